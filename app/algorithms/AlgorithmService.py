@@ -2,15 +2,19 @@ import numpy as np
 import cv2
 import os
 import math
+import time
 import shutil
 import json
 import zlib
 import base64
-import tifffile
 from pathlib import Path
 from PIL import Image
 from PIL.PngImagePlugin import PngInfo
 from helpers.MetaDataHelper import MetaDataHelper
+from helpers.AOIPixels import AOIPixels
+from helpers.AOIStatistics import AOIStatistics
+from helpers.SparseMask import SparseMask
+from helpers.TemperatureGrid import TemperatureGrid
 
 from core.services.cache.ThumbnailCacheService import ThumbnailCacheService
 from core.services.cache.ColorCacheService import ColorCacheService
@@ -45,6 +49,10 @@ class AlgorithmService:
         self.options = options
         self.is_thermal = is_thermal
         self.scale_factor = 1.0  # Default: no scaling
+        self.mask_ms = 0.0  # Time spent in store_mask, read by AnalyzeService's stage timings
+        # Set by TiledAnalysisService: store_mask keeps the mask in captured_mask instead of writing it
+        self.capture_masks = False
+        self.captured_mask = None
 
     def set_scale_factor(self, scale_factor):
         """
@@ -122,6 +130,11 @@ class AlgorithmService:
         """
         Calculates areas of interest from contours without modifying the input image.
 
+        All contours are rasterized once and measured with a single connected-components
+        pass; area, bounding box and pixel membership come from the label image and its
+        stats instead of a full-frame mask per contour. Inputs whose filled contours
+        overlap or touch are measured contour by contour to keep the same results.
+
         Args:
             img_or_shape (numpy.ndarray | tuple | list): The image array or its shape (H, W, [C]).
             contours (list): List of contours.
@@ -134,16 +147,186 @@ class AlgorithmService:
         if len(contours) == 0:
             return None, None
 
-        # Robustly derive height and width whether we received an image or a shape tuple
+        height, width = self._get_height_width(img_or_shape)
+
+        labels, stats, contour_labels = self._label_contours((height, width), contours)
+        if contour_labels is None:
+            return self._identify_areas_of_interest_by_contour((height, width), contours)
+
+        areas_of_interest = []
+        temp_mask = np.zeros((height, width), dtype=np.uint8)
+        base_contour_count = 0
+        valid_labels = []
+
+        # First pass: filter contours and optionally mark them for combining
+        for cnt, label in zip(contours, contour_labels):
+            contour_area = int(stats[label, cv2.CC_STAT_AREA])
+
+            if contour_area >= self.min_area and (self.max_area == 0 or contour_area <= self.max_area):
+                (x, y), radius = cv2.minEnclosingCircle(cnt)
+                center = (int(x), int(y))
+                radius = int(radius) + self.aoi_radius
+                base_contour_count += 1
+
+                # Add to mask for later combining
+                cv2.circle(temp_mask, center, radius, 255, -1)
+                valid_labels.append(label)
+
+                if not self.combine_aois:
+                    detected_pixels_list = self._component_pixels(labels, label, stats[label])
+                    areas_of_interest.append({
+                        'center': center,
+                        'radius': radius,
+                        'area': len(detected_pixels_list),
+                        'contour': cnt.reshape(-1, 2).tolist(),
+                        'detected_pixels': detected_pixels_list
+                    })
+
+        # Second pass: combine AOIs if needed
+        if self.combine_aois:
+            # Original detected pixels of every valid contour, via a label lookup table
+            valid_lut = np.zeros(stats.shape[0], dtype=np.uint8)
+            valid_lut[valid_labels] = 255
+            original_pixels_mask = valid_lut[labels]
+
+            contours = self._merge_aoi_circles(temp_mask, contours)
+
+            combined_labels, combined_stats, combined_contour_labels = self._label_contours((height, width), contours)
+            for i, cnt in enumerate(contours):
+                (x, y), radius = cv2.minEnclosingCircle(cnt)
+                if combined_contour_labels is not None:
+                    label = combined_contour_labels[i]
+                    aoi_pixels_list = self._component_pixels(combined_labels, label, combined_stats[label], original_pixels_mask)
+                else:
+                    mask = np.zeros((height, width), dtype=np.uint8)
+                    cv2.drawContours(mask, [cnt], -1, 255, thickness=-1)
+                    aoi_pixels_list = AOIPixels.from_mask(cv2.bitwise_and(original_pixels_mask, mask))
+
+                # Use actual detected pixel count, not the expanded circle area
+                areas_of_interest.append({
+                    'center': (int(x), int(y)),
+                    'radius': int(radius),
+                    'area': len(aoi_pixels_list),
+                    'contour': cnt.reshape(-1, 2).tolist(),
+                    'detected_pixels': aoi_pixels_list
+                })
+
+        # Sort for consistent ordering
+        areas_of_interest.sort(key=lambda item: (item['center'][1], item['center'][0]))
+
+        return areas_of_interest, base_contour_count
+
+    def _get_height_width(self, img_or_shape):
+        """
+        Derive height and width whether we received an image or a shape tuple.
+
+        Args:
+            img_or_shape (numpy.ndarray | tuple | list): The image array or its shape (H, W, [C]).
+
+        Returns:
+            tuple[int, int]: (height, width).
+        """
         try:
             if hasattr(img_or_shape, 'shape'):
-                height, width = int(img_or_shape.shape[0]), int(img_or_shape.shape[1])
-            else:
-                height, width = int(img_or_shape[0]), int(img_or_shape[1])
+                return int(img_or_shape.shape[0]), int(img_or_shape.shape[1])
+            return int(img_or_shape[0]), int(img_or_shape[1])
         except Exception:
             # Fallback: try tuple conversion then slice
             h_w = tuple(img_or_shape)[:2]
-            height, width = int(h_w[0]), int(h_w[1])
+            return int(h_w[0]), int(h_w[1])
+
+    def _label_contours(self, shape, contours):
+        """
+        Rasterize filled contours once and label them with connected components.
+
+        Args:
+            shape (tuple): (height, width) of the label image.
+            contours (list): List of contours.
+
+        Returns:
+            tuple: (labels, stats, contour_labels) where contour_labels[i] is the component
+                label of contours[i]. contour_labels is None when the filled contours do not
+                map one-to-one onto components (overlapping or touching contours).
+        """
+        filled = np.zeros(shape, dtype=np.uint8)
+        cv2.drawContours(filled, contours, -1, 255, thickness=-1)
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(filled, connectivity=8)
+
+        if num_labels - 1 != len(contours):
+            return labels, stats, None
+
+        # Every drawn contour point lies on its own filled region
+        contour_labels = []
+        for cnt in contours:
+            px, py = cnt.reshape(-1, 2)[0]
+            if not (0 <= py < shape[0] and 0 <= px < shape[1]):
+                return labels, stats, None
+            contour_labels.append(int(labels[py, px]))
+
+        if 0 in contour_labels or len(set(contour_labels)) != len(contour_labels):
+            return labels, stats, None
+        return labels, stats, contour_labels
+
+    def _component_pixels(self, labels, label, stat, restrict_mask=None):
+        """
+        Collect the (x, y) pixels of one labeled component from its bounding box.
+
+        Args:
+            labels (numpy.ndarray): Label image from connectedComponentsWithStats.
+            label (int): Component label.
+            stat (numpy.ndarray): Stats row for the component (x, y, w, h, area).
+            restrict_mask (numpy.ndarray, optional): Only keep pixels that are non-zero here.
+
+        Returns:
+            AOIPixels: Run-length encoded pixels in row-major order.
+        """
+        x, y = int(stat[cv2.CC_STAT_LEFT]), int(stat[cv2.CC_STAT_TOP])
+        w, h = int(stat[cv2.CC_STAT_WIDTH]), int(stat[cv2.CC_STAT_HEIGHT])
+        member = labels[y:y + h, x:x + w] == label
+        if restrict_mask is not None:
+            member &= restrict_mask[y:y + h, x:x + w] > 0
+        return AOIPixels.from_mask(member, x, y)
+
+    def _merge_aoi_circles(self, temp_mask, contours):
+        """
+        Grow AOI circles until no more circles merge.
+
+        Args:
+            temp_mask (numpy.ndarray): Mask with the AOI circles drawn; updated in place.
+            contours (list): Contours from the previous step, used for the convergence check.
+
+        Returns:
+            list: External contours of the merged circles.
+        """
+        while True:
+            new_contours, _ = cv2.findContours(temp_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+            for cnt in new_contours:
+                (x, y), radius = cv2.minEnclosingCircle(cnt)
+                cv2.circle(temp_mask, (int(x), int(y)), int(radius), 255, -1)
+            if len(new_contours) == len(contours):
+                return new_contours
+            contours = new_contours
+
+    def _identify_areas_of_interest_by_contour(self, img_or_shape, contours):
+        """
+        Calculates areas of interest by rasterizing each contour into its own full-frame mask.
+
+        Used when contours overlap or touch, where one label per contour cannot be derived
+        from a single connected-components pass.
+
+        Args:
+            img_or_shape (numpy.ndarray | tuple | list): The image array or its shape (H, W, [C]).
+            contours (list): List of contours.
+
+        Returns:
+            tuple: (areas_of_interest, base_contour_count)
+                - areas_of_interest (list): Final list of AOIs after optional combining.
+                - base_contour_count (int): Count of original valid contours before combining.
+        """
+        if len(contours) == 0:
+            return None, None
+
+        height, width = self._get_height_width(img_or_shape)
         areas_of_interest = []
         temp_mask = np.zeros((height, width), dtype=np.uint8)
         base_contour_count = 0
@@ -174,8 +357,7 @@ class AlgorithmService:
                     contour_points = cnt.reshape(-1, 2).tolist()
 
                     # Get the detected pixels for this AOI
-                    detected_pixels = np.argwhere(mask > 0)
-                    detected_pixels_list = detected_pixels[:, [1, 0]].tolist() if len(detected_pixels) > 0 else []
+                    detected_pixels_list = AOIPixels.from_mask(mask)
 
                     # Use actual detected pixel count for area
                     area = len(detected_pixels_list)
@@ -190,17 +372,7 @@ class AlgorithmService:
 
         # Second pass: combine AOIs if needed
         if self.combine_aois:
-            while True:
-                new_contours, _ = cv2.findContours(temp_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
-                for cnt in new_contours:
-                    (x, y), radius = cv2.minEnclosingCircle(cnt)
-                    center = (int(x), int(y))
-                    radius = int(radius)
-                    cv2.circle(temp_mask, center, radius, 255, -1)
-                if len(new_contours) == len(contours):
-                    contours = new_contours
-                    break
-                contours = new_contours
+            contours = self._merge_aoi_circles(temp_mask, contours)
 
             for cnt in contours:
                 mask = np.zeros((height, width), dtype=np.uint8)
@@ -213,8 +385,7 @@ class AlgorithmService:
 
                 # Get the original detected pixels that belong to this combined AOI
                 aoi_pixels_mask = cv2.bitwise_and(original_pixels_mask, mask)
-                aoi_pixels = np.argwhere(aoi_pixels_mask > 0)
-                aoi_pixels_list = aoi_pixels[:, [1, 0]].tolist() if len(aoi_pixels) > 0 else []
+                aoi_pixels_list = AOIPixels.from_mask(aoi_pixels_mask)
 
                 # Use actual detected pixel count, not the expanded circle area
                 area = len(aoi_pixels_list)
@@ -273,16 +444,120 @@ class AlgorithmService:
 
             # Transform detected pixels
             if 'detected_pixels' in transformed_aoi and transformed_aoi['detected_pixels']:
-                transformed_pixels = []
-                for pixel in transformed_aoi['detected_pixels']:
-                    x, y = pixel[0], pixel[1]
-                    transformed_pixels.append(self.transform_to_original_coords(x, y))
-                transformed_aoi['detected_pixels'] = transformed_pixels
+                pixels = AOIPixels.coerce(transformed_aoi['detected_pixels'])
+                transformed_aoi['detected_pixels'] = pixels.scaled(inverse_scale)
 
             transformed_aois.append(transformed_aoi)
 
         return transformed_aois
 
+    def translate_aois(self, areas_of_interest, dx, dy):
+        """
+        Shift AOI coordinates by a fixed offset, e.g. from tile to full-image coordinates.
+
+        Args:
+            areas_of_interest: List of AOI dictionaries.
+            dx: Column offset.
+            dy: Row offset.
+
+        Returns:
+            List of shifted AOI dictionaries.
+        """
+        if (dx == 0 and dy == 0) or not areas_of_interest:
+            return areas_of_interest
+
+        translated_aois = []
+        for aoi in areas_of_interest:
+            translated_aoi = aoi.copy()
+            if 'center' in translated_aoi:
+                x, y = translated_aoi['center']
+                translated_aoi['center'] = (int(x + dx), int(y + dy))
+            if 'contour' in translated_aoi and translated_aoi['contour']:
+                translated_aoi['contour'] = [[int(x + dx), int(y + dy)] for x, y in translated_aoi['contour']]
+            if 'detected_pixels' in translated_aoi and translated_aoi['detected_pixels']:
+                pixels = AOIPixels.coerce(translated_aoi['detected_pixels'])
+                translated_aoi['detected_pixels'] = pixels.translated(dx, dy)
+            translated_aois.append(translated_aoi)
+
+        return translated_aois
+
+    def _add_mean_confidence_scores(self, areas_of_interest, score_map, mask, score_type, invert=False):
+        """
+        Add confidence fields to AOIs from the mean of a per-pixel score map.
+
+        Scores are normalized to 0-100 against the range of scores over the whole detection
+        mask. Per-AOI means are computed for all AOIs at once with AOIStatistics.
+
+        Args:
+            areas_of_interest (list): List of AOI dictionaries.
+            score_map (numpy.ndarray): Per-pixel score array.
+            mask (numpy.ndarray): Binary detection mask.
+            score_type (str): Value stored in each AOI's 'score_type'.
+            invert (bool): If True, lower scores mean higher confidence. Defaults to False.
+
+        Returns:
+            list: AOIs with 'confidence', 'score_type', 'raw_score' and 'score_method' set.
+        """
+        # Get all scores from detected pixels to find the range for normalization
+        detected_scores = score_map[mask > 0]
+        if len(detected_scores) == 0:
+            return areas_of_interest
+
+        max_score = np.max(detected_scores)
+        min_score = np.min(detected_scores)
+        score_range = max_score - min_score if max_score > min_score else 1.0
+
+        mean_scores = AOIStatistics.from_aois(areas_of_interest, score_map.shape).mean(score_map)
+
+        for aoi, mean_score in zip(areas_of_interest, mean_scores):
+            if np.isnan(mean_score):
+                # No detected pixels inside the score map, set low confidence
+                confidence = 0.0
+                raw_score = 0.0
+            else:
+                if invert:
+                    normalized_score = ((max_score - mean_score) / score_range) * 100.0
+                else:
+                    normalized_score = ((mean_score - min_score) / score_range) * 100.0
+                confidence = round(float(normalized_score), 1)
+                raw_score = round(float(mean_score), 3)
+
+            aoi['confidence'] = confidence
+            aoi['score_type'] = score_type
+            aoi['raw_score'] = raw_score
+            aoi['score_method'] = 'mean'
+
+        return areas_of_interest
+
+    def _add_mean_temperatures(self, areas_of_interest, temperature_c):
+        """
+        Set each AOI's 'temperature' to the mean temperature of its detected pixels.
+
+        Must be called while detected pixels are still in the temperature array's
+        coordinate space. AOIs without usable pixels get None and a warning.
+
+        Args:
+            areas_of_interest (list): List of AOI dictionaries.
+            temperature_c (numpy.ndarray): Per-pixel temperatures in Celsius.
+
+        Returns:
+            list: AOIs with 'temperature' set.
+        """
+        mean_temps = AOIStatistics.from_aois(areas_of_interest, temperature_c.shape).mean(temperature_c)
+
+        for aoi, mean_temp in zip(areas_of_interest, mean_temps):
+            if not np.isnan(mean_temp):
+                aoi['temperature'] = float(mean_temp)
+            elif len(aoi.get('detected_pixels', [])) > 0:
+                aoi['temperature'] = None
+                self.logger.warning(f"AOI at {aoi['center']}: all detected pixels out of bounds")
+            else:
+                # Fallback: no detected pixels (shouldn't happen in normal flow)
+                aoi['temperature'] = None
+                self.logger.warning(f"AOI at {aoi['center']}: no detected pixels available")
+
+        return areas_of_interest
+
     def apply_hue_expansion(self, img, mask, areas_of_interest, hue_range):
         """
         Expands the pixel detection mask based on hue similarity within AOI circles.
@@ -306,59 +581,49 @@ class AlgorithmService:
 
         # Convert image to HSV once for efficiency
         hsv_img = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        hue = hsv_img[:, :, 0]
+        height, width = hue.shape
 
         # Create expanded mask starting with the original
         expanded_mask = mask.copy()
 
-        for aoi in areas_of_interest:
-            detected_pixels = aoi.get('detected_pixels', [])
-            if len(detected_pixels) == 0:
-                continue
-
-            # Calculate average hue of detected pixels
-            hue_values = []
-            for px, py in detected_pixels:
-                # Ensure pixel coordinates are within image bounds
-                if 0 <= py < hsv_img.shape[0] and 0 <= px < hsv_img.shape[1]:
-                    hue_values.append(hsv_img[py, px, 0])  # H channel
+        # Average hue of every AOI's detected pixels in a single pass
+        avg_hues = AOIStatistics.from_aois(areas_of_interest, hue.shape).mean(hue)
+        hue_levels = np.arange(256)
 
-            if len(hue_values) == 0:
+        for aoi, mean_hue in zip(areas_of_interest, avg_hues):
+            if np.isnan(mean_hue):
                 continue
 
-            avg_hue = int(np.mean(hue_values))
+            avg_hue = int(mean_hue)
 
             # Calculate hue range with wraparound handling
             hue_min = avg_hue - hue_range
             hue_max = avg_hue + hue_range
 
-            # Create circular ROI mask for this AOI
-            center = aoi['center']
-            radius = aoi['radius']
-            roi_mask = np.zeros(mask.shape[:2], dtype=np.uint8)
-            cv2.circle(roi_mask, center, radius, 255, -1)
-
-            # Get all pixels within the circular ROI
-            roi_y, roi_x = np.where(roi_mask == 255)
-
-            # Check each pixel in ROI for hue match
-            for py, px in zip(roi_y, roi_x):
-                pixel_hue = hsv_img[py, px, 0]
-
-                # Handle hue wraparound (hue is circular: 0-179 in OpenCV)
-                if hue_min < 0:
-                    # Wraparound at lower bound (e.g., hue=5, range=10 -> -5 to 15)
-                    # Matches if hue >= (180 + hue_min) OR hue <= hue_max
-                    if pixel_hue >= (180 + hue_min) or pixel_hue <= hue_max:
-                        expanded_mask[py, px] = 255
-                elif hue_max >= 180:
-                    # Wraparound at upper bound (e.g., hue=175, range=10 -> 165 to 185)
-                    # Matches if hue >= hue_min OR hue <= (hue_max - 180)
-                    if pixel_hue >= hue_min or pixel_hue <= (hue_max - 180):
-                        expanded_mask[py, px] = 255
-                else:
-                    # No wraparound - simple range check
-                    if hue_min <= pixel_hue <= hue_max:
-                        expanded_mask[py, px] = 255
+            # Lookup table of matching hue values (hue is circular: 0-179 in OpenCV)
+            if hue_min < 0:
+                # Wraparound at lower bound (e.g., hue=5, range=10 -> -5 to 15)
+                hue_match = (hue_levels >= (180 + hue_min)) | (hue_levels <= hue_max)
+            elif hue_max >= 180:
+                # Wraparound at upper bound (e.g., hue=175, range=10 -> 165 to 185)
+                hue_match = (hue_levels >= hue_min) | (hue_levels <= (hue_max - 180))
+            else:
+                # No wraparound - simple range check
+                hue_match = (hue_levels >= hue_min) & (hue_levels <= hue_max)
+
+            # Circular ROI drawn on a crop around the AOI instead of a full-frame mask
+            cx, cy = int(aoi['center'][0]), int(aoi['center'][1])
+            radius = int(aoi['radius'])
+            x0, x1 = max(0, cx - radius - 1), min(width, cx + radius + 2)
+            y0, y1 = max(0, cy - radius - 1), min(height, cy + radius + 2)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            roi_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.circle(roi_mask, (cx - x0, cy - y0), radius, 255, -1)
+
+            matched = (roi_mask == 255) & hue_match[hue[y0:y1, x0:x1]]
+            expanded_mask[y0:y1, x0:x1][matched] = 255
 
         return expanded_mask
 
@@ -368,7 +633,8 @@ class AlgorithmService:
         image_path: str,
         areas_of_interest: list,
         output_dir: str,
-        thermal: bool = False
+        thermal: bool = False,
+        origin: tuple = (0, 0)
     ) -> None:
         """Generate and cache thumbnails and color information for all AOIs.
 
@@ -381,6 +647,8 @@ class AlgorithmService:
             areas_of_interest: List of AOI dictionaries from detection.
             output_dir: Output directory where cache folders will be created.
             thermal: Whether this is a thermal image. Defaults to False.
+            origin: (x, y) of img's top-left corner in the full image, when img is a
+                window of it. AOI coordinates stay in full-image coordinates. Defaults to (0, 0).
         """
         import colorsys
 
@@ -407,11 +675,19 @@ class AlgorithmService:
 
             height, width = img_rgb.shape[:2]
 
+            # Measurements use coordinates within img; thumbnails and colors are keyed by the AOIs as given
+            local_aois = self.translate_aois(areas_of_interest, -origin[0], -origin[1])
+
+            # Average color of every AOI's detected pixels in a single pass
+            avg_colors = None
+            if img_rgb.ndim == 3:
+                avg_colors = AOIStatistics.from_aois(local_aois, img_rgb.shape).mean(img_rgb)
+
             # Process each AOI
-            for aoi in areas_of_interest:
+            for index, aoi in enumerate(areas_of_interest):
                 try:
                     # Extract thumbnail from in-memory image
-                    center = aoi.get('center')
+                    center = local_aois[index].get('center')
                     radius = aoi.get('radius', 50)
 
                     if not center:
@@ -452,7 +728,8 @@ class AlgorithmService:
 
                     # Calculate representative color directly from in-memory image
                     # This avoids creating AOIService/ImageService which reads metadata from disk
-                    color_result = self._calculate_aoi_representative_color(img_rgb, aoi)
+                    avg_rgb = avg_colors[index] if avg_colors is not None else None
+                    color_result = self._calculate_aoi_representative_color(img_rgb, local_aois[index], avg_rgb)
                     if color_result:
                         color_info = {
                             'rgb': color_result['rgb'],
@@ -480,7 +757,7 @@ class AlgorithmService:
             # Don't fail the entire detection if cache generation fails
             self.logger.error(f"Error generating AOI cache: {e}")
 
-    def _calculate_aoi_representative_color(self, img_rgb: np.ndarray, aoi: dict) -> dict:
+    def _calculate_aoi_representative_color(self, img_rgb: np.ndarray, aoi: dict, avg_rgb=None) -> dict:
         """
         Calculate a representative color for an AOI directly from the in-memory image.
 
@@ -490,6 +767,7 @@ class AlgorithmService:
         Args:
             img_rgb: RGB image array (not BGR).
             aoi: AOI dictionary with 'center', 'radius', and optionally 'detected_pixels'.
+            avg_rgb: Precomputed average RGB of the AOI's detected pixels, if available.
 
         Returns:
             dict or None: {
@@ -508,33 +786,26 @@ class AlgorithmService:
             radius = aoi.get('radius', 0)
             cx, cy = int(center[0]), int(center[1])
 
-            # Collect RGB values within the AOI
-            colors = []
-
-            # If we have detected pixels, use those
-            if 'detected_pixels' in aoi and aoi['detected_pixels']:
-                for pixel in aoi['detected_pixels']:
-                    if isinstance(pixel, (list, tuple)) and len(pixel) >= 2:
-                        px, py = int(pixel[0]), int(pixel[1])
-                        if 0 <= py < height and 0 <= px < width:
-                            colors.append(img_rgb[py, px])
-            # Otherwise sample within the circle
-            else:
-                y_min = max(0, cy - radius)
-                y_max = min(height, cy + radius + 1)
-                x_min = max(0, cx - radius)
-                x_max = min(width, cx + radius + 1)
-
-                for y in range(y_min, y_max):
-                    for x in range(x_min, x_max):
-                        if (x - cx) ** 2 + (y - cy) ** 2 <= radius ** 2:
-                            colors.append(img_rgb[y, x])
-
-            if not colors:
+            if avg_rgb is None or np.any(np.isnan(avg_rgb)):
+                # If we have detected pixels, use those
+                if 'detected_pixels' in aoi and aoi['detected_pixels']:
+                    avg_rgb = AOIStatistics.from_aois([aoi], img_rgb.shape).mean(img_rgb)[0]
+                # Otherwise sample within the circle
+                else:
+                    y_min = max(0, cy - radius)
+                    y_max = min(height, cy + radius + 1)
+                    x_min = max(0, cx - radius)
+                    x_max = min(width, cx + radius + 1)
+                    ys, xs = np.ogrid[y_min:y_max, x_min:x_max]
+                    in_circle = (xs - cx) ** 2 + (ys - cy) ** 2 <= radius ** 2
+                    colors = img_rgb[y_min:y_max, x_min:x_max][in_circle]
+                    avg_rgb = np.mean(colors, axis=0) if len(colors) > 0 else None
+
+            if avg_rgb is None or np.any(np.isnan(avg_rgb)):
                 return None
 
             # Calculate average RGB
-            avg_rgb = np.mean(colors, axis=0).astype(int)
+            avg_rgb = np.asarray(avg_rgb).astype(int)
             r, g, b = int(avg_rgb[0]), int(avg_rgb[1]), int(avg_rgb[2])
 
             # Convert to HSV
@@ -590,21 +861,27 @@ class AlgorithmService:
 
     def store_mask(self, input_file, output_file, mask, temperature_data=None, target_shape=None):
         """
-        Saves the detection mask as a TIFF file with temperature data embedded as additional bands.
+        Saves the detection mask as a sparse mask file, with temperature data in a tiled grid beside it.
+
+        The mask is stored with SparseMask, which keeps only the crops around detected
+        pixels. Temperature data covers the whole frame and is stored once per image as a
+        TemperatureGrid next to the mask (same name, TemperatureGrid.EXTENSION), which the
+        viewer reads through a memmap.
 
         Args:
             input_file (str): Path to the input image file.
-            output_file (str): Path to save the mask (will be saved as .tif extension).
+            output_file (str): Path to save the mask (the extension is replaced with SparseMask.EXTENSION).
             mask (np.ndarray): Binary mask of detected pixels (0 or 255).
-            temperature_data (np.ndarray or list, optional): Temperature matrix to store as additional bands.
+            temperature_data (np.ndarray or list, optional): Temperature matrix in Celsius. Only the
+                first channel of a multi-channel matrix is stored.
             target_shape (tuple, optional): Target (height, width) to resize mask and thermal data to.
                 Used when visual image is upscaled (e.g., DJI 1280x1024) vs thermal (640x512).
         """
+        start = time.perf_counter()
         path = Path(output_file)
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Change extension to .tif for mask
-        mask_file = path.with_suffix('.tif')
+        mask_file = path.with_suffix(SparseMask.EXTENSION)
 
         # Ensure mask is single channel grayscale
         if len(mask.shape) == 3:
@@ -621,15 +898,20 @@ class AlgorithmService:
                 interpolation=cv2.INTER_NEAREST  # Use NEAREST for binary mask
             )
 
-        bands = []
+        if self.capture_masks:
+            # Tiled processing assembles and writes the mask from every tile itself
+            self.captured_mask = mask
+            self.mask_ms += (time.perf_counter() - start) * 1000.0
+            return str(mask_file)
 
-        # First band: mask (uint8)
-        bands.append(mask.astype(np.uint8))
+        SparseMask.write(str(mask_file), mask)
 
         if temperature_data is not None:
             # Convert to numpy if needed
             if not isinstance(temperature_data, np.ndarray):
                 temperature_data = np.array(temperature_data)
+            if temperature_data.ndim == 3:
+                temperature_data = temperature_data[:, :, 0]
 
             # Upscale temperature data to match mask resolution (which matches visual image)
             if temperature_data.shape[:2] != mask.shape[:2]:
@@ -641,29 +923,9 @@ class AlgorithmService:
                     interpolation=cv2.INTER_LINEAR  # Bilinear for smooth temperature interpolation
                 )
 
-            # Always float32 for thermal
-            temp_scaled = temperature_data.astype(np.float32)
-
-            # If 2D, add channel dimension
-            if temp_scaled.ndim == 2:
-                temp_scaled = np.expand_dims(temp_scaled, axis=2)
-
-            # Add each channel as its own band
-            for i in range(temp_scaled.shape[2]):
-                bands.append(temp_scaled[:, :, i])
-
-        # Stack into shape (bands, height, width)
-        stacked = np.stack(bands, axis=0)
-
-        # Save with tifffile (multi-band, compressed)
-        tifffile.imwrite(
-            str(mask_file),
-            stacked,
-            photometric='minisblack',
-            metadata={'axes': 'CYX'},  # Channels, Y, X
-            compression='deflate'  # or 'zlib' / 'lzma' if you prefer
-        )
+            TemperatureGrid.write(str(mask_file.with_suffix(TemperatureGrid.EXTENSION)), temperature_data)
 
+        self.mask_ms += (time.perf_counter() - start) * 1000.0
         return str(mask_file)
 
     def split_image(self, img, segments, overlap=0):
@@ -767,3 +1029,7 @@ class AnalysisResult:
         self.areas_of_interest = areas_of_interest
         self.base_contour_count = base_contour_count
         self.error_message = error_message
+        # Hash of the input file contents, set by AnalyzeService.process_file for the analysis manifest
+        self.content_hash = None
+        # Per-stage ImageStageTimings, set by AnalyzeService.process_file
+        self.timings = None
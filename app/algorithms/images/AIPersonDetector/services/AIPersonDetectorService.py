@@ -14,10 +14,15 @@ except (ImportError, OSError, Exception) as e:
     _onnxruntime_error = str(e)
 
 from core.services.LoggerService import LoggerService
+from core.services.CPUService import CPUService
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
 from helpers.SlidingWindowSlicer import SlidingWindowSlicer
 
 OVERLAP = 0.2
+DEFAULT_BATCH_SIZE = 4
+
+# ONNX sessions are expensive to create, so each process keeps one per model/provider setup
+_onnx_sessions = {}
 
 
 class AIPersonDetectorService(AlgorithmService):
@@ -32,6 +37,7 @@ class AIPersonDetectorService(AlgorithmService):
         slice_size: Size of image slices for processing.
         model_img_size: Input size for the ONNX model.
         model_path: Path to the ONNX model file.
+        batch_size: Number of slices sent to the model in a single inference call.
     """
 
     def __init__(self, identifier, min_area, max_area, aoi_radius, combine_aois, options):
@@ -44,7 +50,9 @@ class AIPersonDetectorService(AlgorithmService):
             aoi_radius: Radius for defining areas of interest.
             combine_aois: Whether to combine overlapping AOIs.
             options: Algorithm-specific options, must include
-                'person_detector_confidence' and 'cpu_only'.
+                'person_detector_confidence' and 'cpu_only'. Optional 'batch_size'
+                sets how many slices are inferred per call and 'num_processes'
+                the number of worker processes sharing the CPU.
 
         Raises:
             RuntimeError: If onnxruntime is not available or cannot be loaded.
@@ -67,6 +75,8 @@ class AIPersonDetectorService(AlgorithmService):
         super().__init__('AIPersonDetector', identifier, min_area, max_area, aoi_radius, combine_aois, options)
         self.confidence = options['person_detector_confidence'] / 100
         self.cpu_only = options['cpu_only']
+        self.batch_size = max(1, int(options.get('batch_size', DEFAULT_BATCH_SIZE)))
+        self.num_processes = options.get('num_processes')
         if self.cpu_only:
             self.slice_size = 1280
             self.model_img_size = 640
@@ -103,27 +113,13 @@ class AIPersonDetectorService(AlgorithmService):
             AnalysisResult object with details of the analysis including
             detected people as areas of interest.
         """
-        session = self._create_onnx_session()
+        session = self._get_onnx_session()
         input_name = session.get_inputs()[0].name
 
         try:
             img_pre_processed = self._preprocess_whole_image(img)
-            all_boxes = []
-            all_scores = []
-            all_classes = []
             slices = SlidingWindowSlicer.get_slices(img_pre_processed.shape, self.slice_size, OVERLAP)
-            for s_idx, (x1, y1, x2, y2) in enumerate(slices):
-                crop = img_pre_processed[y1:y2, x1:x2]
-                crop_w = x2 - x1
-                crop_h = y2 - y1
-                input_tensor = self._preprocess_slice(crop, out_size=self.model_img_size)
-                outputs = session.run(None, {input_name: input_tensor})
-                bboxes = self._postprocess(outputs, (x1, y1), crop_w, crop_h)
-                for bx in bboxes:
-                    bx1, by1, bx2, by2, conf, cls = bx
-                    all_boxes.append([bx1, by1, bx2, by2])
-                    all_scores.append(conf)
-                    all_classes.append(cls)
+            all_boxes, all_scores, all_classes = self._detect_slices(session, input_name, img_pre_processed, slices)
             merged_bboxes = SlidingWindowSlicer.merge_slice_detections(
                 all_boxes, all_scores, all_classes, iou_threshold=0.5
             )
@@ -153,6 +149,95 @@ class AIPersonDetectorService(AlgorithmService):
             self.logger.error(f"Error processing image {full_path}: {e}")
             return AnalysisResult(full_path, error_message=str(e))
 
+    def _detect_slices(self, session, input_name, img_pre_processed, slices):
+        """Run the model over all slices, batching them into NCHW tensors.
+
+        Args:
+            session: ONNX Runtime inference session.
+            input_name: Name of the model input.
+            img_pre_processed: Normalized RGB image as float32 numpy array.
+            slices: List of (x1, y1, x2, y2) slice rectangles.
+
+        Returns:
+            Tuple of (boxes, scores, classes) lists in full image coordinates.
+        """
+        all_boxes = []
+        all_scores = []
+        all_classes = []
+        batch_size = self._get_batch_size(session)
+
+        for start in range(0, len(slices), batch_size):
+            batch_slices = slices[start:start + batch_size]
+            tensors = [
+                self._preprocess_slice(img_pre_processed[y1:y2, x1:x2], out_size=self.model_img_size)
+                for (x1, y1, x2, y2) in batch_slices
+            ]
+            outputs = self._run_batch(session, input_name, tensors)
+            for idx, (x1, y1, x2, y2) in enumerate(batch_slices):
+                bboxes = self._postprocess([outputs[idx]], (x1, y1), x2 - x1, y2 - y1)
+                for bx1, by1, bx2, by2, conf, cls in bboxes:
+                    all_boxes.append([bx1, by1, bx2, by2])
+                    all_scores.append(conf)
+                    all_classes.append(cls)
+
+        return all_boxes, all_scores, all_classes
+
+    def _run_batch(self, session, input_name, tensors):
+        """Run inference for a list of (1, 3, H, W) slice tensors.
+
+        Stacks the tensors into a single batch when there is more than one. If the
+        model rejects the batch, falls back to one call per slice and disables
+        batching for the rest of this session.
+
+        Args:
+            session: ONNX Runtime inference session.
+            input_name: Name of the model input.
+            tensors: List of slice tensors.
+
+        Returns:
+            List with the first model output for each slice, shaped (1, N, 6).
+        """
+        if len(tensors) > 1:
+            try:
+                outputs = session.run(None, {input_name: np.concatenate(tensors, axis=0)})
+                return [outputs[0][i:i + 1] for i in range(len(tensors))]
+            except Exception as e:
+                self.logger.warning(f"Batched inference failed, falling back to single slices: {e}")
+                self.batch_size = 1
+        return [session.run(None, {input_name: tensor})[0] for tensor in tensors]
+
+    def _get_batch_size(self, session):
+        """Return the effective batch size, capped by a fixed model batch dimension."""
+        try:
+            model_batch = session.get_inputs()[0].shape[0]
+        except Exception:
+            model_batch = None
+        if isinstance(model_batch, (int, np.integer)) and model_batch > 0:
+            return max(1, min(self.batch_size, int(model_batch)))
+        return self.batch_size
+
+    def _get_intra_op_threads(self):
+        """Split the CPU cores evenly between the worker processes.
+
+        Returns:
+            Number of threads for ONNX Runtime intra-op parallelism (at least 1).
+        """
+        processes = self.num_processes or CPUService.get_recommended_process_count()
+        return max(1, CPUService.get_cpu_count() // max(1, int(processes)))
+
+    def _get_onnx_session(self):
+        """Return the inference session for this model, creating it once per process.
+
+        Returns:
+            Loaded ONNX model session (onnxruntime.InferenceSession).
+        """
+        key = (self.model_path, self.cpu_only, self._get_intra_op_threads())
+        session = _onnx_sessions.get(key)
+        if session is None:
+            session = self._create_onnx_session()
+            _onnx_sessions[key] = session
+        return session
+
     def _preprocess_whole_image(self, img):
         """Convert BGR image to RGB and normalize to [0, 1] float32.
 
@@ -223,7 +308,7 @@ class AIPersonDetectorService(AlgorithmService):
         so.enable_mem_pattern = False
         so.enable_mem_reuse = True
         so.enable_profiling = False
-        so.intra_op_num_threads = 1
+        so.intra_op_num_threads = self._get_intra_op_threads()
 
         providers_cuda_first = ["DmlExecutionProvider", "CPUExecutionProvider"]
 
@@ -3,13 +3,15 @@ import cv2
 import traceback
 from core.services.LoggerService import LoggerService
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
+from helpers.ColorRangeLUT import ColorRangeLUT
 
 
 class ColorRangeService(AlgorithmService):
     """Service that executes the Color Range algorithm to detect and highlight areas.
 
     Detects areas within one or more RGB color ranges. Supports both single
-    and multiple color range configurations.
+    and multiple color range configurations. All ranges are compiled into one
+    ColorRangeLUT the first time an image is processed.
 
     Attributes:
         color_ranges: List of color range configurations, each containing
@@ -48,6 +50,8 @@ class ColorRangeService(AlgorithmService):
             # This maintains backward compatibility
             self.color_ranges = [{'color_range': [identifier, identifier]}]
 
+        self._lut = None
+
     def process_image(self, img, full_path, input_dir, output_dir):
         """Process a single image to identify areas within one or more RGB color ranges.
 
@@ -62,27 +66,8 @@ class ColorRangeService(AlgorithmService):
             of interest, base contour count, and error message if any.
         """
         try:
-            # Start with an empty mask
-            combined_mask = np.zeros(img.shape[:2], dtype=np.uint8)
-
-            # Process each color range and combine masks with OR logic
-            for color_config in self.color_ranges:
-                color_range = color_config.get('color_range')
-                if not color_range:
-                    continue
-
-                min_rgb = color_range[0]
-                max_rgb = color_range[1]
-
-                # Define the color range boundaries (OpenCV uses BGR)
-                cv_lower_limit = np.array([min_rgb[2], min_rgb[1], min_rgb[0]], dtype=np.uint8)
-                cv_upper_limit = np.array([max_rgb[2], max_rgb[1], max_rgb[0]], dtype=np.uint8)
-
-                # Find pixels within this color range
-                mask = cv2.inRange(img, cv_lower_limit, cv_upper_limit)
-
-                # Combine with existing mask using OR logic
-                combined_mask = cv2.bitwise_or(combined_mask, mask)
+            # Pixels within any of the color ranges, in one table lookup
+            combined_mask = self.get_lut().mask(img)
 
             # Identify contours in the combined masked image
             contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
@@ -102,3 +87,22 @@ class ColorRangeService(AlgorithmService):
             self.logger.error(traceback.format_exc())
             self.logger.error(f"Error processing image {full_path}: {e}")
             return AnalysisResult(full_path, error_message=str(e))
+
+    def get_lut(self):
+        """Return the lookup table of all configured color ranges, compiling it on first use.
+
+        Returns:
+            ColorRangeLUT indexed by BGR color.
+        """
+        if self._lut is None:
+            bounds = []
+            for color_config in self.color_ranges:
+                color_range = color_config.get('color_range')
+                if not color_range:
+                    continue
+
+                # Define the color range boundaries (OpenCV uses BGR)
+                min_rgb, max_rgb = color_range[0], color_range[1]
+                bounds.append(([min_rgb[2], min_rgb[1], min_rgb[0]], [max_rgb[2], max_rgb[1], max_rgb[0]]))
+            self._lut = ColorRangeLUT.from_ranges(bounds)
+        return self._lut
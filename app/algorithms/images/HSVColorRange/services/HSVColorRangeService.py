@@ -3,6 +3,7 @@ import cv2
 from ast import literal_eval
 
 from helpers.ColorUtils import ColorUtils
+from helpers.ColorRangeLUT import ColorRangeLUT
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
 from core.services.LoggerService import LoggerService
 
@@ -11,7 +12,9 @@ class HSVColorRangeService(AlgorithmService):
     """Service that executes the HSV Color Range algorithm.
 
     Detects areas within one or more HSV color ranges. Supports both single
-    and multiple HSV range configurations with hue wraparound handling.
+    and multiple HSV range configurations with hue wraparound handling. All
+    ranges are compiled into one ColorRangeLUT over BGR colors the first time an
+    image is processed.
 
     Attributes:
         target_color_hsv: Target HSV color for backward compatibility.
@@ -32,6 +35,7 @@ class HSVColorRangeService(AlgorithmService):
         super().__init__('HSVColorRange', identifier, min_area, max_area, aoi_radius, combine_aois, options)
 
         self.target_color_hsv = None
+        self._lut = None
         # Store for backward compatibility
         selected_color = self.options.get('selected_color')
         if selected_color is not None:
@@ -53,18 +57,17 @@ class HSVColorRangeService(AlgorithmService):
                         rgb_color = np.uint8([[selected_color]])
                         self.target_color_hsv = cv2.cvtColor(rgb_color, cv2.COLOR_RGB2HSV)[0][0]
 
-    def _create_mask_from_hsv_ranges(self, hsv_image, hsv_ranges):
-        """Create a mask from HSV range data.
+    def _hsv_bounds_from_ranges(self, hsv_ranges):
+        """Convert HSV range data to inclusive cv2.inRange bounds.
 
         Handles hue wraparound for OpenCV HSV format (H: 0-179, S/V: 0-255).
 
         Args:
-            hsv_image: Image in HSV color space as numpy array.
             hsv_ranges: Dictionary with h, s, v, h_minus, h_plus, s_minus,
                 s_plus, v_minus, v_plus keys.
 
         Returns:
-            Binary mask as numpy array (0 or 255).
+            List of (lower, upper) uint8 bounds; two when the hue range wraps.
         """
         h, s, v = hsv_ranges['h'], hsv_ranges['s'], hsv_ranges['v']
         h_minus, h_plus = hsv_ranges['h_minus'], hsv_ranges['h_plus']
@@ -88,38 +91,149 @@ class HSVColorRangeService(AlgorithmService):
         # Handle hue wrapping if necessary
         if h_low < 0 or h_high > 179:
             # Hue wraps around (e.g., 350° to 10° or 0° with -30 to +30)
-            # Create two masks to cover the wrapped range
+            # Two ranges cover the wrapped range
             if h_low < 0:
                 # Wraps at the lower end: convert negative to wrapped value
                 # E.g., h_low = -15 becomes 165 (180 + (-15) = 165)
-                h_low_wrapped = 180 + h_low
-                mask1 = cv2.inRange(hsv_image,
-                                    np.array([h_low_wrapped, s_low, v_low], dtype=np.uint8),
-                                    np.array([179, s_high, v_high], dtype=np.uint8))
-            else:
-                # No wrap at lower end, use normal range up to 179
-                mask1 = cv2.inRange(hsv_image,
-                                    np.array([h_low, s_low, v_low], dtype=np.uint8),
-                                    np.array([179, s_high, v_high], dtype=np.uint8))
+                h_low = 180 + h_low
 
             if h_high > 179:
                 # Wraps at the upper end: take modulo to get wrapped value
                 # E.g., h_high = 195 becomes 15 (195 - 180 = 15)
-                h_high_wrapped = h_high - 180
-                mask2 = cv2.inRange(hsv_image,
-                                    np.array([0, s_low, v_low], dtype=np.uint8),
-                                    np.array([h_high_wrapped, s_high, v_high], dtype=np.uint8))
-            else:
-                # No wrap at upper end, use normal range from 0
-                mask2 = cv2.inRange(hsv_image,
-                                    np.array([0, s_low, v_low], dtype=np.uint8),
-                                    np.array([h_high, s_high, v_high], dtype=np.uint8))
-
-            return cv2.bitwise_or(mask1, mask2)
-        else:
-            lower_bound = np.array([h_low, s_low, v_low], dtype=np.uint8)
-            upper_bound = np.array([h_high, s_high, v_high], dtype=np.uint8)
-            return cv2.inRange(hsv_image, lower_bound, upper_bound)
+                h_high = h_high - 180
+
+            return [(np.array([h_low, s_low, v_low], dtype=np.uint8),
+                     np.array([179, s_high, v_high], dtype=np.uint8)),
+                    (np.array([0, s_low, v_low], dtype=np.uint8),
+                     np.array([h_high, s_high, v_high], dtype=np.uint8))]
+
+        return [(np.array([h_low, s_low, v_low], dtype=np.uint8),
+                 np.array([h_high, s_high, v_high], dtype=np.uint8))]
+
+    def _create_mask_from_hsv_ranges(self, hsv_image, hsv_ranges):
+        """Create a mask from HSV range data.
+
+        Args:
+            hsv_image: Image in HSV color space as numpy array.
+            hsv_ranges: Dictionary with h, s, v, h_minus, h_plus, s_minus,
+                s_plus, v_minus, v_plus keys.
+
+        Returns:
+            Binary mask as numpy array (0 or 255).
+        """
+        return self._create_mask_from_bounds(hsv_image, self._hsv_bounds_from_ranges(hsv_ranges))
+
+    def _create_mask_from_bounds(self, hsv_image, bounds):
+        """Create a mask of the pixels within any of several inclusive HSV bounds.
+
+        Args:
+            hsv_image: Image in HSV color space as numpy array.
+            bounds: List of (lower, upper) uint8 bounds.
+
+        Returns:
+            Binary mask as numpy array (0 or 255).
+        """
+        mask = None
+        for lower_bound, upper_bound in bounds:
+            this_mask = cv2.inRange(hsv_image, lower_bound, upper_bound)
+            mask = this_mask if mask is None else cv2.bitwise_or(mask, this_mask)
+        return mask
+
+    def _configured_hsv_bounds(self):
+        """Collect the HSV bounds of the configured ranges, whichever option format is used.
+
+        Returns:
+            tuple: (bounds, error_message), where bounds is a list of (lower, upper)
+            uint8 HSV bounds, or None with an error message when nothing is configured.
+        """
+        # Check if we have multiple HSV configs (new format)
+        hsv_configs = self.options.get('hsv_configs')
+        if hsv_configs:
+            # Handle string format
+            if isinstance(hsv_configs, str):
+                hsv_configs = literal_eval(hsv_configs)
+
+            # Multiple HSV ranges are combined with OR logic
+            bounds = []
+            for hsv_config in hsv_configs:
+                if isinstance(hsv_config, dict):
+                    hsv_ranges = hsv_config.get('hsv_ranges')
+                    if isinstance(hsv_ranges, str):
+                        hsv_ranges = literal_eval(hsv_ranges)
+
+                    if hsv_ranges:
+                        bounds.extend(self._hsv_bounds_from_ranges(hsv_ranges))
+
+            if not bounds:
+                return None, "No valid HSV ranges configured"
+
+            # Use first color for confidence scoring (backward compatibility)
+            if hsv_configs and isinstance(hsv_configs[0], dict):
+                first_config = hsv_configs[0]
+                selected_color = first_config.get('selected_color')
+                if selected_color:
+                    if isinstance(selected_color, str):
+                        selected_color = literal_eval(selected_color)
+                    rgb_color = np.uint8([[selected_color]])
+                    self.target_color_hsv = cv2.cvtColor(rgb_color, cv2.COLOR_RGB2HSV)[0][0]
+            return bounds, None
+
+        # Check if we have single HSV ranges data (legacy format)
+        if 'hsv_ranges' in self.options and self.options.get('hsv_ranges'):
+            hsv_ranges = self.options.get('hsv_ranges')
+            if isinstance(hsv_ranges, str):
+                hsv_ranges = literal_eval(hsv_ranges)
+
+            if hsv_ranges:
+                return self._hsv_bounds_from_ranges(hsv_ranges), None
+            return None, "No valid HSV configuration found"
+
+        # Check for old HSV window data (backward compatibility)
+        if 'hsv_window' in self.options and self.options.get('hsv_window'):
+            hsv_window = self.options.get('hsv_window')
+            # Use precise HSV ranges from the old dialog format
+            lower_bound = np.array([hsv_window['h_min'] / 2, hsv_window['s_min'] * 255 / 100,
+                                   hsv_window['v_min'] * 255 / 100], dtype=np.uint8)
+            upper_bound = np.array([hsv_window['h_max'] / 2, hsv_window['s_max'] * 255 / 100,
+                                   hsv_window['v_max'] * 255 / 100], dtype=np.uint8)
+
+            # Handle hue wrapping if necessary
+            if hsv_window['h_min'] > hsv_window['h_max']:
+                # Hue wraps around (e.g., 350° to 10°)
+                return [(lower_bound, np.array([179, upper_bound[1], upper_bound[2]], dtype=np.uint8)),
+                        (np.array([0, lower_bound[1], lower_bound[2]], dtype=np.uint8), upper_bound)], None
+            return [(lower_bound, upper_bound)], None
+
+        # Fallback to old method (requires target_color_hsv)
+        if self.target_color_hsv is None:
+            return None, "No color selected for HSV Filter"
+
+        hue_threshold = self.options.get('hue_threshold', 10)
+        saturation_threshold = self.options.get('saturation_threshold', 30)
+        value_threshold = self.options.get('value_threshold', 30)
+
+        # Use the staticmethod to get HSV bounds
+        return list(ColorUtils.get_hsv_color_range(
+            self.target_color_hsv, hue_threshold, saturation_threshold, value_threshold
+        )), None
+
+    def get_lut(self):
+        """Return the lookup table of all configured HSV ranges, compiling it on first use.
+
+        The table is indexed by BGR color, so images are masked without converting
+        them to HSV.
+
+        Returns:
+            tuple: (ColorRangeLUT, error_message); the table is None with an error
+            message when no valid range is configured.
+        """
+        if self._lut is None:
+            bounds, error_message = self._configured_hsv_bounds()
+            if bounds is None:
+                return None, error_message
+            self._lut = ColorRangeLUT.compile(
+                lambda colors: self._create_mask_from_bounds(cv2.cvtColor(colors, cv2.COLOR_BGR2HSV), bounds))
+        return self._lut, None
 
     def process_image(self, img, full_path, input_dir, output_dir):
         """Process a single image to identify areas within one or more HSV color ranges.
@@ -138,119 +252,23 @@ class HSVColorRangeService(AlgorithmService):
             of interest, base contour count, and error message if any.
         """
         try:
-            # Convert the image from BGR to HSV color space
-            hsv_image = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-
-            # Check if we have multiple HSV configs (new format)
-            hsv_configs = self.options.get('hsv_configs')
-            if hsv_configs:
-                # Handle string format
-                if isinstance(hsv_configs, str):
-                    hsv_configs = literal_eval(hsv_configs)
+            lut, error_message = self.get_lut()
+            if lut is None:
+                return AnalysisResult(full_path, error_message=error_message)
 
-                # Combine multiple HSV ranges with OR logic
-                mask = None
-                for hsv_config in hsv_configs:
-                    if isinstance(hsv_config, dict):
-                        hsv_ranges = hsv_config.get('hsv_ranges')
-                        if isinstance(hsv_ranges, str):
-                            hsv_ranges = literal_eval(hsv_ranges)
-
-                        if hsv_ranges:
-                            this_mask = self._create_mask_from_hsv_ranges(hsv_image, hsv_ranges)
-                            if mask is None:
-                                mask = this_mask
-                            else:
-                                mask = cv2.bitwise_or(mask, this_mask)
-
-                if mask is None:
-                    return AnalysisResult(full_path, error_message="No valid HSV ranges configured")
-
-                # Use first color for confidence scoring (backward compatibility)
-                if hsv_configs and isinstance(hsv_configs[0], dict):
-                    first_config = hsv_configs[0]
-                    selected_color = first_config.get('selected_color')
-                    if selected_color:
-                        if isinstance(selected_color, str):
-                            selected_color = literal_eval(selected_color)
-                        rgb_color = np.uint8([[selected_color]])
-                        self.target_color_hsv = cv2.cvtColor(rgb_color, cv2.COLOR_RGB2HSV)[0][0]
-
-            # Check if we have single HSV ranges data (legacy format)
-            elif 'hsv_ranges' in self.options and self.options.get('hsv_ranges'):
-                hsv_ranges = self.options.get('hsv_ranges')
-                if isinstance(hsv_ranges, str):
-                    hsv_ranges = literal_eval(hsv_ranges)
-
-                if hsv_ranges:
-                    mask = self._create_mask_from_hsv_ranges(hsv_image, hsv_ranges)
-
-            # Check for old HSV window data (backward compatibility)
-            elif 'hsv_window' in self.options and self.options.get('hsv_window'):
-                hsv_window = self.options.get('hsv_window')
-                # Use precise HSV ranges from the old dialog format
-                lower_bound = np.array([hsv_window['h_min'] / 2, hsv_window['s_min'] * 255 / 100,
-                                       hsv_window['v_min'] * 255 / 100], dtype=np.uint8)
-                upper_bound = np.array([hsv_window['h_max'] / 2, hsv_window['s_max'] * 255 / 100,
-                                       hsv_window['v_max'] * 255 / 100], dtype=np.uint8)
-
-                # Handle hue wrapping if necessary
-                if hsv_window['h_min'] > hsv_window['h_max']:
-                    # Hue wraps around (e.g., 350° to 10°)
-                    mask1 = cv2.inRange(hsv_image,
-                                        np.array([hsv_window['h_min'] / 2, hsv_window['s_min'] * 255 / 100,
-                                                 hsv_window['v_min'] * 255 / 100], dtype=np.uint8),
-                                        np.array([179, hsv_window['s_max'] * 255 / 100,
-                                                 hsv_window['v_max'] * 255 / 100], dtype=np.uint8))
-                    mask2 = cv2.inRange(hsv_image,
-                                        np.array([0, hsv_window['s_min'] * 255 / 100,
-                                                 hsv_window['v_min'] * 255 / 100], dtype=np.uint8),
-                                        np.array([hsv_window['h_max'] / 2, hsv_window['s_max'] * 255 / 100,
-                                                 hsv_window['v_max'] * 255 / 100], dtype=np.uint8))
-                    mask = cv2.bitwise_or(mask1, mask2)
-                else:
-                    mask = cv2.inRange(hsv_image, lower_bound, upper_bound)
-
-            else:
-                # Fallback to old method (requires target_color_hsv)
-                if self.target_color_hsv is None:
-                    return AnalysisResult(full_path, error_message="No color selected for HSV Filter")
-
-                hue_threshold = self.options.get('hue_threshold', 10)
-                saturation_threshold = self.options.get('saturation_threshold', 30)
-                value_threshold = self.options.get('value_threshold', 30)
-
-                # Use the staticmethod to get HSV bounds
-                hsv_ranges = ColorUtils.get_hsv_color_range(
-                    self.target_color_hsv, hue_threshold, saturation_threshold, value_threshold
-                )
-
-                # Create mask(s) and combine if necessary
-                mask = None
-                for lower_bound, upper_bound in hsv_ranges:
-                    this_mask = cv2.inRange(hsv_image, lower_bound, upper_bound)
-                    if mask is None:
-                        mask = this_mask
-                    else:
-                        mask = cv2.bitwise_or(mask, this_mask)
-
-            # Ensure mask is defined
-            if mask is None:
-                return AnalysisResult(full_path, error_message="No valid HSV configuration found")
+            # Pixels within any of the HSV ranges, in one table lookup
+            mask = lut.mask(img)
 
             # Calculate HSV distance for confidence scoring
             # Only calculate for detected pixels to save computation
-            hsv_distances = self._calculate_hsv_distances(hsv_image, self.target_color_hsv, mask)
+            hsv_distances = lut.sample(img, mask, lambda colors: self._calculate_hsv_distances(
+                cv2.cvtColor(colors, cv2.COLOR_BGR2HSV), self.target_color_hsv, np.full(colors.shape[:2], 255)))
 
             # Identify contours in the masked image
             contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
 
             areas_of_interest, base_contour_count = self.identify_areas_of_interest(img, contours)
 
-            # Add confidence scores to AOIs based on HSV distance
-            if areas_of_interest:
-                areas_of_interest = self._add_confidence_scores(areas_of_interest, hsv_distances, mask)
-
             # Add confidence scores to AOIs based on HSV distance
             if areas_of_interest:
                 areas_of_interest = self._add_confidence_scores(areas_of_interest, hsv_distances, mask)
@@ -321,59 +339,4 @@ class HSVColorRangeService(AlgorithmService):
         Returns:
             list: AOIs with added confidence scores
         """
-        # Get all distances from detected pixels to find max for normalization
-        detected_distances = hsv_distances[mask > 0]
-        if len(detected_distances) == 0:
-            return areas_of_interest
-
-        max_distance = np.max(detected_distances)
-        min_distance = np.min(detected_distances)
-        distance_range = max_distance - min_distance if max_distance > min_distance else 1.0
-
-        # Add confidence to each AOI
-        for aoi in areas_of_interest:
-            detected_pixels = aoi.get('detected_pixels', [])
-            if len(detected_pixels) > 0:
-                # Extract distances for this AOI's pixels
-                # NOTE: detected_pixels are in ORIGINAL resolution, but hsv_distances are in PROCESSING resolution
-                # Need to transform coordinates back to processing resolution for lookup
-                aoi_distances = []
-                for pixel in detected_pixels:
-                    x_orig, y_orig = int(pixel[0]), int(pixel[1])
-
-                    # Transform back to processing resolution
-                    if self.scale_factor != 1.0:
-                        x = int(x_orig * self.scale_factor)
-                        y = int(y_orig * self.scale_factor)
-                    else:
-                        x, y = x_orig, y_orig
-
-                    if 0 <= y < hsv_distances.shape[0] and 0 <= x < hsv_distances.shape[1]:
-                        aoi_distances.append(hsv_distances[y, x])
-
-                if len(aoi_distances) > 0:
-                    # Calculate mean distance for this AOI
-                    mean_distance = np.mean(aoi_distances)
-
-                    # Normalize to 0-100 scale (INVERTED: lower distance = better match = higher confidence)
-                    normalized_score = ((max_distance - mean_distance) / distance_range) * 100.0
-
-                    # Add confidence fields to AOI
-                    aoi['confidence'] = round(normalized_score, 1)
-                    aoi['score_type'] = 'color_distance'
-                    aoi['raw_score'] = round(float(mean_distance), 3)
-                    aoi['score_method'] = 'mean'
-                else:
-                    # No valid pixels, set low confidence
-                    aoi['confidence'] = 0.0
-                    aoi['score_type'] = 'color_distance'
-                    aoi['raw_score'] = 0.0
-                    aoi['score_method'] = 'mean'
-            else:
-                # No detected pixels, set low confidence
-                aoi['confidence'] = 0.0
-                aoi['score_type'] = 'color_distance'
-                aoi['raw_score'] = 0.0
-                aoi['score_method'] = 'mean'
-
-        return areas_of_interest
+        return self._add_mean_confidence_scores(areas_of_interest, hsv_distances, mask, 'color_distance', invert=True)
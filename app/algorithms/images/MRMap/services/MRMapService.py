@@ -6,10 +6,11 @@ import traceback
 
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
 from core.services.LoggerService import LoggerService
-from collections import deque
 
 MAX_SHADES = 256
 NUMBER_OF_QUANTIZED_HISTOGRAM_BINS = 26
+# Grid cell size in pixels for finding overlapping rectangles when merging
+MERGE_GRID_CELL = 64
 
 
 class MRMapService(AlgorithmService):
@@ -123,8 +124,8 @@ class MRMapService(AlgorithmService):
     def _getMRMapsContours(self, pixel_anom):
         """Get contours from pixel anomaly mask using MRMap-specific method.
 
-        Uses connected component analysis with window-based connectivity
-        to merge nearby anomalies into rectangles.
+        Groups anomalous pixels that are within the search window of each other,
+        then merges the bounding rectangles of groups that overlap.
 
         Args:
             pixel_anom: Boolean array indicating anomalous pixels.
@@ -133,111 +134,101 @@ class MRMapService(AlgorithmService):
             Tuple of (mask, contours) where mask is the combined mask and
             contours is the list of contours.
         """
-        visited = np.zeros_like(pixel_anom, dtype=bool)
-        anomaly_rectangles = []
         mask = np.zeros_like(pixel_anom, dtype=np.uint8)
-        height, width = pixel_anom.shape
-
-        for y, x in zip(*np.where(pixel_anom & ~visited)):
-            count, rect = self._find_connected_pixels(pixel_anom, visited, x, y, width, height)
-            if count >= self.min_area:
-                merged = False
-                for i, existing_rect in enumerate(anomaly_rectangles):
-                    if self._rectangles_overlap(existing_rect, rect):
-                        anomaly_rectangles[i] = self._merge_rectangles(existing_rect, rect)
-                        merged = True
-                        break
-
-                if not merged:
-                    anomaly_rectangles.append(rect)
-
-        # Draw all combined rectangles
-        for rect in anomaly_rectangles:
-            mask[rect[1]:rect[3] + 1, rect[0]:rect[2] + 1] = 255
+        ys, xs = np.nonzero(pixel_anom)
+
+        if len(ys) > 0:
+            component_labels = self._label_window_components(pixel_anom)[ys, xs]
+
+            # Pixel count and bounding rectangle of each component from one sort by label
+            order = np.argsort(component_labels, kind='stable')
+            sorted_labels = component_labels[order]
+            starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+            counts = np.diff(np.r_[starts, len(sorted_labels)])
+            rects = np.stack([
+                np.minimum.reduceat(xs[order], starts),
+                np.minimum.reduceat(ys[order], starts),
+                np.maximum.reduceat(xs[order], starts),
+                np.maximum.reduceat(ys[order], starts)
+            ], axis=1)
+            # Components in the order their first pixel is reached in a row-major scan
+            rects = rects[np.argsort(order[starts])]
+            counts = counts[np.argsort(order[starts])]
+
+            # Draw all combined rectangles
+            for rect in self._merge_overlapping_rectangles(rects[counts >= self.min_area]):
+                mask[rect[1]:rect[3] + 1, rect[0]:rect[2] + 1] = 255
 
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
 
         return mask, contours
 
-    def _find_connected_pixels(self, pixel_anom, visited, start_x, start_y, width, height):
-        """Find connected pixels using BFS with window-based connectivity.
-
-        Args:
-            pixel_anom: Boolean array indicating anomalous pixels.
-            visited: Boolean array tracking visited pixels.
-            start_x: Starting X coordinate.
-            start_y: Starting Y coordinate.
-            width: Image width.
-            height: Image height.
-
-        Returns:
-            Tuple of (count, rect) where count is the number of connected
-            pixels and rect is [min_x, min_y, max_x, max_y].
-        """
-        queue = deque([(start_x, start_y)])
-        rect = [start_x, start_y, start_x, start_y]
-        count = 0
-
-        while queue:
-            x, y = queue.popleft()
-
-            if visited[y, x] or not pixel_anom[y, x]:
-                continue  # Skip if already visited or not an anomaly
-
-            visited[y, x] = True
-            count += 1
-            rect[0] = min(rect[0], x)
-            rect[1] = min(rect[1], y)
-            rect[2] = max(rect[2], x)
-            rect[3] = max(rect[3], y)
-
-            # Vectorized neighbor selection
-            x_range = np.clip([x - self.window_size, x + self.window_size + 1], 0, width)
-            y_range = np.clip([y - self.window_size, y + self.window_size + 1], 0, height)
-
-            neighbors = np.argwhere(
-                pixel_anom[y_range[0]:y_range[1], x_range[0]:x_range[1]] &
-                ~visited[y_range[0]:y_range[1], x_range[0]:x_range[1]]
-            )
-
-            for dy, dx in neighbors:
-                queue.append((x_range[0] + dx, y_range[0] + dy))
-
-        return count, rect
+    def _label_window_components(self, pixel_anom):
+        """Label anomalous pixels connected through the search window.
 
-    def _merge_rectangles(self, rect1, rect2):
-        """Merge two overlapping rectangles into one.
+        Two anomalous pixels belong to the same component when a chain of anomalous
+        pixels links them with no step larger than window_size in x or y. Dilating every
+        pixel into a window_size square anchored at its bottom-right corner makes two
+        squares 8-connected exactly when their pixels are that close, so one
+        connected-components pass over the dilated mask finds every component.
 
         Args:
-            rect1: First rectangle as [min_x, min_y, max_x, max_y].
-            rect2: Second rectangle as [min_x, min_y, max_x, max_y].
+            pixel_anom: Boolean array indicating anomalous pixels.
 
         Returns:
-            Merged rectangle as [min_x, min_y, max_x, max_y].
+            numpy.ndarray: int32 label image; only values at anomalous pixels are meaningful.
         """
-        return [
-            min(rect1[0], rect2[0]),  # left
-            min(rect1[1], rect2[1]),  # top
-            max(rect1[2], rect2[2]),  # right
-            max(rect1[3], rect2[3])   # bottom
-        ]
-
-    def _rectangles_overlap(self, rect1, rect2):
-        """Check if two rectangles overlap.
+        window = int(self.window_size)
+        if window < 1:
+            # No neighbors are searched, so every pixel stands alone
+            labels = np.zeros(pixel_anom.shape, dtype=np.int32)
+            labels[pixel_anom] = np.arange(1, np.count_nonzero(pixel_anom) + 1)
+            return labels
+
+        kernel = np.ones((window, window), dtype=np.uint8)
+        grown = cv2.dilate(pixel_anom.astype(np.uint8), kernel, anchor=(0, 0))
+        _, labels = cv2.connectedComponents(grown, connectivity=8, ltype=cv2.CV_32S)
+        return labels
+
+    def _merge_overlapping_rectangles(self, rects):
+        """Merge overlapping rectangles first-fit, as the original per-pixel search did.
+
+        Rectangles are taken in order. One that overlaps a kept rectangle grows the
+        earliest kept rectangle it overlaps to their bounding box; otherwise it is kept.
+        Grown rectangles are not merged again, so kept rectangles may overlap and the
+        mask draws their union. Kept rectangles are registered in every MERGE_GRID_CELL
+        square they cover, so each rectangle is only compared with kept rectangles near it.
 
         Args:
-            rect1: First rectangle as [min_x, min_y, max_x, max_y].
-            rect2: Second rectangle as [min_x, min_y, max_x, max_y].
+            rects: Array of rectangles as [min_x, min_y, max_x, max_y] rows (inclusive).
 
         Returns:
-            True if rectangles overlap, False otherwise.
+            numpy.ndarray: Kept rectangles as [min_x, min_y, max_x, max_y] rows.
         """
-        return not (
-            rect1[2] < rect2[0] or  # rect1 right < rect2 left
-            rect1[0] > rect2[2] or  # rect1 left > rect2 right
-            rect1[3] < rect2[1] or  # rect1 bottom < rect2 top
-            rect1[1] > rect2[3]     # rect1 top > rect2 bottom
-        )
+        cell = MERGE_GRID_CELL
+        kept = []
+        grid = {}
+        for left, top, right, bottom in np.asarray(rects, dtype=np.int64).reshape(-1, 4).tolist():
+            first = None
+            for gy in range(top // cell, bottom // cell + 1):
+                for gx in range(left // cell, right // cell + 1):
+                    for i in grid.get((gx, gy), ()):
+                        if first is not None and i >= first:
+                            continue
+                        k_left, k_top, k_right, k_bottom = kept[i]
+                        if not (k_right < left or k_left > right or k_bottom < top or k_top > bottom):
+                            first = i
+            if first is None:
+                first = len(kept)
+                kept.append([left, top, right, bottom])
+            else:
+                k_left, k_top, k_right, k_bottom = kept[first]
+                kept[first] = [min(k_left, left), min(k_top, top), max(k_right, right), max(k_bottom, bottom)]
+            left, top, right, bottom = kept[first]
+            for gy in range(top // cell, bottom // cell + 1):
+                for gx in range(left // cell, right // cell + 1):
+                    grid.setdefault((gx, gy), set()).add(first)
+        return np.array(kept, dtype=np.int64).reshape(-1, 4)
 
     def _add_confidence_scores(self, areas_of_interest, bin_counts, mask):
         """Add confidence scores to AOIs based on histogram bin counts (rarity scores).
@@ -253,55 +244,7 @@ class MRMapService(AlgorithmService):
         Returns:
             List of AOIs with added confidence scores.
         """
-        # Get all bin counts from detected pixels to find max for normalization
-        detected_bin_counts = bin_counts[mask > 0]
-        if len(detected_bin_counts) == 0:
-            return areas_of_interest
-
-        max_bin_count = np.max(detected_bin_counts)
-        min_bin_count = np.min(detected_bin_counts)
-        bin_range = max_bin_count - min_bin_count if max_bin_count > min_bin_count else 1.0
-
-        # Add confidence to each AOI
-        for aoi in areas_of_interest:
-            detected_pixels = aoi.get('detected_pixels', [])
-            if len(detected_pixels) > 0:
-                # Extract bin counts for this AOI's pixels
-                # NOTE: detected_pixels are in PROCESSING resolution (same as bin_counts)
-                # No transformation needed - coordinates are already at processing resolution
-                aoi_bin_counts = []
-                for pixel in detected_pixels:
-                    x, y = int(pixel[0]), int(pixel[1])
-
-                    if 0 <= y < bin_counts.shape[0] and 0 <= x < bin_counts.shape[1]:
-                        aoi_bin_counts.append(bin_counts[y, x])
-
-                if len(aoi_bin_counts) > 0:
-                    # Calculate mean bin count for this AOI
-                    mean_bin_count = np.mean(aoi_bin_counts)
-
-                    # Normalize to 0-100 scale (INVERTED: lower bin count = rarer = higher confidence)
-                    normalized_score = ((max_bin_count - mean_bin_count) / bin_range) * 100.0
-
-                    # Add confidence fields to AOI
-                    aoi['confidence'] = round(normalized_score, 1)
-                    aoi['score_type'] = 'rarity'
-                    aoi['raw_score'] = round(float(mean_bin_count), 3)
-                    aoi['score_method'] = 'mean'
-                else:
-                    # No valid pixels, set low confidence
-                    aoi['confidence'] = 0.0
-                    aoi['score_type'] = 'rarity'
-                    aoi['raw_score'] = 0.0
-                    aoi['score_method'] = 'mean'
-            else:
-                # No detected pixels, set low confidence
-                aoi['confidence'] = 0.0
-                aoi['score_type'] = 'rarity'
-                aoi['raw_score'] = 0.0
-                aoi['score_method'] = 'mean'
-
-        return areas_of_interest
+        return self._add_mean_confidence_scores(areas_of_interest, bin_counts, mask, 'rarity', invert=True)
 
 
 class Histogram:
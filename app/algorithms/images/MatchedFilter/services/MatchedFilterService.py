@@ -1,9 +1,9 @@
 import numpy as np
 import cv2
-import spectral
 import traceback
 from core.services.LoggerService import LoggerService
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
+from helpers.BackgroundStatistics import BackgroundStatistics
 
 
 class MatchedFilterService(AlgorithmService):
@@ -12,9 +12,14 @@ class MatchedFilterService(AlgorithmService):
     Detects and highlights areas matching one or more specific color signatures
     using spectral matched filter analysis. Supports multiple color configurations.
 
+    The image's background statistics are computed once, and every target is scored
+    with one matrix multiply over the flattened pixels, in chunks to bound memory.
+
     Attributes:
         color_configs: List of color configurations, each containing
             'selected_color' and 'match_filter_threshold'.
+        targets: (targets, 3) BGR signatures of the configured colors.
+        thresholds: Match filter threshold of every target.
     """
 
     def __init__(self, identifier, min_area, max_area, aoi_radius, combine_aois, options):
@@ -52,6 +57,12 @@ class MatchedFilterService(AlgorithmService):
                 'match_filter_threshold': 0.3
             }]
 
+        # Signatures are in BGR order like the image; configs without a color are skipped
+        configs = [config for config in self.color_configs if config.get('selected_color')]
+        self.targets = np.array([(config['selected_color'][2], config['selected_color'][1], config['selected_color'][0])
+                                 for config in configs], dtype=np.float64).reshape(-1, 3)
+        self.thresholds = np.array([config.get('match_filter_threshold', 0.3) for config in configs], dtype=np.float64)
+
     def process_image(self, img, full_path, input_dir, output_dir):
         """Process a single image using the Matched Filter algorithm.
 
@@ -70,31 +81,8 @@ class MatchedFilterService(AlgorithmService):
             of interest, base contour count, and error message if any.
         """
         try:
-            # Start with an empty mask and combined scores
-            combined_mask = np.zeros(img.shape[:2], dtype=np.uint8)
-            combined_scores = np.zeros(img.shape[:2], dtype=np.float32)
-
-            # Process each color configuration and combine masks with OR logic
-            for color_config in self.color_configs:
-                match_color = color_config.get('selected_color')
-                threshold = color_config.get('match_filter_threshold', 0.3)
-
-                if not match_color:
-                    continue
-
-                # Calculate the matched filter scores based on the specified color
-                # spectral.matched_filter expects BGR format
-                color_bgr = np.array([match_color[2], match_color[1], match_color[0]], dtype=np.uint8)
-                scores = spectral.matched_filter(img, color_bgr)
-
-                # Create mask for this color (threshold applied)
-                mask = np.uint8((1 * (scores > threshold)))
-
-                # Combine masks using OR logic
-                combined_mask = cv2.bitwise_or(combined_mask, mask)
-
-                # Keep track of maximum scores across all colors for confidence calculation
-                combined_scores = np.maximum(combined_scores, scores * mask.astype(np.float32))
+            # Masks of all colors are combined with OR logic
+            combined_mask, combined_scores = self.compute_match_scores(img)
 
             # Identify contours in the combined masked image
             contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
@@ -142,6 +130,35 @@ class MatchedFilterService(AlgorithmService):
             self.logger.error(f"Error processing image {full_path}: {e}")
             return AnalysisResult(full_path, error_message=str(e))
 
+    def compute_match_scores(self, img):
+        """Score every pixel against every target color and combine the detections.
+
+        Args:
+            img: The image to be processed as numpy array.
+
+        Returns:
+            tuple: (mask, scores) where mask is a uint8 array that is 1 where any target
+            exceeds its threshold, and scores is a float32 array holding the highest
+            score among the targets detected at each pixel (0 elsewhere).
+        """
+        height, width = img.shape[:2]
+        combined_mask = np.zeros(height * width, dtype=np.uint8)
+        combined_scores = np.zeros(height * width, dtype=np.float32)
+        if len(self.targets) == 0:
+            return combined_mask.reshape(height, width), combined_scores.reshape(height, width)
+
+        background = BackgroundStatistics.from_pixels(img)
+        coefficients = background.matched_filter_coefficients(self.targets)
+        samples = img.reshape(-1, img.shape[-1])
+        chunk_pixels = BackgroundStatistics.CHUNK_PIXELS
+        for start in range(0, len(samples), chunk_pixels):
+            scores = (samples[start:start + chunk_pixels] - background.mean) @ coefficients
+            detected = scores > self.thresholds
+            combined_mask[start:start + chunk_pixels] = detected.any(axis=1)
+            combined_scores[start:start + chunk_pixels] = np.maximum(np.where(detected, scores, 0).max(axis=1), 0)
+
+        return combined_mask.reshape(height, width), combined_scores.reshape(height, width)
+
     def _add_confidence_scores(self, areas_of_interest, filter_scores, mask):
         """Add confidence scores to AOIs based on matched filter correlation values.
 
@@ -153,52 +170,4 @@ class MatchedFilterService(AlgorithmService):
         Returns:
             List of AOIs with added confidence scores.
         """
-        # Get all filter scores from detected pixels to find max for normalization
-        detected_scores = filter_scores[mask > 0]
-        if len(detected_scores) == 0:
-            return areas_of_interest
-
-        max_score = np.max(detected_scores)
-        min_score = np.min(detected_scores)
-        score_range = max_score - min_score if max_score > min_score else 1.0
-
-        # Add confidence to each AOI
-        for aoi in areas_of_interest:
-            detected_pixels = aoi.get('detected_pixels', [])
-            if len(detected_pixels) > 0:
-                # Extract filter scores for this AOI's pixels
-                # NOTE: detected_pixels are in PROCESSING resolution (same as filter_scores)
-                # No transformation needed - coordinates are already at processing resolution
-                aoi_scores = []
-                for pixel in detected_pixels:
-                    x, y = int(pixel[0]), int(pixel[1])
-
-                    if 0 <= y < filter_scores.shape[0] and 0 <= x < filter_scores.shape[1]:
-                        aoi_scores.append(filter_scores[y, x])
-
-                if len(aoi_scores) > 0:
-                    # Calculate mean filter score for this AOI
-                    mean_score = np.mean(aoi_scores)
-
-                    # Normalize to 0-100 scale (higher score = better match = higher confidence)
-                    normalized_score = ((mean_score - min_score) / score_range) * 100.0
-
-                    # Add confidence fields to AOI
-                    aoi['confidence'] = round(normalized_score, 1)
-                    aoi['score_type'] = 'match'
-                    aoi['raw_score'] = round(float(mean_score), 3)
-                    aoi['score_method'] = 'mean'
-                else:
-                    # No valid pixels, set low confidence
-                    aoi['confidence'] = 0.0
-                    aoi['score_type'] = 'match'
-                    aoi['raw_score'] = 0.0
-                    aoi['score_method'] = 'mean'
-            else:
-                # No detected pixels, set low confidence
-                aoi['confidence'] = 0.0
-                aoi['score_type'] = 'match'
-                aoi['raw_score'] = 0.0
-                aoi['score_method'] = 'mean'
-
-        return areas_of_interest
+        return self._add_mean_confidence_scores(areas_of_interest, filter_scores, mask, 'match')
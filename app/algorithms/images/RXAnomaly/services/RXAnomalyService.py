@@ -1,12 +1,13 @@
 import logging
+import os
 import numpy as np
 import cv2
-import spectral
 from scipy.stats import chi2
 import traceback
 
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
 from core.services.LoggerService import LoggerService
+from helpers.BackgroundStatistics import BackgroundStatistics
 
 
 class RXAnomalyService(AlgorithmService):
@@ -15,11 +16,21 @@ class RXAnomalyService(AlgorithmService):
     Uses Reed-Xiaoli (RX) anomaly detection algorithm to identify anomalous
     pixels based on statistical analysis in CIE LAB color space.
 
+    The background mean and covariance of every segment are computed once with a
+    streaming covariance, optionally from a stride-subsampled set of pixels, and each
+    segment is scored with one precomputed Cholesky factor. With shared_background the
+    statistics are reused for consecutive frames of the same folder and size.
+
     Attributes:
         chi_threshold: Chi-squared threshold for anomaly detection.
         segments: Number of image segments for processing.
+        background_stride: Pixel stride along both axes when sampling background statistics.
+        shared_background: Whether background statistics are reused across consecutive frames.
+        background_refresh: Number of frames that share background statistics before they are recomputed.
     """
 
+    DEFAULT_BACKGROUND_REFRESH = 10
+
     def __init__(self, identifier, min_area, max_area, aoi_radius, combine_aois, options):
         """Initialize the RXAnomalyService with specific parameters for anomaly detection.
 
@@ -29,12 +40,20 @@ class RXAnomalyService(AlgorithmService):
             max_area: Maximum area in pixels for an object to qualify as an area of interest.
             aoi_radius: Radius added to the minimum enclosing circle around an area of interest.
             combine_aois: If True, overlapping areas of interest will be combined.
-            options: Additional algorithm-specific options, including 'sensitivity' and 'segments'.
+            options: Additional algorithm-specific options, including 'sensitivity' and 'segments',
+                and optionally 'background_stride', 'shared_background' and 'background_refresh'.
         """
         self.logger = LoggerService()
         super().__init__('RXAnomaly', identifier, min_area, max_area, aoi_radius, combine_aois, options)
         self.chi_threshold = self.get_threshold(options['sensitivity'])
         self.segments = options['segments']
+        self.background_stride = max(1, int(options.get('background_stride', 1)))
+        self.shared_background = bool(options.get('shared_background', False))
+        self.background_refresh = max(1, int(options.get('background_refresh', self.DEFAULT_BACKGROUND_REFRESH)))
+        # Statistics shared across frames: key of the frames they apply to, grid of statistics, frames scored
+        self._shared_key = None
+        self._shared_statistics = None
+        self._shared_frames = 0
 
     def process_image(self, img, full_path, input_dir, output_dir):
         """Process a single image using the RX Anomaly algorithm.
@@ -56,21 +75,10 @@ class RXAnomalyService(AlgorithmService):
             # Convert to CIE LAB color space for more perceptually uniform analysis
             lab_img = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
 
-            # Split the LAB image into segments for RX processing
-            masks = pieces = self.split_image(lab_img, self.segments)
-            rx_values_segments = [[None for _ in range(len(pieces[0]))] for _ in range(len(pieces))]
-
-            for x in range(len(pieces)):
-                for y in range(len(pieces[x])):
-                    rx_values = spectral.rx(pieces[x][y])
-                    chi_values = chi2.ppf(self.chi_threshold, pieces[x][y].shape[-1])
-                    masks[x][y] = np.uint8((1 * (rx_values > chi_values)))
-                    # Store RX values for confidence calculation
-                    rx_values_segments[x][y] = rx_values
-
-            combined_mask = self.glue_image(masks)
-            # Glue RX values together for confidence scoring
-            combined_rx_values = self.glue_image(rx_values_segments)
+            # RX values are kept for confidence scoring
+            combined_rx_values = self.compute_rx_values(lab_img, full_path)
+            chi_value = chi2.ppf(self.chi_threshold, lab_img.shape[-1])
+            combined_mask = np.uint8(combined_rx_values > chi_value)
 
             # Find contours of the identified areas and circle areas of interest.
             contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
@@ -114,6 +122,47 @@ class RXAnomalyService(AlgorithmService):
             # print(traceback.format_exc())
             return AnalysisResult(full_path, error_message=str(e))
 
+    def compute_rx_values(self, lab_img, full_path):
+        """Compute the RX anomaly score of every pixel against its segment's background.
+
+        Args:
+            lab_img: The image in CIE LAB color space as numpy array.
+            full_path: The path to the image, used to group frames that share statistics.
+
+        Returns:
+            (H, W) float64 numpy array of RX values.
+        """
+        pieces = self.split_image(lab_img, self.segments)
+        statistics = self._background_statistics(pieces, lab_img.shape, full_path)
+        rx_values_segments = [[stats.mahalanobis(piece) for piece, stats in zip(row, row_statistics)]
+                              for row, row_statistics in zip(pieces, statistics)]
+        return self.glue_image(rx_values_segments)
+
+    def _background_statistics(self, pieces, shape, full_path):
+        """Return the background statistics of every segment, reusing shared ones when enabled.
+
+        Args:
+            pieces: 2D list of image segments from split_image.
+            shape: Shape of the whole image.
+            full_path: The path to the image.
+
+        Returns:
+            2D list of BackgroundStatistics matching pieces.
+        """
+        if self.shared_background:
+            key = (os.path.dirname(full_path), shape, self.segments)
+            if key == self._shared_key and self._shared_frames < self.background_refresh:
+                self._shared_frames += 1
+                return self._shared_statistics
+
+        statistics = [[BackgroundStatistics.from_pixels(piece, self.background_stride) for piece in row]
+                      for row in pieces]
+        if self.shared_background:
+            self._shared_key = key
+            self._shared_statistics = statistics
+            self._shared_frames = 1
+        return statistics
+
     def get_threshold(self, sensitivity):
         """Calculate the chi-squared threshold based on a sensitivity value.
 
@@ -136,59 +185,4 @@ class RXAnomalyService(AlgorithmService):
         Returns:
             List of AOIs with added confidence scores.
         """
-        # Get all RX values from detected pixels to find max for normalization
-        detected_rx_values = rx_values[mask > 0]
-        if len(detected_rx_values) == 0:
-            return areas_of_interest
-
-        max_rx_value = np.max(detected_rx_values)
-        min_rx_value = np.min(detected_rx_values)
-        rx_range = max_rx_value - min_rx_value if max_rx_value > min_rx_value else 1.0
-
-        # Add confidence to each AOI
-        for aoi in areas_of_interest:
-            detected_pixels = aoi.get('detected_pixels', [])
-            if len(detected_pixels) > 0:
-                # Extract RX values for this AOI's pixels
-                # NOTE: detected_pixels are in ORIGINAL resolution, but rx_values are in PROCESSING resolution
-                # Need to transform coordinates back to processing resolution for lookup
-                aoi_rx_values = []
-                for pixel in detected_pixels:
-                    x_orig, y_orig = int(pixel[0]), int(pixel[1])
-
-                    # Transform back to processing resolution
-                    if self.scale_factor != 1.0:
-                        x = int(x_orig * self.scale_factor)
-                        y = int(y_orig * self.scale_factor)
-                    else:
-                        x, y = x_orig, y_orig
-
-                    if 0 <= y < rx_values.shape[0] and 0 <= x < rx_values.shape[1]:
-                        aoi_rx_values.append(rx_values[y, x])
-
-                if len(aoi_rx_values) > 0:
-                    # Calculate mean RX value for this AOI
-                    mean_rx = np.mean(aoi_rx_values)
-
-                    # Normalize to 0-100 scale (higher RX value = higher anomaly confidence)
-                    normalized_score = ((mean_rx - min_rx_value) / rx_range) * 100.0
-
-                    # Add confidence fields to AOI
-                    aoi['confidence'] = round(normalized_score, 1)
-                    aoi['score_type'] = 'anomaly'
-                    aoi['raw_score'] = round(float(mean_rx), 3)
-                    aoi['score_method'] = 'mean'
-                else:
-                    # No valid pixels, set low confidence
-                    aoi['confidence'] = 0.0
-                    aoi['score_type'] = 'anomaly'
-                    aoi['raw_score'] = 0.0
-                    aoi['score_method'] = 'mean'
-            else:
-                # No detected pixels, set low confidence
-                aoi['confidence'] = 0.0
-                aoi['score_type'] = 'anomaly'
-                aoi['raw_score'] = 0.0
-                aoi['score_method'] = 'mean'
-
-        return areas_of_interest
+        return self._add_mean_confidence_scores(areas_of_interest, rx_values, mask, 'anomaly')
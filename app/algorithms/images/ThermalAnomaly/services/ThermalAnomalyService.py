@@ -4,6 +4,7 @@ import traceback
 
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
 from core.services.LoggerService import LoggerService
+from helpers.AOIPixels import AOIPixels
 from helpers.ColorUtils import ColorUtils
 from core.services.thermal.ThermalParserService import ThermalParserService
 from helpers.MetaDataHelper import MetaDataHelper
@@ -37,6 +38,7 @@ class ThermalAnomalyService(AlgorithmService):
         self.threshold = options['threshold']
         self.segments = options['segments']
         self.direction = options['type']
+        self.thermal_parser = None
 
     def process_image(self, img, full_path, input_dir, output_dir):
         """Process a single thermal image using the Thermal Anomaly algorithm.
@@ -58,8 +60,9 @@ class ThermalAnomalyService(AlgorithmService):
         """
         try:
             # Parse the thermal image and retrieve temperature data.
-            thermal = ThermalParserService(dtype=np.float32)
-            temperature_c, thermal_img = thermal.parse_file(full_path)
+            if self.thermal_parser is None:
+                self.thermal_parser = ThermalParserService(dtype=np.float32)
+            temperature_c, thermal_img = self.thermal_parser.parse_file(full_path)
             masks = temperature_c_pieces = self.split_image(temperature_c, self.segments)
             for x in range(len(temperature_c_pieces)):
                 for y in range(len(temperature_c_pieces[x])):
@@ -89,49 +92,8 @@ class ThermalAnomalyService(AlgorithmService):
 
             # Extract average temperature from detected pixels for each AOI
             # Note: This must happen BEFORE coordinate scaling since pixels are in thermal space
-            temps_extracted = 0
             if areas_of_interest:
-                for aoi in areas_of_interest:
-                    detected_pixels = aoi.get('detected_pixels', [])
-
-                    if len(detected_pixels) > 0:
-                        # Extract temperatures for all detected pixels
-                        temps = []
-                        for pixel in detected_pixels:
-                            x_orig, y_orig = int(pixel[0]), int(pixel[1])
-
-                            # Transform to processing resolution if needed
-                            if self.scale_factor != 1.0:
-                                x = int(x_orig * self.scale_factor)
-                                y = int(y_orig * self.scale_factor)
-                            else:
-                                x, y = x_orig, y_orig
-
-                            # Bounds check and extract temperature
-                            if 0 <= y < temperature_c.shape[0] and 0 <= x < temperature_c.shape[1]:
-                                temps.append(temperature_c[y, x])
-
-                        if len(temps) > 0:
-                            # Calculate mean temperature across all detected pixels
-                            temp_value = float(np.mean(temps))
-                            aoi['temperature'] = temp_value
-                            temps_extracted += 1
-                            # Debug: Log first few temperatures
-                            if temps_extracted <= 3:
-                                # self.logger.debug(
-                                #     f"AOI at {aoi['center']}: avg temperature="
-                                #     f"{temp_value:.2f}°C (from {len(temps)} pixels)"
-                                # )
-                                pass
-                        else:
-                            aoi['temperature'] = None
-                            self.logger.warning(f"AOI at {aoi['center']}: all detected pixels out of bounds")
-                    else:
-                        # Fallback: no detected pixels (shouldn't happen in normal flow)
-                        aoi['temperature'] = None
-                        self.logger.warning(f"AOI at {aoi['center']}: no detected pixels available")
-
-                # self.logger.info(f"Extracted temperature for {temps_extracted}/{len(areas_of_interest)} AOIs from {full_path}")
+                self._add_mean_temperatures(areas_of_interest, temperature_c)
 
             # Calculate scale factors if thermal resolution != visual resolution
             thermal_h, thermal_w = temperature_c.shape[:2]
@@ -152,7 +114,7 @@ class ThermalAnomalyService(AlgorithmService):
                         aoi['radius'] = int(aoi['radius'] * max(scale_x, scale_y))
                     # Scale detected pixels
                     if 'detected_pixels' in aoi:
-                        aoi['detected_pixels'] = [(int(x * scale_x), int(y * scale_y)) for x, y in aoi['detected_pixels']]
+                        aoi['detected_pixels'] = AOIPixels.coerce(aoi['detected_pixels']).scaled(scale_x, scale_y)
 
             output_path = self._construct_output_path(full_path, input_dir, output_dir)
             # Store mask instead of duplicating image (with temperature data for thermal)
@@ -0,0 +1,274 @@
+"""Headless command-line interface for ADIAT.
+
+Runs an image analysis without the GUI, for processing servers and scripted pipelines:
+
+    python -m app.cli analyze INPUT OUTPUT --algorithm ColorRange --options options.json
+
+The options file holds the algorithm options as a JSON object, in the same form the
+algorithm's controller passes to AnalyzeService. Progress is written to stdout as one
+JSON object per line; log output goes to stderr so stdout stays machine readable.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from multiprocessing import freeze_support
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+# Application modules import each other as top-level packages (core, helpers, algorithms)
+if APP_ROOT not in sys.path:
+    sys.path.insert(0, APP_ROOT)
+
+from PySide6.QtCore import Qt
+
+from core.services.AnalyzeService import AnalyzeService
+from core.services.ConfigService import ConfigService
+from core.services.CPUService import CPUService
+
+# Defaults match the GUI's first-run settings
+DEFAULT_IDENTIFIER_COLOR = (0, 255, 0)
+DEFAULT_MIN_AREA = 10
+DEFAULT_MAX_AOIS = 100
+DEFAULT_AOI_RADIUS = 15
+
+
+class JsonLinesEmitter:
+    """Writes progress events as JSON lines.
+
+    Events can come from the analysis thread, the validation threads and the worker
+    pool's result thread, so writes are serialized.
+
+    Attributes:
+        stream: Text stream the events are written to.
+    """
+
+    def __init__(self, stream):
+        """Initialize the emitter.
+
+        Args:
+            stream: Text stream the events are written to.
+        """
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._start = time.time()
+
+    def emit(self, event, **fields):
+        """Write one event.
+
+        Args:
+            event: Event name.
+            **fields: Additional JSON-serializable fields.
+        """
+        record = {'event': event, 'elapsed': round(time.time() - self._start, 3)}
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def load_algorithm(name, config_path=None):
+    """Find an algorithm in algorithms.conf by name.
+
+    Args:
+        name: Algorithm name, e.g. 'ColorRange'. Matching ignores case.
+        config_path: Path to the configuration file. Defaults to the application's algorithms.conf.
+
+    Returns:
+        dict: The algorithm configuration.
+
+    Raises:
+        ValueError: If no algorithm has that name.
+    """
+    config_path = config_path or os.path.join(APP_ROOT, 'algorithms.conf')
+    algorithms = ConfigService(config_path).get_algorithms()
+    for algorithm in algorithms:
+        if algorithm['name'].lower() == name.lower():
+            return algorithm
+    available = ', '.join(algorithm['name'] for algorithm in algorithms)
+    raise ValueError(f"Unknown algorithm '{name}'. Available algorithms: {available}")
+
+
+def load_options(path):
+    """Read algorithm options from a JSON file.
+
+    Args:
+        path: Path to a JSON file holding an object.
+
+    Returns:
+        dict: The algorithm options.
+
+    Raises:
+        ValueError: If the file is not valid JSON or does not hold an object.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            options = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Options file {path} is not valid JSON: {e}")
+    if not isinstance(options, dict):
+        raise ValueError(f"Options file {path} must contain a JSON object")
+    return options
+
+
+def parse_color(value):
+    """Parse an 'R,G,B' argument into a color tuple.
+
+    Args:
+        value: Comma-separated red, green and blue values from 0 to 255.
+
+    Returns:
+        tuple: (R, G, B) integers.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not three integers from 0 to 255.
+    """
+    try:
+        color = tuple(int(part) for part in value.split(','))
+    except ValueError:
+        color = ()
+    if len(color) != 3 or not all(0 <= channel <= 255 for channel in color):
+        raise argparse.ArgumentTypeError(f"'{value}' is not a color in R,G,B form")
+    return color
+
+
+def build_parser():
+    """Build the command-line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog='python -m app.cli', description='Automated Drone Image Analysis Tool')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyze = commands.add_parser('analyze', help='Analyze a folder of images')
+    analyze.add_argument('input', help='Folder containing the images to analyze')
+    analyze.add_argument('output', help='Folder where the ADIAT_Results folder is written')
+    analyze.add_argument('--algorithm', required=True, help='Algorithm name from algorithms.conf, e.g. ColorRange')
+    analyze.add_argument('--options', required=True, help='JSON file with the algorithm options')
+    analyze.add_argument('--identifier-color', type=parse_color, default=DEFAULT_IDENTIFIER_COLOR,
+                         help='Highlight color as R,G,B (default: 0,255,0)')
+    analyze.add_argument('--min-area', type=int, default=DEFAULT_MIN_AREA,
+                         help=f'Minimum object area in pixels (default: {DEFAULT_MIN_AREA})')
+    analyze.add_argument('--max-area', type=int, default=0, help='Maximum object area in pixels, 0 for no limit (default: 0)')
+    analyze.add_argument('--processes', type=int, default=None,
+                         help='Number of worker processes (default: recommended for this machine)')
+    analyze.add_argument('--max-aois', type=int, default=DEFAULT_MAX_AOIS,
+                         help=f'AOI count per image that triggers a warning (default: {DEFAULT_MAX_AOIS})')
+    analyze.add_argument('--aoi-radius', type=int, default=DEFAULT_AOI_RADIUS,
+                         help=f'Radius added around each AOI (default: {DEFAULT_AOI_RADIUS})')
+    analyze.add_argument('--histogram-reference', default=None, help='Reference image for histogram normalization')
+    analyze.add_argument('--kmeans-clusters', type=int, default=None,
+                         help='Reduce every image to this many colors with k-means before analysis')
+    analyze.add_argument('--kmeans-shared-palette', action='store_true',
+                         help='Fit the k-means colors once on frames from across the flight instead of per image')
+    analyze.add_argument('--processing-resolution', type=float, default=1.0,
+                         help='Fraction of the original resolution to analyze at, 0.1 to 1.0 (default: 1.0)')
+    analyze.add_argument('--resume', action='store_true',
+                         help='Skip images a previous run with the same settings already finished')
+    return parser
+
+
+def run_analyze(args, emitter):
+    """Run an analysis and report its progress.
+
+    Args:
+        args: Parsed 'analyze' arguments.
+        emitter: JsonLinesEmitter receiving the progress events.
+
+    Returns:
+        int: Process exit code.
+    """
+    if not os.path.isdir(args.input):
+        emitter.emit('error', message=f"Input folder {args.input} does not exist")
+        return 2
+    if not 0.1 <= args.processing_resolution <= 1.0:
+        emitter.emit('error', message="Processing resolution must be between 0.1 and 1.0")
+        return 2
+    if args.kmeans_clusters is not None and args.kmeans_clusters < 2:
+        emitter.emit('error', message="K-means clusters must be at least 2")
+        return 2
+    try:
+        algorithm = load_algorithm(args.algorithm)
+        options = load_options(args.options)
+    except (OSError, ValueError) as e:
+        emitter.emit('error', message=str(e))
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+
+    num_processes = args.processes or CPUService.get_recommended_process_count()
+    service = AnalyzeService(
+        1, algorithm, args.input, args.output, args.identifier_color, args.min_area, num_processes,
+        args.max_aois, args.aoi_radius, args.histogram_reference, args.kmeans_clusters, options, args.max_area,
+        args.processing_resolution, resume=args.resume, kmeans_shared_palette=args.kmeans_shared_palette
+    )
+
+    result = {}
+
+    def on_done(_id, images_with_aois, xml_path):
+        result.update(images_with_aois=images_with_aois, xml_path=xml_path)
+
+    # No event loop runs here, so every signal is delivered on the thread that emits it
+    service.sig_msg.connect(lambda message: emitter.emit('message', message=message, progress=service.get_progress()),
+                            type=Qt.DirectConnection)
+    service.sig_aois.connect(lambda: emitter.emit('max_aois_exceeded', max_aois=args.max_aois), type=Qt.DirectConnection)
+    service.sig_done.connect(on_done, type=Qt.DirectConnection)
+
+    emitter.emit('start', input=args.input, output=args.output, algorithm=algorithm['name'], processes=num_processes)
+    try:
+        service.process_files()
+    except KeyboardInterrupt:
+        service.process_cancel()
+        emitter.emit('cancelled', progress=service.get_progress())
+        return 130
+
+    if not result:
+        emitter.emit('error', message="Analysis failed; see the log on stderr", progress=service.get_progress())
+        return 1
+    emitter.emit('done', progress=service.get_progress(), **result)
+    return 0
+
+
+def _progress_stream():
+    """Return the stream for progress events and send all other stdout output to stderr.
+
+    The redirect is done on the file descriptors so log handlers and worker
+    processes that write to stdout also end up on stderr.
+
+    Returns:
+        A text stream on the original stdout.
+    """
+    try:
+        stdout_fd = sys.stdout.fileno()
+        stderr_fd = sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError):
+        # Embedded or captured streams have no descriptors to redirect
+        return sys.stdout
+    sys.stdout.flush()
+    progress_fd = os.dup(stdout_fd)
+    os.dup2(stderr_fd, stdout_fd)
+    return os.fdopen(progress_fd, 'w', buffering=1, encoding='utf-8')
+
+
+def main(argv=None, stream=None):
+    """Parse the command line and run the requested command.
+
+    Args:
+        argv: Arguments without the program name. Defaults to sys.argv[1:].
+        stream: Text stream for the progress events. Defaults to sys.stdout.
+
+    Returns:
+        int: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    emitter = JsonLinesEmitter(stream or sys.stdout)
+    if args.command == 'analyze':
+        return run_analyze(args, emitter)
+    return 2
+
+
+if __name__ == '__main__':
+    freeze_support()
+    sys.exit(main(stream=_progress_stream()))
@@ -11,6 +11,7 @@ from helpers.MetaDataHelper import MetaDataHelper
 from core.services.LoggerService import LoggerService
 from core.services.image.ImageService import ImageService
 from core.services.image.AOIService import AOIService
+from core.services.image.MetadataIndexService import MetadataIndexService
 from core.views.images.viewer.dialogs.GPSMapDialog import GPSMapDialog
 import piexif
 from datetime import datetime
@@ -109,18 +110,26 @@ class GPSMapController(QObject):
         - has_aoi: Whether image has areas of interest
         """
         self.gps_data = []
+        entries = self.get_indexed_metadata([image['path'] for image in self.parent.images])
 
         for idx, image in enumerate(self.parent.images):
             try:
-                # Get EXIF data first, then extract GPS
-                # This bypasses the JPEG-only restriction in LocationInfo.get_gps()
-                exif_data = MetaDataHelper.get_exif_data_piexif(image['path'])
-                gps_coords = LocationInfo.get_gps(exif_data=exif_data)
-
-                if gps_coords:
+                entry = entries.get(image['path'])
+                if entry is not None:
+                    # Indexed during analysis; no need to read the file
+                    gps_coords = None
+                    if entry['latitude'] is not None:
+                        gps_coords = {'latitude': entry['latitude'], 'longitude': entry['longitude']}
+                    timestamp = self.parse_exif_timestamp(entry['capture_time'])
+                else:
+                    # Get EXIF data first, then extract GPS
+                    # This bypasses the JPEG-only restriction in LocationInfo.get_gps()
+                    exif_data = MetaDataHelper.get_exif_data_piexif(image['path'])
+                    gps_coords = LocationInfo.get_gps(exif_data=exif_data)
                     # Extract timestamp from EXIF if available
-                    timestamp = self.get_image_timestamp_from_exif(exif_data)
+                    timestamp = self.get_image_timestamp_from_exif(exif_data) if gps_coords else None
 
+                if gps_coords:
                     # Check if image has AOIs and count them
                     has_aoi = 'areas_of_interest' in image and len(image['areas_of_interest']) > 0
                     aoi_count = len(image.get('areas_of_interest', [])) if 'areas_of_interest' in image else 0
@@ -156,6 +165,39 @@ class GPSMapController(QObject):
         # Sort by timestamp if available
         self.gps_data.sort(key=lambda x: x['timestamp'] if x['timestamp'] else datetime.min)
 
+    def get_indexed_metadata(self, paths):
+        """
+        Look up images in the metadata index written during analysis.
+
+        Args:
+            paths: Image paths
+
+        Returns:
+            Dict of index entries keyed by path; images missing from it are read from disk
+        """
+        try:
+            return MetadataIndexService.instance().get_many(paths)
+        except Exception as e:
+            self.logger.warning(f"Metadata index unavailable, reading images directly: {e}")
+            return {}
+
+    def parse_exif_timestamp(self, value):
+        """
+        Parse an EXIF date and time.
+
+        Args:
+            value: 'YYYY:MM:DD HH:MM:SS' string, or None
+
+        Returns:
+            datetime object or None if the value is missing or malformed
+        """
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
+        except ValueError:
+            return None
+
     def get_image_timestamp_from_exif(self, exif_data):
         """
         Extract timestamp from EXIF data.
@@ -41,7 +41,8 @@ class ThermalDataController:
             temperature_unit (str): Desired temperature unit ('F' or 'C')
 
         Returns:
-            np.ndarray or None: Temperature data array or None if unavailable
+            TemperatureGrid, np.ndarray or None: Temperature data, indexable as a 2D array,
+                or None if unavailable
         """
         # First try to get thermal data from XMP metadata
         self.temperature_data = image_service.get_thermal_data(temperature_unit)
@@ -86,7 +87,7 @@ class ThermalDataController:
         shape = self.temperature_data.shape
         # Ensure position is within temperature data array bounds
         if (0 <= y < shape[0]) and (0 <= x < shape[1]):
-            return self.temperature_data[y][x]
+            return self.temperature_data[y, x]
 
         return None
 
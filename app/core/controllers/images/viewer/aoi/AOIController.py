@@ -24,6 +24,7 @@ from core.services.LoggerService import LoggerService
 from core.services.image.AOIService import AOIService
 from core.controllers.images.viewer.aoi.AOIUIComponent import AOIUIComponent
 from helpers.LocationInfo import LocationInfo
+from helpers.AOIPixels import AOIPixels
 from core.views.images.viewer.dialogs.AOICommentDialog import AOICommentDialog
 from core.views.images.viewer.dialogs.AOIFilterDialog import AOIFilterDialog
 
@@ -164,19 +165,18 @@ class AOIController:
                 temps = []
 
                 # If we have detected pixels, use those for temperature
+                # (temperature_data may be a TemperatureGrid, which reads only the pixels indexed)
                 if 'detected_pixels' in area_of_interest and area_of_interest['detected_pixels']:
-                    for pixel in area_of_interest['detected_pixels']:
-                        if isinstance(pixel, (list, tuple)) and len(pixel) >= 2:
-                            px, py = int(pixel[0]), int(pixel[1])
-                            if 0 <= py < shape[0] and 0 <= px < shape[1]:
-                                temps.append(temperature_data[py][px])
+                    coords = AOIPixels.coerce(area_of_interest['detected_pixels']).to_array(shape)
+                    temps = np.asarray(temperature_data[coords[:, 1], coords[:, 0]]).tolist()
                 # Otherwise sample temperatures within the circle
                 else:
-                    for y in range(max(0, cy - radius), min(shape[0], cy + radius + 1)):
-                        for x in range(max(0, cx - radius), min(shape[1], cx + radius + 1)):
-                            # Check if pixel is within circle
-                            if (x - cx) ** 2 + (y - cy) ** 2 <= radius ** 2:
-                                temps.append(temperature_data[y][x])
+                    y1, y2 = max(0, cy - radius), min(shape[0], cy + radius + 1)
+                    x1, x2 = max(0, cx - radius), min(shape[1], cx + radius + 1)
+                    if y2 > y1 and x2 > x1:
+                        ys, xs = np.mgrid[y1:y2, x1:x2]
+                        inside = (xs - cx) ** 2 + (ys - cy) ** 2 <= radius ** 2
+                        temps = np.asarray(temperature_data[y1:y2, x1:x2])[inside].tolist()
 
                 if temps:
                     avg_temp = sum(temps) / len(temps)
@@ -21,6 +21,7 @@ from core.services.XmlService import XmlService
 from core.services.image.ImageService import ImageService
 from core.services.image.ImageHighlightService import ImageHighlightService
 from helpers.MetaDataHelper import MetaDataHelper
+from helpers.TemperatureGrid import TemperatureGrid
 
 from core.views.images.viewer.dialogs.ZipExportDialog import ZipExportDialog
 from core.views.images.viewer.dialogs.ExportProgressDialog import ExportProgressDialog
@@ -289,15 +290,18 @@ class ZipExportController:
 
                     mask_name = image_xml.get('mask_path', '')
                     if mask_name and mask_src_dir:
-                        src_mask = os.path.join(mask_src_dir, mask_name)
-                        if os.path.exists(src_mask):
-                            # Preserve any relative subfolder in mask_name
-                            dst_mask = os.path.join(results_root, mask_name)
-                            os.makedirs(os.path.dirname(dst_mask), exist_ok=True)
-                            try:
-                                shutil.copy2(src_mask, dst_mask)
-                            except Exception:
-                                pass
+                        # A thermal mask's temperature grid sits beside it under the same name
+                        grid_name = os.path.splitext(mask_name)[0] + TemperatureGrid.EXTENSION
+                        for name in (mask_name, grid_name):
+                            src_mask = os.path.join(mask_src_dir, name)
+                            if os.path.exists(src_mask):
+                                # Preserve any relative subfolder in mask_name
+                                dst_mask = os.path.join(results_root, name)
+                                os.makedirs(os.path.dirname(dst_mask), exist_ok=True)
+                                try:
+                                    shutil.copy2(src_mask, dst_mask)
+                                except Exception:
+                                    pass
 
             # Save updated XML into staging root
             try:
@@ -8,6 +8,7 @@ lazy loading and efficient rendering of large datasets.
 from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex, QSize, QThread, Signal, Slot, QTimer
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QPixmap, QIcon, QImage, QColor
+import os
 import numpy as np
 import qimage2ndarray
 from pathlib import Path
@@ -16,6 +17,8 @@ from core.services.LoggerService import LoggerService
 from core.services.image.AOIService import AOIService
 from core.services.cache.ColorCacheService import ColorCacheService
 from core.services.cache.TemperatureCacheService import TemperatureCacheService
+from helpers.SparseMask import SparseMask
+from helpers.TemperatureGrid import TemperatureGrid
 from .ThumbnailLoader import ThumbnailLoader
 
 
@@ -104,9 +107,9 @@ class AOIGalleryModel(QAbstractListModel):
             thumbnail_cache_dir = self.dataset_dir / '.thumbnails'
 
             # Color and temperature cache data is stored in XML, not JSON files
-            # Cache services are not needed in viewer - data comes from XML
+            # Only AOIs without a temperature in the XML read it from the image's temperature grid
             self.color_cache_service = None
-            self.temperature_cache_service = None
+            self.temperature_cache_service = TemperatureCacheService()
 
             # Update thumbnail loader with dataset cache directory
             if thumbnail_cache_dir.exists():
@@ -747,7 +750,8 @@ class AOIGalleryModel(QAbstractListModel):
         Pre-load temperature information for all AOIs from cache.
 
         Temperature values are already calculated during analysis and stored in the cache.
-        This method loads them into memory for fast tooltip access.
+        This method loads them into memory for fast tooltip access. AOIs without one
+        (e.g. added in the viewer) are measured on their image's temperature grid.
         """
         if not self.viewer or not self.aoi_items:
             return
@@ -766,7 +770,7 @@ class AOIGalleryModel(QAbstractListModel):
                     self._temperature_info_cache[cache_key] = aoi_data['temperature']
                     loaded_count += 1
                 else:
-                    self._temperature_info_cache[cache_key] = None
+                    self._temperature_info_cache[cache_key] = self._grid_temperature(img_idx, aoi_data)
 
             if loaded_count > 0:
                 # self.logger.info(f"Loaded {loaded_count} temperatures from cache")
@@ -775,6 +779,30 @@ class AOIGalleryModel(QAbstractListModel):
         except Exception as e:
             self.logger.error(f"Error loading temperature info: {e}")
 
+    def _grid_temperature(self, image_idx, aoi_data):
+        """
+        Get the temperature of an AOI from its image's temperature grid.
+
+        Args:
+            image_idx: Index of the image containing the AOI
+            aoi_data: AOI dictionary
+
+        Returns:
+            float: Temperature in Celsius, or None if the image has no temperature grid
+        """
+        if self.temperature_cache_service is None or image_idx >= len(self.viewer.images):
+            return None
+        image = self.viewer.images[image_idx]
+        mask_path = image.get('mask_path', '')
+        if not mask_path.endswith(SparseMask.EXTENSION):
+            return None
+        grid_path = os.path.splitext(mask_path)[0] + TemperatureGrid.EXTENSION
+        if not os.path.exists(grid_path):
+            return None
+        if self.temperature_cache_service.temperature_grids.get(os.path.basename(image['path'])) != grid_path:
+            self.temperature_cache_service.register_grid(image['path'], grid_path)
+        return self.temperature_cache_service.get_temperature(image['path'], aoi_data)
+
     def _get_color_info(self, image_idx, aoi_idx):
         """
         Get color information for an AOI from cache.
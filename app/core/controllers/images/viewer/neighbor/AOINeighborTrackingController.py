@@ -11,6 +11,7 @@ from PySide6.QtCore import Qt
 
 from core.services.image.AOINeighborService import AOINeighborService
 from core.services.image.AOIService import AOIService
+from core.services.image.MetadataIndexService import MetadataIndexService
 from core.services.LoggerService import LoggerService
 
 
@@ -78,7 +79,12 @@ class AOINeighborTrackingController(QObject):
         super().__init__(parent)
         self.parent = parent
         self.logger = LoggerService()
-        self.neighbor_service = AOINeighborService()
+        try:
+            metadata_index = MetadataIndexService.instance()
+        except Exception as e:
+            self.logger.warning(f"Metadata index unavailable, reading images directly: {e}")
+            metadata_index = None
+        self.neighbor_service = AOINeighborService(metadata_index)
 
         # Thread management
         self._worker = None
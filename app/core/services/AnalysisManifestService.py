@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from core.services.LoggerService import LoggerService
+from helpers.AOIPixels import AOIPixels
+
+
+class AnalysisManifestService:
+    """
+    Append-only record of the images an analysis run has finished.
+
+    Every completed image is written as one JSON line holding its path relative to the
+    input folder, a hash of its contents, a hash of the analysis settings and its
+    serialized AOIs. Lines are flushed as they are written, so a crash or cancel keeps
+    everything finished so far and a later run can resume from it.
+    """
+
+    FILE_NAME = "ADIAT_Manifest.jsonl"
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, output_dir):
+        """
+        Initialize the manifest for an output folder.
+
+        Args:
+            output_dir (str): Folder holding the manifest (the ADIAT_Results folder).
+        """
+        self.logger = LoggerService()
+        self.path = os.path.join(output_dir, self.FILE_NAME)
+        self._lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def settings_hash(settings):
+        """
+        Hash the settings that determine an image's analysis result.
+
+        Args:
+            settings (dict): Analysis settings; values that are not JSON types are hashed by str().
+
+        Returns:
+            str: Hex digest identifying the settings.
+        """
+        encoded = json.dumps(settings, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def content_hash(data):
+        """
+        Hash image file contents that are already in memory.
+
+        Args:
+            data (bytes | numpy.ndarray): File contents.
+
+        Returns:
+            str: Hex digest of the contents.
+        """
+        return hashlib.blake2b(memoryview(data), digest_size=20).hexdigest()
+
+    @classmethod
+    def file_content_hash(cls, path):
+        """
+        Hash an image file on disk, reading it in chunks.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: Hex digest of the contents, equal to content_hash() of the same bytes.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def exists(self):
+        """Return True if the manifest file exists."""
+        return os.path.exists(self.path)
+
+    def read_index(self):
+        """
+        Summarize every complete record without decoding its AOIs.
+
+        A line cut short by a crash is skipped. When an image appears more than once
+        the last record wins. Only the summaries are kept in memory; full records are
+        read back one at a time with read_record().
+
+        Returns:
+            dict: Summaries keyed by relative image path, in file order. Each holds the
+            record's 'offset' in the file, 'content_hash', 'settings_hash', 'mask_path'
+            and 'aoi_count'.
+        """
+        index = {}
+        if not self.exists():
+            return index
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line_number, line in enumerate(f, 1):
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    index[record['path']] = {
+                        'offset': line_offset,
+                        'content_hash': record['content_hash'],
+                        'settings_hash': record['settings_hash'],
+                        'mask_path': record['mask_path'],
+                        'aoi_count': len(record['aois'])
+                    }
+                except (ValueError, KeyError, TypeError):
+                    self.logger.warning(f"Ignoring incomplete manifest line {line_number} in {self.path}")
+        return index
+
+    def index(self, settings_hash):
+        """
+        Summarize the records produced with the given settings.
+
+        Args:
+            settings_hash (str): Value returned by settings_hash() for the current run.
+
+        Returns:
+            dict: Matching summaries keyed by relative image path, as returned by read_index().
+        """
+        return {path: entry for path, entry in self.read_index().items()
+                if entry['settings_hash'] == settings_hash}
+
+    def read_record(self, offset):
+        """
+        Read and decode the record starting at a file offset.
+
+        Args:
+            offset (int): Offset taken from a read_index() summary.
+
+        Returns:
+            dict: The decoded record.
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline(), object_hook=self._decode_value)
+
+    def read_records(self):
+        """
+        Read every complete record in the manifest.
+
+        Returns:
+            dict: Decoded records keyed by relative image path, with the same rules as read_index().
+        """
+        return {path: self.read_record(entry['offset']) for path, entry in self.read_index().items()}
+
+    def load(self, settings_hash):
+        """
+        Read the records produced with the given settings.
+
+        Args:
+            settings_hash (str): Value returned by settings_hash() for the current run.
+
+        Returns:
+            dict: Matching decoded records keyed by relative image path.
+        """
+        return {path: self.read_record(entry['offset']) for path, entry in self.index(settings_hash).items()}
+
+    def open(self, append=True):
+        """
+        Open the manifest for writing.
+
+        Args:
+            append (bool): Keep existing records if True, otherwise start an empty manifest.
+        """
+        self.close()
+        with self._lock:
+            self._file = self._open_file(append)
+
+    def append(self, rel_path, content_hash, settings_hash, mask_path, areas_of_interest, base_contour_count=None):
+        """
+        Record a finished image and flush it to disk.
+
+        Args:
+            rel_path (str): Image path relative to the input folder.
+            content_hash (str): Hash of the image file contents.
+            settings_hash (str): Hash of the analysis settings.
+            mask_path (str | None): Mask path relative to the output folder, if one was stored.
+            areas_of_interest (list | None): AOI dictionaries detected in the image.
+            base_contour_count (int, optional): Contour count reported by the algorithm.
+
+        Returns:
+            dict: The record as it will be read back by load().
+        """
+        record = {
+            'path': rel_path,
+            'content_hash': content_hash,
+            'settings_hash': settings_hash,
+            'mask_path': mask_path,
+            'base_contour_count': base_contour_count,
+            'aois': areas_of_interest or []
+        }
+        line = json.dumps(self._encode_value(record), separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                self._file = self._open_file(True)
+            self._file.write(line + '\n')
+            self._file.flush()
+        return json.loads(line, object_hook=self._decode_value)
+
+    def close(self):
+        """Close the manifest file if it is open."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open_file(self, append):
+        """Open the manifest file, ending a line torn by a crash before new records are added."""
+        torn = False
+        if append and self.exists() and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b'\n'
+        manifest_file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        if torn:
+            manifest_file.write('\n')
+            manifest_file.flush()
+        return manifest_file
+
+    @classmethod
+    def _encode_value(cls, value):
+        """Convert a record value into JSON types, tagging tuples and AOI pixel sets."""
+        if isinstance(value, dict):
+            return {str(key): cls._encode_value(item) for key, item in value.items()}
+        if isinstance(value, tuple):
+            return {'__tuple__': [cls._encode_value(item) for item in value]}
+        if isinstance(value, list):
+            return [cls._encode_value(item) for item in value]
+        if isinstance(value, AOIPixels):
+            return {'__aoi_pixels__': value.serialize()}
+        if isinstance(value, np.ndarray):
+            return cls._encode_value(value.tolist())
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    @staticmethod
+    def _decode_value(obj):
+        """Restore tagged tuples and AOI pixel sets while JSON is parsed."""
+        if len(obj) == 1:
+            if '__tuple__' in obj:
+                return tuple(obj['__tuple__'])
+            if '__aoi_pixels__' in obj:
+                return AOIPixels.deserialize(obj['__aoi_pixels__'])
+        return obj
@@ -1,5 +1,5 @@
-import operator
 import cv2
+import io
 import os
 import numpy as np
 from PIL import Image, UnidentifiedImageError
@@ -8,15 +8,25 @@ import xml.etree.ElementTree as ET
 import time
 import traceback
 import hashlib
+import json
+import atexit
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from multiprocessing import Pool, pool
 from PySide6.QtCore import QObject, Signal, Slot
 
 from core.services.LoggerService import LoggerService
+from core.services.AnalysisManifestService import AnalysisManifestService
 from core.services.advancedFeatures.HistogramNormalizationService import HistogramNormalizationService
 from core.services.advancedFeatures.KMeansClustersService import KMeansClustersService
 from core.services.XmlService import XmlService
+from core.services.XmlStreamWriterService import XmlStreamWriterService
+from core.services.TiledAnalysisService import TiledAnalysisService
+from core.services.image.MetadataIndexService import MetadataIndexService
+from helpers.TiledImageReader import TiledImageReader
+from helpers.AnalysisTimings import ImageStageTimings, StageTimingSummary
 from algorithms.images.ColorRange.services.ColorRangeService import ColorRangeService
 from algorithms.images.RXAnomaly.services.RXAnomalyService import RXAnomalyService
 from algorithms.images.MatchedFilter.services.MatchedFilterService import MatchedFilterService
@@ -26,6 +36,22 @@ from algorithms.images.HSVColorRange.services.HSVColorRangeService import HSVCol
 from algorithms.images.ThermalRange.services.ThermalRangeService import ThermalRangeService
 from algorithms.images.ThermalAnomaly.services.ThermalAnomalyService import ThermalAnomalyService
 
+# Per-process cache of warm helper objects (algorithm instance, histogram reference,
+# k-means service). Populated by the pool initializer and reused for every image a
+# worker handles. Each entry is stored as (key, object) so changed settings rebuild it.
+_worker_cache = {}
+
+# Threads that verify image headers while discovery and analysis continue
+VALIDATION_THREADS = 4
+# Seconds between discovery progress messages
+PROGRESS_INTERVAL = 2.0
+# Images with at least this many pixels are analyzed tile by tile (RGB algorithms only)
+TILED_PROCESSING_MIN_PIXELS = 100_000_000
+# Frames, spread evenly over the flight, sampled to fit a shared k-means palette
+PALETTE_FRAMES = 8
+# Power-of-two reductions libjpeg can apply while decoding, largest first
+REDUCED_DECODE_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
 
 class AnalyzeService(QObject):
     """Service to process images using a selected algorithm.
@@ -44,9 +70,13 @@ class AnalyzeService(QObject):
     sig_aois = Signal()
     sig_done = Signal(int, int, str)
 
+    # Worker pool kept warm across analysis runs
+    _shared_pool = None
+    _shared_pool_size = None
+
     def __init__(self, id, algorithm, input, output, identifier_color, min_area, num_processes,
                  max_aois, aoi_radius, histogram_reference_path, kmeans_clusters, options, max_area,
-                 processing_resolution=1.0):
+                 processing_resolution=1.0, resume=False, kmeans_shared_palette=False):
         """Initialize the AnalyzeService with parameters for processing images.
 
         Args:
@@ -65,6 +95,10 @@ class AnalyzeService(QObject):
             max_area: Maximum area in pixels for an object to qualify as an area of interest.
             processing_resolution: Percentage to scale images (0.1 to 1.0).
                 1.0 means process at original resolution (no scaling). Defaults to 1.0.
+            resume: If True, keep the results of a previous run with the same settings and
+                only analyze images that are new or changed. Defaults to False.
+            kmeans_shared_palette: If True, k-means cluster centers are fitted once on frames
+                from across the flight and shared by all images. Defaults to False.
         """
         self.logger = LoggerService()
         self.xmlService = XmlService()
@@ -75,6 +109,8 @@ class AnalyzeService(QObject):
         self.output = os.path.join(output, "ADIAT_Results")
         self.identifier_color = identifier_color
         self.options = options
+        # Workers also get the pool size, e.g. to split the CPU threads between them
+        self._worker_options = {**(options or {}), 'num_processes': num_processes}
         self.min_area = min_area
         self.max_area = max_area
         self.processing_resolution = processing_resolution
@@ -84,11 +120,70 @@ class AnalyzeService(QObject):
         self.max_aois_limit_exceeded = False
         self.hist_ref_path = histogram_reference_path
         self.kmeans_clusters = kmeans_clusters
+        self.kmeans_shared_palette = kmeans_shared_palette
+        self.kmeans_palette = None
         self.__id = id
-        self.images_with_aois = []
+        self.images_with_aois = 0
         self.cancelled = False
         self.is_thermal = (self.algorithm['type'] == 'Thermal')
-        self.pool = Pool(self.num_processes)
+        self.ttl_images = 0
+        self._discovered_images = 0
+        self._validated_images = 0
+        self._completed_images = 0
+        self._discovery_done = False
+        self._pending_results = []
+        self._image_files = []
+        self._progress_lock = threading.Lock()
+        self._scandir = os.scandir
+        self.resume = resume
+        self.manifest = AnalysisManifestService(self.output)
+        self._settings_hash = AnalysisManifestService.settings_hash(self._manifest_settings())
+        self._completed_records = {}
+        self._input_paths = set()
+        self._resumed_images = 0
+        self._stage_timings = StageTimingSummary()
+        self.pool = AnalyzeService._acquire_pool(
+            self.num_processes,
+            (self.algorithm, self.identifier_color, self.aoi_radius, self._worker_options,
+             self.hist_ref_path, self.kmeans_clusters, self.is_thermal)
+        )
+
+    @classmethod
+    def _acquire_pool(cls, num_processes, initargs):
+        """Return the shared worker pool, creating it if needed.
+
+        The pool is kept alive between runs so workers keep their cached models
+        and helpers. A new pool is created when the previous one was terminated
+        or the requested number of processes changed.
+
+        Args:
+            num_processes: Number of worker processes.
+            initargs: Arguments passed to the pool initializer to warm worker caches.
+
+        Returns:
+            multiprocessing.pool.Pool: A running worker pool.
+        """
+        existing = cls._shared_pool
+        if existing is not None and existing._state == pool.RUN and cls._shared_pool_size == num_processes:
+            return existing
+
+        if existing is not None:
+            existing.terminate()
+        cls._shared_pool = Pool(num_processes, initializer=AnalyzeService._init_worker, initargs=initargs)
+        cls._shared_pool_size = num_processes
+        return cls._shared_pool
+
+    @classmethod
+    def shutdown_pool(cls):
+        """Terminate the shared worker pool, if any."""
+        if cls._shared_pool is not None:
+            try:
+                cls._shared_pool.terminate()
+                cls._shared_pool.join()
+            except Exception:
+                pass
+            cls._shared_pool = None
+            cls._shared_pool_size = None
 
     @Slot()
     def process_files(self):
@@ -99,6 +194,10 @@ class AnalyzeService(QObject):
         """
         try:
             self._setup_output_dir()
+            if self._completed_records:
+                self.sig_msg.emit(f"Resuming analysis: {len(self._completed_records)} images already analyzed")
+            elif self.resume:
+                self.sig_msg.emit("No previous results for these settings, starting a new analysis")
             self.xmlService.add_settings_to_xml(
                 input_dir=self.input,
                 output_dir=self.output_dir,
@@ -114,91 +213,324 @@ class AnalyzeService(QObject):
                 options=self.options
             )
 
-            image_files = []
-
             start_time = time.time()
-            for subdir, dirs, files in os.walk(self.input):
-                for file in files:
-                    file_path = Path(file)
-                    if self.is_thermal and file_path.suffix != 'irg':
-                        image_files.append(os.path.join(subdir, file))
-                    elif not self.is_thermal:
-                        image_files.append(os.path.join(subdir, file))
-
-            self.ttl_images = len(image_files)
-            self.sig_msg.emit(f"Processing {self.ttl_images} files")
-
+            self.ttl_images = 0
+            self._discovered_images = 0
+            self._validated_images = 0
             self._completed_images = 0
+            self._resumed_images = 0
             self._total_aois = 0
+            self._discovery_done = False
+            self._pending_results = []
+            self._image_files = []
+            self._input_paths = set()
+            self._stage_timings = StageTimingSummary()
+            self.sig_msg.emit("Discovering and processing files...")
 
-            # Process each image using multiprocessing
-            for file in image_files:
-                if os.path.isdir(file):
-                    self.ttl_images -= 1
-                    continue
-                if self.pool._state == pool.RUN:
-                    try:
-                        with Image.open(file) as img:
-                            img.verify()  # Check if it's a valid image
-                        is_valid_image = True
-                    except (UnidentifiedImageError, OSError):
-                        is_valid_image = False
-
-                    if is_valid_image and self.pool._state == pool.RUN:
-                        self.pool.apply_async(
-                            AnalyzeService.process_file,
-                            (
-                                self.algorithm,
-                                self.identifier_color,
-                                self.min_area,
-                                self.max_area,
-                                self.aoi_radius,
-                                self.options,
-                                file,
-                                self.input,
-                                self.output,
-                                self.hist_ref_path,
-                                self.kmeans_clusters,
-                                self.is_thermal,
-                                self.processing_resolution
-                            ),
-                            callback=self._process_complete
-                        )
-                    else:
-                        self.ttl_images -= 1
-                        self.sig_msg.emit(f"Skipping {file} :: File is not an image")
+            # Stream files into the pool as they are found; headers are verified on a
+            # few threads so slow storage overlaps with analysis instead of preceding it
+            input_files = self._iter_input_files()
+            self.kmeans_palette = None
+            if self.kmeans_clusters is not None and self.kmeans_shared_palette and not self.is_thermal:
+                # The palette needs frames from across the flight, so the listing is completed first
+                input_files = list(input_files)
+                self._fit_kmeans_palette(input_files)
+
+            last_progress = time.time()
+            validations = []
+            with ThreadPoolExecutor(max_workers=VALIDATION_THREADS) as validator:
+                for file in input_files:
+                    if self.cancelled:
+                        break
+                    if self.is_thermal and Path(file).suffix == 'irg':
+                        continue
+                    self._input_paths.add(self._relative_input_path(file))
+                    with self._progress_lock:
+                        self._discovered_images += 1
+                    validations.append(validator.submit(self._validate_and_queue, file))
+
+                    if time.time() - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = time.time()
+                        self.sig_msg.emit(self._progress_counts())
+
+            # Raise any error a validation thread hit while queueing its file
+            for validation in validations:
+                validation.result()
+
+            with self._progress_lock:
+                self._discovery_done = True
+                pending_results = list(self._pending_results)
+                image_files = list(self._image_files)
 
             # Notify that images are queued and processing has started
+            self.sig_msg.emit(self._progress_counts())
             self.sig_msg.emit(f"All {self.ttl_images} images queued, processing started...")
 
-            # Close the pool and ensure all processes are done
-            self.pool.close()
-            self.pool.join()
+            # Index the images' metadata for the viewer while the workers analyze them
+            with ThreadPoolExecutor(max_workers=1) as indexer:
+                indexer.submit(self._index_metadata, image_files)
 
-            # Generate the output XML with the information gathered during processing
-            self.images_with_aois = sorted(self.images_with_aois, key=operator.itemgetter('path'))
+                # Wait for every queued image; the pool itself stays warm for the next run
+                for async_result in pending_results:
+                    while not async_result.ready() and not self.cancelled:
+                        async_result.wait(0.5)
 
-            # Set the XML path before adding images so relative paths can be calculated
+            # Stream the output XML from the manifest, one image at a time, so resumed and
+            # uninterrupted runs match and no run holds every image's AOIs in memory
+            self.manifest.close()
             file_path = os.path.join(self.output, "ADIAT_Data.xml")
-            self.xmlService.xml_path = file_path
-
-            for img in self.images_with_aois:
-                self.xmlService.add_image_to_xml(img)
+            self._total_aois = 0
+            with XmlStreamWriterService(file_path, self.xmlService) as writer:
+                for image_data in self._iter_manifest_images():
+                    writer.add_image(image_data)
+                    self._total_aois += len(image_data['aois'])
+            self.images_with_aois = writer.image_count
+            self._write_stage_timings()
 
-            self.xmlService.save_xml_file(file_path)
             ttl_time = round(time.time() - start_time, 3)
-            self.sig_done.emit(self.__id, len(self.images_with_aois), file_path)
-            self.sig_msg.emit(f"{len(self.images_with_aois)} images with {self._total_aois} areas of interest identified")
+            self.sig_done.emit(self.__id, self.images_with_aois, file_path)
+            self.sig_msg.emit(f"{self.images_with_aois} images with {self._total_aois} areas of interest identified")
             self.sig_msg.emit(f"Total Processing Time: {ttl_time} seconds")
             self.sig_msg.emit(f"Total Images Processed: {self.ttl_images}")
+            if self._resumed_images:
+                self.sig_msg.emit(f"Images Skipped (already analyzed): {self._resumed_images}")
 
         except Exception as e:
             self.logger.error(traceback.format_exc())
             self.logger.error(f"An error occurred during processing: {e}")
+        finally:
+            self.manifest.close()
+
+    def _iter_input_files(self):
+        """Yield every file below the input directory as soon as it is listed.
+
+        Walks top-down like os.walk (without following directory symlinks) using
+        the scandir function in self._scandir, so discovery can be streamed.
+
+        Yields:
+            str: Path of each file found.
+        """
+        pending_dirs = [self.input]
+        while pending_dirs and not self.cancelled:
+            directory = pending_dirs.pop()
+            subdirs = []
+            try:
+                for entry in self._scandir(directory):
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        yield entry.path
+                    elif not entry.is_symlink():
+                        subdirs.append(entry.path)
+            except OSError as e:
+                self.logger.warning(f"Unable to list {directory}: {e}")
+            pending_dirs.extend(reversed(subdirs))
+
+    def _validate_and_queue(self, file):
+        """Verify an image header and hand the file to the worker pool.
+
+        Runs on the validation threads started by process_files. Files that cannot be
+        read are reported as skipped; errors while queueing are raised to process_files.
+
+        Args:
+            file: Path to the file to validate.
+        """
+        if self.cancelled or self.pool._state != pool.RUN:
+            return
+        try:
+            already_analyzed = self._is_already_analyzed(file)
+            is_valid_image = already_analyzed or self._is_valid_image(file)
+        except Exception as e:
+            self.logger.error(f"Unable to validate {file}: {e}")
+            self.sig_msg.emit(f"Skipping {file} :: {e}")
+            return
+        if already_analyzed:
+            with self._progress_lock:
+                self._resumed_images += 1
+                self._image_files.append(file)
+            return
+        if not is_valid_image:
+            self.sig_msg.emit(f"Skipping {file} :: File is not an image")
+            return
+
+        with self._progress_lock:
+            if self.cancelled or self.pool._state != pool.RUN:
+                return
+            self._validated_images += 1
+            self.ttl_images += 1
+            self._image_files.append(file)
+            async_result = self.pool.apply_async(
+                AnalyzeService.process_file,
+                (
+                    self.algorithm,
+                    self.identifier_color,
+                    self.min_area,
+                    self.max_area,
+                    self.aoi_radius,
+                    self._worker_options,
+                    file,
+                    self.input,
+                    self.output,
+                    self.hist_ref_path,
+                    self.kmeans_clusters,
+                    self.is_thermal,
+                    self.processing_resolution,
+                    self.kmeans_palette
+                ),
+                callback=self._process_complete
+            )
+            self._pending_results.append(async_result)
+
+    @staticmethod
+    def _is_valid_image(file):
+        """Check that a file is an image the workers can analyze.
+
+        Args:
+            file: Path to the file to check.
+
+        Returns:
+            bool: True if the image header and data structure are valid.
+        """
+        try:
+            with Image.open(file) as img:
+                img.verify()  # Check if it's a valid image
+            return True
+        except Image.DecompressionBombError:
+            # PIL refuses images above its pixel limit; those large enough for the tiled
+            # reader are validated from their header only
+            return (TiledImageReader.pixel_count(file) or 0) >= TILED_PROCESSING_MIN_PIXELS
+        except (UnidentifiedImageError, OSError):
+            return False
+
+    def _fit_kmeans_palette(self, files):
+        """Fit the shared k-means palette on frames spread evenly over the flight.
+
+        Frames are decoded at a quarter of their size, which is enough for sampling
+        colors. Failures are logged and leave per-image clustering in place.
+
+        Args:
+            files: Paths of every file in the input folder.
+        """
+        self.sig_msg.emit("Fitting shared color palette...")
+        step = max(1, len(files) // PALETTE_FRAMES)
+        images = []
+        for file in files[::step]:
+            if len(images) >= PALETTE_FRAMES or self.cancelled:
+                break
+            try:
+                img = cv2.imdecode(np.fromfile(file, dtype=np.uint8), cv2.IMREAD_REDUCED_COLOR_4)
+            except Exception:
+                img = None
+            if img is not None:
+                images.append(img)
+        try:
+            kmeans_service = KMeansClustersService(self.kmeans_clusters)
+            kmeans_service.fit_palette(images)
+            self.kmeans_palette = kmeans_service.get_palette()
+        except Exception as e:
+            self.logger.warning(f"Shared palette could not be fitted, clustering each image: {e}")
+
+    def _index_metadata(self, files):
+        """Add the analyzed images to the metadata index the viewer reads.
+
+        Runs on its own thread while the workers analyze the images. Failures are
+        logged and do not affect the analysis.
+
+        Args:
+            files: Paths of the input images.
+        """
+        try:
+            MetadataIndexService.instance().update(files, cancel_check=lambda: self.cancelled)
+        except Exception as e:
+            self.logger.warning(f"Image metadata could not be indexed: {e}")
+
+    def _progress_counts(self):
+        """Return a status message with the discovered, validated and processed counts."""
+        with self._progress_lock:
+            message = (f"Discovered {self._discovered_images} files, validated {self._validated_images} images, "
+                       f"processed {self._completed_images}")
+            if self._resumed_images:
+                message += f", skipped {self._resumed_images} already analyzed"
+            return message
+
+    def get_progress(self):
+        """Return the current progress counts.
+
+        Returns:
+            dict: Counts of 'discovered' files, 'validated' images queued for analysis,
+            'processed' images and images 'skipped' because a previous run finished them.
+        """
+        with self._progress_lock:
+            return {
+                'discovered': self._discovered_images,
+                'validated': self._validated_images,
+                'processed': self._completed_images,
+                'skipped': self._resumed_images
+            }
+
+    def _manifest_settings(self):
+        """Return the settings that determine each image's result, for the manifest settings hash."""
+        settings = {
+            'algorithm': self.algorithm,
+            'identifier_color': self.identifier_color,
+            'min_area': self.min_area,
+            'max_area': self.max_area,
+            'aoi_radius': self.aoi_radius,
+            'options': self.options,
+            'hist_ref_path': self.hist_ref_path,
+            'kmeans_clusters': self.kmeans_clusters,
+            'thermal': self.is_thermal,
+            'processing_resolution': self.processing_resolution
+        }
+        if self.kmeans_shared_palette:
+            settings['kmeans_shared_palette'] = True
+        return settings
+
+    def _relative_input_path(self, file):
+        """Return a file's path relative to the input directory, with forward slashes."""
+        return os.path.relpath(file, self.input).replace('\\', '/')
+
+    def _is_already_analyzed(self, file):
+        """Check whether a previous run with the same settings finished this file unchanged.
+
+        Args:
+            file: Path to the input file.
+
+        Returns:
+            bool: True if the manifest holds a record for the file with a matching content hash.
+        """
+        record = self._completed_records.get(self._relative_input_path(file))
+        if record is None:
+            return False
+        try:
+            return AnalysisManifestService.file_content_hash(file) == record['content_hash']
+        except OSError:
+            return False
+
+    def _iter_manifest_images(self):
+        """Yield the image entries for the XML from the manifest records of this input set.
+
+        Only the manifest index is held in memory; each record is read when it is yielded.
+
+        Yields:
+            dict: Image dictionaries with AOIs, in mask path order.
+        """
+        entries = [(entry['mask_path'], rel_path, entry['offset'])
+                   for rel_path, entry in self.manifest.index(self._settings_hash).items()
+                   if rel_path in self._input_paths and entry['aoi_count']]
+        for mask_path, rel_path, offset in sorted(entries, key=lambda entry: (entry[0] or '', entry[1])):
+            record = self.manifest.read_record(offset)
+            yield {
+                "path": mask_path,
+                "original_path": os.path.join(self.input, *rel_path.split('/')),
+                "aois": record['aois']
+            }
 
     @staticmethod
     def process_file(algorithm, identifier_color, min_area, max_area, aoi_radius, options, full_path, input_dir, output_dir, hist_ref_path, kmeans_clusters,
-                     thermal, processing_resolution=1.0):
+                     thermal, processing_resolution=1.0, kmeans_palette=None):
         """Process a single image using the selected algorithm and settings.
 
         Applies histogram normalization and k-means clustering if specified,
@@ -219,21 +551,41 @@ class AnalyzeService(QObject):
             kmeans_clusters: Number of clusters (colors) to retain in the image.
             thermal: Whether this is a thermal image algorithm.
             processing_resolution: Percentage to scale images (0.1 to 1.0).
-                1.0 = no scaling. Defaults to 1.0.
+                1.0 = no scaling. RGB JPEGs are decoded directly at a reduced size.
+                Defaults to 1.0.
+            kmeans_palette: Shared k-means palette from KMeansClustersService.get_palette(),
+                or None to cluster each image on its own. Defaults to None.
 
         Returns:
             AnalysisResult containing processed image path, areas of interest,
             and error message if any.
         """
-        img = cv2.imdecode(np.fromfile(full_path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        start = time.perf_counter()
+        timings = ImageStageTimings()
+        if not thermal and (TiledImageReader.pixel_count(full_path) or 0) >= TILED_PROCESSING_MIN_PIXELS:
+            return AnalyzeService._process_file_tiled(
+                algorithm, identifier_color, min_area, max_area, aoi_radius, options, full_path, input_dir, output_dir,
+                hist_ref_path, kmeans_clusters, processing_resolution, start, timings, kmeans_palette)
+
+        with timings.measure('decode'):
+            file_bytes = np.fromfile(full_path, dtype=np.uint8)
+            content_hash = AnalysisManifestService.content_hash(file_bytes)
+            reduced = None
+            if not thermal and processing_resolution is not None and processing_resolution < 1.0:
+                reduced = AnalyzeService._decode_reduced(file_bytes, processing_resolution)
+            if reduced is not None:
+                img, (original_width, original_height) = reduced
+            else:
+                img = cv2.imdecode(file_bytes, cv2.IMREAD_UNCHANGED)
         if img is None:
             raise ValueError(f"Could not load image: {full_path}")
+        if reduced is None:
+            # Store original dimensions for coordinate transformation
+            original_height, original_width = img.shape[:2]
 
-        # Store original image for thumbnail generation (before scaling)
-        original_img = img.copy()
-
-        # Store original dimensions for coordinate transformation
-        original_height, original_width = img.shape[:2]
+        # The decoded image doubles as the original for thumbnails; no stage modifies it in place.
+        # A downscaled image's original is decoded again only if AOIs are found.
+        original_img = img if reduced is None else None
         scale_factor = 1.0
 
         # Apply percentage-based resolution scaling if specified
@@ -244,8 +596,11 @@ class AnalyzeService(QObject):
 
             # Ensure minimum dimensions of at least 10 pixels
             if new_width >= 10 and new_height >= 10:
-                # Use INTER_AREA for best quality when downscaling
-                img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+                # Use INTER_AREA for best quality when downscaling what the decoder left
+                if img.shape[:2] != (new_height, new_width):
+                    with timings.measure('downscale'):
+                        img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+                original_img = None
 
                 # Scale area thresholds to match processing resolution (area scales by factor²)
                 min_area = int(min_area * scale_factor * scale_factor)
@@ -253,59 +608,248 @@ class AnalyzeService(QObject):
             else:
                 # Image too small to scale, process at original resolution
                 scale_factor = 1.0
+        if original_img is not None:
+            del file_bytes
 
         try:
             if not thermal:
                 # Apply histogram normalization if a reference image is provided
-                histogram_service = None
                 if hist_ref_path is not None:
-                    histogram_service = HistogramNormalizationService(hist_ref_path)
-                    img = histogram_service.match_histograms(img)
+                    with timings.measure('histogram'):
+                        histogram_service = AnalyzeService._get_worker_histogram_service(hist_ref_path)
+                        img = histogram_service.match_histograms(img)
 
                 # Apply k-means clustering if specified
-                kmeans_service = None
                 if kmeans_clusters is not None:
-                    kmeans_service = KMeansClustersService(kmeans_clusters)
-                    img = kmeans_service.generate_clusters(img)
+                    with timings.measure('kmeans'):
+                        kmeans_service = AnalyzeService._get_worker_kmeans_service(kmeans_clusters, kmeans_palette)
+                        img = kmeans_service.generate_clusters(img)
 
-            # Instantiate the algorithm class and process the image
-            cls = globals()[algorithm['service']]
-            instance = cls(identifier_color, min_area, max_area, aoi_radius, algorithm['combine_overlapping_aois'], options)
+            # Reuse this worker's algorithm instance and process the image
+            instance = AnalyzeService._get_worker_algorithm(algorithm, identifier_color, aoi_radius, options)
+            # Area thresholds depend on the per-image scale factor, so set them for every image
+            instance.min_area = min_area
+            instance.max_area = max_area
             instance.set_scale_factor(scale_factor)  # Pass scale factor to algorithm for coordinate transformation
-            result = instance.process_image(img, full_path, input_dir, output_dir)
+            instance.mask_ms = 0.0
+            with timings.measure('algorithm'):
+                result = instance.process_image(img, full_path, input_dir, output_dir)
+            # Mask storage happens inside process_image; report it as its own stage
+            timings.add('algorithm', -instance.mask_ms)
+            timings.add('mask', instance.mask_ms)
 
             # Transform AOI coordinates from processing resolution back to original resolution
             if result and result.areas_of_interest and scale_factor < 1.0:
-                result.areas_of_interest = instance.transform_aois_to_original_resolution(result.areas_of_interest)
+                with timings.measure('transform'):
+                    result.areas_of_interest = instance.transform_aois_to_original_resolution(result.areas_of_interest)
 
             if result and result.areas_of_interest:
+                if original_img is None:
+                    with timings.measure('decode'):
+                        original_img = cv2.imdecode(file_bytes, cv2.IMREAD_UNCHANGED)
+                    del file_bytes
                 # Generate main image thumbnail (using original resolution image)
                 try:
-                    AnalyzeService._generate_main_image_thumbnail(original_img, full_path, output_dir, input_root=input_dir)
+                    with timings.measure('thumbnail'):
+                        AnalyzeService._generate_main_image_thumbnail(original_img, full_path, output_dir, input_root=input_dir)
                 except Exception as thumb_error:
                     logger = LoggerService()
                     logger.warning(f"Main thumbnail generation failed for {full_path}: {thumb_error}")
                 # Generate thumbnail and color cache for detected AOIs (using original resolution image)
                 try:
                     # Call cache generation with original (unscaled) image for best quality thumbnails
-                    instance.generate_aoi_cache(
-                        img=original_img,
-                        image_path=full_path,
-                        areas_of_interest=result.areas_of_interest,
-                        output_dir=output_dir,
-                        thermal=thermal
-                    )
+                    with timings.measure('aoi_cache'):
+                        instance.generate_aoi_cache(
+                            img=original_img,
+                            image_path=full_path,
+                            areas_of_interest=result.areas_of_interest,
+                            output_dir=output_dir,
+                            thermal=thermal
+                        )
                 except Exception as cache_error:
                     # Don't fail detection if cache generation fails
                     logger = LoggerService()
                     logger.warning(f"Cache generation failed for {full_path}: {cache_error}")
 
+            if result:
+                result.content_hash = content_hash
+                timings.add('total', (time.perf_counter() - start) * 1000.0)
+                result.timings = timings
             return result
 
         except Exception as e:
             logger = LoggerService()
             logger.error(e)
 
+    @staticmethod
+    def _decode_reduced(file_bytes, processing_resolution):
+        """Decode a JPEG at the largest power-of-two reduction that covers the processing size.
+
+        libjpeg scales while decoding (DCT scaling), so a 1/2, 1/4 or 1/8 size image is
+        decoded in a fraction of the time of a full decode and never exists at full size.
+        Only the remaining scale is left to cv2.resize. EXIF orientation is ignored, as
+        with IMREAD_UNCHANGED.
+
+        Args:
+            file_bytes: Encoded image as a uint8 numpy array.
+            processing_resolution: Scale the image is processed at (below 1.0).
+
+        Returns:
+            tuple: (image, (original_width, original_height)), or None if the file is not
+                a JPEG or no reduction is at least as large as the processing size.
+        """
+        if bytes(file_bytes[:3]) != b'\xff\xd8\xff':
+            return None
+        try:
+            with Image.open(io.BytesIO(file_bytes)) as header:
+                width, height = header.size
+        except (UnidentifiedImageError, OSError):
+            return None
+
+        new_width = int(width * processing_resolution)
+        new_height = int(height * processing_resolution)
+        if new_width < 10 or new_height < 10:
+            return None
+        for reduction, flag in REDUCED_DECODE_FLAGS:
+            if width // reduction >= new_width and height // reduction >= new_height:
+                img = cv2.imdecode(file_bytes, flag | cv2.IMREAD_IGNORE_ORIENTATION)
+                return (img, (width, height)) if img is not None else None
+        return None
+
+    @staticmethod
+    def _process_file_tiled(algorithm, identifier_color, min_area, max_area, aoi_radius, options, full_path, input_dir,
+                            output_dir, hist_ref_path, kmeans_clusters, processing_resolution, start, timings,
+                            kmeans_palette=None):
+        """Process a very large image tile by tile with TiledAnalysisService.
+
+        Takes the same settings as process_file, plus the start time and timings of the
+        image. The image is never decoded at full size when its format allows windowed
+        reads.
+
+        Returns:
+            AnalysisResult containing the mask path, areas of interest,
+            and error message if any.
+        """
+        try:
+            with timings.measure('decode'):
+                content_hash = AnalysisManifestService.file_content_hash(full_path)
+                reader = TiledImageReader(full_path)
+
+            scale_factor = 1.0
+            if processing_resolution is not None and processing_resolution < 1.0:
+                scale_factor = processing_resolution
+                min_area = int(min_area * scale_factor * scale_factor)
+                max_area = int(max_area * scale_factor * scale_factor) if max_area > 0 else 0
+
+            instance = AnalyzeService._get_worker_algorithm(algorithm, identifier_color, aoi_radius, options)
+            instance.min_area = min_area
+            instance.max_area = max_area
+            instance.set_scale_factor(scale_factor)
+
+            def preprocess(tile):
+                # Histogram normalization and k-means clustering are applied to each tile
+                if hist_ref_path is not None:
+                    with timings.measure('histogram'):
+                        tile = AnalyzeService._get_worker_histogram_service(hist_ref_path).match_histograms(tile)
+                if kmeans_clusters is not None:
+                    with timings.measure('kmeans'):
+                        tile = AnalyzeService._get_worker_kmeans_service(kmeans_clusters, kmeans_palette).generate_clusters(tile)
+                return tile
+
+            tiled = TiledAnalysisService(instance)
+            with reader:
+                result = tiled.process(reader, full_path, input_dir, output_dir, preprocess=preprocess, timings=timings)
+
+            if result.areas_of_interest and tiled.overview is not None:
+                try:
+                    with timings.measure('thumbnail'):
+                        AnalyzeService._generate_main_image_thumbnail(tiled.overview, full_path, output_dir, input_root=input_dir)
+                except Exception as thumb_error:
+                    logger = LoggerService()
+                    logger.warning(f"Main thumbnail generation failed for {full_path}: {thumb_error}")
+
+            result.content_hash = content_hash
+            timings.add('total', (time.perf_counter() - start) * 1000.0)
+            result.timings = timings
+            return result
+
+        except Exception as e:
+            logger = LoggerService()
+            logger.error(e)
+
+    @staticmethod
+    def _init_worker(algorithm, identifier_color, aoi_radius, options, hist_ref_path, kmeans_clusters, thermal):
+        """Pool initializer that warms the per-process caches.
+
+        Builds the algorithm instance and, for RGB algorithms, the histogram
+        normalization reference and k-means service once per worker so they are
+        reused for every image the worker handles.
+
+        Args:
+            algorithm: Dictionary specifying the algorithm for analysis.
+            identifier_color: RGB values for highlighting areas of interest.
+            aoi_radius: Radius added to the minimum enclosing circle around areas of interest.
+            options: Additional algorithm-specific options.
+            hist_ref_path: Path to the histogram reference image.
+            kmeans_clusters: Number of clusters (colors) to retain in the image.
+            thermal: Whether this is a thermal image algorithm.
+        """
+        _worker_cache.clear()
+        try:
+            AnalyzeService._get_worker_algorithm(algorithm, identifier_color, aoi_radius, options)
+            if not thermal:
+                if hist_ref_path is not None:
+                    AnalyzeService._get_worker_histogram_service(hist_ref_path)
+                if kmeans_clusters is not None:
+                    AnalyzeService._get_worker_kmeans_service(kmeans_clusters)
+        except Exception as e:
+            # Objects are built lazily on first use if warming fails
+            logger = LoggerService()
+            logger.warning(f"Worker initialization failed: {e}")
+
+    @staticmethod
+    def _get_worker_cached(name, key, factory):
+        """Return the cached object for name if key matches, otherwise build and cache it.
+
+        Args:
+            name: Cache slot name.
+            key: Value identifying the settings the object was built with.
+            factory: Callable that builds the object.
+
+        Returns:
+            The cached or newly built object.
+        """
+        entry = _worker_cache.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        obj = factory()
+        _worker_cache[name] = (key, obj)
+        return obj
+
+    @staticmethod
+    def _get_worker_algorithm(algorithm, identifier_color, aoi_radius, options):
+        """Return this worker's algorithm instance for the given settings."""
+        key = repr((algorithm['service'], algorithm['combine_overlapping_aois'], identifier_color, aoi_radius, options))
+
+        def build():
+            cls = globals()[algorithm['service']]
+            # Area thresholds are assigned per image in process_file
+            return cls(identifier_color, 0, 0, aoi_radius, algorithm['combine_overlapping_aois'], options)
+
+        return AnalyzeService._get_worker_cached('algorithm', key, build)
+
+    @staticmethod
+    def _get_worker_histogram_service(hist_ref_path):
+        """Return this worker's histogram normalization service for the reference image."""
+        return AnalyzeService._get_worker_cached(
+            'histogram', hist_ref_path, lambda: HistogramNormalizationService(hist_ref_path))
+
+    @staticmethod
+    def _get_worker_kmeans_service(kmeans_clusters, kmeans_palette=None):
+        """Return this worker's k-means service for the cluster count and shared palette."""
+        return AnalyzeService._get_worker_cached(
+            'kmeans', repr((kmeans_clusters, kmeans_palette)), lambda: KMeansClustersService(kmeans_clusters, kmeans_palette))
+
     @Slot()
     def _process_complete(self, result):
         """Handle completion of an image processing task.
@@ -324,22 +868,27 @@ class AnalyzeService(QObject):
             self.sig_msg.emit("Unable to process " + file_name + " :: " + result.error_message)
             return
         # Update progress counters
-        self._completed_images += 1
-        percent_complete = int(100 * self._completed_images / self.ttl_images)
+        with self._progress_lock:
+            self._completed_images += 1
+            if result.timings is not None:
+                self._stage_timings.add(result.timings)
+            if self._discovery_done:
+                progress = f"{int(100 * self._completed_images / self.ttl_images)}%"
+            else:
+                # The total is still growing while files are being discovered
+                progress = f"{self._completed_images} of {self._validated_images} validated"
 
-        # Add successfully processed image to results
-        if result.areas_of_interest:
-            # Include original path for mask-based approach
-            image_data = {
-                "path": result.output_path,  # This will be the mask path
-                "original_path": result.input_path,  # Original image path
-                "aois": result.areas_of_interest
-            }
-            self.images_with_aois.append(image_data)
+        # Record the finished image so an interrupted run can resume after it
+        try:
+            content_hash = result.content_hash or AnalysisManifestService.file_content_hash(result.input_path)
+            self.manifest.append(self._relative_input_path(result.input_path), content_hash, self._settings_hash,
+                                 result.output_path, result.areas_of_interest, result.base_contour_count)
+        except Exception as e:
+            self.logger.error(f"Unable to record {file_name} in the analysis manifest: {e}")
 
+        if result.areas_of_interest:
             num_aois = len(result.areas_of_interest)
-            self._total_aois += num_aois
-            self.sig_msg.emit(f'{num_aois} Areas of interest identified in {file_name} ({percent_complete}%)')
+            self.sig_msg.emit(f'{num_aois} Areas of interest identified in {file_name} ({progress})')
 
             # Guard against None and ensure integers for comparison
             if (result.base_contour_count is not None
@@ -350,7 +899,24 @@ class AnalyzeService(QObject):
                 self.sig_aois.emit()
                 self.max_aois_limit_exceeded = True
         else:
-            self.sig_msg.emit(f'No areas of interest identified in {file_name} ({percent_complete}%)')
+            self.sig_msg.emit(f'No areas of interest identified in {file_name} ({progress})')
+
+    def _write_stage_timings(self):
+        """Write the per-stage timing summary of this run to the results folder and the log.
+
+        Only images analyzed in this run are included; images skipped on resume have no timings.
+        """
+        if not self._stage_timings.image_count:
+            return
+        try:
+            summary = {'images': self._stage_timings.image_count, 'stages': self._stage_timings.summary()}
+            with open(os.path.join(self.output, "ADIAT_Timings.json"), 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            self.logger.warning(f"Unable to write stage timings: {e}")
+        self.logger.info(f"Stage timings for {self._stage_timings.image_count} images:")
+        for line in self._stage_timings.format_lines():
+            self.logger.info(f"  {line}")
 
     @Slot()
     def process_cancel(self):
@@ -361,6 +927,9 @@ class AnalyzeService(QObject):
         self.cancelled = True
         self.sig_msg.emit("--- Cancelling Image Processing ---")
         self.pool.terminate()
+        if AnalyzeService._shared_pool is self.pool:
+            AnalyzeService._shared_pool = None
+            AnalyzeService._shared_pool_size = None
 
     @staticmethod
     def _generate_main_image_thumbnail(img, image_path, output_dir, input_root=None):
@@ -447,12 +1016,20 @@ class AnalyzeService(QObject):
     def _setup_output_dir(self):
         """Create the output directory for storing processed images.
 
-        Removes existing output directory if present and creates a new one.
+        When resuming and the manifest holds results for the current settings, the
+        existing output directory is kept and new results are appended. Otherwise the
+        existing output directory is removed and a new one is created.
         Logs errors if directory creation fails.
         """
         try:
-            if os.path.exists(self.output):
-                shutil.rmtree(self.output)
-            os.makedirs(self.output)
+            self._completed_records = self.manifest.index(self._settings_hash) if self.resume else {}
+            if not self._completed_records:
+                if os.path.exists(self.output):
+                    shutil.rmtree(self.output)
+                os.makedirs(self.output)
+            self.manifest.open(append=bool(self._completed_records))
         except Exception as e:
             self.logger.error(e)
+
+
+atexit.register(AnalyzeService.shutdown_pool)
@@ -34,6 +34,12 @@ class LoggerService:
             app_path = home_path + '/AppData/Roaming/ADIAT/'
             if not os.path.exists(app_path):
                 os.makedirs(app_path)
+        else:
+            # Linux, typically a headless server running the command-line interface
+            home_path = os.path.expanduser("~")
+            app_path = home_path + '/.local/share/ADIAT/'
+            if not os.path.exists(app_path):
+                os.makedirs(app_path)
 
         log_path = app_path + 'adiat_logs.txt'
         self.logger = logging.getLogger(__name__)
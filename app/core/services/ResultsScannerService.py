@@ -1,7 +1,7 @@
 """ResultsScannerService - Service for scanning folders for ADIAT results."""
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple, Callable
 
 from core.services.XmlService import XmlService
@@ -21,6 +21,7 @@ class ResultsScanResult:
     missing_images: int              # Count of images that cannot be found
     first_image_path: Optional[str]  # Path to first available image (for GPS)
     gps_coordinates: Optional[Tuple[float, float]]  # (lat, lon) or None
+    available_images: List[str] = field(default_factory=list, repr=False, compare=False)  # Candidates for GPS
 
 
 class ResultsScannerService:
@@ -75,20 +76,24 @@ class ResultsScannerService:
                 if filename.upper() == self.XML_FILENAME.upper():
                     xml_path = os.path.join(dirpath, filename)
                     try:
-                        result = self._parse_result_file(xml_path)
+                        result = self._parse_result_file(xml_path, resolve_gps=False)
                         if result:
                             results.append(result)
                     except Exception as e:
                         self.logger.error(f"Error parsing {xml_path}: {e}")
 
+        # GPS of every results folder at once
+        self._resolve_gps(results)
         return results
 
-    def _parse_result_file(self, xml_path: str) -> Optional[ResultsScanResult]:
+    def _parse_result_file(self, xml_path: str, resolve_gps: bool = True) -> Optional[ResultsScanResult]:
         """
         Parse a single ADIAT_DATA.XML file and extract metadata.
 
         Args:
             xml_path: Full path to the XML file
+            resolve_gps: Whether to look up GPS coordinates now; scan_folder looks them
+                up for all results together
 
         Returns:
             ResultsScanResult or None if parsing fails
@@ -119,13 +124,6 @@ class ResultsScannerService:
                 else:
                     missing_images += 1
 
-            # Get GPS coordinates - try multiple images if first one fails
-            gps_coords = None
-            for img_path in available_images:
-                gps_coords = self._get_image_gps(img_path)
-                if gps_coords:
-                    break  # Found GPS, stop searching
-
             # Get folder name - use parent of ADIAT_Results if applicable
             xml_dir = os.path.dirname(xml_path)
             folder_name = os.path.basename(xml_dir)
@@ -136,7 +134,7 @@ class ResultsScannerService:
                 if parent_dir:
                     folder_name = os.path.basename(parent_dir)
 
-            return ResultsScanResult(
+            result = ResultsScanResult(
                 xml_path=xml_path,
                 folder_name=folder_name,
                 algorithm=algorithm,
@@ -144,24 +142,62 @@ class ResultsScannerService:
                 aoi_count=aoi_count,
                 missing_images=missing_images,
                 first_image_path=first_available_image,
-                gps_coordinates=gps_coords
+                gps_coordinates=None,
+                available_images=available_images
             )
+            if resolve_gps:
+                self._resolve_gps([result])
+            return result
 
         except Exception as e:
             self.logger.error(f"Failed to parse result file {xml_path}: {e}")
             return None
 
-    def _get_image_gps(self, image_path: str) -> Optional[Tuple[float, float]]:
+    def _resolve_gps(self, results: List[ResultsScanResult]):
+        """
+        Set the GPS coordinates of results from their available images.
+
+        The first available image of every result is read in one batch; a result
+        whose first image has no GPS tries its other images one at a time.
+
+        Args:
+            results: Results whose gps_coordinates are not set yet
+        """
+        pending = [result for result in results if result.gps_coordinates is None and result.available_images]
+        if not pending:
+            return
+        try:
+            metadata = MetaDataHelper.get_metadata_batch([result.available_images[0] for result in pending],
+                                                         MetaDataHelper.GPS_TAGS)
+        except Exception as e:
+            self.logger.error(f"Failed to read GPS metadata: {e}")
+            metadata = {}
+
+        for result in pending:
+            # Try multiple images if first one fails
+            for index, img_path in enumerate(result.available_images):
+                result.gps_coordinates = self._get_image_gps(img_path, metadata.get(img_path) if index == 0 else None)
+                if result.gps_coordinates:
+                    break  # Found GPS, stop searching
+
+    def _get_image_gps(self, image_path: str, metadata: Optional[dict] = None) -> Optional[Tuple[float, float]]:
         """
         Extract GPS coordinates from an image.
 
         Args:
             image_path: Path to the image file
+            metadata: Tags already read by MetaDataHelper.get_metadata_batch, if any
 
         Returns:
             Tuple of (latitude, longitude) or None
         """
         try:
+            if metadata:
+                gps_info = LocationInfo.get_gps(metadata=metadata)
+                if gps_info and 'latitude' in gps_info and 'longitude' in gps_info:
+                    return (gps_info['latitude'], gps_info['longitude'])
+                return None
+
             # First try using MetaDataHelper to get EXIF data (works with more formats)
             exif_data = MetaDataHelper.get_exif_data_piexif(image_path)
             if exif_data:
@@ -0,0 +1,227 @@
+import os
+from contextlib import nullcontext
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from algorithms.AlgorithmService import AnalysisResult
+from core.services.LoggerService import LoggerService
+from helpers.SparseMask import SparseMask
+
+
+class TiledAnalysisService:
+    """Service for running an algorithm over a very large image one tile at a time.
+
+    The image is divided into a grid of square core tiles. Each tile is read from a
+    TiledImageReader together with an overlap margin on every side, analyzed with the
+    algorithm's process_image, and its AOIs are moved into full-image coordinates. An
+    AOI is kept only by the tile whose core contains its center, so objects in the
+    overlap are reported once; objects smaller than the overlap are measured exactly
+    as in full-frame processing.
+
+    The detection mask is written as a SparseMask from the crops of detected pixels in
+    the core of every tile's mask, so neither the image nor the mask is held in memory
+    at full size. Thumbnails and colors of AOIs are generated from the tile
+    that contains them.
+
+    Algorithms that normalize against statistics of the whole image (confidence
+    scores, RX and MR map backgrounds) and histogram matching or k-means clustering
+    are applied per tile, so their results differ slightly from full-frame
+    processing. Thermal algorithms read the radiometric data themselves and are not
+    supported.
+
+    Attributes:
+        algorithm: AlgorithmService instance that analyzes each tile.
+        tile_size: Core tile size in pixels, a multiple of 16 as TIFF tiles require.
+        overlap: Margin in pixels read around every core tile.
+        overview: Downscaled copy of the whole image built during process(), for the
+            main image thumbnail.
+    """
+
+    DEFAULT_TILE_SIZE = 2048
+    DEFAULT_OVERLAP = 256
+    OVERVIEW_SIZE = 1024  # Longest side of the overview image
+    THUMBNAIL_PADDING = 10  # Padding generate_aoi_cache adds around each AOI
+
+    def __init__(self, algorithm, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_OVERLAP):
+        """Initialize the service.
+
+        Args:
+            algorithm: AlgorithmService instance. Its scale_factor sets the processing
+                resolution of every tile.
+            tile_size: Core tile size in pixels, rounded up to a multiple of 16.
+            overlap: Margin in pixels read around every core tile.
+
+        Raises:
+            ValueError: If the algorithm is a thermal algorithm.
+        """
+        if algorithm.is_thermal:
+            raise ValueError("Tiled processing does not support thermal algorithms")
+        self.logger = LoggerService()
+        self.algorithm = algorithm
+        self.tile_size = max(16, -(-int(tile_size) // 16) * 16)
+        self.overlap = max(0, int(overlap))
+        self.overview = None
+
+    def tiles(self, height, width):
+        """Core tiles covering an image, in row-major order.
+
+        Args:
+            height: Image height in pixels.
+            width: Image width in pixels.
+
+        Returns:
+            list: (x, y, width, height) of every core tile.
+        """
+        return [(x, y, min(self.tile_size, width - x), min(self.tile_size, height - y))
+                for y in range(0, height, self.tile_size)
+                for x in range(0, width, self.tile_size)]
+
+    def process(self, reader, full_path, input_dir, output_dir, preprocess=None, timings=None, generate_cache=True):
+        """Analyze an image tile by tile.
+
+        Args:
+            reader: TiledImageReader for the image.
+            full_path: Path to the image being analyzed.
+            input_dir: The base input folder.
+            output_dir: The base output folder.
+            preprocess: Optional callable applied to every tile after downscaling,
+                e.g. histogram normalization.
+            timings: Optional ImageStageTimings receiving the time of each stage.
+            generate_cache: Whether to generate AOI thumbnails and colors.
+
+        Returns:
+            AnalysisResult with AOIs in full-image coordinates and the path of the mask.
+        """
+        algorithm = self.algorithm
+        mask_path = str(Path(algorithm._construct_output_path(full_path, input_dir, output_dir)).with_suffix(SparseMask.EXTENSION))
+        os.makedirs(os.path.dirname(mask_path), exist_ok=True)
+        state = {'areas_of_interest': [], 'base_contour_count': 0.0, 'deferred_cache': []}
+        self.overview = None
+
+        try:
+            SparseMask.write_crops(
+                mask_path,
+                (reader.height, reader.width),
+                self._mask_crops(reader, full_path, input_dir, output_dir, preprocess, timings, generate_cache, state)
+            )
+        except Exception as e:
+            self.logger.error(f"Error processing image {full_path} in tiles: {e}")
+            if os.path.exists(mask_path):
+                os.remove(mask_path)
+            return AnalysisResult(full_path, error_message=str(e))
+        finally:
+            algorithm.capture_masks = False
+            algorithm.captured_mask = None
+
+        areas_of_interest = state['areas_of_interest']
+        if not areas_of_interest:
+            os.remove(mask_path)
+            return AnalysisResult(full_path, None, output_dir, None, None)
+
+        # AOIs crossing a tile's edge are cached from a window read around each of them
+        if generate_cache:
+            with self._measure(timings, 'aoi_cache'):
+                for aoi, (x1, y1, x2, y2) in state['deferred_cache']:
+                    window = reader.read(x1, y1, x2 - x1, y2 - y1)
+                    algorithm.generate_aoi_cache(window, full_path, [aoi], output_dir, origin=(x1, y1))
+
+        areas_of_interest.sort(key=lambda item: (item['center'][1], item['center'][0]))
+        return AnalysisResult(full_path, mask_path, output_dir, areas_of_interest, int(round(state['base_contour_count'])))
+
+    def _mask_crops(self, reader, full_path, input_dir, output_dir, preprocess, timings, generate_cache, state):
+        """Analyze every tile and yield the SparseMask crops of its core mask, in full-image coordinates."""
+        algorithm = self.algorithm
+        height, width = reader.height, reader.width
+        scale = algorithm.scale_factor
+        algorithm.capture_masks = True
+
+        for x, y, core_width, core_height in self.tiles(height, width):
+            wx1, wy1 = max(0, x - self.overlap), max(0, y - self.overlap)
+            wx2, wy2 = min(width, x + core_width + self.overlap), min(height, y + core_height + self.overlap)
+
+            with self._measure(timings, 'decode'):
+                original = reader.read(wx1, wy1, wx2 - wx1, wy2 - wy1)
+            self._add_to_overview(original[y - wy1:y - wy1 + core_height, x - wx1:x - wx1 + core_width], x, y, height, width)
+
+            tile = original
+            if scale < 1.0:
+                with self._measure(timings, 'downscale'):
+                    size = (max(1, int((wx2 - wx1) * scale)), max(1, int((wy2 - wy1) * scale)))
+                    tile = cv2.resize(original, size, interpolation=cv2.INTER_AREA)
+            if preprocess is not None:
+                tile = preprocess(tile)
+            if tile is original:
+                # The original tile is still needed for thumbnails
+                tile = original.copy()
+
+            algorithm.captured_mask = None
+            algorithm.mask_ms = 0.0
+            with self._measure(timings, 'algorithm'):
+                result = algorithm.process_image(tile, full_path, input_dir, output_dir)
+            if timings is not None:
+                timings.add('algorithm', -algorithm.mask_ms)
+                timings.add('mask', algorithm.mask_ms)
+            if result is None or result.error_message is not None:
+                raise RuntimeError(result.error_message if result is not None else "Algorithm returned no result")
+
+            areas_of_interest = result.areas_of_interest or []
+            with self._measure(timings, 'transform'):
+                if scale < 1.0:
+                    areas_of_interest = algorithm.transform_aois_to_original_resolution(areas_of_interest)
+                areas_of_interest = algorithm.translate_aois(areas_of_interest, wx1, wy1)
+            owned = [aoi for aoi in areas_of_interest
+                     if x <= aoi['center'][0] < x + core_width and y <= aoi['center'][1] < y + core_height]
+            if owned:
+                # Contours before combining cannot be traced to one AOI; attribute them proportionally
+                state['base_contour_count'] += (result.base_contour_count or 0) * len(owned) / len(areas_of_interest)
+                state['areas_of_interest'].extend(owned)
+                if generate_cache:
+                    self._cache_tile_aois(original, (wx1, wy1, wx2, wy2), owned, full_path, output_dir, height, width,
+                                          timings, state)
+
+            with self._measure(timings, 'mask'):
+                mask = algorithm.captured_mask
+                crops = []
+                if mask is not None:
+                    if mask.shape[:2] != original.shape[:2]:
+                        mask = cv2.resize(mask, (wx2 - wx1, wy2 - wy1), interpolation=cv2.INTER_NEAREST)
+                    # Core tiles do not overlap, so neither do the crops of different tiles
+                    crops = SparseMask.find_crops(mask[y - wy1:y - wy1 + core_height, x - wx1:x - wx1 + core_width])
+            algorithm.captured_mask = None
+            for cx, cy, bits in crops:
+                yield x + cx, y + cy, bits
+
+    def _cache_tile_aois(self, tile, window, areas_of_interest, full_path, output_dir, height, width, timings, state):
+        """Generate the AOI cache of AOIs whose thumbnail lies inside the tile; defer the rest."""
+        wx1, wy1, wx2, wy2 = window
+        in_tile = []
+        for aoi in areas_of_interest:
+            cx, cy = aoi['center']
+            crop_radius = aoi.get('radius', 50) + self.THUMBNAIL_PADDING
+            crop = (max(0, int(cx - crop_radius)), max(0, int(cy - crop_radius)),
+                    min(width, int(cx + crop_radius)), min(height, int(cy + crop_radius)))
+            if crop[0] >= wx1 and crop[1] >= wy1 and crop[2] <= wx2 and crop[3] <= wy2:
+                in_tile.append(aoi)
+            else:
+                state['deferred_cache'].append((aoi, crop))
+        if in_tile:
+            with self._measure(timings, 'aoi_cache'):
+                self.algorithm.generate_aoi_cache(tile, full_path, in_tile, output_dir, origin=(wx1, wy1))
+
+    def _add_to_overview(self, core, x, y, height, width):
+        """Paste a downscaled core tile into the overview image."""
+        scale = min(1.0, self.OVERVIEW_SIZE / max(height, width))
+        if self.overview is None:
+            self.overview = np.zeros((max(1, round(height * scale)), max(1, round(width * scale))) + core.shape[2:],
+                                     dtype=core.dtype)
+        x1, y1 = round(x * scale), round(y * scale)
+        x2, y2 = round((x + core.shape[1]) * scale), round((y + core.shape[0]) * scale)
+        if x2 > x1 and y2 > y1:
+            self.overview[y1:y2, x1:x2] = cv2.resize(core, (x2 - x1, y2 - y1), interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _measure(timings, stage):
+        """Measure a stage when timings are being collected."""
+        return timings.measure(stage) if timings is not None else nullcontext()
@@ -4,6 +4,8 @@ from datetime import datetime
 import uuid
 import xml.etree.ElementTree as ET
 from core.services.LoggerService import LoggerService
+from helpers.AOIPixels import AOIPixels
+from helpers.SparseMask import SparseMask
 
 
 class XmlService:
@@ -143,8 +145,12 @@ class XmlService:
                     # Add optional fields if they exist (for backward compatibility)
                     if area_of_interest_xml.get('contour'):
                         area_of_interest['contour'] = literal_eval(area_of_interest_xml.get('contour'))
-                    if area_of_interest_xml.get('detected_pixels'):
-                        area_of_interest['detected_pixels'] = literal_eval(area_of_interest_xml.get('detected_pixels'))
+                    if area_of_interest_xml.get('detected_pixels_rle'):
+                        area_of_interest['detected_pixels'] = AOIPixels.deserialize(area_of_interest_xml.get('detected_pixels_rle'))
+                    elif area_of_interest_xml.get('detected_pixels'):
+                        # Legacy files stored short pixel lists as a Python literal
+                        area_of_interest['detected_pixels'] = AOIPixels.from_list(
+                            literal_eval(area_of_interest_xml.get('detected_pixels')))
                     # Always set flagged status (default to False if not present)
                     area_of_interest['flagged'] = area_of_interest_xml.get('flagged') == 'True'
                     # Load user comment (default to empty string if not present)
@@ -217,10 +223,24 @@ class XmlService:
         if images_xml is None:
             images_xml = ET.SubElement(root, "images")
 
-        image = ET.SubElement(images_xml, 'image')
+        images_xml.append(self.build_image_element(img))
 
-        # Check if this is a mask path (ends with .tif) or original image path
-        if img["path"] and img["path"].endswith('.tif'):
+    def build_image_element(self, img):
+        """
+        Build a detached image element without adding it to the XML document.
+
+        Paths are made relative to xml_path exactly as add_image_to_xml does.
+
+        Args:
+            img (dict): Dictionary with image path and areas of interest.
+
+        Returns:
+            xml.etree.ElementTree.Element: The image element.
+        """
+        image = ET.Element('image')
+
+        # Check if this is a mask path (sparse mask or .tif) or original image path
+        if img["path"] and img["path"].endswith(('.tif', SparseMask.EXTENSION)):
             # This is a mask file, store just the filename as mask_path
             # This avoids path duplication issues
             image.set('mask_path', img["path"])
@@ -286,16 +306,16 @@ class XmlService:
             if 'contour' in area and area['contour']:
                 area_xml.set('contour', str(area['contour']))
             if 'detected_pixels' in area and area['detected_pixels']:
-                # Only save a limited number of pixels to avoid huge XML files
-                # Full pixel data is preserved in the image XMP metadata
-                if len(area['detected_pixels']) <= 100:
-                    area_xml.set('detected_pixels', str(area['detected_pixels']))
+                # Run-length encoded, so every AOI keeps its exact pixels at a few bytes per row
+                area_xml.set('detected_pixels_rle', AOIPixels.coerce(area['detected_pixels']).serialize())
 
         # Debug logging for temperature save
         if temp_count > 0:
             # self.logger.debug(f"Saved {temp_count} AOIs with temperature data for image {img.get('path', 'unknown')}")
             pass
 
+        return image
+
     def save_xml_file(self, path):
         """
         Save the XML document to the specified path.
@@ -0,0 +1,114 @@
+import os
+import xml.etree.ElementTree as ET
+
+
+class XmlStreamWriterService:
+    """Service for writing an ADIAT XML file one image at a time.
+
+    Writes the header elements of an XmlService document (settings and anything else
+    already under the root), then serializes each image element as it is added, so
+    only one image is held in memory at a time. The bytes produced are identical to
+    adding every image with XmlService.add_image_to_xml and calling save_xml_file.
+
+    The document is written to a temporary file and moved into place on close, so
+    an interrupted write never leaves a truncated XML file behind.
+
+    Attributes:
+        path: Path of the XML file being written.
+        xml_service: XmlService holding the header elements and building image elements.
+        image_count: Number of images written so far.
+    """
+
+    ENCODING = 'us-ascii'  # ElementTree.write's default, so output matches save_xml_file
+
+    def __init__(self, path, xml_service):
+        """Initialize the writer.
+
+        Args:
+            path: Full path where the XML file will be saved.
+            xml_service: XmlService with the settings already added. Its xml_path is
+                set to path so image paths are made relative to the XML location.
+        """
+        self.path = path
+        self.xml_service = xml_service
+        self.image_count = 0
+        self._tmp_path = path + '.tmp'
+        self._file = None
+        self._root_open = False
+        self._images_open = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        """Start the document and write the header elements."""
+        self.xml_service.xml_path = self.path
+        self._file = open(self._tmp_path, 'wb')
+        self._root_open = False
+        self._images_open = False
+        self.image_count = 0
+
+        root = self.xml_service.xml.getroot()
+        header = [child for child in root if child.tag != 'images']
+        if header:
+            self._open_root()
+            for child in header:
+                self._file.write(ET.tostring(child, encoding=self.ENCODING))
+
+    def add_image(self, img):
+        """Serialize one image and write it to the document.
+
+        Args:
+            img (dict): Dictionary with image path and areas of interest, as for XmlService.add_image_to_xml.
+        """
+        element = self.xml_service.build_image_element(img)
+        if not self._images_open:
+            self._open_root()
+            self._file.write(b'<images>')
+            self._images_open = True
+        self._file.write(ET.tostring(element, encoding=self.ENCODING))
+        self.image_count += 1
+
+    def close(self):
+        """Finish the document and move it into place."""
+        if self._file is None:
+            return
+        root = self.xml_service.xml.getroot()
+        if self._images_open:
+            self._file.write(b'</images>')
+        if self._root_open:
+            self._file.write(f'</{root.tag}>'.encode(self.ENCODING))
+        else:
+            self._file.write(ET.tostring(ET.Element(root.tag, root.attrib), encoding=self.ENCODING))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard a partially written document."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def _open_root(self):
+        """Write the root start tag if it has not been written yet."""
+        if self._root_open:
+            return
+        root = self.xml_service.xml.getroot()
+        # Serializing the bare root gives '<data />' (with any attributes); reopen it as a start tag
+        empty_root = ET.tostring(ET.Element(root.tag, root.attrib), encoding=self.ENCODING)
+        self._file.write(empty_root[:-len(b' />')] + b'>')
+        self._root_open = True
@@ -6,7 +6,15 @@ from core.services.LoggerService import LoggerService
 
 
 class HistogramNormalizationService:
-    """Service to adjust the histogram of a source image to match that of a reference image."""
+    """Service to adjust the histogram of a source image to match that of a reference image.
+
+    The reference image's cumulative distribution is computed once. Each 8-bit image is
+    then matched with a 256-entry lookup table per channel, built from its histogram the
+    way skimage.exposure.match_histograms interpolates quantiles, and applied with
+    cv2.LUT. The result is rounded to uint8, so it is within 1 of skimage's output,
+    which is a float or, in newer releases, truncated to the input dtype. Images of
+    other bit depths are matched with skimage.
+    """
 
     def __init__(self, hist_ref_path):
         """
@@ -31,6 +39,8 @@ class HistogramNormalizationService:
             self.hist_ref_img = None  # Or handle the error as needed
             raise Exception("The reference image path is not a valid image file.")
 
+        self.reference_cdfs = [self._cumulative_distribution(channel) for channel in self._channels(self.hist_ref_img)]
+
     def match_histograms(self, src):
         """
         Match the histogram of a source image to that of the reference image.
@@ -45,7 +55,42 @@ class HistogramNormalizationService:
             Exception: If an error occurs during histogram matching.
         """
         try:
-            return exposure.match_histograms(src, self.hist_ref_img, channel_axis=-1)
+            if src.dtype != np.uint8:
+                return exposure.match_histograms(src, self.hist_ref_img, channel_axis=-1)
+
+            channels = self._channels(src)
+            if len(channels) != len(self.reference_cdfs):
+                raise ValueError("Number of channels in the input image and reference image must match!")
+
+            lut = np.empty((256, len(channels)), dtype=np.uint8)
+            for index, (channel, (reference_values, reference_quantiles)) in enumerate(zip(channels, self.reference_cdfs)):
+                quantiles = np.cumsum(np.bincount(channel.ravel(), minlength=256)) / channel.size
+                lut[:, index] = np.clip(np.rint(np.interp(quantiles, reference_quantiles, reference_values)), 0, 255)
+            return cv2.LUT(src, lut.reshape(256, 1, len(channels)) if src.ndim == 3 else lut)
         except Exception as e:
             self.logger.error(e)
             raise
+
+    @staticmethod
+    def _channels(img):
+        """Split an image into a list of its channels."""
+        return [img] if img.ndim == 2 else [img[..., index] for index in range(img.shape[-1])]
+
+    @staticmethod
+    def _cumulative_distribution(channel):
+        """
+        Compute the values present in a channel and their cumulative quantiles.
+
+        Args:
+            channel (numpy.ndarray): One image channel.
+
+        Returns:
+            tuple: (values, quantiles) arrays, as skimage uses them to interpolate.
+        """
+        if channel.dtype.kind == 'u':
+            counts = np.bincount(channel.ravel())
+            values = np.nonzero(counts)[0]
+            counts = counts[values]
+        else:
+            values, counts = np.unique(channel.ravel(), return_counts=True)
+        return values, np.cumsum(counts) / channel.size
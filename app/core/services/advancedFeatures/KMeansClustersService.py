@@ -4,17 +4,47 @@ from core.services.LoggerService import LoggerService
 
 
 class KMeansClustersService:
-    """Service to generate an image with a limited number of colors using K-Means clustering."""
+    """Service to generate an image with a limited number of colors using K-Means clustering.
 
-    def __init__(self, clusters):
+    By default cv2.kmeans runs on every pixel of every image. With a shared palette the
+    cluster centers are fitted once on a stratified pixel sample of several frames of a
+    flight, and images are quantized with a precomputed nearest-center lookup table over
+    6-6-6 bit colors. An image whose colors have drifted too far from the palette is
+    clustered on its own instead.
+
+    Attributes:
+        num_clusters: Number of color clusters.
+        palette: (clusters, 3) float32 shared cluster centers, or None for per-image clustering.
+        palette_error: Mean distance from the palette's fitting sample to its nearest center.
+        drift_threshold: Largest increase of the mean distance to the nearest center, in
+            color units, at which an image is still quantized with the shared palette.
+    """
+
+    LUT_BITS = 6  # Bits per channel of the nearest-center lookup table
+    SAMPLE_GRID = 16  # Strata per image side for palette sampling
+    SAMPLES_PER_STRATUM = 16  # Pixels drawn from every stratum
+    DEFAULT_DRIFT_THRESHOLD = 12.0
+    CHUNK_PIXELS = 1 << 20  # Pixels quantized at a time
+
+    def __init__(self, clusters, palette=None, drift_threshold=DEFAULT_DRIFT_THRESHOLD):
         """
         Initialize the KMeansClustersService with the specified number of color clusters.
 
         Args:
             clusters (int): The number of color clusters for the K-Means Clustering algorithm.
+            palette (tuple, optional): (centers, error) from get_palette() of a fitted service.
+                Defaults to None (per-image clustering).
+            drift_threshold (float): Color drift past which an image is clustered on its own.
+                Defaults to DEFAULT_DRIFT_THRESHOLD.
         """
         self.logger = LoggerService()
         self.num_clusters = clusters
+        self.drift_threshold = drift_threshold
+        self.palette = None
+        self.palette_error = None
+        self._lut = None
+        if palette is not None:
+            self.set_palette(*palette)
 
     def generate_clusters(self, src):
         """
@@ -30,6 +60,9 @@ class KMeansClustersService:
             Exception: If an error occurs during K-Means clustering.
         """
         try:
+            if self.palette is not None and self.palette_drift(src) <= self.drift_threshold:
+                return self.quantize(src)
+
             Z = src.reshape((-1, 3))
 
             # Convert to np.float32
@@ -46,3 +79,122 @@ class KMeansClustersService:
             return res2
         except Exception as e:
             self.logger.error(e)
+
+    def fit_palette(self, images):
+        """
+        Fit shared cluster centers on a stratified pixel sample of several images.
+
+        Args:
+            images (iterable): Images (numpy arrays) from the flight.
+
+        Returns:
+            numpy.ndarray: The (clusters, 3) cluster centers.
+
+        Raises:
+            ValueError: If there are fewer sampled pixels than clusters.
+        """
+        samples = [self.stratified_sample(img) for img in images if img is not None]
+        samples = np.concatenate(samples) if samples else np.empty((0, 3), dtype=np.float32)
+        if len(samples) < self.num_clusters:
+            raise ValueError("Not enough pixels to fit a palette")
+
+        # The sample is small, so k-means can afford more iterations and careful seeding
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.5)
+        _, _, centers = cv2.kmeans(samples, self.num_clusters, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+        self.set_palette(centers, self._nearest_distances(samples, centers).mean())
+        return self.palette
+
+    def set_palette(self, centers, error):
+        """
+        Use shared cluster centers and build their nearest-center lookup table.
+
+        Args:
+            centers (array-like): (clusters, 3) cluster centers.
+            error (float): Mean distance from the fitting sample to its nearest center.
+        """
+        self.palette = np.asarray(centers, dtype=np.float32).reshape(-1, 3)
+        self.palette_error = float(error)
+
+        # Nearest center of the middle of every 6-6-6 bit color cell, stored as its color
+        shift = 8 - self.LUT_BITS
+        levels = (np.arange(1 << self.LUT_BITS, dtype=np.float32) * (1 << shift)) + (1 << shift) / 2
+        cells = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(-1, 3)
+        nearest = np.concatenate([self._nearest_centers(cells[start:start + self.CHUNK_PIXELS], self.palette)
+                                  for start in range(0, len(cells), self.CHUNK_PIXELS)])
+        self._lut = np.uint8(self.palette)[nearest]
+
+    def get_palette(self):
+        """
+        Return the shared palette in a form that can be passed to another process.
+
+        Returns:
+            tuple: (centers, error) with centers as nested tuples, or None without a palette.
+        """
+        if self.palette is None:
+            return None
+        return tuple(tuple(float(value) for value in center) for center in self.palette), self.palette_error
+
+    def palette_drift(self, src):
+        """
+        Measure how far an image's colors have drifted from the shared palette.
+
+        Args:
+            src (numpy.ndarray): The input image.
+
+        Returns:
+            float: Increase of the mean distance to the nearest center over the palette's fitting sample.
+        """
+        return float(self._nearest_distances(self.stratified_sample(src), self.palette).mean()) - self.palette_error
+
+    def quantize(self, src):
+        """
+        Replace every pixel with its nearest shared cluster center using the lookup table.
+
+        Args:
+            src (numpy.ndarray): The input image.
+
+        Returns:
+            numpy.ndarray: The image with palette colors.
+        """
+        shift = 8 - self.LUT_BITS
+        pixels = src.reshape(-1, 3)
+        result = np.empty_like(pixels)
+        for start in range(0, len(pixels), self.CHUNK_PIXELS):
+            cells = (pixels[start:start + self.CHUNK_PIXELS] >> shift).astype(np.int32)
+            index = (cells[:, 0] << (2 * self.LUT_BITS)) | (cells[:, 1] << self.LUT_BITS) | cells[:, 2]
+            result[start:start + self.CHUNK_PIXELS] = self._lut[index]
+        return result.reshape(src.shape)
+
+    @classmethod
+    def stratified_sample(cls, img, seed=0):
+        """
+        Draw the same number of random pixels from every cell of a grid over the image.
+
+        Args:
+            img (numpy.ndarray): (H, W, 3) image.
+            seed (int): Seed of the random pixel positions. Defaults to 0.
+
+        Returns:
+            numpy.ndarray: (SAMPLE_GRID * SAMPLE_GRID * SAMPLES_PER_STRATUM, 3) float32 pixels.
+        """
+        rng = np.random.default_rng(seed)
+        height, width = img.shape[:2]
+        grid, count = cls.SAMPLE_GRID, cls.SAMPLES_PER_STRATUM
+        row_edges = np.linspace(0, height, grid + 1).astype(np.int64)
+        col_edges = np.linspace(0, width, grid + 1).astype(np.int64)
+        rows = row_edges[:-1, None, None] + (rng.random((grid, grid, count)) * np.diff(row_edges)[:, None, None])
+        cols = col_edges[None, :-1, None] + (rng.random((grid, grid, count)) * np.diff(col_edges)[None, :, None])
+        return img[rows.astype(np.int64).ravel(), cols.astype(np.int64).ravel()].reshape(-1, 3).astype(np.float32)
+
+    @staticmethod
+    def _nearest_centers(colors, centers):
+        """Index of the nearest center of every color."""
+        distances = (np.einsum('ij,ij->i', colors, colors)[:, None] - 2 * colors @ centers.T
+                     + np.einsum('ij,ij->i', centers, centers)[None, :])
+        return np.argmin(distances, axis=1)
+
+    @staticmethod
+    def _nearest_distances(colors, centers):
+        """Euclidean distance from every color to its nearest center."""
+        differences = colors[:, None, :] - centers[None, :, :]
+        return np.sqrt(np.einsum('ijk,ijk->ij', differences, differences).min(axis=1))
@@ -4,12 +4,14 @@ TemperatureCacheService - Manages in-memory caching of AOI temperature informati
 This service provides:
 - In-memory storage of temperature information (in Celsius) during processing
 - Temperature data is stored in XML, not JSON files
+- Temperatures of uncached AOIs read from an image's TemperatureGrid through a memmap
 """
 
 import hashlib
 import os
 from typing import Dict, Optional, Any
 from core.services.LoggerService import LoggerService
+from helpers.TemperatureGrid import TemperatureGrid
 
 
 class TemperatureCacheService:
@@ -19,7 +21,9 @@ class TemperatureCacheService:
     Temperature data is stored in XML files, not JSON. This service only provides
     in-memory storage during processing.
 
-    Temperature is stored in Celsius for consistency.
+    Temperature is stored in Celsius for consistency. When an image's temperature
+    grid is registered, the temperature of an AOI that is not cached is computed from
+    the grid's pixels under the AOI, reading only the tiles it covers.
     """
 
     def __init__(self):
@@ -31,6 +35,10 @@ class TemperatureCacheService:
         # In-memory cache: {cache_key: temperature_celsius}
         self.memory_cache: Dict[str, Optional[float]] = {}
 
+        # Temperature grids by image filename: {filename: grid_path}, and the opened grids
+        self.temperature_grids: Dict[str, str] = {}
+        self._open_grids: Dict[str, TemperatureGrid] = {}
+
     def get_cache_key(self, image_path: str, aoi_data: Dict[str, Any]) -> str:
         """
         Generate a unique cache key for an AOI.
@@ -72,11 +80,46 @@ class TemperatureCacheService:
             aoi_data: AOI dictionary
 
         Returns:
-            Temperature in Celsius, or None if not cached
+            Temperature in Celsius, or None if neither cached nor available from a grid
         """
         cache_key = self.get_cache_key(image_path, aoi_data)
+        if cache_key not in self.memory_cache:
+            grid = self._get_grid(image_path)
+            if grid is None:
+                return None
+            try:
+                self.memory_cache[cache_key] = grid.aoi_mean(aoi_data)
+            except Exception as e:
+                self.logger.error(f"Error reading temperature from grid: {e}")
+                return None
         return self.memory_cache.get(cache_key)
 
+    def register_grid(self, image_path: str, grid_path: str):
+        """
+        Register the temperature grid of an image for AOIs that are not cached.
+
+        Args:
+            image_path: Path to the source image
+            grid_path: Path to the image's TemperatureGrid file
+        """
+        filename = os.path.basename(image_path)
+        self.temperature_grids[filename] = grid_path
+        self._open_grids.pop(filename, None)
+
+    def _get_grid(self, image_path: str) -> Optional[TemperatureGrid]:
+        """Open (once) the registered temperature grid of an image."""
+        filename = os.path.basename(image_path)
+        grid_path = self.temperature_grids.get(filename)
+        if grid_path is None:
+            return None
+        if filename not in self._open_grids:
+            try:
+                self._open_grids[filename] = TemperatureGrid(grid_path)
+            except Exception as e:
+                self.logger.error(f"Error opening temperature grid {grid_path}: {e}")
+                return None
+        return self._open_grids[filename]
+
     def save_temperature(self, image_path: str, aoi_data: Dict[str, Any],
                          temperature: float) -> bool:
         """
@@ -124,6 +167,7 @@ class TemperatureCacheService:
     def clear_cache(self):
         """Clear the in-memory cache."""
         self.memory_cache.clear()
+        self._open_grids.clear()
         # self.logger.info("Temperature cache cleared from memory")
 
     def get_all_cache_data(self) -> Dict[str, float]:
@@ -143,5 +187,6 @@ class TemperatureCacheService:
             Dict with cache stats
         """
         return {
-            'memory_count': len(self.memory_cache)
+            'memory_count': len(self.memory_cache),
+            'grid_count': len(self.temperature_grids)
         }
@@ -117,11 +117,13 @@ class KMLGeneratorService:
                 total_aois += sum(1 for aoi in aois if aoi.get('flagged', False))
 
         current_aoi_count = 0
+        metadata = {}
 
         for img_idx, image in enumerate(images):
             # Check for cancellation
             if cancel_check and cancel_check():
                 return  # Exit early if cancelled
+            metadata = self._read_metadata_batch(images, img_idx, MetaDataHelper.GPS_TAGS, metadata)
             # Skip hidden images
             if image.get('hidden', False):
                 continue
@@ -129,21 +131,20 @@ class KMLGeneratorService:
             image_name = image.get('name', f'Image {img_idx + 1}')
             image_path = image.get('path', '')
 
-            # Get image GPS coordinates and metadata
+            # Get image GPS coordinates
             try:
-                # Create ImageService to extract EXIF data
-                image_service = ImageService(image_path, image.get('mask_path', ''))
+                if metadata.get(image_path):
+                    image_gps = LocationInfo.get_gps(metadata=metadata[image_path])
+                else:
+                    # Create ImageService to extract EXIF data
+                    image_service = ImageService(image_path, image.get('mask_path', ''))
 
-                # Get GPS from EXIF data as a dict (not formatted string)
-                image_gps = LocationInfo.get_gps(exif_data=image_service.exif_data)
+                    # Get GPS from EXIF data as a dict (not formatted string)
+                    image_gps = LocationInfo.get_gps(exif_data=image_service.exif_data)
 
                 if not image_gps:
                     continue
 
-                # Get image dimensions and metadata
-                img_array = image_service.img_array
-                height, width = img_array.shape[:2]
-
             except Exception:
                 continue
 
@@ -248,11 +249,13 @@ class KMLGeneratorService:
         """
         total_images = sum(1 for img in images if not img.get('hidden', False))
         current_image_count = 0
+        metadata = {}
 
         for img_idx, image in enumerate(images):
             # Check for cancellation
             if cancel_check and cancel_check():
                 return  # Exit early if cancelled
+            metadata = self._read_metadata_batch(images, img_idx, MetaDataHelper.IMAGE_TAGS, metadata)
 
             # Skip hidden images
             if image.get('hidden', False):
@@ -263,11 +266,19 @@ class KMLGeneratorService:
 
             # Get image GPS coordinates
             try:
-                # Create ImageService to extract EXIF data
-                image_service = ImageService(image_path, image.get('mask_path', ''))
+                image_metadata = metadata.get(image_path)
+                if image_metadata:
+                    image_gps = LocationInfo.get_gps(metadata=image_metadata)
+                    if not image_gps:
+                        continue
+
+                # Create ImageService to extract EXIF data, reusing the XMP data of the batch
+                image_service = ImageService(image_path, image.get('mask_path', ''),
+                                             xmp_data=MetaDataHelper.xmp_data_from_metadata(image_metadata))
 
                 # Get GPS from EXIF data
-                image_gps = LocationInfo.get_gps(exif_data=image_service.exif_data)
+                if not image_metadata:
+                    image_gps = LocationInfo.get_gps(exif_data=image_service.exif_data)
 
                 if not image_gps:
                     continue
@@ -316,6 +327,27 @@ class KMLGeneratorService:
                 # shouldn't stop the entire export
                 continue
 
+    @staticmethod
+    def _read_metadata_batch(images, img_idx, tags, metadata):
+        """
+        Reads the tags of the next batch of images when img_idx starts one.
+
+        Args:
+            images (list of dict): All image metadata dictionaries.
+            img_idx (int): Index of the current image.
+            tags (tuple): Tags to read.
+            metadata (dict): Metadata of the current batch.
+
+        Returns:
+            dict: Metadata keyed by image path for the batch containing img_idx.
+        """
+        batch_size = MetaDataHelper.METADATA_BATCH_SIZE
+        if img_idx % batch_size:
+            return metadata
+        paths = [image['path'] for image in images[img_idx:img_idx + batch_size]
+                 if image.get('path') and not image.get('hidden', False)]
+        return MetaDataHelper.get_metadata_batch(paths, tags)
+
     def generate_coverage_extent_kml(self, coverage_data: dict, output_path: str):
         """
         Generate KML file with polygons representing image coverage extents.
@@ -594,9 +594,7 @@ class PdfGeneratorService:
             # Clear image array from ImageService cache to free memory
             # Metadata (GPS, bearing, etc.) is already extracted, so we don't need the full image array anymore
             if cache_key in self._image_service_cache:
-                image_service = self._image_service_cache[cache_key]
-                if hasattr(image_service, 'img_array') and image_service.img_array is not None:
-                    image_service.img_array = None
+                self._image_service_cache[cache_key].img_array = None
 
     def _initialize_styles(self):
         """Initialize paragraph styles for the document."""
@@ -22,9 +22,16 @@ from core.services.LoggerService import LoggerService
 class AOINeighborService:
     """Service for tracking AOI GPS coordinates across neighboring images."""
 
-    def __init__(self):
-        """Initialize the AOINeighborService."""
+    def __init__(self, metadata_index=None):
+        """
+        Initialize the AOINeighborService.
+
+        Args:
+            metadata_index (MetadataIndexService, optional): Index to read image centers
+                and camera parameters from. Images it does not hold are read from disk.
+        """
         self.logger = LoggerService()
+        self.metadata_index = metadata_index
 
     def get_image_coverage_info(self, image, agl_override_m=None):
         """
@@ -222,7 +229,57 @@ class AOINeighborService:
             pass
         return None
 
-    def _estimate_max_coverage_radius(self, images, agl_override_m=None):
+    def _get_indexed_entries(self, images):
+        """
+        Look up the images in the metadata index.
+
+        Args:
+            images (list): List of all images
+
+        Returns:
+            dict: Index entries keyed by image path; empty without an index
+        """
+        if self.metadata_index is None:
+            return {}
+        try:
+            return self.metadata_index.get_many([image['path'] for image in images])
+        except Exception as e:
+            self.logger.warning(f"AOINeighborService: Metadata index unavailable - {e}")
+            return {}
+
+    def _coverage_info_from_entry(self, entry, agl_override_m=None):
+        """
+        Build the camera part of the coverage info from a metadata index entry.
+
+        Args:
+            entry (dict): Entry returned by MetadataIndexService
+            agl_override_m (float, optional): Manual AGL altitude override in meters
+
+        Returns:
+            dict or None: Coverage info without the image service, or None if metadata is missing
+        """
+        altitude = agl_override_m if agl_override_m and agl_override_m > 0 else entry['relative_altitude'] or 0
+        required = (entry['latitude'], entry['focal_length_mm'], entry['sensor_width_mm'],
+                    entry['sensor_height_mm'], entry['image_width'], entry['image_height'])
+        if altitude <= 0 or any(value is None for value in required):
+            return None
+
+        pitch = entry['gimbal_pitch'] if entry['gimbal_pitch'] is not None else -90
+        return {
+            'center_lat': entry['latitude'],
+            'center_lon': entry['longitude'],
+            'yaw': entry['camera_yaw'] or 0.0,
+            'pitch': pitch,
+            'tilt_angle': max(0, min(90, 90 + pitch)),
+            'altitude': altitude,
+            'width': entry['image_width'],
+            'height': entry['image_height'],
+            'focal_mm': entry['focal_length_mm'],
+            'sensor_w_mm': entry['sensor_width_mm'],
+            'sensor_h_mm': entry['sensor_height_mm']
+        }
+
+    def _estimate_max_coverage_radius(self, images, agl_override_m=None, entries=None):
         """
         Estimate the maximum ground coverage radius for images in the dataset.
 
@@ -232,16 +289,22 @@ class AOINeighborService:
         Args:
             images (list): List of all images
             agl_override_m (float, optional): Manual AGL altitude override
+            entries (dict, optional): Metadata index entries keyed by image path
 
         Returns:
             float: Maximum coverage radius in meters (default 500m if estimation fails)
         """
         max_radius = 0
         sample_count = min(10, len(images))  # Sample first few images
+        entries = entries or {}
 
         for i in range(sample_count):
             try:
-                coverage_info = self.get_image_coverage_info(images[i], agl_override_m)
+                entry = entries.get(images[i]['path'])
+                if entry is not None:
+                    coverage_info = self._coverage_info_from_entry(entry, agl_override_m)
+                else:
+                    coverage_info = self.get_image_coverage_info(images[i], agl_override_m)
                 if coverage_info:
                     # Calculate diagonal coverage distance using GSD
                     gsd_service = GSDService(
@@ -332,11 +395,26 @@ class AOINeighborService:
             progress_callback("Calculating search area...")
 
         # Estimate maximum coverage radius for GPS-based pre-filtering
-        max_coverage_radius = self._estimate_max_coverage_radius(images, agl_override_m)
+        entries = self._get_indexed_entries(images)
+        max_coverage_radius = self._estimate_max_coverage_radius(images, agl_override_m, entries)
+
+        # Indexed images are found with one spatial query on their centers
+        indexed_distances = {}
+        if entries:
+            try:
+                indexed_distances = dict(self.metadata_index.images_near(
+                    target_lat, target_lon, max_coverage_radius, paths=list(entries)))
+            except Exception as e:
+                self.logger.warning(f"AOINeighborService: Metadata index query failed - {e}")
+                entries = {}
 
         # Build list of candidate images based on GPS proximity
         candidates = []
         for i, image in enumerate(images):
+            if image['path'] in entries:
+                if image['path'] in indexed_distances:
+                    candidates.append((i, indexed_distances[image['path']]))
+                continue
             center_gps = self._get_image_center_gps(image)
             if center_gps:
                 center_lat, center_lon = center_gps
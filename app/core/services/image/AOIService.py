@@ -4,6 +4,7 @@ import colorsys
 from pathlib import Path
 from helpers.MetaDataHelper import MetaDataHelper
 from helpers.LocationInfo import LocationInfo
+from helpers.AOIPixels import AOIPixels
 from core.services.image.ImageService import ImageService
 from core.services.LoggerService import LoggerService
 from core.services.GSDService import GSDService
@@ -218,11 +219,9 @@ class AOIService:
 
             # If we have detected pixels, use those
             if 'detected_pixels' in aoi and aoi['detected_pixels']:
-                for pixel in aoi['detected_pixels']:
-                    if isinstance(pixel, (list, tuple)) and len(pixel) >= 2:
-                        px, py = int(pixel[0]), int(pixel[1])
-                        if 0 <= py < height and 0 <= px < width:
-                            colors.append(img_array[py, px])
+                coords = AOIPixels.coerce(aoi['detected_pixels']).to_array(img_array.shape)
+                if len(coords) > 0:
+                    colors = img_array[coords[:, 1], coords[:, 0]]
             # Otherwise sample within the circle
             else:
                 for y in range(max(0, cy - radius), min(height, cy + radius + 1)):
@@ -230,7 +229,7 @@ class AOIService:
                         if (x - cx) ** 2 + (y - cy) ** 2 <= radius ** 2:
                             colors.append(img_array[y, x])
 
-            if not colors:
+            if len(colors) == 0:
                 return None
 
             # Calculate average RGB
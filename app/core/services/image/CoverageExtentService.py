@@ -57,6 +57,8 @@ class CoverageExtentService:
         processed_count = 0
         skipped_count = 0
         total_images = len(images)
+        batch_size = MetaDataHelper.METADATA_BATCH_SIZE
+        metadata = {}
 
         for idx, image in enumerate(images):
             # Check for cancellation
@@ -75,9 +77,14 @@ class CoverageExtentService:
                 image_name = image.get('name', f'Image {idx + 1}')
                 progress_callback(idx, total_images, f"Processing {image_name}...")
 
+            # Read the tags of the next images with one ExifTool call
+            if idx % batch_size == 0:
+                metadata = MetaDataHelper.get_metadata_batch(
+                    [img['path'] for img in images[idx:idx + batch_size] if img.get('path')], MetaDataHelper.IMAGE_TAGS)
+
             try:
                 # Calculate FOV polygon for this image
-                polygon_coords = self._calculate_image_fov_polygon(image)
+                polygon_coords = self._calculate_image_fov_polygon(image, metadata.get(image.get('path', '')))
 
                 if polygon_coords:
                     # Create shapely Polygon from coordinates (lat, lon pairs)
@@ -149,12 +156,14 @@ class CoverageExtentService:
             'cancelled': False
         }
 
-    def _calculate_image_fov_polygon(self, image: Dict[str, Any]) -> Optional[List[tuple]]:
+    def _calculate_image_fov_polygon(self, image: Dict[str, Any],
+                                     metadata: Optional[Dict[str, Any]] = None) -> Optional[List[tuple]]:
         """
         Calculate the FOV polygon for a single image.
 
         Args:
             image: Image data dictionary
+            metadata: Tags read by MetaDataHelper.get_metadata_batch, if any
 
         Returns:
             List of (latitude, longitude) tuples for polygon corners, or None if calculation fails
@@ -164,9 +173,12 @@ class CoverageExtentService:
             if not image_path:
                 return None
 
-            # Get EXIF data and GPS coordinates
-            exif_data = MetaDataHelper.get_exif_data_piexif(image_path)
-            gps_coords = LocationInfo.get_gps(exif_data=exif_data)
+            # Get GPS coordinates from the batch, or from the EXIF data
+            if metadata:
+                gps_coords = LocationInfo.get_gps(metadata=metadata)
+            else:
+                exif_data = MetaDataHelper.get_exif_data_piexif(image_path)
+                gps_coords = LocationInfo.get_gps(exif_data=exif_data)
 
             if not gps_coords:
                 return None
@@ -175,7 +187,8 @@ class CoverageExtentService:
             image_lon = gps_coords['longitude']
 
             # Load image service
-            image_service = ImageService(image_path, image.get('mask_path', ''))
+            image_service = ImageService(image_path, image.get('mask_path', ''),
+                                         xmp_data=MetaDataHelper.xmp_data_from_metadata(metadata))
 
             # Check gimbal angle - must be nadir
             gimbal_pitch = image_service.get_camera_pitch()
@@ -193,11 +206,8 @@ class CoverageExtentService:
                 return None
 
             # Get image dimensions
-            img_array = image_service.img_array
-            if img_array is None:
-                return None
-
-            height, width = img_array.shape[:2]
+            # Read from the file header; the pixels are not needed
+            width, height = image_service.get_image_size()
 
             # Calculate image dimensions in meters
             gsd_m = gsd_cm / 100.0
@@ -8,7 +8,8 @@ detection results, including mask-based highlighting and pixel-based highlightin
 import os
 import cv2
 import numpy as np
-import tifffile
+from helpers.AOIPixels import AOIPixels
+from helpers.SparseMask import SparseMask
 
 
 class ImageHighlightService:
@@ -26,7 +27,7 @@ class ImageHighlightService:
 
         Args:
             image_array (np.ndarray): The input image array in BGR format.
-            mask_path (str): Path to the mask file (.tif or .png).
+            mask_path (str): Path to the mask file (sparse mask, .tif or .png).
             identifier_color (tuple): RGB color tuple for highlighting (uses Object Identifier color).
             areas_of_interest (list, optional): Not used currently, but kept for future filtering.
 
@@ -36,17 +37,21 @@ class ImageHighlightService:
         if not mask_path or not os.path.exists(mask_path):
             return image_array
 
-        # Load the mask depending on format
-        if mask_path.lower().endswith((".tif", ".tiff")):
-            # Read multi-band GeoTIFF and pull first band as mask
-            data = tifffile.imread(mask_path)
-            if data.ndim == 3:  # (bands, height, width)
-                mask = data[0].astype(np.uint8)
-            else:
-                mask = data.astype(np.uint8)
-        else:
-            # Fallback: load grayscale PNG
-            mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+        # Image is in BGR format, identifier_color is RGB, so convert
+        bgr_color = np.array([int(identifier_color[2]), int(identifier_color[1]), int(identifier_color[0])], dtype=np.uint8)
+
+        if mask_path.lower().endswith(SparseMask.EXTENSION):
+            sparse_mask = SparseMask(mask_path)
+            if sparse_mask.shape == image_array.shape[:2]:
+                # Blend only the stored crops; they never share a pixel
+                highlighted_image = image_array.copy()
+                for x, y, bits in sparse_mask.iter_crops():
+                    region = highlighted_image[y:y + bits.shape[0], x:x + bits.shape[1]]
+                    region[bits] = ImageHighlightService._blend(region[bits], bgr_color)
+                return highlighted_image
+
+        # Load the whole mask (sparse at another resolution, legacy multi-band TIFF or PNG)
+        mask = SparseMask.load_mask(mask_path)
 
         if mask is None:
             return image_array
@@ -57,21 +62,20 @@ class ImageHighlightService:
 
         highlighted_image = image_array.copy()
 
-        # Apply the mask - blend highlight color with original image
-        # Image is in BGR format, identifier_color is RGB, so convert
-        bgr_color = np.array([int(identifier_color[2]), int(identifier_color[1]), int(identifier_color[0])], dtype=np.uint8)
-
         # Create a blended overlay where mask pixels are highlighted
         mask_indices = mask > 0
         if np.any(mask_indices):
-            # Blend with 70% original image and 30% highlight color for visibility
-            alpha = 0.7  # Highlight strength
-            highlighted_image[mask_indices] = (
-                highlighted_image[mask_indices] * (1 - alpha) + bgr_color * alpha
-            ).astype(np.uint8)
+            highlighted_image[mask_indices] = ImageHighlightService._blend(highlighted_image[mask_indices], bgr_color)
 
         return highlighted_image
 
+    @staticmethod
+    def _blend(pixels, bgr_color):
+        """Blend highlighted pixels with the highlight color."""
+        # Blend with 70% original image and 30% highlight color for visibility
+        alpha = 0.7  # Highlight strength
+        return (pixels * (1 - alpha) + bgr_color * alpha).astype(np.uint8)
+
     @staticmethod
     def highlight_aoi_pixels(image_array, areas_of_interest, highlight_color=(255, 0, 255)):
         """
@@ -90,15 +94,13 @@ class ImageHighlightService:
         # Convert highlight color to numpy array
         highlight_color_array = np.array(highlight_color, dtype=np.uint8)
 
+        # Only 3-channel images are highlighted
+        if len(highlighted_image.shape) != 3 or highlighted_image.shape[2] != 3:
+            return highlighted_image
+
         for aoi in areas_of_interest or []:
             if "detected_pixels" in aoi and aoi["detected_pixels"]:
-                for pixel in aoi["detected_pixels"]:
-                    if isinstance(pixel, (list, tuple)) and len(pixel) >= 2:
-                        x, y = int(pixel[0]), int(pixel[1])
-                        # Check bounds
-                        if 0 <= y < highlighted_image.shape[0] and 0 <= x < highlighted_image.shape[1]:
-                            # Convert from BGR to RGB for display if needed
-                            if len(highlighted_image.shape) == 3 and highlighted_image.shape[2] == 3:
-                                highlighted_image[y, x] = highlight_color_array
+                coords = AOIPixels.coerce(aoi["detected_pixels"]).to_array(highlighted_image.shape)
+                highlighted_image[coords[:, 1], coords[:, 0]] = highlight_color_array
 
         return highlighted_image
@@ -16,12 +16,14 @@ from core.services.GSDService import GSDService
 from helpers.MetaDataHelper import MetaDataHelper
 from helpers.PickleHelper import PickleHelper
 from helpers.LocationInfo import LocationInfo
+from helpers.SparseMask import SparseMask
+from helpers.TemperatureGrid import TemperatureGrid
 
 
 class ImageService:
     """Service to calculate various drone and image attributes based on metadata."""
 
-    def __init__(self, path, mask_path=None, img_array=None, calculated_bearing=None):
+    def __init__(self, path, mask_path=None, img_array=None, calculated_bearing=None, xmp_data=None):
         """
         Initializes the ImageService by extracting Exif and XMP metadata.
 
@@ -32,22 +34,56 @@ class ImageService:
                                               If provided, skips loading from disk.
             calculated_bearing (float, optional): Calculated bearing in degrees [0, 360).
                                                  Used as fallback if EXIF bearing is missing.
+            xmp_data (dict, optional): XMP data already read for a batch of images.
+                                       If provided, skips reading it from the file.
         """
         self.exif_data = MetaDataHelper.get_exif_data_piexif(path)
-        self.xmp_data = MetaDataHelper.get_xmp_data_merged(path)
+        self.xmp_data = xmp_data if xmp_data else MetaDataHelper.get_xmp_data_merged(path)
         self.drone_make = MetaDataHelper.get_drone_make(self.exif_data)
         self.path = path
         self.mask_path = mask_path
         self.calculated_bearing = calculated_bearing
 
-        # Use pre-loaded array if provided, otherwise load from disk
-        if img_array is not None:
-            self.img_array = img_array
-        else:
+        # Use pre-loaded array if provided, otherwise load from disk on first access
+        self._img_array = img_array
+
+    @property
+    def img_array(self):
+        """
+        The image pixels in RGB order, decoded from the file on first access.
+
+        Metadata lookups never touch the pixels, so an ImageService used only for
+        them does not decode the image.
+
+        Returns:
+            np.ndarray: The image array.
+
+        Raises:
+            ValueError: If the image cannot be decoded.
+        """
+        if self._img_array is None:
             img = cv2.imdecode(np.fromfile(self.path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
             if img is None:
                 raise ValueError(f"Could not load image: {self.path}")
-            self.img_array = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            self._img_array = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        return self._img_array
+
+    @img_array.setter
+    def img_array(self, value):
+        self._img_array = value
+
+    def get_image_size(self):
+        """
+        Retrieves the image dimensions, read from the file header if the image is not decoded.
+
+        Returns:
+            tuple: (width, height) in pixels.
+        """
+        if self._img_array is not None:
+            height, width = self._img_array.shape[:2]
+            return width, height
+        with Image.open(self.path) as img:
+            return img.size
 
     def get_relative_altitude(self, distance_unit='m'):
         """
@@ -354,17 +390,29 @@ class ImageService:
 
     def get_thermal_data(self, unit):
         """
-        Loads thermal data from a multi-band mask GeoTIFF.
-        Band 0 = mask, Bands 1..N = temperature data.
+        Loads thermal data stored with the mask.
+
+        A sparse mask's temperatures are in a TemperatureGrid file beside it, which is
+        opened as a memmap and indexed like an array without decoding the whole frame.
+        A legacy multi-band mask GeoTIFF holds them in band 1 (band 0 = mask).
 
         Args:
             unit (str): Temperature unit ('C' or 'F').
 
         Returns:
-            np.ndarray or None: Temperature data array in the specified unit.
+            TemperatureGrid, np.ndarray or None: Temperature data in the specified unit.
         """
         if not self.mask_path or not os.path.exists(self.mask_path):
             return None
+        if self.mask_path.lower().endswith(SparseMask.EXTENSION):
+            grid_path = os.path.splitext(self.mask_path)[0] + TemperatureGrid.EXTENSION
+            if not os.path.exists(grid_path):
+                return None  # Mask of an RGB image
+            try:
+                return TemperatureGrid(grid_path, unit)
+            except Exception as e:
+                print(f"Warning: Failed to read thermal data from {grid_path}: {e}")
+                return None
 
         try:
             # Read all bands from the TIFF
@@ -0,0 +1,436 @@
+"""
+MetadataIndexService - Persistent index of per-image metadata.
+
+Keeps the metadata the viewer and exports read over and over (GPS, altitude,
+gimbal angles, camera intrinsics, image size and the matched drone sensor row)
+in an SQLite database, so it is extracted once per image instead of once per
+session. Entries are invalidated when an image's size or modification time changes.
+"""
+
+import atexit
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+
+import piexif
+from shapely.geometry import Point, Polygon
+
+from core.services.LoggerService import LoggerService
+from core.services.image.ImageService import ImageService
+from helpers.GeodesicHelper import GeodesicHelper
+from helpers.LocationInfo import LocationInfo
+from helpers.MetaDataHelper import MetaDataHelper
+
+
+class MetadataIndexService:
+    """
+    SQLite index of image metadata, keyed by absolute image path.
+
+    Every entry records the size and modification time of the file it was read
+    from and is only returned while both still match. Image centers and ground
+    footprints are kept in R*Tree tables for spatial queries. The database runs in
+    WAL mode with one connection per thread, so an analysis can write entries while
+    viewers read them, from any number of threads or processes.
+    """
+
+    FILE_NAME = "metadata_index.sqlite"
+    SCHEMA_VERSION = 1
+    BUSY_TIMEOUT = 30.0  # Seconds a connection waits for another writer
+    QUERY_CHUNK = 500  # Paths per IN (...) query, below SQLite's variable limit
+    EARTH_RADIUS = 6371000  # meters, as CoverageExtentService
+    INDEX_TAGS = MetaDataHelper.IMAGE_TAGS + ('EXIF:DateTimeOriginal',)
+    COLUMNS = (
+        'latitude', 'longitude', 'altitude', 'relative_altitude', 'gimbal_pitch', 'gimbal_roll', 'camera_yaw',
+        'flight_yaw', 'focal_length_mm', 'sensor_width_mm', 'sensor_height_mm', 'image_width', 'image_height',
+        'make', 'model', 'capture_time', 'drone', 'footprint'
+    )
+    JSON_COLUMNS = ('drone', 'footprint')
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db_path):
+        """
+        Open the index, creating the database if needed.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.logger = LoggerService()
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._create_schema()
+
+    @classmethod
+    def instance(cls):
+        """
+        Return the index shared by the whole application, in the application data folder.
+
+        Returns:
+            MetadataIndexService: The shared index.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(os.path.join(cls._get_destination_path(), cls.FILE_NAME))
+            return cls._instance
+
+    @classmethod
+    def shutdown_instance(cls):
+        """Close the shared index, if it was opened."""
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.close()
+                cls._instance = None
+
+    @staticmethod
+    def key(path):
+        """
+        Normalize an image path to the form it is stored under.
+
+        Args:
+            path (str): Image path.
+
+        Returns:
+            str: Absolute, case-normalized path.
+        """
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def signature(path):
+        """
+        Identify the current version of a file.
+
+        Args:
+            path (str): Image path.
+
+        Returns:
+            tuple or None: (size, mtime_ns), or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, path):
+        """
+        Look up the entry of an image.
+
+        Args:
+            path (str): Image path.
+
+        Returns:
+            dict or None: The entry, or None if the image is not indexed or has changed since.
+        """
+        return self.get_many([path]).get(path)
+
+    def get_many(self, paths):
+        """
+        Look up the entries of many images.
+
+        Args:
+            paths (list): Image paths.
+
+        Returns:
+            dict: Entries keyed by the given paths, for images indexed in their current version.
+        """
+        keys = {}
+        for path in paths:
+            keys.setdefault(self.key(path), path)
+        entries = {}
+        for row in self._select_rows(list(keys)):
+            path = keys[row['path']]
+            if (row['size'], row['mtime_ns']) != self.signature(path):
+                continue
+            entry = dict(row)
+            del entry['id']
+            entry['path'] = path
+            for column in self.JSON_COLUMNS:
+                entry[column] = json.loads(entry[column]) if entry[column] else None
+            entries[path] = entry
+        return entries
+
+    def update(self, paths, cancel_check=None):
+        """
+        Index the images that are new or changed since they were last indexed.
+
+        Metadata is read in batches with MetaDataHelper.get_metadata_batch and each
+        batch is written in one transaction. Images that cannot be read are stored
+        without metadata, so they are not read again until they change.
+
+        Args:
+            paths (list): Image paths.
+            cancel_check (callable, optional): Returns True to stop after the current batch.
+
+        Returns:
+            int: Number of images (re)indexed.
+        """
+        signatures = {}
+        for path in paths:
+            signature = self.signature(path)
+            if signature is not None:
+                signatures.setdefault(self.key(path), (path, signature))
+        stored = {row['path']: (row['size'], row['mtime_ns']) for row in self._select_rows(list(signatures))}
+        stale = [(path, signature) for key, (path, signature) in signatures.items() if stored.get(key) != signature]
+
+        indexed = 0
+        batch_size = MetaDataHelper.METADATA_BATCH_SIZE
+        for start in range(0, len(stale), batch_size):
+            if cancel_check and cancel_check():
+                break
+            batch = stale[start:start + batch_size]
+            metadata = MetaDataHelper.get_metadata_batch([path for path, _ in batch], self.INDEX_TAGS)
+            self._write_entries([self._read_entry(path, signature, metadata.get(path))
+                                 for path, signature in batch])
+            indexed += len(batch)
+        return indexed
+
+    def images_near(self, latitude, longitude, radius_m, paths=None):
+        """
+        Find the indexed images whose center lies within a distance of a point.
+
+        Args:
+            latitude (float): Latitude of the point.
+            longitude (float): Longitude of the point.
+            radius_m (float): Search radius in meters.
+            paths (list, optional): Only consider these images.
+
+        Returns:
+            list: (path, distance_m) tuples, closest first.
+        """
+        delta_lat = math.degrees(radius_m / self.EARTH_RADIUS)
+        delta_lon = delta_lat / max(math.cos(math.radians(latitude)), 1e-6)
+        rows = self._connection().execute(
+            "SELECT images.path, images.latitude, images.longitude FROM image_centers "
+            "JOIN images ON images.id = image_centers.id "
+            "WHERE min_lat <= ? AND max_lat >= ? AND min_lon <= ? AND max_lon >= ?",
+            (latitude + delta_lat, latitude - delta_lat, longitude + delta_lon, longitude - delta_lon))
+        keys = None if paths is None else {self.key(path): path for path in paths}
+        results = []
+        for row in rows:
+            if keys is not None and row['path'] not in keys:
+                continue
+            distance = GeodesicHelper.haversine_distance(latitude, longitude, row['latitude'], row['longitude'])
+            if distance <= radius_m:
+                results.append((row['path'] if keys is None else keys[row['path']], distance))
+        results.sort(key=lambda result: result[1])
+        return results
+
+    def images_covering(self, latitude, longitude, paths=None):
+        """
+        Find the indexed images whose ground footprint contains a point.
+
+        Footprints are computed from the altitude in each image's metadata, for
+        images taken at most 60 degrees from nadir.
+
+        Args:
+            latitude (float): Latitude of the point.
+            longitude (float): Longitude of the point.
+            paths (list, optional): Only consider these images.
+
+        Returns:
+            list: Paths of the images covering the point.
+        """
+        rows = self._connection().execute(
+            "SELECT images.path, images.footprint FROM image_footprints "
+            "JOIN images ON images.id = image_footprints.id "
+            "WHERE min_lat <= ? AND max_lat >= ? AND min_lon <= ? AND max_lon >= ?",
+            (latitude, latitude, longitude, longitude))
+        keys = None if paths is None else {self.key(path): path for path in paths}
+        point = Point(latitude, longitude)
+        results = []
+        for row in rows:
+            if keys is not None and row['path'] not in keys:
+                continue
+            if Polygon(json.loads(row['footprint'])).covers(point):
+                results.append(row['path'] if keys is None else keys[row['path']])
+        return results
+
+    def close(self):
+        """Close every connection opened by this index."""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _connection(self):
+        """Return this thread's connection, opening it on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _create_schema(self):
+        """Create the tables, rebuilding them if they were made by another schema version."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        connection = self._connection()
+        # WAL lets readers continue while an analysis writes; the mode is stored in the file
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                for table in ('images', 'image_centers', 'image_footprints'):
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+            columns = ", ".join(f"{column} {self._column_type(column)}" for column in self.COLUMNS)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS images (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, "
+                f"size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, {columns})")
+            for table in ('image_centers', 'image_footprints'):
+                connection.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+            connection.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    @staticmethod
+    def _column_type(column):
+        """Return the SQLite type of a metadata column."""
+        if column in ('image_width', 'image_height'):
+            return 'INTEGER'
+        if column in ('make', 'model', 'capture_time') + MetadataIndexService.JSON_COLUMNS:
+            return 'TEXT'
+        return 'REAL'
+
+    def _select_rows(self, keys):
+        """Fetch the stored rows of normalized paths, in chunks."""
+        connection = self._connection()
+        rows = []
+        for start in range(0, len(keys), self.QUERY_CHUNK):
+            chunk = keys[start:start + self.QUERY_CHUNK]
+            rows.extend(connection.execute(
+                f"SELECT * FROM images WHERE path IN ({','.join('?' * len(chunk))})", chunk))
+        return rows
+
+    def _write_entries(self, entries):
+        """Insert or replace entries and their spatial rows in one transaction."""
+        columns = ('path', 'size', 'mtime_ns') + self.COLUMNS
+        insert = (f"INSERT INTO images ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                  f"ON CONFLICT(path) DO UPDATE SET "
+                  f"{', '.join(f'{column} = excluded.{column}' for column in columns[1:])}")
+        connection = self._connection()
+        with connection:
+            for entry in entries:
+                values = [json.dumps(entry[column]) if column in self.JSON_COLUMNS and entry[column] is not None
+                          else entry[column] for column in columns]
+                connection.execute(insert, values)
+                image_id = connection.execute("SELECT id FROM images WHERE path = ?", (entry['path'],)).fetchone()[0]
+                connection.execute("DELETE FROM image_centers WHERE id = ?", (image_id,))
+                connection.execute("DELETE FROM image_footprints WHERE id = ?", (image_id,))
+                if entry['latitude'] is not None and entry['longitude'] is not None:
+                    connection.execute("INSERT INTO image_centers VALUES (?, ?, ?, ?, ?)",
+                                       (image_id, entry['latitude'], entry['latitude'],
+                                        entry['longitude'], entry['longitude']))
+                if entry['footprint']:
+                    latitudes = [corner[0] for corner in entry['footprint']]
+                    longitudes = [corner[1] for corner in entry['footprint']]
+                    connection.execute("INSERT INTO image_footprints VALUES (?, ?, ?, ?, ?)",
+                                       (image_id, min(latitudes), max(latitudes), min(longitudes), max(longitudes)))
+
+    def _read_entry(self, path, signature, metadata):
+        """
+        Extract the indexed metadata of one image.
+
+        Args:
+            path (str): Image path.
+            signature (tuple): (size, mtime_ns) of the file.
+            metadata (dict): Tags read by MetaDataHelper.get_metadata_batch, if any.
+
+        Returns:
+            dict: The entry, with None for every value that could not be read.
+        """
+        entry = dict.fromkeys(self.COLUMNS)
+        entry.update(path=self.key(path), size=signature[0], mtime_ns=signature[1])
+        try:
+            image_service = ImageService(path, xmp_data=MetaDataHelper.xmp_data_from_metadata(metadata or {}))
+        except Exception as e:
+            self.logger.warning(f"Indexing {path} without metadata: {e}")
+            return entry
+
+        gps = LocationInfo.get_gps(metadata=metadata) or self._safe(LocationInfo.get_gps, exif_data=image_service.exif_data)
+        if gps:
+            entry['latitude'], entry['longitude'] = gps['latitude'], gps['longitude']
+        entry['altitude'] = self._safe(image_service.get_asl_altitude, 'm')
+        entry['relative_altitude'] = self._safe(image_service.get_relative_altitude, 'm')
+        entry['gimbal_pitch'] = self._safe(image_service.get_camera_pitch)
+        entry['gimbal_roll'] = self._safe(image_service.get_gimbal_roll)
+        entry['camera_yaw'] = self._safe(image_service.get_camera_yaw)
+        entry['flight_yaw'] = self._safe(image_service._get_drone_orientation)
+        entry['make'] = image_service.drone_make
+
+        exif_data = image_service.exif_data or {}
+        model = exif_data.get('0th', {}).get(piexif.ImageIFD.Model)
+        if model:
+            entry['model'] = model.decode('utf-8', 'ignore').strip().rstrip('\x00')
+        focal_length = exif_data.get('Exif', {}).get(piexif.ExifIFD.FocalLength)
+        if focal_length and focal_length[1]:
+            entry['focal_length_mm'] = focal_length[0] / focal_length[1]
+        capture_time = exif_data.get('Exif', {}).get(piexif.ExifIFD.DateTimeOriginal)
+        if isinstance(capture_time, bytes):
+            capture_time = capture_time.decode('utf-8', 'ignore')
+        entry['capture_time'] = capture_time or (metadata or {}).get('EXIF:DateTimeOriginal')
+
+        size = self._safe(image_service.get_image_size)
+        if size:
+            entry['image_width'], entry['image_height'] = size
+        camera_info = self._safe(image_service._get_camera_info)
+        if camera_info is not None and not camera_info.empty:
+            drone = json.loads(camera_info.iloc[0].to_json())
+            entry['drone'] = drone
+            entry['sensor_width_mm'] = self._safe(float, drone.get('sensor_w'))
+            entry['sensor_height_mm'] = self._safe(float, drone.get('sensor_h'))
+
+        gsd_cm = self._safe(image_service.get_average_gsd)
+        if gps and size and gsd_cm:
+            entry['footprint'] = self._footprint(entry['latitude'], entry['longitude'], size[0], size[1], gsd_cm,
+                                                 entry['camera_yaw'] or 0)
+        return entry
+
+    @classmethod
+    def _footprint(cls, latitude, longitude, width, height, gsd_cm, bearing):
+        """
+        Compute the ground corners of an image, as CoverageExtentService does.
+
+        Returns:
+            list: [latitude, longitude] of the four corners.
+        """
+        gsd_m = gsd_cm / 100.0
+        half_width, half_height = width * gsd_m / 2, height * gsd_m / 2
+        bearing_rad = math.radians(-bearing)
+        cos_b, sin_b = math.cos(bearing_rad), math.sin(bearing_rad)
+        corners = []
+        for x, y in ((-half_width, -half_height), (half_width, -half_height),
+                     (half_width, half_height), (-half_width, half_height)):
+            x_rot = x * cos_b - y * sin_b
+            y_rot = x * sin_b + y * cos_b
+            corners.append([latitude + math.degrees(y_rot / cls.EARTH_RADIUS),
+                            longitude + math.degrees(x_rot / (cls.EARTH_RADIUS * math.cos(math.radians(latitude))))])
+        return corners
+
+    @staticmethod
+    def _safe(function, *args, **kwargs):
+        """Call a metadata getter, returning None if the metadata it needs is malformed."""
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _get_destination_path():
+        """Return the application data folder, as PickleHelper stores the drone sensor table."""
+        home_path = os.path.expanduser("~")
+        if sys.platform.startswith('win'):
+            return os.path.join(home_path, 'AppData', 'Roaming', 'ADIAT')
+        elif sys.platform == 'darwin':
+            return os.path.join(home_path, 'Library', 'Application Support', 'ADIAT')
+        return os.path.join(home_path, '.config', 'ADIAT')
+
+
+atexit.register(MetadataIndexService.shutdown_instance)
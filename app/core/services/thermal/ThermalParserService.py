@@ -50,8 +50,30 @@ class ThermalParserService:
             dtype (type, optional): Data type for temperature arrays. Defaults to np.float32.
         """
         self.logger = LoggerService()
-        self.logger = LoggerService()
         self.dtype = dtype
+        # Platform parsers keep their SDK library handles loaded, so build each once and reuse it
+        self._parsers = {}
+
+    def _get_parser(self, platform):
+        """
+        Return the cached parser for a platform, creating it on first use.
+
+        Args:
+            platform (str): Thermal platform ('FLIR', 'DJI' or 'AUTEL').
+
+        Returns:
+            object: The platform-specific thermal parser instance.
+        """
+        parser = self._parsers.get(platform)
+        if parser is None:
+            if platform == 'FLIR':
+                parser = FlirThermalParserService(self.dtype)
+            elif platform == 'DJI':
+                parser = DjiThermalParserService(self.dtype)
+            else:
+                parser = AutelThermalImageParser(self.dtype)
+            self._parsers[platform] = parser
+        return parser
 
     def _get_model_and_platform(self, meta_fields):
         """
@@ -129,7 +151,7 @@ class ThermalParserService:
                     kwargs[name] = float(meta_fields[key])
 
             try:
-                parser = FlirThermalParserService(self.dtype)
+                parser = self._get_parser('FLIR')
                 temps = parser.temperatures(filepath_image=full_path, **kwargs)
                 img = parser.image(temps, palette)
                 return temps, img
@@ -154,7 +176,7 @@ class ThermalParserService:
                 kwargs['m2ea_mode'] = True
 
             try:
-                parser = DjiThermalParserService(self.dtype)
+                parser = self._get_parser('DJI')
                 temps = parser.temperatures(filepath_image=full_path, **kwargs)
                 img = parser.image(full_path, palette)
                 return temps, img
@@ -168,7 +190,7 @@ class ThermalParserService:
             }
 
             try:
-                parser = AutelThermalImageParser(self.dtype)
+                parser = self._get_parser('AUTEL')
                 temps = parser.temperatures(filepath_image=full_path, **kwargs)
                 img = parser.image(temps, palette)
                 return temps, img
@@ -4,7 +4,6 @@ import cv2
 from io import BufferedIOBase, BytesIO
 from PIL import Image
 from typing import BinaryIO, Dict, Optional, Tuple, Union
-import exiftool
 from helpers.MetaDataHelper import MetaDataHelper
 
 ABSOLUTE_ZERO = 273.15
@@ -1277,11 +1277,8 @@ class GPSMapView(QGraphicsView):
             if gsd_cm is None or gsd_cm <= 0:
                 return
 
-            img_array = image_service.img_array
-            if img_array is None:
-                return
-
-            height, width = img_array.shape[:2]
+            # Read from the file header; the pixels are not needed
+            width, height = image_service.get_image_size()
 
             # Calculate dimensions in meters
             gsd_m = gsd_cm / 100.0
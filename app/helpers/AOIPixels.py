@@ -0,0 +1,282 @@
+import base64
+import zlib
+
+import numpy as np
+
+
+class AOIPixels:
+    """
+    Compact, exact set of AOI pixels stored as row run-lengths.
+
+    Each run is a row of ``(y, x_start, x_end)`` with ``x_end`` exclusive, sorted in
+    row-major order. Iterating yields ``(x, y)`` tuples in the same order as
+    ``np.argwhere`` so code written for the old ``[[x, y], ...]`` lists keeps working,
+    while storage, pickling and scaling stay proportional to the number of runs.
+    """
+
+    SERIAL_PREFIX = 'rle1:'
+
+    __slots__ = ('runs', '_count')
+
+    def __init__(self, runs=None):
+        """
+        Initialize from an (N, 3) array of ``(y, x_start, x_end)`` runs.
+
+        Args:
+            runs (numpy.ndarray, optional): Runs sorted by row then column. Defaults to empty.
+        """
+        if runs is None:
+            runs = np.empty((0, 3), dtype=np.int32)
+        self.runs = np.ascontiguousarray(runs, dtype=np.int32).reshape(-1, 3)
+        self._count = int((self.runs[:, 2] - self.runs[:, 1]).sum())
+
+    @classmethod
+    def from_mask(cls, mask, x_offset=0, y_offset=0):
+        """
+        Build from a 2D mask, typically a bounding-box crop.
+
+        Args:
+            mask (numpy.ndarray): 2D array where non-zero values are AOI pixels.
+            x_offset (int): Column of the mask's left edge in the full image.
+            y_offset (int): Row of the mask's top edge in the full image.
+
+        Returns:
+            AOIPixels: The encoded pixel set.
+        """
+        member = np.asarray(mask) > 0
+        if member.size == 0:
+            return cls()
+        padded = np.zeros((member.shape[0], member.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = member
+        edges = np.diff(padded, axis=1)
+        # nonzero walks row-major, so the n-th start and n-th end belong to the same run
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+        runs = np.stack([start_rows + y_offset, start_cols + x_offset, end_cols + x_offset], axis=1)
+        return cls(runs)
+
+    @classmethod
+    def from_coords(cls, xs, ys):
+        """
+        Build from parallel x and y coordinate arrays. Duplicates are removed.
+
+        Args:
+            xs (array-like): X coordinates.
+            ys (array-like): Y coordinates.
+
+        Returns:
+            AOIPixels: The encoded pixel set.
+        """
+        xs = np.asarray(xs, dtype=np.int64).ravel()
+        ys = np.asarray(ys, dtype=np.int64).ravel()
+        if xs.size == 0:
+            return cls()
+        order = np.lexsort((xs, ys))
+        xs = xs[order]
+        ys = ys[order]
+        keep = np.ones(xs.size, dtype=bool)
+        keep[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])
+        xs = xs[keep]
+        ys = ys[keep]
+
+        new_run = np.ones(xs.size, dtype=bool)
+        new_run[1:] = (ys[1:] != ys[:-1]) | (xs[1:] != xs[:-1] + 1)
+        starts = np.flatnonzero(new_run)
+        ends = np.append(starts[1:], xs.size) - 1
+        return cls(np.stack([ys[starts], xs[starts], xs[ends] + 1], axis=1))
+
+    @classmethod
+    def from_list(cls, pixels):
+        """
+        Build from a sequence of ``[x, y]`` pairs.
+
+        Args:
+            pixels (list): Pixel coordinates as ``[x, y]`` pairs.
+
+        Returns:
+            AOIPixels: The encoded pixel set.
+        """
+        coords = np.asarray(pixels, dtype=np.int64).reshape(-1, 2)
+        return cls.from_coords(coords[:, 0], coords[:, 1])
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        Return value as AOIPixels, converting legacy lists and None.
+
+        Args:
+            value (AOIPixels | list | None): Detected pixels in any supported form.
+
+        Returns:
+            AOIPixels: The encoded pixel set.
+        """
+        if isinstance(value, cls):
+            return value
+        if value is None or len(value) == 0:
+            return cls()
+        return cls.from_list(value)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        for y, x_start, x_end in self.runs.tolist():
+            for x in range(x_start, x_end):
+                yield (x, y)
+
+    def __contains__(self, point):
+        x, y = int(point[0]), int(point[1])
+        rows = self.runs[:, 0]
+        lo = np.searchsorted(rows, y, side='left')
+        hi = np.searchsorted(rows, y, side='right')
+        if lo == hi:
+            return False
+        idx = lo + np.searchsorted(self.runs[lo:hi, 1], x, side='right') - 1
+        return bool(idx >= lo and x < self.runs[idx, 2])
+
+    def __eq__(self, other):
+        if isinstance(other, AOIPixels):
+            return np.array_equal(self.runs, other.runs)
+        if isinstance(other, (list, tuple)):
+            return self == AOIPixels.from_list(other) and len(other) == self._count
+        return NotImplemented
+
+    def __repr__(self):
+        return f"AOIPixels(pixels={self._count}, runs={len(self.runs)})"
+
+    def __getstate__(self):
+        return self.runs
+
+    def __setstate__(self, state):
+        self.runs = state
+        self._count = int((state[:, 2] - state[:, 1]).sum())
+
+    @property
+    def nbytes(self):
+        """int: Bytes used by the run array."""
+        return self.runs.nbytes
+
+    def to_array(self, shape=None):
+        """
+        Expand to an (N, 2) array of ``(x, y)`` coordinates in row-major order.
+
+        Args:
+            shape (tuple, optional): Image shape (H, W, ...). When given, pixels outside it are dropped.
+
+        Returns:
+            numpy.ndarray: int32 coordinate array.
+        """
+        if self._count == 0:
+            return np.empty((0, 2), dtype=np.int32)
+        lengths = self.runs[:, 2] - self.runs[:, 1]
+        run_offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        xs = np.repeat(self.runs[:, 1], lengths) + (np.arange(self._count) - run_offsets)
+        ys = np.repeat(self.runs[:, 0], lengths)
+        coords = np.stack([xs, ys], axis=1).astype(np.int32)
+        if shape is not None:
+            height, width = shape[:2]
+            in_bounds = (coords[:, 0] >= 0) & (coords[:, 0] < width) & (coords[:, 1] >= 0) & (coords[:, 1] < height)
+            coords = coords[in_bounds]
+        return coords
+
+    def tolist(self):
+        """
+        Expand to a list of ``[x, y]`` pairs.
+
+        Returns:
+            list: Pixel coordinates.
+        """
+        return self.to_array().tolist()
+
+    def bbox(self):
+        """
+        Bounding box of the pixel set.
+
+        Returns:
+            tuple | None: ``(x_min, y_min, x_max, y_max)`` inclusive, or None when empty.
+        """
+        if self._count == 0:
+            return None
+        return (int(self.runs[:, 1].min()), int(self.runs[0, 0]),
+                int(self.runs[:, 2].max()) - 1, int(self.runs[-1, 0]))
+
+    def to_mask(self):
+        """
+        Rasterize into a bounding-box mask.
+
+        Returns:
+            tuple: (mask, x_min, y_min) where mask is uint8 (0 or 255), or (None, 0, 0) when empty.
+        """
+        box = self.bbox()
+        if box is None:
+            return None, 0, 0
+        x_min, y_min, x_max, y_max = box
+        mask = np.zeros((y_max - y_min + 1, x_max - x_min + 1), dtype=np.uint8)
+        for y, x_start, x_end in self.runs.tolist():
+            mask[y - y_min, x_start - x_min:x_end - x_min] = 255
+        return mask, x_min, y_min
+
+    def scaled(self, scale_x, scale_y=None):
+        """
+        Map every pixel to ``(int(x * scale_x), int(y * scale_y))``.
+
+        Args:
+            scale_x (float): Horizontal scale factor.
+            scale_y (float, optional): Vertical scale factor. Defaults to scale_x.
+
+        Returns:
+            AOIPixels: The scaled pixel set (pixels that collapse together are merged).
+        """
+        if scale_y is None:
+            scale_y = scale_x
+        if self._count == 0 or (scale_x == 1.0 and scale_y == 1.0):
+            return AOIPixels(self.runs.copy())
+        coords = self.to_array()
+        xs = (coords[:, 0] * scale_x).astype(np.int64)
+        ys = (coords[:, 1] * scale_y).astype(np.int64)
+        return AOIPixels.from_coords(xs, ys)
+
+    def translated(self, dx, dy):
+        """
+        Shift every pixel by ``(dx, dy)``.
+
+        Args:
+            dx (int): Column offset.
+            dy (int): Row offset.
+
+        Returns:
+            AOIPixels: The shifted pixel set.
+        """
+        return AOIPixels(self.runs + np.array([dy, dx, dx], dtype=np.int32))
+
+    def serialize(self):
+        """
+        Encode as a compact string for XML attributes.
+
+        Returns:
+            str: ``'rle1:'`` followed by base64 of the deflated little-endian int32 runs.
+        """
+        payload = zlib.compress(self.runs.astype('<i4').tobytes())
+        return self.SERIAL_PREFIX + base64.b64encode(payload).decode('ascii')
+
+    @classmethod
+    def deserialize(cls, text):
+        """
+        Decode a string produced by serialize().
+
+        Args:
+            text (str): Serialized pixel set.
+
+        Returns:
+            AOIPixels: The decoded pixel set.
+
+        Raises:
+            ValueError: If the string is not in the expected format.
+        """
+        if not text.startswith(cls.SERIAL_PREFIX):
+            raise ValueError("Unsupported AOI pixel encoding")
+        payload = zlib.decompress(base64.b64decode(text[len(cls.SERIAL_PREFIX):]))
+        return cls(np.frombuffer(payload, dtype='<i4').reshape(-1, 3).astype(np.int32))
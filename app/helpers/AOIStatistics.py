@@ -0,0 +1,233 @@
+import numpy as np
+
+from helpers.AOIPixels import AOIPixels
+
+
+class AOIStatistics:
+    """
+    Per-label statistics over an image, computed for every label in one vectorized pass.
+
+    The engine holds a flat list of sampled pixel positions and the label each sample
+    belongs to. It can be built from a label image (e.g. from connectedComponentsWithStats)
+    or from AOI dictionaries, and then reduces any score, color or temperature array of
+    the same height and width with np.bincount instead of per-pixel Python loops.
+
+    Statistics are returned as arrays indexed by label; labels without samples get NaN.
+    """
+
+    def __init__(self, shape, flat_indices, labels, count):
+        """
+        Initialize the engine from precomputed sample positions.
+
+        Args:
+            shape (tuple): Image shape (H, W, ...) the samples refer to.
+            flat_indices (numpy.ndarray): Row-major pixel index (y * W + x) of every sample.
+            labels (numpy.ndarray): Label in [0, count) of every sample.
+            count (int): Number of labels.
+        """
+        self.shape = tuple(shape[:2])
+        self.flat_indices = np.asarray(flat_indices, dtype=np.int64)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.count = int(count)
+        self.counts = np.bincount(self.labels, minlength=self.count)[:self.count]
+
+    @classmethod
+    def from_label_image(cls, label_image, count=None):
+        """
+        Build from a label image where 0 is background and 1..count are labels.
+
+        Statistic index i refers to label i + 1.
+
+        Args:
+            label_image (numpy.ndarray): 2D integer label image.
+            count (int, optional): Number of labels. Defaults to the largest label present.
+
+        Returns:
+            AOIStatistics: The statistics engine.
+        """
+        flat_labels = np.asarray(label_image).ravel()
+        flat_indices = np.flatnonzero(flat_labels)
+        labels = flat_labels[flat_indices].astype(np.int64) - 1
+        if count is None:
+            count = int(labels.max()) + 1 if labels.size else 0
+        return cls(label_image.shape, flat_indices, labels, count)
+
+    @classmethod
+    def from_aois(cls, areas_of_interest, shape, scale=1.0):
+        """
+        Build from AOI dictionaries, one label per AOI in list order.
+
+        Each AOI contributes its detected pixels, mapped to ``(int(x * scale), int(y * scale))``
+        and dropped when outside shape, exactly like the per-pixel lookups it replaces.
+
+        Args:
+            areas_of_interest (list): AOI dictionaries, optionally with 'detected_pixels'.
+            shape (tuple): Shape (H, W, ...) of the arrays that will be reduced.
+            scale (float): Factor applied to pixel coordinates before lookup. Defaults to 1.0.
+
+        Returns:
+            AOIStatistics: The statistics engine.
+        """
+        height, width = shape[:2]
+        coords = []
+        labels = []
+        for index, aoi in enumerate(areas_of_interest or []):
+            pixels = aoi.get('detected_pixels')
+            if pixels is None or len(pixels) == 0:
+                continue
+            aoi_coords = AOIPixels.coerce(pixels).to_array()
+            if scale != 1.0:
+                aoi_coords = (aoi_coords * scale).astype(np.int64)
+            coords.append(aoi_coords)
+            labels.append(np.full(len(aoi_coords), index, dtype=np.int64))
+
+        if not coords:
+            return cls(shape, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), len(areas_of_interest or []))
+
+        coords = np.concatenate(coords).astype(np.int64)
+        labels = np.concatenate(labels)
+        xs, ys = coords[:, 0], coords[:, 1]
+        in_bounds = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        flat_indices = ys[in_bounds] * width + xs[in_bounds]
+        return cls(shape, flat_indices, labels[in_bounds], len(areas_of_interest))
+
+    def sample(self, values):
+        """
+        Gather the sampled pixels of an array.
+
+        Args:
+            values (numpy.ndarray): Array of shape (H, W) or (H, W, C).
+
+        Returns:
+            numpy.ndarray: Samples of shape (N,) or (N, C), in the engine's sample order.
+        """
+        values = np.asarray(values)
+        if values.shape[:2] != self.shape:
+            raise ValueError(f"Array shape {values.shape[:2]} does not match label shape {self.shape}")
+        flat = values.reshape(self.shape[0] * self.shape[1], -1)
+        samples = flat[self.flat_indices]
+        return samples[:, 0] if values.ndim == 2 else samples
+
+    def sum(self, values):
+        """
+        Per-label sum.
+
+        Args:
+            values (numpy.ndarray): Array of shape (H, W) or (H, W, C).
+
+        Returns:
+            numpy.ndarray: float64 sums of shape (count,) or (count, C).
+        """
+        samples = self.sample(values).astype(np.float64)
+        if samples.ndim == 1:
+            return np.bincount(self.labels, weights=samples, minlength=self.count)[:self.count]
+        return np.stack([
+            np.bincount(self.labels, weights=samples[:, channel], minlength=self.count)[:self.count]
+            for channel in range(samples.shape[1])
+        ], axis=1)
+
+    def mean(self, values):
+        """
+        Per-label mean.
+
+        Args:
+            values (numpy.ndarray): Array of shape (H, W) or (H, W, C).
+
+        Returns:
+            numpy.ndarray: float64 means of shape (count,) or (count, C); NaN for empty labels.
+        """
+        sums = self.sum(values)
+        counts = self.counts if sums.ndim == 1 else self.counts[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    def minimum(self, values):
+        """
+        Per-label minimum.
+
+        Args:
+            values (numpy.ndarray): 2D array of shape (H, W).
+
+        Returns:
+            numpy.ndarray: float64 minimums of shape (count,); NaN for empty labels.
+        """
+        return self.percentile(values, 0)
+
+    def maximum(self, values):
+        """
+        Per-label maximum.
+
+        Args:
+            values (numpy.ndarray): 2D array of shape (H, W).
+
+        Returns:
+            numpy.ndarray: float64 maximums of shape (count,); NaN for empty labels.
+        """
+        return self.percentile(values, 100)
+
+    def percentile(self, values, q):
+        """
+        Per-label percentile with linear interpolation (numpy's default method).
+
+        Args:
+            values (numpy.ndarray): 2D array of shape (H, W).
+            q (float): Percentile in [0, 100].
+
+        Returns:
+            numpy.ndarray: float64 percentiles of shape (count,); NaN for empty labels.
+        """
+        samples = self.sample(values).astype(np.float64)
+        if samples.ndim != 1:
+            raise ValueError("Percentiles require a single-channel array")
+        result = np.full(self.count, np.nan)
+        if samples.size == 0:
+            return result
+
+        # One sort by (label, value) serves every label at once
+        order = np.lexsort((samples, self.labels))
+        sorted_values = samples[order]
+        starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        present = self.counts > 0
+        position = (q / 100.0) * (self.counts[present] - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = sorted_values[starts[present] + lower]
+        high_values = sorted_values[starts[present] + upper]
+        result[present] = low_values + (high_values - low_values) * (position - lower)
+        return result
+
+    def dominant_color(self, image, bits=3):
+        """
+        Per-label dominant color.
+
+        Colors are quantized to ``bits`` bits per channel; the most populated bin wins
+        and its member pixels are averaged to give the returned color.
+
+        Args:
+            image (numpy.ndarray): uint8 image of shape (H, W, 3).
+            bits (int): Quantization bits per channel. Defaults to 3 (512 bins).
+
+        Returns:
+            numpy.ndarray: float64 colors of shape (count, 3) in the image's channel order;
+            NaN for empty labels.
+        """
+        samples = self.sample(image)
+        result = np.full((self.count, 3), np.nan)
+        if samples.size == 0:
+            return result
+
+        quantized = (samples >> (8 - bits)).astype(np.int64)
+        codes = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+        bins = 1 << (3 * bits)
+        histogram = np.bincount(self.labels * bins + codes, minlength=self.count * bins).reshape(self.count, bins)
+        dominant = histogram.argmax(axis=1)
+
+        in_dominant = codes == dominant[self.labels]
+        labels = self.labels[in_dominant]
+        members = samples[in_dominant].astype(np.float64)
+        member_counts = np.bincount(labels, minlength=self.count)
+        present = self.counts > 0
+        for channel in range(3):
+            sums = np.bincount(labels, weights=members[:, channel], minlength=self.count)
+            result[present, channel] = sums[present] / member_counts[present]
+        return result
@@ -0,0 +1,98 @@
+"""
+Stage timing for batch image analysis.
+
+Mirrors StageTimings in the streaming pipeline for AnalyzeService.process_file:
+- ImageStageTimings: Per-image durations of each processing stage, returned on the AnalysisResult
+- StageTimingSummary: Aggregates per-image timings into a total/mean/p95 summary per stage
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+
+@dataclass
+class ImageStageTimings:
+    """Timing measurements for each stage of processing one image."""
+    decode_ms: float = 0.0  # Reading, hashing and decoding the file
+    downscale_ms: float = 0.0
+    histogram_ms: float = 0.0
+    kmeans_ms: float = 0.0
+    algorithm_ms: float = 0.0  # process_image, excluding mask storage
+    mask_ms: float = 0.0
+    transform_ms: float = 0.0
+    thumbnail_ms: float = 0.0
+    aoi_cache_ms: float = 0.0
+    total_ms: float = 0.0
+
+    STAGES = ('decode', 'downscale', 'histogram', 'kmeans', 'algorithm', 'mask',
+              'transform', 'thumbnail', 'aoi_cache', 'total')
+
+    @contextmanager
+    def measure(self, stage):
+        """Add the time spent in the with-block to a stage.
+
+        Args:
+            stage: Stage name from STAGES.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, (time.perf_counter() - start) * 1000.0)
+
+    def add(self, stage, duration_ms):
+        """Add a duration to a stage.
+
+        Args:
+            stage: Stage name from STAGES.
+            duration_ms: Duration in milliseconds.
+        """
+        attribute = f'{stage}_ms'
+        setattr(self, attribute, getattr(self, attribute) + duration_ms)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary keyed by stage name."""
+        return {stage: getattr(self, f'{stage}_ms') for stage in self.STAGES}
+
+
+class StageTimingSummary:
+    """Aggregates ImageStageTimings from every analyzed image."""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = {stage: [] for stage in ImageStageTimings.STAGES}
+
+    @property
+    def image_count(self):
+        """int: Number of images added."""
+        return len(self._samples['total'])
+
+    def add(self, timings):
+        """Add one image's timings.
+
+        Args:
+            timings: ImageStageTimings of an image.
+        """
+        for stage, duration_ms in timings.to_dict().items():
+            self._samples[stage].append(duration_ms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Total, mean and 95th percentile of each stage, in milliseconds."""
+        result = {}
+        for stage, samples in self._samples.items():
+            values = np.asarray(samples, dtype=np.float64)
+            result[stage] = {
+                'total_ms': round(float(values.sum()), 3),
+                'mean_ms': round(float(values.mean()), 3) if values.size else 0.0,
+                'p95_ms': round(float(np.percentile(values, 95)), 3) if values.size else 0.0,
+            }
+        return result
+
+    def format_lines(self) -> List[str]:
+        """One human-readable line per stage for logs."""
+        return [f"{stage}: total {values['total_ms'] / 1000.0:.2f} s, mean {values['mean_ms']:.1f} ms, "
+                f"p95 {values['p95_ms']:.1f} ms"
+                for stage, values in self.summary().items()]
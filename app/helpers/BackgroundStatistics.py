@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class BackgroundStatistics:
+    """
+    Mean and covariance of a set of background pixels, with a cached whitening factor.
+
+    Statistics are accumulated chunk by chunk and merged with the parallel form of
+    Welford's algorithm, so a segment of any size is reduced with bounded memory and
+    statistics of several segments or frames can be combined without revisiting their
+    pixels. The covariance is unbiased (divided by n - 1), as in spectral.calc_stats.
+
+    Mahalanobis distances and matched filters are computed from one inverse Cholesky
+    factor W of the covariance: (x - m)^T C^-1 (x - m) = |W (x - m)|^2.
+    """
+
+    CHUNK_PIXELS = 1 << 18  # Pixels converted to float64 at a time
+
+    def __init__(self, mean, scatter, count):
+        """
+        Initialize from accumulated moments.
+
+        Args:
+            mean (numpy.ndarray): Mean of every band, shape (bands,).
+            scatter (numpy.ndarray): Sum of outer products of centered samples, shape (bands, bands).
+            count (int): Number of samples.
+        """
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scatter = np.asarray(scatter, dtype=np.float64)
+        self.count = int(count)
+        self._whitening = None
+
+    @classmethod
+    def from_pixels(cls, pixels, stride=1, chunk_pixels=CHUNK_PIXELS):
+        """
+        Compute the statistics of an image or segment.
+
+        Args:
+            pixels (numpy.ndarray): (H, W, bands) array.
+            stride (int): Use every stride-th pixel along both axes. Defaults to 1 (every pixel).
+            chunk_pixels (int): Pixels reduced at a time. Defaults to CHUNK_PIXELS.
+
+        Returns:
+            BackgroundStatistics: The statistics of the sampled pixels.
+
+        Raises:
+            ValueError: If fewer than two pixels are sampled.
+        """
+        stride = max(1, int(stride))
+        if stride > 1:
+            pixels = pixels[::stride, ::stride]
+        samples = pixels.reshape(-1, pixels.shape[-1])
+        if len(samples) < 2:
+            raise ValueError("At least two pixels are needed for background statistics")
+
+        statistics = None
+        for start in range(0, len(samples), chunk_pixels):
+            chunk = samples[start:start + chunk_pixels].astype(np.float64)
+            mean = chunk.mean(axis=0)
+            centered = chunk - mean
+            chunk_statistics = cls(mean, np.einsum('ij,ik->jk', centered, centered), len(chunk))
+            statistics = chunk_statistics if statistics is None else statistics.merge(chunk_statistics)
+        return statistics
+
+    @property
+    def bands(self):
+        """int: Number of bands."""
+        return len(self.mean)
+
+    @property
+    def covariance(self):
+        """numpy.ndarray: Unbiased covariance matrix, shape (bands, bands)."""
+        return self.scatter / max(self.count - 1, 1)
+
+    @property
+    def whitening(self):
+        """
+        numpy.ndarray: Inverse of the lower Cholesky factor of the covariance.
+
+        A singular covariance (e.g. a segment of one flat color) is regularized with a
+        small ridge so it still has a factor.
+        """
+        if self._whitening is None:
+            covariance = self.covariance
+            try:
+                factor = np.linalg.cholesky(covariance)
+            except np.linalg.LinAlgError:
+                ridge = 1e-6 * max(np.trace(covariance) / self.bands, 1.0)
+                factor = np.linalg.cholesky(covariance + ridge * np.eye(self.bands))
+            self._whitening = np.linalg.inv(factor)
+        return self._whitening
+
+    def merge(self, other):
+        """
+        Combine with the statistics of another, disjoint set of pixels.
+
+        Args:
+            other (BackgroundStatistics): Statistics with the same number of bands.
+
+        Returns:
+            BackgroundStatistics: Statistics of both sets together.
+        """
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.count / count)
+        scatter = self.scatter + other.scatter + np.outer(delta, delta) * (self.count * other.count / count)
+        return BackgroundStatistics(mean, scatter, count)
+
+    def mahalanobis(self, pixels, chunk_pixels=CHUNK_PIXELS):
+        """
+        Squared Mahalanobis distance of every pixel from the background (the RX score).
+
+        Args:
+            pixels (numpy.ndarray): (H, W, bands) array.
+            chunk_pixels (int): Pixels scored at a time. Defaults to CHUNK_PIXELS.
+
+        Returns:
+            numpy.ndarray: (H, W) float64 distances.
+        """
+        samples = pixels.reshape(-1, pixels.shape[-1])
+        whitening_t = self.whitening.T
+        distances = np.empty(len(samples), dtype=np.float64)
+        for start in range(0, len(samples), chunk_pixels):
+            whitened = (samples[start:start + chunk_pixels] - self.mean) @ whitening_t
+            distances[start:start + chunk_pixels] = np.einsum('ij,ij->i', whitened, whitened)
+        return distances.reshape(pixels.shape[:-1])
+
+    def matched_filter_coefficients(self, targets):
+        """
+        Matched filters of several targets as the columns of one matrix.
+
+        The score of target t for pixel x is (x - m) @ coefficients[:, t], normalized so a
+        pixel equal to the target scores 1, as in spectral.matched_filter.
+
+        Args:
+            targets (numpy.ndarray): (targets, bands) target signatures.
+
+        Returns:
+            numpy.ndarray: (bands, targets) filter coefficients.
+        """
+        whitened = (np.asarray(targets, dtype=np.float64) - self.mean) @ self.whitening.T
+        norms = np.einsum('ij,ij->i', whitened, whitened)
+        return (whitened @ self.whitening).T / norms
@@ -0,0 +1,129 @@
+import numpy as np
+
+
+class ColorRangeLUT:
+    """
+    Exact lookup table of which 8-bit colors lie in a set of color ranges.
+
+    The table covers all 256^3 colors in the image's channel order and is stored
+    bit-packed along the last channel (2 MB). It is compiled once from any per-pixel
+    mask function, e.g. several cv2.inRange calls OR-ed together, possibly in another
+    color space, so a mask from the table is identical to the mask the function gives.
+    Masking an image is then one table-indexing pass, however many ranges there are.
+    """
+
+    CHUNK_PIXELS = 1 << 20  # Pixels looked up at a time
+    COMPILE_PLANES = 16  # Values of the first channel evaluated per mask function call
+
+    def __init__(self, packed):
+        """
+        Initialize from a packed table.
+
+        Args:
+            packed (numpy.ndarray): (256, 256, 32) uint8 table; bit (c2 & 7) of
+                packed[c0, c1, c2 >> 3] is set when color (c0, c1, c2) is in range.
+        """
+        self.packed = packed
+
+    @classmethod
+    def compile(cls, mask_function):
+        """
+        Build the table by evaluating a mask function on every color.
+
+        Args:
+            mask_function (callable): Takes an (H, W, 3) uint8 image and returns an
+                (H, W) mask that is non-zero for pixels in range.
+
+        Returns:
+            ColorRangeLUT: The compiled table.
+        """
+        values = np.arange(256, dtype=np.uint8)
+        packed = np.empty((256, 256, 32), dtype=np.uint8)
+        for first in range(0, 256, cls.COMPILE_PLANES):
+            # Every color whose first channel is in [first, first + COMPILE_PLANES), as a 2D image
+            colors = np.empty((cls.COMPILE_PLANES, 256, 256, 3), dtype=np.uint8)
+            colors[..., 0] = values[first:first + cls.COMPILE_PLANES, None, None]
+            colors[..., 1] = values[None, :, None]
+            colors[..., 2] = values[None, None, :]
+            mask = np.asarray(mask_function(colors.reshape(-1, 256, 3))) != 0
+            packed[first:first + cls.COMPILE_PLANES] = np.packbits(
+                mask.reshape(cls.COMPILE_PLANES, 256, 256), axis=-1, bitorder='little')
+        return cls(packed)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """
+        Build the table from inclusive per-channel bounds, as cv2.inRange uses them.
+
+        Args:
+            ranges (list): (lower, upper) pairs of 3-element bounds in the image's channel order.
+                Bounds may lie outside 0-255.
+
+        Returns:
+            ColorRangeLUT: The compiled table.
+        """
+        packed = np.zeros((256, 256, 32), dtype=np.uint8)
+        values = np.arange(256)
+        for lower, upper in ranges:
+            # Bounds outside 0-255 are clipped to the colors that exist, as cv2.inRange compares them
+            lower = [max(int(value), 0) for value in lower]
+            upper = [min(int(value), 255) for value in upper]
+            if any(low > high for low, high in zip(lower, upper)):
+                continue
+            # One packed row of the last channel's bounds, OR-ed into the block of the first two
+            row = np.packbits((values >= lower[2]) & (values <= upper[2]), bitorder='little')
+            packed[lower[0]:upper[0] + 1, lower[1]:upper[1] + 1] |= row
+        return cls(packed)
+
+    def contains(self, colors):
+        """
+        Look up whether colors are in range.
+
+        Args:
+            colors (numpy.ndarray): (..., 3) uint8 colors.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape colors.shape[:-1].
+        """
+        c0, c1, c2 = colors[..., 0], colors[..., 1], colors[..., 2]
+        return ((self.packed[c0, c1, c2 >> 3] >> (c2 & 7)) & 1).astype(bool)
+
+    def mask(self, img):
+        """
+        Mask the pixels of an image that are in range.
+
+        Args:
+            img (numpy.ndarray): (H, W, 3) uint8 image.
+
+        Returns:
+            numpy.ndarray: (H, W) uint8 mask, 255 in range and 0 elsewhere.
+        """
+        pixels = img.reshape(-1, 3)
+        mask = np.empty(len(pixels), dtype=np.uint8)
+        for start in range(0, len(pixels), self.CHUNK_PIXELS):
+            chunk = pixels[start:start + self.CHUNK_PIXELS]
+            c2 = chunk[:, 2]
+            bits = (self.packed[chunk[:, 0], chunk[:, 1], c2 >> 3] >> (c2 & 7)) & 1
+            mask[start:start + self.CHUNK_PIXELS] = bits * np.uint8(255)
+        return mask.reshape(img.shape[:2])
+
+    def sample(self, img, mask, value_function, dtype=np.float32):
+        """
+        Evaluate a per-color value, such as a distance or confidence, at masked pixels only.
+
+        Args:
+            img (numpy.ndarray): (H, W, 3) uint8 image.
+            mask (numpy.ndarray): (H, W) mask; values are computed where it is non-zero.
+            value_function (callable): Takes an (N, 1, 3) uint8 array of colors and
+                returns N values in any shape.
+            dtype: Data type of the result. Defaults to numpy.float32.
+
+        Returns:
+            numpy.ndarray: (H, W) values, 0 outside the mask.
+        """
+        values = np.zeros(mask.size, dtype=dtype)
+        detected = np.flatnonzero(mask)
+        if len(detected):
+            colors = img.reshape(-1, 1, 3)[detected]
+            values[detected] = np.asarray(value_function(colors)).ravel()
+        return values.reshape(mask.shape)
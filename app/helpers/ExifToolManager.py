@@ -0,0 +1,302 @@
+import atexit
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+from concurrent.futures import Future
+
+
+class ExifToolError(Exception):
+    """Raised when ExifTool reports a failure or cannot be run."""
+
+
+class ExifToolStartError(ExifToolError):
+    """Raised when the ExifTool executable cannot be started."""
+
+
+class _Request:
+    """One queued ExifTool command and the future its caller waits on."""
+
+    def __init__(self, args, check):
+        self.args = args
+        self.check = check
+        self.future = Future()
+        self.attempts = 0
+
+
+class ExifToolManager:
+    """
+    Long-running ExifTool process shared by every metadata call of this process.
+
+    Starting ExifTool costs far more than reading one file's tags, so a single
+    process is kept running in -stay_open mode and fed commands through its
+    argument file on stdin (-@ -). Each command ends with -execute{n}; ExifTool
+    answers with its output followed by {ready{n}} on stdout, and -echo4 writes the
+    exit status and a matching marker to stderr once the command is processed.
+
+    Callers put requests on a bounded queue and block on their result. A single
+    thread owns the process: it takes up to MAX_BATCH queued requests, writes them
+    in one go and reads the answers in order, so concurrent callers share a round
+    trip. If ExifTool dies, it is restarted and the unanswered requests are sent
+    again; a request that kills the process MAX_ATTEMPTS times fails on its own.
+
+    There is one manager per process. Forked workers get their own, as the parent's
+    pipes and thread are not usable there. The process is shut down at exit.
+    """
+
+    COMMON_ARGS = ('-G', '-n', '-charset', 'filename=utf8')
+    MAX_QUEUE = 256  # Callers block once this many requests are waiting
+    MAX_BATCH = 32  # Requests written to ExifTool per round trip
+    MAX_ATTEMPTS = 2
+    READ_SIZE = 65536
+
+    _instance = None
+    _instance_pid = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, executable=None):
+        """
+        Create a manager; ExifTool is started on the first request.
+
+        Args:
+            executable (str, optional): Path to ExifTool. Defaults to 'exiftool' on PATH.
+        """
+        self.executable = executable or 'exiftool'
+        self.spawn_count = 0
+        self._process = None
+        self._buffers = {'stdout': b'', 'stderr': b''}
+        self._sequence = 0
+        self._queue = queue.Queue(self.MAX_QUEUE)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='ExifToolManager', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def instance(cls, executable=None):
+        """
+        Return this process's shared manager, creating it if needed.
+
+        Args:
+            executable (str, optional): Path to ExifTool, used when the manager is created.
+
+        Returns:
+            ExifToolManager: The shared manager.
+        """
+        pid = os.getpid()
+        if cls._instance_pid != pid:
+            # In a forked child the parent's lock may have been held at fork time
+            cls._instance_lock = threading.Lock()
+            cls._instance = None
+            cls._instance_pid = pid
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(executable)
+            return cls._instance
+
+    @classmethod
+    def shutdown_instance(cls):
+        """Shut down this process's shared manager, if any."""
+        if cls._instance_pid == os.getpid() and cls._instance is not None:
+            cls._instance.shutdown()
+            cls._instance = None
+
+    def execute(self, *args, raw_bytes=False, check=True):
+        """
+        Run one ExifTool command.
+
+        Args:
+            *args (str): Command line arguments, without the common arguments.
+            raw_bytes (bool): Return stdout as bytes instead of text. Defaults to False.
+            check (bool): Raise if ExifTool exits with an error status. Defaults to True.
+
+        Returns:
+            str or bytes: ExifTool's output.
+
+        Raises:
+            ExifToolError: If ExifTool cannot be run, or exits with an error status and check is set.
+        """
+        if self._closed:
+            raise ExifToolError("ExifTool manager has been shut down")
+        request = _Request([str(arg) for arg in args], check)
+        self._queue.put(request)
+        output = request.future.result()
+        return output if raw_bytes else output.decode('utf-8', errors='replace')
+
+    def get_metadata(self, file_paths, tags=None, params=None):
+        """
+        Read tags from files as JSON.
+
+        Args:
+            file_paths (list): Image paths.
+            tags (list, optional): Tag names to read. Defaults to all tags.
+            params (list, optional): Extra ExifTool arguments.
+
+        Returns:
+            list: One dictionary per file, keyed by group-prefixed tag names.
+        """
+        args = ['-j', *(params or []), *(f'-{tag}' for tag in tags or []), *file_paths]
+        output = self.execute(*args)
+        return json.loads(output) if output.strip() else []
+
+    def set_tags(self, file_paths, tags, params=None):
+        """
+        Write tags to files.
+
+        Args:
+            file_paths (list): Image paths.
+            tags (dict): Tag names and the values to write.
+            params (list, optional): Extra ExifTool arguments.
+
+        Returns:
+            str: ExifTool's output.
+        """
+        args = [f'-{tag}={value}' for tag, value in tags.items()]
+        return self.execute(*args, *(params or []), *file_paths)
+
+    def shutdown(self):
+        """Stop the worker thread and ask ExifTool to exit."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        """Worker thread: send queued requests to ExifTool in batches."""
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                self._process_batch(batch)
+            if stop:
+                self._stop_process()
+                return
+
+    def _process_batch(self, batch):
+        """Send a batch and resolve its futures, restarting ExifTool if it dies."""
+        pending = batch
+        while pending:
+            try:
+                self._ensure_process()
+            except OSError as e:
+                for request in pending:
+                    request.future.set_exception(ExifToolStartError(f"Could not start {self.executable}: {e}"))
+                return
+            sequences = self._write(pending)
+            for index, (request, sequence) in enumerate(zip(pending, sequences)):
+                try:
+                    output, status, error = self._read(sequence)
+                except (OSError, ExifToolError) as e:
+                    # ExifTool died: retry what was not answered, giving up on a request that keeps killing it
+                    self._kill_process()
+                    request.attempts += 1
+                    if request.attempts >= self.MAX_ATTEMPTS:
+                        request.future.set_exception(ExifToolError(f"ExifTool crashed on {request.args}: {e}"))
+                        index += 1
+                    pending = pending[index:]
+                    break
+                if status != 0 and request.check:
+                    message = error.decode('utf-8', errors='replace').strip() or f"exit status {status}"
+                    request.future.set_exception(ExifToolError(message))
+                else:
+                    request.future.set_result(output)
+            else:
+                pending = []
+
+    def _ensure_process(self):
+        """Start ExifTool if it is not running."""
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._kill_process()
+        self._process = subprocess.Popen(
+            [self.executable, '-stay_open', 'True', '-@', '-', '-common_args', *self.COMMON_ARGS],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+        self.spawn_count += 1
+
+    def _write(self, requests):
+        """Write requests to ExifTool's argument file and return their sequence numbers."""
+        sequences = []
+        lines = []
+        for request in requests:
+            self._sequence += 1
+            sequences.append(self._sequence)
+            lines += request.args
+            lines += ['-echo4', f'${{status}}{{ready{self._sequence}}}', f'-execute{self._sequence}']
+        try:
+            self._process.stdin.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            self._process.stdin.flush()
+        except OSError:
+            # Reported by the read of the first request
+            pass
+        return sequences
+
+    def _read(self, sequence):
+        """
+        Read the answer to one command.
+
+        Returns:
+            tuple: (stdout bytes, exit status, stderr bytes).
+
+        Raises:
+            ExifToolError: If ExifTool exits before answering.
+        """
+        output, _ = self._read_until('stdout', re.compile(rb'\{ready%d\}\r?\n' % sequence))
+        error, match = self._read_until('stderr', re.compile(rb'(-?\d+)\{ready%d\}\r?\n' % sequence))
+        return output, int(match.group(1)), error
+
+    def _read_until(self, name, pattern):
+        """Read a pipe until pattern matches; return what came before it and the match."""
+        stream = getattr(self._process, name)
+        data = self._buffers[name]
+        start = 0
+        while True:
+            match = pattern.search(data, start)
+            if match:
+                # Anything after the match belongs to the next command
+                self._buffers[name] = data[match.end():]
+                return data[:match.start()], match
+            chunk = os.read(stream.fileno(), self.READ_SIZE)
+            if not chunk:
+                raise ExifToolError("ExifTool exited unexpectedly")
+            start = max(0, len(data) - 32)
+            data += chunk
+
+    def _stop_process(self):
+        """Ask ExifTool to exit, killing it if it does not."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.write(b'-stay_open\nFalse\n')
+            self._process.stdin.close()
+            self._process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        self._kill_process()
+
+    def _kill_process(self):
+        """Kill ExifTool and forget it."""
+        process, self._process = self._process, None
+        self._buffers = {'stdout': b'', 'stderr': b''}
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        for stream in (process.stdin, process.stdout, process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+atexit.register(ExifToolManager.shutdown_instance)
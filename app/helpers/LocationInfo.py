@@ -10,16 +10,25 @@ class LocationInfo:
     """Provides functions to retrieve and convert locational data."""
 
     @staticmethod
-    def get_gps(full_path=None, exif_data=None):
+    def get_gps(full_path=None, exif_data=None, metadata=None):
         """
         Retrieve the GPS EXIF data stored in an image file.
 
         Args:
             full_path (str): The path to the image file.
+            exif_data (dict): EXIF data already loaded with piexif.
+            metadata (dict): Tags read by MetaDataHelper.get_metadata_batch.
 
         Returns:
             dict: Contains the decimal latitude and longitude values from the GPS data.
         """
+        if metadata:
+            latitude = metadata.get('Composite:GPSLatitude')
+            longitude = metadata.get('Composite:GPSLongitude')
+            if latitude is None or longitude is None:
+                return {}
+            return {'latitude': round(float(latitude), 6), 'longitude': round(float(longitude), 6)}
+
         if full_path:
             try:
                 with Image.open(full_path) as img:
@@ -1,14 +1,15 @@
 from PIL import Image
 from os import path
-import exiftool
 import piexif
 import hashlib
+import json
 import platform
 import re
 import struct
 import xml.etree.ElementTree as ET
 import sys
 
+from helpers.ExifToolManager import ExifToolError, ExifToolManager, ExifToolStartError
 from helpers.PickleHelper import PickleHelper
 
 # Constant headers
@@ -19,6 +20,12 @@ _XMP_EXT_HDR = b"http://ns.adobe.com/xmp/extension/\x00"
 class MetaDataHelper:
     """Helper class for managing EXIF, XMP, and thermal metadata of image files."""
 
+    METADATA_BATCH_SIZE = 250  # Files per ExifTool call in get_metadata_batch
+    PIEXIF_EXTENSIONS = ('.jpg', '.jpeg')
+    GPS_TAGS = ('Composite:GPSLatitude', 'Composite:GPSLongitude')
+    # Position and attitude tags the folder-level services read for every image
+    IMAGE_TAGS = GPS_TAGS + ('Composite:GPSAltitude', 'EXIF:Make', 'EXIF:Model', 'XMP:all')
+
     @staticmethod
     def _get_exif_tool_path():
         """
@@ -40,6 +47,16 @@ class MetaDataHelper:
         elif platform.system() == 'Darwin':
             return path.abspath(path.join(app_root, 'external/exiftool'))
 
+    @staticmethod
+    def _exiftool():
+        """
+        Returns this process's shared, long-running ExifTool.
+
+        Returns:
+            ExifToolManager: The shared ExifTool manager.
+        """
+        return ExifToolManager.instance(MetaDataHelper._get_exif_tool_path())
+
     @staticmethod
     def _transfer_exif_piexif(origin_file, destination_file):
         """
@@ -80,9 +97,8 @@ class MetaDataHelper:
             origin_file (str): Source image path.
             destination_file (str): Destination image path.
         """
-        with exiftool.ExifTool(MetaDataHelper._get_exif_tool_path()) as et:
-            et.execute("-tagsfromfile", origin_file, "-exif", destination_file, "-overwrite_original")
-            et.terminate()
+        MetaDataHelper._exiftool().execute("-tagsfromfile", origin_file, "-exif", destination_file, "-overwrite_original",
+                                           check=False)
 
     @staticmethod
     def transfer_xmp_exiftool(origin_file, destination_file):
@@ -93,9 +109,8 @@ class MetaDataHelper:
             origin_file (str): Source image path.
             destination_file (str): Destination image path.
         """
-        with exiftool.ExifTool(MetaDataHelper._get_exif_tool_path()) as et:
-            et.execute("-tagsfromfile", origin_file, "-xmp", destination_file, "-overwrite_original")
-            et.terminate()
+        MetaDataHelper._exiftool().execute("-tagsfromfile", origin_file, "-xmp", destination_file, "-overwrite_original",
+                                           check=False)
 
     @staticmethod
     def transfer_exif(origin_file, destination_file):
@@ -122,9 +137,8 @@ class MetaDataHelper:
             origin_file (str): Source image path.
             destination_file (str): Destination image path.
         """
-        with exiftool.ExifTool(MetaDataHelper._get_exif_tool_path()) as et:
-            et.execute("-tagsfromfile", origin_file, destination_file, "-overwrite_original", "--thumbnailimage")
-            et.terminate()
+        MetaDataHelper._exiftool().execute("-tagsfromfile", origin_file, destination_file, "-overwrite_original",
+                                           "--thumbnailimage", check=False)
 
     @staticmethod
     def get_raw_temperature_data(file_path):
@@ -137,10 +151,8 @@ class MetaDataHelper:
         Returns:
             bytes: Byte data of raw thermal image.
         """
-        with exiftool.ExifTool(MetaDataHelper._get_exif_tool_path()) as et:
-            thermal_img_bytes = et.execute("-b", "-RawThermalImage", file_path, raw_bytes=True)
-            et.terminate()
-        return thermal_img_bytes
+        return MetaDataHelper._exiftool().execute("-b", "-RawThermalImage", file_path, raw_bytes=True,
+                                                  check=False)
 
     @staticmethod
     def get_meta_data_exiftool(file_path):
@@ -153,10 +165,7 @@ class MetaDataHelper:
         Returns:
             dict: Metadata dictionary.
         """
-        with exiftool.ExifToolHelper(executable=MetaDataHelper._get_exif_tool_path()) as et:
-            metadata = et.get_metadata([file_path])[0]
-            et.terminate()
-        return metadata
+        return MetaDataHelper._exiftool().get_metadata([file_path])[0]
 
     @staticmethod
     def get_exif_data_piexif(file_path):
@@ -180,9 +189,146 @@ class MetaDataHelper:
             file_path (str): Path to image.
             tags (dict): Dictionary of tag:value to apply.
         """
-        with exiftool.ExifToolHelper(executable=MetaDataHelper._get_exif_tool_path()) as et:
-            et.set_tags([file_path], tags=tags, params=["-overwrite_original"])
-            et.terminate()
+        MetaDataHelper._exiftool().set_tags([file_path], tags=tags, params=["-overwrite_original"])
+
+    @staticmethod
+    def get_metadata_batch(file_paths, tags, batch_size=None):
+        """
+        Reads a whitelist of tags from many images with one ExifTool call per batch.
+
+        If ExifTool crashes on a batch, its files are read one by one, so a corrupt image
+        does not cost the rest of its batch. JPEGs that still have no metadata, e.g. when
+        ExifTool is not available, are read with piexif, which only knows EXIF tags.
+
+        Args:
+            file_paths (list): Image paths.
+            tags (list): Tag names, optionally group-prefixed ('Composite:GPSLatitude')
+                or a whole group ('XMP:all').
+            batch_size (int, optional): Files per ExifTool call. Defaults to METADATA_BATCH_SIZE.
+
+        Returns:
+            dict: Metadata per path, keyed by group-prefixed tag names; empty for unreadable files.
+        """
+        batch_size = batch_size or MetaDataHelper.METADATA_BATCH_SIZE
+        file_paths = list(dict.fromkeys(file_paths))
+        results = {file_path: {} for file_path in file_paths}
+        for start in range(0, len(file_paths), batch_size):
+            batch = file_paths[start:start + batch_size]
+            try:
+                entries = MetaDataHelper._read_metadata_batch(batch, tags)
+            except ExifToolStartError:
+                entries = {}
+            except ExifToolError:
+                entries = {}
+                if len(batch) > 1:
+                    # Isolate the file that failed the batch
+                    for file_path in batch:
+                        try:
+                            entries.update(MetaDataHelper._read_metadata_batch([file_path], tags))
+                        except ExifToolError:
+                            pass
+            for file_path in batch:
+                metadata = entries.get(MetaDataHelper._normalized_path(file_path))
+                if not metadata and file_path.lower().endswith(MetaDataHelper.PIEXIF_EXTENSIONS):
+                    metadata = MetaDataHelper._metadata_from_piexif(file_path, tags)
+                results[file_path] = metadata or {}
+        return results
+
+    @staticmethod
+    def _read_metadata_batch(file_paths, tags):
+        """
+        Reads tags from files in one ExifTool call.
+
+        Args:
+            file_paths (list): Image paths.
+            tags (list): Tag names to read.
+
+        Returns:
+            dict: Metadata of every file ExifTool could read, keyed by normalized path.
+
+        Raises:
+            ExifToolError: If ExifTool cannot be run or crashes on the batch.
+        """
+        # Unreadable files are reported on stderr; the others are still in the output
+        output = MetaDataHelper._exiftool().execute('-j', *(f'-{tag}' for tag in tags), *file_paths, check=False)
+        if not output.strip():
+            return {}
+        try:
+            entries = json.loads(output)
+        except ValueError as e:
+            raise ExifToolError(f"Unreadable ExifTool output: {e}")
+        return {MetaDataHelper._normalized_path(entry.get('SourceFile', '')): entry for entry in entries}
+
+    @staticmethod
+    def _normalized_path(file_path):
+        """Path as compared between the request and ExifTool's SourceFile."""
+        return path.normcase(path.normpath(file_path))
+
+    @staticmethod
+    def _metadata_from_piexif(file_path, tags):
+        """
+        Reads EXIF tags with piexif, named as ExifTool names them with -G -n.
+
+        Args:
+            file_path (str): JPEG path.
+            tags (list): Tag names to keep.
+
+        Returns:
+            dict: The whitelisted tags found, empty if the file has no readable EXIF.
+        """
+        try:
+            exif_dict = piexif.load(file_path)
+        except Exception:
+            return {}
+
+        metadata = {'SourceFile': file_path}
+        for ifd in ('0th', 'Exif', 'GPS'):
+            for tag_id, value in (exif_dict.get(ifd) or {}).items():
+                tag = piexif.TAGS[ifd].get(tag_id)
+                if tag:
+                    metadata[f'EXIF:{tag["name"]}'] = MetaDataHelper._piexif_value(value, tag['type'])
+
+        # Signed coordinates, as ExifTool's composite tags
+        gps = exif_dict.get('GPS') or {}
+        for name, negative_ref in (('GPSLatitude', b'S'), ('GPSLongitude', b'W')):
+            value = metadata.get(f'EXIF:{name}')
+            if isinstance(value, list):
+                value = sum(part / 60 ** i for i, part in enumerate(value))
+                metadata[f'EXIF:{name}'] = value
+                ref = gps.get(getattr(piexif.GPSIFD, f'{name}Ref'), b'')
+                metadata[f'Composite:{name}'] = -value if ref.startswith(negative_ref) else value
+        altitude = metadata.get('EXIF:GPSAltitude')
+        if altitude is not None:
+            metadata['Composite:GPSAltitude'] = -altitude if gps.get(piexif.GPSIFD.GPSAltitudeRef) == 1 else altitude
+
+        return {key: value for key, value in metadata.items()
+                if key == 'SourceFile' or MetaDataHelper._tag_selected(key, tags)}
+
+    @staticmethod
+    def _piexif_value(value, value_type):
+        """Converts a piexif value to the type ExifTool's JSON output uses."""
+        if isinstance(value, bytes):
+            return value.rstrip(b'\x00').decode('utf-8', errors='replace').strip()
+        if value_type in (piexif.TYPES.Rational, piexif.TYPES.SRational):
+            # One (numerator, denominator) pair, or a tuple of them
+            rationals = [value] if isinstance(value[0], int) else value
+            values = [numerator / denominator if denominator else 0.0 for numerator, denominator in rationals]
+            return values[0] if len(values) == 1 else values
+        if isinstance(value, tuple):
+            return list(value)
+        return value
+
+    @staticmethod
+    def _tag_selected(key, tags):
+        """Whether a group-prefixed tag name matches a tag whitelist."""
+        group, _, name = key.rpartition(':')
+        for tag in tags:
+            tag_group, _, tag_name = tag.rpartition(':')
+            if tag_group and tag_group.lower() != group.lower():
+                continue
+            if tag_name.lower() in ('all', name.lower()):
+                return True
+        return False
 
     @staticmethod
     def add_gps_data(file_path, lat, lng, alt, rel_alt=0):
@@ -240,6 +386,77 @@ class MetaDataHelper:
             piexif.GPSIFD.GPSAltitude: (abs(int(alt * 100)), 100),
         }
 
+    @staticmethod
+    def xmp_data_from_metadata(metadata):
+        """
+        Converts ExifTool metadata to the XMP dictionary format of get_xmp_data_merged.
+
+        Args:
+            metadata (dict): Metadata read by ExifTool, keyed by group-prefixed tag names.
+
+        Returns:
+            dict: XMP data dictionary, empty if there is no metadata.
+        """
+        if not metadata:
+            return {}
+
+        # Extract XMP fields from ExifTool output
+        xmp_data = {}
+
+        # Process all metadata fields
+        for key, value in metadata.items():
+            # Store original key-value for reference
+            xmp_data[key] = value
+
+            # Convert ExifTool format to expected XMP format
+            if key.startswith('XMP:'):
+                xmp_key = key[4:]  # Remove "XMP:" prefix
+                xmp_data[xmp_key] = value
+                # Also store with drone-dji namespace if it's a DJI field
+                if any(field in xmp_key for field in ['FlightYaw', 'FlightPitch', 'FlightRoll',
+                                                      'GimbalYaw', 'GimbalPitch', 'GimbalRoll',
+                                                      'RelativeAltitude', 'AbsoluteAltitude']):
+                    xmp_data[f'drone-dji:{xmp_key}'] = value
+            elif key.startswith('XMP-'):
+                # Handle namespaced XMP tags like "XMP-drone-dji:FlightYawDegree"
+                xmp_key = key[4:]  # Remove "XMP-" prefix
+                xmp_data[xmp_key] = value
+                # Also store without namespace for compatibility
+                if ':' in xmp_key:
+                    simple_key = xmp_key.split(':')[-1]
+                    xmp_data[simple_key] = value
+                    # Store with proper drone-dji namespace
+                    if 'drone' in xmp_key.lower():
+                        namespace_key = xmp_key.replace('drone-dji:', 'drone-dji:')
+                        xmp_data[namespace_key] = value
+
+        # Ensure critical drone fields are properly mapped
+        # ExifTool might return these with different key formats
+        critical_mappings = [
+            ('RelativeAltitude', 'drone-dji:RelativeAltitude'),
+            ('AbsoluteAltitude', 'drone-dji:AbsoluteAltitude'),
+            ('FlightYawDegree', 'drone-dji:FlightYawDegree'),
+            ('GimbalYawDegree', 'drone-dji:GimbalYawDegree'),
+            ('GimbalPitchDegree', 'drone-dji:GimbalPitchDegree'),
+        ]
+
+        for base_key, full_key in critical_mappings:
+            # Check various possible key formats from ExifTool
+            possible_keys = [
+                base_key,
+                f'XMP:{base_key}',
+                f'XMP-drone-dji:{base_key}',
+                f'drone-dji:{base_key}',
+                full_key
+            ]
+            for possible_key in possible_keys:
+                if possible_key in metadata:
+                    xmp_data[full_key] = metadata[possible_key]
+                    xmp_data[base_key] = metadata[possible_key]
+                    break
+
+        return xmp_data
+
     @staticmethod
     def get_xmp_data_merged(file_path: str) -> dict:
         """
@@ -254,65 +471,9 @@ class MetaDataHelper:
         """
         # Try using ExifTool first (works better in bundled exe)
         try:
-            metadata = MetaDataHelper.get_meta_data_exiftool(file_path)
-            if metadata:
-                # Extract XMP fields from ExifTool output
-                xmp_data = {}
-
-                # Process all metadata fields
-                for key, value in metadata.items():
-                    # Store original key-value for reference
-                    xmp_data[key] = value
-
-                    # Convert ExifTool format to expected XMP format
-                    if key.startswith('XMP:'):
-                        xmp_key = key[4:]  # Remove "XMP:" prefix
-                        xmp_data[xmp_key] = value
-                        # Also store with drone-dji namespace if it's a DJI field
-                        if any(field in xmp_key for field in ['FlightYaw', 'FlightPitch', 'FlightRoll',
-                                                              'GimbalYaw', 'GimbalPitch', 'GimbalRoll',
-                                                              'RelativeAltitude', 'AbsoluteAltitude']):
-                            xmp_data[f'drone-dji:{xmp_key}'] = value
-                    elif key.startswith('XMP-'):
-                        # Handle namespaced XMP tags like "XMP-drone-dji:FlightYawDegree"
-                        xmp_key = key[4:]  # Remove "XMP-" prefix
-                        xmp_data[xmp_key] = value
-                        # Also store without namespace for compatibility
-                        if ':' in xmp_key:
-                            simple_key = xmp_key.split(':')[-1]
-                            xmp_data[simple_key] = value
-                            # Store with proper drone-dji namespace
-                            if 'drone' in xmp_key.lower():
-                                namespace_key = xmp_key.replace('drone-dji:', 'drone-dji:')
-                                xmp_data[namespace_key] = value
-
-                # Ensure critical drone fields are properly mapped
-                # ExifTool might return these with different key formats
-                critical_mappings = [
-                    ('RelativeAltitude', 'drone-dji:RelativeAltitude'),
-                    ('AbsoluteAltitude', 'drone-dji:AbsoluteAltitude'),
-                    ('FlightYawDegree', 'drone-dji:FlightYawDegree'),
-                    ('GimbalYawDegree', 'drone-dji:GimbalYawDegree'),
-                    ('GimbalPitchDegree', 'drone-dji:GimbalPitchDegree'),
-                ]
-
-                for base_key, full_key in critical_mappings:
-                    # Check various possible key formats from ExifTool
-                    possible_keys = [
-                        base_key,
-                        f'XMP:{base_key}',
-                        f'XMP-drone-dji:{base_key}',
-                        f'drone-dji:{base_key}',
-                        full_key
-                    ]
-                    for possible_key in possible_keys:
-                        if possible_key in metadata:
-                            xmp_data[full_key] = metadata[possible_key]
-                            xmp_data[base_key] = metadata[possible_key]
-                            break
-
-                if xmp_data:
-                    return xmp_data
+            xmp_data = MetaDataHelper.xmp_data_from_metadata(MetaDataHelper.get_meta_data_exiftool(file_path))
+            if xmp_data:
+                return xmp_data
         except Exception:
             # If ExifTool fails, fall back to direct parsing
             pass
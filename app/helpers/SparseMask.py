@@ -0,0 +1,261 @@
+import json
+import os
+import struct
+
+import cv2
+import numpy as np
+import tifffile
+
+
+class SparseMask:
+    """
+    Detection mask stored as bit-packed crops around its detected pixels.
+
+    Detections usually cover a tiny part of the frame, so instead of the whole frame
+    only the crops that contain detected pixels are stored. The frame is divided into
+    BLOCK x BLOCK blocks; every 8-connected group of blocks with detected pixels
+    becomes one crop, tightened to the bounding box of its pixels. Crops never share
+    a pixel. A crop's mask is stored with np.packbits, followed by the crop of every
+    auxiliary band (e.g. per-pixel scores) in the band's own dtype.
+
+    File layout:
+        MAGIC | uint32 little-endian header length | JSON header | crop payloads
+
+    The JSON header holds the frame size, band dtypes and an index of the crops as
+    [x, y, width, height, offset], offsets counted from the end of the header. A
+    window is read by seeking to the crops that intersect it, without decoding the
+    rest of the file.
+    """
+
+    EXTENSION = '.mask'
+    MAGIC = b'ADIATMSK'
+    VERSION = 1
+    BLOCK = 64  # Block size in pixels for grouping detections into crops
+    LEGACY_EXTENSIONS = ('.tif', '.tiff')
+
+    def __init__(self, path):
+        """
+        Open a sparse mask file and read its index.
+
+        Args:
+            path (str): Path to the mask file.
+
+        Raises:
+            ValueError: If the file is not a sparse mask.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"Not a sparse mask file: {path}")
+            (header_length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        self._payload_start = len(self.MAGIC) + 4 + header_length
+        self.shape = (int(header['height']), int(header['width']))
+        self.band_dtypes = [np.dtype(dtype) for dtype in header['bands']]
+        self.crops = [tuple(int(value) for value in crop) for crop in header['crops']]
+
+    @classmethod
+    def write(cls, path, mask, bands=None, block=BLOCK):
+        """
+        Write a mask and optional auxiliary bands in the sparse format.
+
+        Args:
+            path (str): Destination file path.
+            mask (numpy.ndarray): (H, W) mask; non-zero pixels are detected.
+            bands (list, optional): (H, W) arrays stored at detected crops only.
+            block (int): Block size for grouping detections into crops. Defaults to BLOCK.
+
+        Returns:
+            int: Size of the written file in bytes.
+        """
+        bands = [np.asarray(band) for band in bands or []]
+        crops = ((x, y, bits, *(band[y:y + bits.shape[0], x:x + bits.shape[1]] for band in bands))
+                 for x, y, bits in cls.find_crops(mask, block))
+        return cls.write_crops(path, mask.shape[:2], crops, [band.dtype for band in bands])
+
+    @classmethod
+    def write_crops(cls, path, shape, crops, band_dtypes=()):
+        """
+        Write a mask given as disjoint crops, e.g. one tile of a large image at a time.
+
+        Only the packed crops are held in memory, never the whole frame.
+
+        Args:
+            path (str): Destination file path.
+            shape (tuple): (height, width) of the frame.
+            crops (iterable): (x, y, bits, *band_crops) per crop, bits being a boolean
+                (height, width) array and band_crops one array of that size per band.
+                Crops must not share a pixel.
+            band_dtypes (list, optional): dtype of every auxiliary band.
+
+        Returns:
+            int: Size of the written file in bytes.
+        """
+        band_dtypes = [np.dtype(dtype).newbyteorder('<') for dtype in band_dtypes]
+        payloads = []
+        index = []
+        offset = 0
+        for x, y, bits, *band_crops in crops:
+            height, width = bits.shape
+            payload = [np.packbits(bits, axis=None, bitorder='little').tobytes()]
+            payload += [np.ascontiguousarray(values).astype(dtype).tobytes() for values, dtype in zip(band_crops, band_dtypes)]
+            index.append([int(x), int(y), width, height, offset])
+            payloads.extend(payload)
+            offset += sum(len(part) for part in payload)
+
+        header = json.dumps({
+            'version': cls.VERSION,
+            'height': int(shape[0]),
+            'width': int(shape[1]),
+            'bands': [dtype.str for dtype in band_dtypes],
+            'crops': index
+        }, separators=(',', ':')).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(cls.MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for part in payloads:
+                f.write(part)
+        return len(cls.MAGIC) + 4 + len(header) + offset
+
+    @staticmethod
+    def find_crops(mask, block=BLOCK):
+        """
+        Split the detected pixels of a mask into disjoint crops.
+
+        Args:
+            mask (numpy.ndarray): (H, W) mask; non-zero pixels are detected.
+            block (int): Block size for grouping detections. Defaults to BLOCK.
+
+        Returns:
+            list: (x, y, bits) per crop, bits being a boolean (height, width) array.
+        """
+        detected = np.asarray(mask) != 0
+        height, width = detected.shape
+        if not detected.any():
+            return []
+
+        # Blocks with any detected pixel, grouped into 8-connected components
+        occupied = np.logical_or.reduceat(detected, np.arange(0, height, block), axis=0)
+        occupied = np.logical_or.reduceat(occupied, np.arange(0, width, block), axis=1)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(occupied.astype(np.uint8), connectivity=8)
+
+        crops = []
+        for label in range(1, count):
+            bx, by, bw, bh = (int(value) for value in stats[label, :4])
+            x1, y1 = bx * block, by * block
+            x2, y2 = min((bx + bw) * block, width), min((by + bh) * block, height)
+            # Pixels of this component's blocks only, so crops whose boxes overlap share no pixel
+            owned = np.repeat(np.repeat(labels[by:by + bh, bx:bx + bw] == label, block, axis=0), block, axis=1)
+            bits = detected[y1:y2, x1:x2] & owned[:y2 - y1, :x2 - x1]
+            rows = np.flatnonzero(bits.any(axis=1))
+            cols = np.flatnonzero(bits.any(axis=0))
+            bits = bits[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+            crops.append((x1 + int(cols[0]), y1 + int(rows[0]), np.ascontiguousarray(bits)))
+        return crops
+
+    def iter_crops(self, x=0, y=0, width=None, height=None, band=None):
+        """
+        Read the crops that intersect a window.
+
+        Args:
+            x (int): Left edge of the window. Defaults to 0.
+            y (int): Top edge of the window. Defaults to 0.
+            width (int, optional): Window width. Defaults to the rest of the frame.
+            height (int, optional): Window height. Defaults to the rest of the frame.
+            band (int, optional): Auxiliary band to read with every crop.
+
+        Yields:
+            tuple: (x, y, bits) for each crop in frame coordinates, bits being a
+                boolean (height, width) array, plus the band's crop when band is given.
+        """
+        x2 = self.shape[1] if width is None else x + width
+        y2 = self.shape[0] if height is None else y + height
+        with open(self.path, 'rb') as f:
+            for cx, cy, cw, ch, offset in self.crops:
+                if cx >= x2 or cy >= y2 or cx + cw <= x or cy + ch <= y:
+                    continue
+                mask_bytes = (cw * ch + 7) // 8
+                f.seek(self._payload_start + offset)
+                bits = np.unpackbits(np.frombuffer(f.read(mask_bytes), dtype=np.uint8),
+                                     count=cw * ch, bitorder='little').reshape(ch, cw).astype(bool)
+                if band is None:
+                    yield cx, cy, bits
+                    continue
+                band_offset = mask_bytes + sum(dtype.itemsize * cw * ch for dtype in self.band_dtypes[:band])
+                dtype = self.band_dtypes[band]
+                f.seek(self._payload_start + offset + band_offset)
+                values = np.frombuffer(f.read(dtype.itemsize * cw * ch), dtype=dtype).reshape(ch, cw)
+                yield cx, cy, bits, values
+
+    def read_window(self, x=0, y=0, width=None, height=None):
+        """
+        Read a window of the mask.
+
+        Args:
+            x (int): Left edge of the window. Defaults to 0.
+            y (int): Top edge of the window. Defaults to 0.
+            width (int, optional): Window width. Defaults to the rest of the frame.
+            height (int, optional): Window height. Defaults to the rest of the frame.
+
+        Returns:
+            numpy.ndarray: (height, width) uint8 mask, 255 at detected pixels and 0 elsewhere.
+        """
+        width = self.shape[1] - x if width is None else width
+        height = self.shape[0] - y if height is None else height
+        window = np.zeros((height, width), dtype=np.uint8)
+        for cx, cy, bits in self.iter_crops(x, y, width, height):
+            target, source = self._overlap(x, y, width, height, cx, cy, bits.shape)
+            window[target][bits[source]] = 255
+        return window
+
+    def read_band(self, band, x=0, y=0, width=None, height=None, fill=0):
+        """
+        Read a window of an auxiliary band; pixels outside the crops get the fill value.
+
+        Args:
+            band (int): Index of the auxiliary band.
+            x (int): Left edge of the window. Defaults to 0.
+            y (int): Top edge of the window. Defaults to 0.
+            width (int, optional): Window width. Defaults to the rest of the frame.
+            height (int, optional): Window height. Defaults to the rest of the frame.
+            fill: Value of pixels outside the stored crops. Defaults to 0.
+
+        Returns:
+            numpy.ndarray: (height, width) array of the band's dtype.
+        """
+        width = self.shape[1] - x if width is None else width
+        height = self.shape[0] - y if height is None else height
+        window = np.full((height, width), fill, dtype=self.band_dtypes[band])
+        for cx, cy, _, values in self.iter_crops(x, y, width, height, band=band):
+            target, source = self._overlap(x, y, width, height, cx, cy, values.shape)
+            window[target] = values[source]
+        return window
+
+    @classmethod
+    def load_mask(cls, path):
+        """
+        Load a whole detection mask from a sparse mask, a legacy multi-band TIFF or a PNG.
+
+        Args:
+            path (str): Path to the mask file.
+
+        Returns:
+            numpy.ndarray: (H, W) uint8 mask, or None if the file cannot be read.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == cls.EXTENSION:
+            return cls(path).read_window()
+        if extension in cls.LEGACY_EXTENSIONS:
+            # Multi-band TIFF: band 0 is the mask, further bands hold temperatures
+            data = tifffile.imread(path)
+            return (data[0] if data.ndim == 3 else data).astype(np.uint8)
+        return cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+
+    @staticmethod
+    def _overlap(x, y, width, height, cx, cy, shape):
+        """Slices of a window and a crop that cover their common pixels."""
+        top, left = max(y, cy), max(x, cx)
+        bottom, right = min(y + height, cy + shape[0]), min(x + width, cx + shape[1])
+        return ((slice(top - y, bottom - y), slice(left - x, right - x)),
+                (slice(top - cy, bottom - cy), slice(left - cx, right - cx)))
@@ -0,0 +1,237 @@
+import json
+import struct
+
+import numpy as np
+
+from helpers.AOIPixels import AOIPixels
+
+
+class TemperatureGrid:
+    """
+    Per-image temperature matrix stored as tiled int16 values, read through a memmap.
+
+    Temperatures (Celsius) are quantized as value = raw * scale + offset. The scale is
+    0.01 (centi-degrees) unless the image's range is wider than int16 allows at that
+    step, in which case it grows to fit; the offset is the middle of the range. The
+    largest quantization error is scale / 2. Non-finite temperatures are stored as
+    NODATA and read back as NaN.
+
+    File layout:
+        MAGIC | uint32 little-endian header length | JSON header | int16 tiles
+
+    The tiles are TILE x TILE blocks in row-major tile order, so a point lookup touches
+    one tile and a window only the tiles it covers. The header is padded so the tiles
+    start on an ALIGNMENT boundary.
+
+    Indexing mimics a 2D array for point, row, window and coordinate-array reads, so
+    code written against a full temperature array works unchanged:
+    grid[y, x], grid[y][x], grid[y1:y2, x1:x2] and grid[ys, xs].
+    """
+
+    EXTENSION = '.temps'
+    MAGIC = b'ADIATTMP'
+    VERSION = 1
+    TILE = 64
+    DEFAULT_SCALE = 0.01  # Centi-degrees
+    NODATA = -32768
+    MAX_RAW = 32767
+    ALIGNMENT = 64
+
+    def __init__(self, path, unit='C'):
+        """
+        Open a temperature grid file.
+
+        Args:
+            path (str): Path to the file.
+            unit (str): Unit of the values read, 'C' or 'F'. Defaults to 'C'.
+
+        Raises:
+            ValueError: If the file is not a temperature grid.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"Not a temperature grid file: {path}")
+            (header_length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        self.shape = (int(header['height']), int(header['width']))
+        self.tile = int(header['tile'])
+        self.scale = float(header['scale'])
+        self.offset = float(header['offset'])
+        if unit.upper() == 'F':
+            # Fold the unit conversion into the quantization
+            self.scale, self.offset = self.scale * 1.8, self.offset * 1.8 + 32.0
+        self.unit = unit.upper()
+        tiles_y = -(-self.shape[0] // self.tile)
+        tiles_x = -(-self.shape[1] // self.tile)
+        self._tiles = np.memmap(path, dtype='<i2', mode='r', offset=len(self.MAGIC) + 4 + header_length,
+                                shape=(tiles_y, tiles_x, self.tile, self.tile))
+
+    @classmethod
+    def write(cls, path, temperatures, tile=TILE):
+        """
+        Quantize a temperature matrix and write it as a tiled grid.
+
+        Args:
+            path (str): Destination file path.
+            temperatures (numpy.ndarray): (H, W) temperatures in Celsius.
+            tile (int): Tile size in pixels. Defaults to TILE.
+
+        Returns:
+            tuple: (scale, offset) of the quantization.
+        """
+        values = np.asarray(temperatures, dtype=np.float64)
+        height, width = values.shape
+        finite = np.isfinite(values)
+        low, high = (float(values[finite].min()), float(values[finite].max())) if finite.any() else (0.0, 0.0)
+        scale = max(cls.DEFAULT_SCALE, (high - low) / (2 * cls.MAX_RAW))
+        offset = (low + high) / 2
+
+        tiles_y, tiles_x = -(-height // tile), -(-width // tile)
+        raw = np.full((tiles_y * tile, tiles_x * tile), cls.NODATA, dtype='<i2')
+        quantized = np.clip(np.rint((values - offset) / scale), -cls.MAX_RAW, cls.MAX_RAW)
+        raw[:height, :width] = np.where(finite, quantized, cls.NODATA)
+        tiles = raw.reshape(tiles_y, tile, tiles_x, tile).transpose(0, 2, 1, 3)
+
+        header = json.dumps({
+            'version': cls.VERSION,
+            'height': height,
+            'width': width,
+            'tile': tile,
+            'scale': scale,
+            'offset': offset,
+            'nodata': cls.NODATA
+        }, separators=(',', ':')).encode('utf-8')
+        header += b' ' * (-(len(cls.MAGIC) + 4 + len(header)) % cls.ALIGNMENT)
+        with open(path, 'wb') as f:
+            f.write(cls.MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(np.ascontiguousarray(tiles).tobytes())
+        return scale, offset
+
+    @property
+    def height(self):
+        """int: Grid height in pixels."""
+        return self.shape[0]
+
+    @property
+    def width(self):
+        """int: Grid width in pixels."""
+        return self.shape[1]
+
+    @property
+    def max_error(self):
+        """float: Largest quantization error in the grid's unit."""
+        return self.scale / 2
+
+    def point(self, x, y):
+        """
+        Temperature at one pixel.
+
+        Args:
+            x (int): Column.
+            y (int): Row.
+
+        Returns:
+            float: The temperature, or None outside the grid or where no data was stored.
+        """
+        if not (0 <= y < self.shape[0] and 0 <= x < self.shape[1]):
+            return None
+        raw = int(self._tiles[y // self.tile, x // self.tile, y % self.tile, x % self.tile])
+        return None if raw == self.NODATA else raw * self.scale + self.offset
+
+    def values(self, xs, ys):
+        """
+        Temperatures at arrays of pixel coordinates.
+
+        Args:
+            xs (array-like): Columns.
+            ys (array-like): Rows, of the same shape.
+
+        Returns:
+            numpy.ndarray: float32 temperatures, NaN where no data was stored.
+
+        Raises:
+            IndexError: If a coordinate is outside the grid.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if xs.size and (xs.min() < 0 or ys.min() < 0 or xs.max() >= self.shape[1] or ys.max() >= self.shape[0]):
+            raise IndexError("Coordinates outside the temperature grid")
+        raw = self._tiles[ys // self.tile, xs // self.tile, ys % self.tile, xs % self.tile]
+        return self._to_temperatures(raw)
+
+    def window(self, x, y, width, height):
+        """
+        Temperatures of a window, clipped to the grid.
+
+        Args:
+            x (int): Left edge.
+            y (int): Top edge.
+            width (int): Window width.
+            height (int): Window height.
+
+        Returns:
+            numpy.ndarray: float32 temperatures, NaN where no data was stored.
+        """
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(self.shape[1], x + width), min(self.shape[0], y + height)
+        if x2 <= x1 or y2 <= y1:
+            return np.empty((max(0, y2 - y1), max(0, x2 - x1)), dtype=np.float32)
+        tile = self.tile
+        ty1, ty2 = y1 // tile, (y2 - 1) // tile + 1
+        tx1, tx2 = x1 // tile, (x2 - 1) // tile + 1
+        block = self._tiles[ty1:ty2, tx1:tx2].transpose(0, 2, 1, 3).reshape((ty2 - ty1) * tile, (tx2 - tx1) * tile)
+        raw = block[y1 - ty1 * tile:y2 - ty1 * tile, x1 - tx1 * tile:x2 - tx1 * tile]
+        return self._to_temperatures(raw)
+
+    def aoi_mean(self, aoi):
+        """
+        Mean temperature of an AOI's detected pixels, or of its circle without them.
+
+        Args:
+            aoi (dict): AOI with 'center', 'radius' and optionally 'detected_pixels'.
+
+        Returns:
+            float: The mean temperature, or None if the AOI covers no stored data.
+        """
+        if aoi.get('detected_pixels'):
+            coords = AOIPixels.coerce(aoi['detected_pixels']).to_array(self.shape)
+            temperatures = self.values(coords[:, 0], coords[:, 1])
+        else:
+            cx, cy = (int(value) for value in aoi['center'])
+            radius = int(aoi.get('radius', 0))
+            window = self.window(cx - radius, cy - radius, 2 * radius + 1, 2 * radius + 1)
+            ys, xs = np.mgrid[max(0, cy - radius):max(0, cy - radius) + window.shape[0],
+                              max(0, cx - radius):max(0, cx - radius) + window.shape[1]]
+            temperatures = window[(xs - cx) ** 2 + (ys - cy) ** 2 <= radius ** 2]
+        temperatures = temperatures[np.isfinite(temperatures)]
+        return float(temperatures.mean()) if temperatures.size else None
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple) and len(key) == 2:
+            rows, cols = key
+            if isinstance(rows, slice) and isinstance(cols, slice):
+                y1, y2, _ = rows.indices(self.shape[0])
+                x1, x2, _ = cols.indices(self.shape[1])
+                return self.window(x1, y1, x2 - x1, y2 - y1)
+            if np.ndim(rows) == 0 and np.ndim(cols) == 0:
+                return self.values(cols, rows)[()]
+            return self.values(cols, rows)
+        # A single row
+        row = int(key)
+        return self.window(0, row if row >= 0 else row + self.shape[0], self.shape[1], 1)[0]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.window(0, 0, self.shape[1], self.shape[0])
+        return values if dtype is None else values.astype(dtype)
+
+    def _to_temperatures(self, raw):
+        """Dequantize raw values to float32 temperatures in the grid's unit."""
+        raw = np.asarray(raw)
+        temperatures = np.asarray(raw * self.scale + self.offset, dtype=np.float32)
+        return np.where(raw == self.NODATA, np.float32(np.nan), temperatures)
@@ -0,0 +1,166 @@
+import os
+
+import cv2
+import numpy as np
+import tifffile
+from PIL import Image
+
+
+class TiledImageReader:
+    """
+    Reads rectangular windows of an image in OpenCV (BGR) channel order.
+
+    Uncompressed TIFF and BigTIFF files are memory-mapped and compressed tiled or
+    stripped TIFFs are decoded one segment at a time, so only the pixels of the
+    requested window are held in memory. Other formats (JPEG, PNG, ...) cannot be
+    decoded partially and are decoded once, as cv2.imdecode would.
+    """
+
+    TIFF_EXTENSIONS = ('.tif', '.tiff')
+
+    def __init__(self, path):
+        """
+        Open an image for windowed reading.
+
+        Args:
+            path (str): Path to the image file.
+
+        Raises:
+            ValueError: If the image cannot be decoded.
+        """
+        self.path = path
+        self._tiff = None
+        self._page = None
+        self._array = None
+        self._reverse_channels = False
+
+        if os.path.splitext(path)[1].lower() in self.TIFF_EXTENSIONS:
+            self._open_tiff()
+        if self._array is None and self._page is None:
+            self._array = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+            if self._array is None:
+                raise ValueError(f"Could not load image: {path}")
+
+        source = self._page if self._page is not None else self._array
+        self.shape = tuple(int(size) for size in source.shape)
+        self.dtype = source.dtype
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    @property
+    def height(self):
+        """int: Image height in pixels."""
+        return self.shape[0]
+
+    @property
+    def width(self):
+        """int: Image width in pixels."""
+        return self.shape[1]
+
+    @staticmethod
+    def pixel_count(path):
+        """
+        Read the number of pixels from the file header without decoding the image.
+
+        Args:
+            path (str): Path to the image file.
+
+        Returns:
+            int | None: Width times height, or None when the header cannot be read.
+        """
+        try:
+            if os.path.splitext(path)[1].lower() in TiledImageReader.TIFF_EXTENSIONS:
+                with tifffile.TiffFile(path) as tiff:
+                    page = tiff.pages[0]
+                    return int(page.imagewidth) * int(page.imagelength)
+            with Image.open(path) as img:
+                return img.size[0] * img.size[1]
+        except Image.DecompressionBombError:
+            # PIL refuses to open images above twice its pixel limit, so that is a lower bound
+            return 2 * Image.MAX_IMAGE_PIXELS
+        except Exception:
+            return None
+
+    def read(self, x, y, width, height):
+        """
+        Read a window of the image.
+
+        Args:
+            x (int): Left column of the window.
+            y (int): Top row of the window.
+            width (int): Window width in pixels.
+            height (int): Window height in pixels.
+
+        Returns:
+            numpy.ndarray: Contiguous (height, width[, channels]) array in BGR(A) order.
+        """
+        x2, y2 = min(x + width, self.width), min(y + height, self.height)
+        x, y = max(x, 0), max(y, 0)
+        if self._array is not None:
+            window = self._array[y:y2, x:x2]
+        else:
+            window = self._read_segments(x, y, x2, y2)
+        # Copy straight from the memory map or decoded segments, reordering channels on the way
+        if self._reverse_channels and window.shape[2] == 3:
+            return np.ascontiguousarray(window[..., ::-1])
+        if self._reverse_channels:
+            return window[..., [2, 1, 0, 3]]
+        return np.array(window) if self._array is not None else window
+
+    def close(self):
+        """Release the file and any memory map."""
+        self._array = None
+        self._page = None
+        if self._tiff is not None:
+            self._tiff.close()
+            self._tiff = None
+
+    def _open_tiff(self):
+        """Memory-map the first page of a TIFF, or prepare segment-wise decoding."""
+        try:
+            tiff = tifffile.TiffFile(self.path)
+        except Exception:
+            return
+        page = tiff.pages[0]
+        # TIFF stores RGB(A); OpenCV consumers expect BGR(A)
+        self._reverse_channels = (page.photometric == tifffile.PHOTOMETRIC.RGB
+                                  and page.samplesperpixel in (3, 4) and len(page.shape) == 3)
+        if page.is_memmappable:
+            tiff.close()
+            self._array = tifffile.memmap(self.path, page=0, mode='r')
+        elif page.planarconfig == tifffile.PLANARCONFIG.CONTIG and page.imagedepth == 1:
+            self._tiff = tiff
+            self._page = page
+        else:
+            tiff.close()
+            self._reverse_channels = False
+
+    def _read_segments(self, x1, y1, x2, y2):
+        """Decode only the tiles or strips that intersect a window."""
+        page = self._page
+        segment_height, segment_width = page.chunks[0], page.chunks[1]
+        rows, cols = page.chunked[0], page.chunked[1]
+        window = np.zeros((y2 - y1, x2 - x1) + tuple(page.shape[2:]), dtype=page.dtype)
+        file_handle = self._tiff.filehandle
+
+        for row in range(y1 // segment_height, min((y2 - 1) // segment_height + 1, rows)):
+            for col in range(x1 // segment_width, min((x2 - 1) // segment_width + 1, cols)):
+                index = row * cols + col
+                file_handle.seek(page.dataoffsets[index])
+                data = file_handle.read(page.databytecounts[index])
+                segment, indices, _ = page.decode(data, index, jpegtables=page.jpegtables)
+                segment = segment.reshape(segment.shape[1:3] + tuple(page.shape[2:]))
+                seg_y, seg_x = indices[2], indices[3]
+                # Overlap of this segment with the window, in image coordinates
+                top, bottom = max(y1, seg_y), min(y2, seg_y + segment.shape[0], page.shape[0])
+                left, right = max(x1, seg_x), min(x2, seg_x + segment.shape[1], page.shape[1])
+                if top >= bottom or left >= right:
+                    continue
+                window[top - y1:bottom - y1, left - x1:right - x1] = \
+                    segment[top - seg_y:bottom - seg_y, left - seg_x:right - seg_x]
+        return window
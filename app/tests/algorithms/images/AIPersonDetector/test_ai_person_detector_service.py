@@ -3,8 +3,10 @@ import numpy as np
 import tempfile
 import os
 from unittest.mock import patch, MagicMock
-from algorithms.images.AIPersonDetector.services.AIPersonDetectorService import AIPersonDetectorService
+from algorithms.images.AIPersonDetector.services import AIPersonDetectorService as ai_person_detector_module
+from algorithms.images.AIPersonDetector.services.AIPersonDetectorService import AIPersonDetectorService, OVERLAP
 from algorithms.AlgorithmService import AnalysisResult
+from helpers.SlidingWindowSlicer import SlidingWindowSlicer
 
 
 @pytest.fixture
@@ -104,3 +106,71 @@ def test_process_image_mock_onnx(ai_person_detector_service, test_image):
 
             assert isinstance(result, AnalysisResult)
             assert result.input_path == full_path
+
+
+class _FakeBatchSession:
+    """Deterministic stand-in for an ONNX session that accepts any batch size."""
+
+    def __init__(self):
+        self.calls = []
+        self._input = MagicMock()
+        self._input.name = 'input'
+        self._input.shape = ['batch', 3, 640, 640]
+
+    def get_inputs(self):
+        return [self._input]
+
+    def run(self, output_names, feeds):
+        batch = feeds['input']
+        self.calls.append(batch.shape[0])
+        preds = []
+        for tensor in batch:
+            # Place a box where the brightest pixel of the red channel is
+            y, x = np.unravel_index(np.argmax(tensor[0]), tensor[0].shape)
+            conf = 0.6 + 0.3 * float(tensor[0].mean())
+            preds.append([[x, y, min(x + 40, 639), min(y + 40, 639), conf, 0]])
+        return [np.array(preds, dtype=np.float32)]
+
+
+def test_batched_and_unbatched_detections_match(ai_person_detector_service):
+    """Test that batching slices does not change the merged detections."""
+    rng = np.random.default_rng(42)
+    img = rng.integers(0, 200, (2600, 3400, 3), dtype=np.uint8)
+    img_pre_processed = ai_person_detector_service._preprocess_whole_image(img)
+    slices = SlidingWindowSlicer.get_slices(img_pre_processed.shape, ai_person_detector_service.slice_size, OVERLAP)
+    assert len(slices) > 4
+
+    results = {}
+    for batch_size in (1, 4, 8):
+        session = _FakeBatchSession()
+        ai_person_detector_service.batch_size = batch_size
+        boxes, scores, classes = ai_person_detector_service._detect_slices(session, 'input', img_pre_processed, slices)
+        results[batch_size] = SlidingWindowSlicer.merge_slice_detections(boxes, scores, classes, iou_threshold=0.5)
+        assert max(session.calls) == min(batch_size, len(slices))
+
+    assert len(results[1]) > 0
+    assert results[4] == results[1]
+    assert results[8] == results[1]
+
+
+def test_batch_size_capped_by_fixed_model_batch(ai_person_detector_service):
+    """Test that a model with a fixed batch dimension limits the batch size."""
+    session = _FakeBatchSession()
+    session._input.shape = [1, 3, 640, 640]
+    ai_person_detector_service.batch_size = 8
+    assert ai_person_detector_service._get_batch_size(session) == 1
+
+
+def test_onnx_session_cached_per_process(ai_person_detector_service):
+    """Test that the ONNX session is created once and reused across images."""
+    ai_person_detector_module._onnx_sessions.clear()
+    session = _FakeBatchSession()
+    try:
+        with patch.object(ai_person_detector_service, '_create_onnx_session', return_value=session) as mock_create:
+            first = ai_person_detector_service._get_onnx_session()
+            second = ai_person_detector_service._get_onnx_session()
+        assert first is session
+        assert second is session
+        assert mock_create.call_count == 1
+    finally:
+        ai_person_detector_module._onnx_sessions.clear()
@@ -5,6 +5,7 @@ import tempfile
 import os
 from algorithms.images.ColorRange.services.ColorRangeService import ColorRangeService
 from algorithms.AlgorithmService import AnalysisResult
+from helpers.SparseMask import SparseMask
 
 
 @pytest.fixture
@@ -254,4 +255,26 @@ def test_process_image_mask_storage(color_range_service, test_image):
 
         if result.areas_of_interest and len(result.areas_of_interest) > 0:
             assert result.output_path is not None
-            assert result.output_path.endswith('.tif')
+            assert result.output_path.endswith(SparseMask.EXTENSION)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_lut_mask_matches_in_range_per_color_range(seed):
+    """The compiled table gives the same mask as one cv2.inRange per configured range."""
+    rng = np.random.default_rng(seed)
+    color_ranges = []
+    for _ in range(int(rng.integers(1, 11))):
+        a, b = rng.integers(0, 256, 3), rng.integers(0, 256, 3)
+        color_ranges.append({'color_range': [tuple(int(v) for v in np.minimum(a, b)),
+                                             tuple(int(v) for v in np.maximum(a, b))]})
+    service = ColorRangeService((255, 0, 0), 10, 0, 5, True, {'color_ranges': color_ranges})
+    img = rng.integers(0, 256, (150, 200, 3), dtype=np.uint8)
+
+    expected = np.zeros(img.shape[:2], dtype=np.uint8)
+    for config in color_ranges:
+        min_rgb, max_rgb = config['color_range']
+        expected = cv2.bitwise_or(expected, cv2.inRange(img, np.array(min_rgb[::-1], dtype=np.uint8),
+                                                        np.array(max_rgb[::-1], dtype=np.uint8)))
+
+    np.testing.assert_array_equal(service.get_lut().mask(img), expected)
+    assert service.get_lut() is service.get_lut()
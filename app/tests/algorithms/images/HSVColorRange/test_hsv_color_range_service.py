@@ -287,3 +287,64 @@ def test_process_image_no_color_selected():
 
         assert isinstance(result, AnalysisResult)
         assert result.error_message is not None
+
+
+def _random_hsv_configs(rng, count):
+    """Random HSV range configs; hue ranges near 0 and 1 wrap around."""
+    configs = []
+    for _ in range(count):
+        configs.append({
+            'selected_color': tuple(int(v) for v in rng.integers(0, 256, 3)),
+            'hsv_ranges': {
+                'h': float(rng.choice([0.02, 0.98, rng.random()])),
+                's': float(rng.random()),
+                'v': float(rng.random()),
+                'h_minus': float(rng.uniform(0, 0.1)),
+                'h_plus': float(rng.uniform(0, 0.1)),
+                's_minus': float(rng.uniform(0, 0.3)),
+                's_plus': float(rng.uniform(0, 0.3)),
+                'v_minus': float(rng.uniform(0, 0.3)),
+                'v_plus': float(rng.uniform(0, 0.3))
+            }
+        })
+    return configs
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_lut_matches_in_range_per_hsv_config(seed):
+    """The compiled table gives the same mask and distances as the per-range cv2.inRange path."""
+    rng = np.random.default_rng(seed)
+    configs = _random_hsv_configs(rng, int(rng.integers(1, 11)))
+    service = HSVColorRangeService((100, 150, 200), 10, 1000, 5, True, {'hsv_configs': configs})
+    img = rng.integers(0, 256, (150, 200, 3), dtype=np.uint8)
+    hsv_image = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+    expected = np.zeros(img.shape[:2], dtype=np.uint8)
+    for config in configs:
+        expected = cv2.bitwise_or(expected, service._create_mask_from_hsv_ranges(hsv_image, config['hsv_ranges']))
+
+    lut, error_message = service.get_lut()
+    mask = lut.mask(img)
+    distances = lut.sample(img, mask, lambda colors: service._calculate_hsv_distances(
+        cv2.cvtColor(colors, cv2.COLOR_BGR2HSV), service.target_color_hsv, np.full(colors.shape[:2], 255)))
+
+    assert error_message is None
+    assert np.count_nonzero(expected) > 0
+    np.testing.assert_array_equal(mask, expected)
+    np.testing.assert_allclose(
+        distances, service._calculate_hsv_distances(hsv_image, service.target_color_hsv, expected), rtol=1e-6)
+
+
+def test_lut_matches_in_range_for_old_window_format():
+    """Wrapped hue windows of the old dialog format compile to the same mask."""
+    hsv_window = {'h_min': 340, 'h_max': 20, 's_min': 20, 's_max': 100, 'v_min': 20, 'v_max': 100}
+    service = HSVColorRangeService((255, 0, 0), 10, 1000, 5, True, {'hsv_window': hsv_window})
+    img = np.random.default_rng(4).integers(0, 256, (150, 200, 3), dtype=np.uint8)
+    hsv_image = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+    expected = cv2.bitwise_or(
+        cv2.inRange(hsv_image, np.array([170, 51, 51], dtype=np.uint8), np.array([179, 255, 255], dtype=np.uint8)),
+        cv2.inRange(hsv_image, np.array([0, 51, 51], dtype=np.uint8), np.array([10, 255, 255], dtype=np.uint8)))
+
+    lut, _ = service.get_lut()
+    np.testing.assert_array_equal(lut.mask(img), expected)
@@ -2,7 +2,7 @@ import pytest
 import numpy as np
 import tempfile
 import os
-from algorithms.images.MRMap.services.MRMapService import MRMapService
+from algorithms.images.MRMap.services.MRMapService import MRMapService, Histogram
 from algorithms.AlgorithmService import AnalysisResult
 
 
@@ -118,3 +118,133 @@ def test_add_confidence_scores(mrmap_service):
     assert 'confidence' in result[0]
     assert 'score_type' in result[0]
     assert result[0]['score_type'] == 'rarity'
+
+
+def _legacy_merge_rectangles(rectangles):
+    """First-fit rectangle merge used before the grid lookup."""
+    merged = []
+    for rect in rectangles:
+        for i, existing in enumerate(merged):
+            if not (existing[2] < rect[0] or existing[0] > rect[2] or existing[3] < rect[1] or existing[1] > rect[3]):
+                merged[i] = [min(existing[0], rect[0]), min(existing[1], rect[1]),
+                             max(existing[2], rect[2]), max(existing[3], rect[3])]
+                break
+        else:
+            merged.append(list(rect))
+    return merged
+
+
+def _legacy_mrmap_mask(pixel_anom, window_size, min_area):
+    """Window BFS and first-fit rectangle merge used before connected-component labeling."""
+    from collections import deque
+
+    height, width = pixel_anom.shape
+    visited = np.zeros_like(pixel_anom, dtype=bool)
+    rectangles = []
+    for y, x in zip(*np.where(pixel_anom)):
+        queue = deque([(x, y)])
+        rect = [x, y, x, y]
+        count = 0
+        while queue:
+            cx, cy = queue.popleft()
+            if visited[cy, cx] or not pixel_anom[cy, cx]:
+                continue
+            visited[cy, cx] = True
+            count += 1
+            rect = [min(rect[0], cx), min(rect[1], cy), max(rect[2], cx), max(rect[3], cy)]
+            x_range = np.clip([cx - window_size, cx + window_size + 1], 0, width)
+            y_range = np.clip([cy - window_size, cy + window_size + 1], 0, height)
+            neighbors = np.argwhere(pixel_anom[y_range[0]:y_range[1], x_range[0]:x_range[1]]
+                                    & ~visited[y_range[0]:y_range[1], x_range[0]:x_range[1]])
+            for dy, dx in neighbors:
+                queue.append((x_range[0] + dx, y_range[0] + dy))
+        if count >= min_area:
+            rectangles.append(rect)
+    mask = np.zeros(pixel_anom.shape, dtype=np.uint8)
+    for rect in _legacy_merge_rectangles(rectangles):
+        mask[rect[1]:rect[3] + 1, rect[0]:rect[2] + 1] = 255
+    return mask
+
+
+def _rare_blob_image(seed):
+    """Smooth background with a few small, rarely colored blobs."""
+    rng = np.random.default_rng(seed)
+    img = np.full((240, 320, 3), (60, 120, 70), dtype=np.uint8)
+    img = np.clip(img.astype(np.int16) + rng.integers(-3, 4, size=img.shape), 0, 255).astype(np.uint8)
+    for _ in range(15):
+        x, y = int(rng.integers(0, 310)), int(rng.integers(0, 230))
+        color = rng.integers(0, 256, size=3)
+        for _ in range(int(rng.integers(3, 40))):
+            img[min(239, y + int(rng.integers(0, 10))), min(319, x + int(rng.integers(0, 10)))] = color
+    return img
+
+
+@pytest.mark.parametrize("window", [0, 1, 3, 5])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_mrmap_contours_match_window_bfs(mrmap_service, seed, window):
+    """Test that labeling and the grid rectangle merge reproduce the BFS mask."""
+    mrmap_service.window_size = window
+    mrmap_service.min_area = 3
+    rng = np.random.default_rng(seed)
+    pixel_anom = rng.random((150, 200)) > 0.995
+    pixel_anom[40:44, 60:80] = rng.random((4, 20)) > 0.5
+
+    mask, contours = mrmap_service._getMRMapsContours(pixel_anom)
+
+    np.testing.assert_array_equal(mask, _legacy_mrmap_mask(pixel_anom, window, 3))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_process_image_mask_matches_window_bfs(seed):
+    """Test end-to-end MRMap detection against the BFS implementation."""
+    service = MRMapService((255, 0, 0), 2, 0, 5, False, {'threshold': 30000, 'segments': 1, 'window': 5, 'colorspace': 'RGB'})
+    img = _rare_blob_image(seed)
+    hist = Histogram(img, 'RGB')
+    bin_counts = hist.bin_count(img[:, :, 0], img[:, :, 1], img[:, :, 2]) * ((8000 * 6000) / (img.shape[0] * img.shape[1]))
+    pixel_anom = (0 < bin_counts) & (bin_counts < service.threshold)
+    assert pixel_anom.any()
+
+    mask, _ = service._getMRMapsContours(pixel_anom)
+
+    np.testing.assert_array_equal(mask, _legacy_mrmap_mask(pixel_anom, 5, 2))
+
+
+def test_merge_overlapping_rectangles_is_first_fit(mrmap_service):
+    """Test that a rectangle bridging two kept rectangles only grows the first one."""
+    rects = [[0, 0, 10, 2], [20, 0, 30, 2], [9, 1, 21, 1], [50, 50, 52, 52]]
+
+    merged = mrmap_service._merge_overlapping_rectangles(rects)
+
+    assert merged.tolist() == [[0, 0, 21, 2], [20, 0, 30, 2], [50, 50, 52, 52]]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_merge_overlapping_rectangles_matches_first_fit_loop(mrmap_service, seed):
+    """Test the merged rectangles against the original loop, with chained overlaps and large boxes."""
+    rng = np.random.default_rng(seed)
+    corners = np.stack([rng.integers(0, 600, 400), rng.integers(0, 400, 400)], axis=1)
+    sizes = np.where(rng.random((400, 1)) < 0.1, rng.integers(50, 300, (400, 2)), rng.integers(0, 30, (400, 2)))
+    rects = np.concatenate([corners, corners + sizes], axis=1).tolist()
+
+    merged = mrmap_service._merge_overlapping_rectangles(rects)
+
+    assert merged.tolist() == _legacy_merge_rectangles(rects)
+
+
+def test_mrmap_contours_scale_with_candidate_pixels(mrmap_service):
+    """Test that 5,000 candidate pixels are grouped and merged in well under a second."""
+    import time
+
+    mrmap_service.window_size = 5
+    mrmap_service.min_area = 1
+    rng = np.random.default_rng(7)
+    pixel_anom = np.zeros((3000, 4000), dtype=bool)
+    pixel_anom[rng.integers(0, 3000, 5000), rng.integers(0, 4000, 5000)] = True
+
+    start = time.perf_counter()
+    mask, contours = mrmap_service._getMRMapsContours(pixel_anom)
+    elapsed = time.perf_counter() - start
+
+    assert len(contours) > 0
+    assert mask[pixel_anom].all()
+    assert elapsed < 1.0
@@ -1,9 +1,12 @@
 import pytest
 import numpy as np
+import cv2
+import spectral
 import tempfile
 import os
 from algorithms.images.MatchedFilter.services.MatchedFilterService import MatchedFilterService
 from algorithms.AlgorithmService import AnalysisResult
+from helpers.BackgroundStatistics import BackgroundStatistics
 
 
 @pytest.fixture
@@ -179,3 +182,60 @@ def test_add_confidence_scores(matched_filter_service):
     assert 'confidence' in result[0]
     assert 'score_type' in result[0]
     assert result[0]['score_type'] == 'match'
+
+
+def _spectral_match_scores(service, img):
+    """Mask and scores from one spectral.matched_filter call per color, as the service did before."""
+    combined_mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    combined_scores = np.zeros(img.shape[:2], dtype=np.float32)
+    for color_config in service.color_configs:
+        match_color = color_config['selected_color']
+        color_bgr = np.array([match_color[2], match_color[1], match_color[0]], dtype=np.uint8)
+        scores = spectral.matched_filter(img, color_bgr)
+        mask = np.uint8(scores > color_config['match_filter_threshold'])
+        combined_mask = cv2.bitwise_or(combined_mask, mask)
+        combined_scores = np.maximum(combined_scores, scores * mask.astype(np.float32))
+    return combined_mask, combined_scores
+
+
+@pytest.mark.parametrize('target_count', [1, 5, 20])
+def test_match_scores_match_spectral(test_image, target_count):
+    """One stacked matrix multiply reproduces the per-color spectral.matched_filter results."""
+    rng = np.random.default_rng(target_count)
+    colors = [(100, 150, 200)] + [tuple(int(v) for v in rng.integers(0, 256, 3)) for _ in range(target_count - 1)]
+    options = {'color_configs': [{'selected_color': color, 'match_filter_threshold': 0.2 + 0.02 * index}
+                                 for index, color in enumerate(colors)]}
+    service = MatchedFilterService((100, 150, 200), 10, 1000, 5, True, options)
+    img = test_image.copy()
+    img[120:140, 20:60] = [50, 100, 200]
+
+    expected_mask, expected_scores = _spectral_match_scores(service, img)
+    mask, scores = service.compute_match_scores(img)
+
+    assert np.count_nonzero(expected_mask) > 0
+    np.testing.assert_array_equal(mask, expected_mask)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5, atol=1e-6)
+
+
+def test_match_scores_are_chunked(test_image, monkeypatch):
+    """Scoring in small chunks gives the same result as one pass."""
+    service = MatchedFilterService((100, 150, 200), 10, 1000, 5, True, {})
+    mask, scores = service.compute_match_scores(test_image)
+
+    monkeypatch.setattr(BackgroundStatistics, 'CHUNK_PIXELS', 999)
+    chunked_mask, chunked_scores = service.compute_match_scores(test_image)
+
+    np.testing.assert_array_equal(chunked_mask, mask)
+    np.testing.assert_allclose(chunked_scores, scores, rtol=1e-6)
+
+
+def test_configs_without_color_are_skipped(test_image):
+    """A config without a selected color adds no target."""
+    options = {'color_configs': [{'selected_color': None, 'match_filter_threshold': 0.3}]}
+    service = MatchedFilterService((100, 150, 200), 10, 1000, 5, True, options)
+
+    mask, scores = service.compute_match_scores(test_image)
+
+    assert service.targets.shape == (0, 3)
+    assert not mask.any()
+    assert not scores.any()
@@ -1,5 +1,7 @@
 import pytest
 import numpy as np
+import cv2
+import spectral
 import tempfile
 import os
 from algorithms.images.RXAnomaly.services.RXAnomalyService import RXAnomalyService
@@ -105,3 +107,75 @@ def test_add_confidence_scores(rx_anomaly_service):
     assert 'confidence' in result[0]
     assert 'score_type' in result[0]
     assert result[0]['score_type'] == 'anomaly'  # Service uses 'anomaly', not 'rx_anomaly'
+
+
+def _planted_anomaly_image():
+    """Smooth noisy background with a few small, strongly colored discs."""
+    rng = np.random.default_rng(1)
+    img = rng.normal(110, 6, (240, 320, 3)).clip(0, 255).astype(np.uint8)
+    for center in [(40, 50), (160, 120), (290, 200), (200, 30)]:
+        cv2.circle(img, center, 4, (30, 40, 230), -1)
+    return img
+
+
+def _spectral_rx_values(service, lab_img):
+    """RX values computed segment by segment with spectral.rx, as the service did before."""
+    pieces = service.split_image(lab_img, service.segments)
+    return service.glue_image([[spectral.rx(piece) for piece in row] for row in pieces])
+
+
+@pytest.mark.parametrize('segments', [1, 2, 4])
+def test_rx_values_match_spectral(rx_anomaly_service, segments):
+    """Streaming statistics and the Cholesky factor reproduce spectral.rx."""
+    rx_anomaly_service.segments = segments
+    lab_img = cv2.cvtColor(_planted_anomaly_image(), cv2.COLOR_BGR2LAB)
+
+    expected = _spectral_rx_values(rx_anomaly_service, lab_img)
+    actual = rx_anomaly_service.compute_rx_values(lab_img, 'frame.jpg')
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-7, atol=1e-7)
+
+
+def test_detections_match_spectral(rx_anomaly_service, tmp_path, monkeypatch):
+    """AOIs are the same as with per-segment spectral.rx."""
+    img = _planted_anomaly_image()
+    full_path = str(tmp_path / 'frame.jpg')
+
+    result = rx_anomaly_service.process_image(img, full_path, str(tmp_path), str(tmp_path / 'new'))
+    monkeypatch.setattr(rx_anomaly_service, 'compute_rx_values',
+                        lambda lab_img, path: _spectral_rx_values(rx_anomaly_service, lab_img))
+    expected = rx_anomaly_service.process_image(img, full_path, str(tmp_path), str(tmp_path / 'spectral'))
+
+    assert result.error_message is None
+    assert len(result.areas_of_interest) == len(expected.areas_of_interest) == 4
+    assert [(aoi['center'], aoi['area']) for aoi in result.areas_of_interest] == \
+        [(aoi['center'], aoi['area']) for aoi in expected.areas_of_interest]
+
+
+def test_strided_background_finds_the_same_anomalies(rx_anomaly_service, tmp_path):
+    """Sampling every fourth pixel along both axes still separates the planted discs."""
+    rx_anomaly_service.options['background_stride'] = 4
+    strided_service = RXAnomalyService((255, 0, 0), 10, 1000, 5, True, rx_anomaly_service.options)
+    img = _planted_anomaly_image()
+
+    result = strided_service.process_image(img, str(tmp_path / 'frame.jpg'), str(tmp_path), str(tmp_path / 'out'))
+
+    assert strided_service.background_stride == 4
+    assert len(result.areas_of_interest) == 4
+
+
+def test_shared_background_is_reused_and_refreshed(tmp_path):
+    """Consecutive frames of one folder share statistics until background_refresh frames are scored."""
+    options = {'sensitivity': 7, 'segments': 2, 'shared_background': True, 'background_refresh': 2}
+    service = RXAnomalyService((255, 0, 0), 10, 1000, 5, True, options)
+    lab_img = cv2.cvtColor(_planted_anomaly_image(), cv2.COLOR_BGR2LAB)
+    pieces = service.split_image(lab_img, service.segments)
+
+    first = service._background_statistics(pieces, lab_img.shape, str(tmp_path / 'a' / '1.jpg'))
+    second = service._background_statistics(pieces, lab_img.shape, str(tmp_path / 'a' / '2.jpg'))
+    third = service._background_statistics(pieces, lab_img.shape, str(tmp_path / 'a' / '3.jpg'))
+    other_folder = service._background_statistics(pieces, lab_img.shape, str(tmp_path / 'b' / '1.jpg'))
+
+    assert second is first
+    assert third is not first
+    assert other_folder is not third
@@ -8,6 +8,8 @@ The AlgorithmService base class is located at algorithms/AlgorithmService.py
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
 from algorithms.AlgorithmService import AlgorithmService, AnalysisResult
+from helpers.SparseMask import SparseMask
+from helpers.TemperatureGrid import TemperatureGrid
 import cv2
 import numpy as np
 from pathlib import Path
@@ -169,6 +171,77 @@ def test_identify_areas_of_interest_combine_aois(algorithm_service):
     assert len(areas_of_interest) <= 2
 
 
+def _random_blob_mask(seed, shape=(400, 600), count=60):
+    """Build a mask with random ellipses, rectangles and ring shapes (with holes)."""
+    rng = np.random.default_rng(seed)
+    mask = np.zeros(shape, dtype=np.uint8)
+    for _ in range(count):
+        x, y = int(rng.integers(0, shape[1])), int(rng.integers(0, shape[0]))
+        kind = rng.integers(0, 3)
+        if kind == 0:
+            cv2.ellipse(mask, (x, y), (int(rng.integers(1, 12)), int(rng.integers(1, 12))),
+                        float(rng.integers(0, 180)), 0, 360, 255, -1)
+        elif kind == 1:
+            cv2.rectangle(mask, (x, y), (x + int(rng.integers(0, 15)), y + int(rng.integers(0, 15))), 255, -1)
+        else:
+            cv2.circle(mask, (x, y), int(rng.integers(4, 14)), 255, 2)
+    return mask
+
+
+@pytest.mark.parametrize("combine_aois", [True, False])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_identify_areas_of_interest_matches_per_contour(algorithm_service, combine_aois, seed):
+    """Test that the connected-components engine matches the per-contour implementation."""
+    algorithm_service.combine_aois = combine_aois
+    algorithm_service.max_area = 0
+    mask = _random_blob_mask(seed)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+
+    expected = algorithm_service._identify_areas_of_interest_by_contour(mask.shape, contours)
+    result = algorithm_service.identify_areas_of_interest(mask.shape, contours)
+
+    assert result[1] == expected[1]
+    assert result[0] == expected[0]
+
+
+def test_identify_areas_of_interest_overlapping_contours(algorithm_service):
+    """Test that overlapping input contours are measured contour by contour."""
+    algorithm_service.combine_aois = False
+    contours = [
+        np.array([[[10, 10]], [[10, 40]], [[40, 40]], [[40, 10]]], dtype=np.int32),
+        np.array([[[30, 30]], [[30, 60]], [[60, 60]], [[60, 30]]], dtype=np.int32),
+    ]
+
+    expected = algorithm_service._identify_areas_of_interest_by_contour((100, 100), contours)
+    result = algorithm_service.identify_areas_of_interest((100, 100), contours)
+
+    assert result == expected
+    assert [aoi['area'] for aoi in result[0]] == [961, 961]
+
+
+def test_identify_areas_of_interest_many_blobs_timing(algorithm_service):
+    """Test that 10,000 blobs are extracted quickly without a mask per contour."""
+    import time
+
+    algorithm_service.combine_aois = False
+    algorithm_service.min_area = 1
+    algorithm_service.max_area = 0
+    mask = np.zeros((2000, 2000), dtype=np.uint8)
+    mask[4::20, 4::20] = 255
+    mask[5::20, 4::20] = 255
+    mask[4::20, 5::20] = 255
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    assert len(contours) == 10000
+
+    start = time.perf_counter()
+    areas_of_interest, base_contour_count = algorithm_service.identify_areas_of_interest(mask.shape, contours)
+    elapsed = time.perf_counter() - start
+
+    assert base_contour_count == 10000
+    assert all(aoi['area'] == 3 for aoi in areas_of_interest)
+    assert elapsed < 5.0
+
+
 def test_construct_output_path(algorithm_service):
     """Test constructing output paths from input paths."""
     input_dir = "/input"
@@ -192,7 +265,7 @@ def test_construct_output_path_no_subdir(algorithm_service):
 
 
 def test_store_mask(algorithm_service):
-    """Test storing a mask as a TIFF file."""
+    """Test storing a mask as a sparse mask file."""
     with tempfile.TemporaryDirectory() as tmpdir:
         input_file = os.path.join(tmpdir, "input.jpg")
         output_file = os.path.join(tmpdir, "output.jpg")
@@ -203,8 +276,9 @@ def test_store_mask(algorithm_service):
 
         mask_path = algorithm_service.store_mask(input_file, output_file, mask)
 
-        assert mask_path.endswith('.tif')
+        assert mask_path.endswith(SparseMask.EXTENSION)
         assert os.path.exists(mask_path)
+        np.testing.assert_array_equal(SparseMask.load_mask(mask_path), mask)
 
 
 def test_store_mask_with_temperature(algorithm_service):
@@ -222,8 +296,24 @@ def test_store_mask_with_temperature(algorithm_service):
 
         mask_path = algorithm_service.store_mask(input_file, output_file, mask, temperature_data)
 
-        assert mask_path.endswith('.tif')
-        assert os.path.exists(mask_path)
+        assert mask_path.endswith(SparseMask.EXTENSION)
+        np.testing.assert_array_equal(SparseMask.load_mask(mask_path), mask)
+        grid = TemperatureGrid(str(Path(mask_path).with_suffix(TemperatureGrid.EXTENSION)))
+        np.testing.assert_allclose(grid.window(0, 0, 100, 100), temperature_data, atol=grid.max_error)
+
+
+def test_store_mask_upscales_temperature_to_target_shape(algorithm_service):
+    """Test that thermal data is stored at the visual image resolution."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mask = np.zeros((50, 80), dtype=np.uint8)
+        mask[10:20, 30:40] = 255
+        temperature_data = np.linspace(10, 40, 50 * 80, dtype=np.float32).reshape(50, 80)
+
+        mask_path = algorithm_service.store_mask(os.path.join(tmpdir, "input.jpg"), os.path.join(tmpdir, "output.jpg"),
+                                                 mask, temperature_data, target_shape=(100, 160, 3))
+
+        assert SparseMask(mask_path).shape == (100, 160)
+        assert TemperatureGrid(str(Path(mask_path).with_suffix(TemperatureGrid.EXTENSION))).shape == (100, 160)
 
 
 def test_split_image(algorithm_service):
@@ -284,6 +374,60 @@ def test_apply_hue_expansion(algorithm_service):
     assert np.sum(expanded_mask) >= np.sum(mask)  # Should have at least as many pixels
 
 
+def _legacy_hue_expansion(img, mask, areas_of_interest, hue_range):
+    """Per-pixel hue expansion used before the vectorized implementation."""
+    hsv_img = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    expanded_mask = mask.copy()
+    for aoi in areas_of_interest:
+        hue_values = [hsv_img[py, px, 0] for px, py in aoi.get('detected_pixels', [])
+                      if 0 <= py < hsv_img.shape[0] and 0 <= px < hsv_img.shape[1]]
+        if len(hue_values) == 0:
+            continue
+        avg_hue = int(np.mean(hue_values))
+        hue_min, hue_max = avg_hue - hue_range, avg_hue + hue_range
+        roi_mask = np.zeros(mask.shape[:2], dtype=np.uint8)
+        cv2.circle(roi_mask, aoi['center'], aoi['radius'], 255, -1)
+        roi_y, roi_x = np.where(roi_mask == 255)
+        for py, px in zip(roi_y, roi_x):
+            pixel_hue = hsv_img[py, px, 0]
+            if hue_min < 0:
+                matched = pixel_hue >= (180 + hue_min) or pixel_hue <= hue_max
+            elif hue_max >= 180:
+                matched = pixel_hue >= hue_min or pixel_hue <= (hue_max - 180)
+            else:
+                matched = hue_min <= pixel_hue <= hue_max
+            if matched:
+                expanded_mask[py, px] = 255
+    return expanded_mask
+
+
+@pytest.mark.parametrize("hue_range", [0, 5, 20, 100])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_apply_hue_expansion_matches_pixel_loop(algorithm_service, seed, hue_range):
+    """Test that the vectorized hue expansion selects exactly the same pixels as the per-pixel loop."""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, size=(160, 200, 3), dtype=np.uint8)
+    # Reds sit on the hue wraparound, so include some near-red regions
+    img[20:60, 20:60] = [10, 10, 220]
+    img[100:140, 150:190] = [200, 40, 150]
+    mask = np.zeros((160, 200), dtype=np.uint8)
+    areas_of_interest = []
+    for _ in range(12):
+        cx, cy = int(rng.integers(-5, 205)), int(rng.integers(-5, 165))
+        radius = int(rng.integers(0, 40))
+        pixels = [(int(x), int(y)) for x, y in rng.integers(-3, 203, size=(int(rng.integers(0, 20)), 2))]
+        for x, y in pixels:
+            if 0 <= y < 160 and 0 <= x < 200:
+                mask[y, x] = 255
+        areas_of_interest.append({'center': (cx, cy), 'radius': radius, 'detected_pixels': pixels})
+    areas_of_interest.append({'center': (40, 40), 'radius': 25, 'detected_pixels': [(x, 40) for x in range(30, 50)]})
+
+    expected = _legacy_hue_expansion(img, mask, areas_of_interest, hue_range)
+    result = algorithm_service.apply_hue_expansion(img, mask, areas_of_interest, hue_range)
+
+    np.testing.assert_array_equal(result, expected)
+
+
 def test_process_image(algorithm_service):
     """Test the process_image method returns an AnalysisResult."""
     img = np.zeros((100, 100, 3), dtype=np.uint8)
@@ -328,3 +472,78 @@ def test_analysis_result_with_error():
     assert result.input_path == "/input/image.jpg"
     assert result.error_message == "Test error"
     assert result.areas_of_interest is None
+
+
+def _legacy_mean_confidence(areas_of_interest, score_map, mask, invert):
+    """Per-pixel loop the algorithms used before the shared statistics engine."""
+    detected = score_map[mask > 0]
+    max_score, min_score = np.max(detected), np.min(detected)
+    score_range = max_score - min_score if max_score > min_score else 1.0
+    results = []
+    for aoi in areas_of_interest:
+        scores = [score_map[y, x] for x, y in aoi.get('detected_pixels', [])
+                  if 0 <= y < score_map.shape[0] and 0 <= x < score_map.shape[1]]
+        if not scores:
+            results.append((0.0, 0.0))
+            continue
+        mean_score = np.mean(scores)
+        if invert:
+            normalized = ((max_score - mean_score) / score_range) * 100.0
+        else:
+            normalized = ((mean_score - min_score) / score_range) * 100.0
+        results.append((round(normalized, 1), round(float(mean_score), 3)))
+    return results
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_add_mean_confidence_scores_matches_pixel_loop(algorithm_service, invert):
+    """Test that label-indexed confidence scores match the per-pixel loops."""
+    algorithm_service.combine_aois = False
+    algorithm_service.max_area = 0
+    mask = _random_blob_mask(5)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    areas_of_interest, _ = algorithm_service.identify_areas_of_interest(mask.shape, contours)
+    score_map = np.random.default_rng(5).random(mask.shape).astype(np.float32) * 50
+
+    expected = _legacy_mean_confidence(areas_of_interest, score_map, mask, invert)
+    result = algorithm_service._add_mean_confidence_scores(areas_of_interest, score_map, mask, 'test', invert=invert)
+
+    for aoi, (confidence, raw_score) in zip(result, expected):
+        assert aoi['confidence'] == pytest.approx(confidence, abs=0.1 + 1e-9)
+        assert aoi['raw_score'] == pytest.approx(raw_score, abs=1e-3 + 1e-9)
+        assert aoi['score_type'] == 'test'
+        assert aoi['score_method'] == 'mean'
+
+
+def test_add_mean_temperatures_matches_pixel_loop(algorithm_service):
+    """Test that per-AOI temperatures match the per-pixel loop."""
+    temperature_c = np.random.default_rng(6).uniform(-10, 60, size=(100, 120)).astype(np.float32)
+    areas_of_interest = [
+        {'center': (20, 20), 'detected_pixels': [(x, y) for x in range(15, 25) for y in range(15, 25)]},
+        {'center': (500, 500), 'detected_pixels': [(500, 500)]},
+        {'center': (0, 0)},
+    ]
+
+    algorithm_service._add_mean_temperatures(areas_of_interest, temperature_c)
+
+    expected = np.mean([temperature_c[y, x] for x, y in areas_of_interest[0]['detected_pixels']])
+    assert areas_of_interest[0]['temperature'] == pytest.approx(float(expected), rel=1e-6)
+    assert areas_of_interest[1]['temperature'] is None
+    assert areas_of_interest[2]['temperature'] is None
+
+
+def test_calculate_aoi_representative_color(algorithm_service):
+    """Test that precomputed and on-demand representative colors agree with a pixel average."""
+    img_rgb = np.zeros((50, 50, 3), dtype=np.uint8)
+    img_rgb[10:20, 10:20] = (200, 40, 40)
+    img_rgb[10:12, 10:20] = (100, 40, 40)
+    aoi = {'center': (15, 15), 'radius': 3, 'detected_pixels': [(x, y) for x in range(10, 20) for y in range(10, 20)]}
+
+    result = algorithm_service._calculate_aoi_representative_color(img_rgb, aoi)
+    precomputed = algorithm_service._calculate_aoi_representative_color(img_rgb, aoi, np.array([180.0, 40.0, 40.0]))
+    circle = algorithm_service._calculate_aoi_representative_color(img_rgb, {'center': (15, 15), 'radius': 3})
+
+    assert result['avg_rgb'] == (180, 40, 40)
+    assert precomputed == result
+    assert circle['avg_rgb'] == (200, 40, 40)
+    assert result['hue_degrees'] == 0
@@ -97,6 +97,20 @@ def testData():
     }
 
 
+@pytest.fixture(autouse=True)
+def metadata_index(tmp_path, monkeypatch):
+    """Keep the shared image metadata index in a temporary folder instead of the user's."""
+    try:
+        from core.services.image.MetadataIndexService import MetadataIndexService
+    except ImportError:
+        yield None
+        return
+    MetadataIndexService.shutdown_instance()
+    monkeypatch.setattr(MetadataIndexService, '_get_destination_path', staticmethod(lambda: str(tmp_path / 'ADIAT')))
+    yield MetadataIndexService
+    MetadataIndexService.shutdown_instance()
+
+
 @pytest.fixture(scope='session')
 def app():
     return QApplication.instance() or QApplication([])
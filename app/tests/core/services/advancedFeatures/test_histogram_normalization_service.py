@@ -42,20 +42,72 @@ def test_histogram_normalization_service_initialization_invalid_image():
             HistogramNormalizationService(mock_path)
 
 
-def test_matchHistograms(mock_reference_image, mock_source_image):
-    mock_path = "app/tests/data/rgb/input/DJI_0084.JPG"
-    mock_image_array_ref = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
-    mock_image_array_src = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
-
+def _service_with_reference(reference):
     with patch("PIL.Image.open") as mock_open, \
-            patch("numpy.fromfile", return_value=mock_image_array_ref.tobytes()), \
-            patch("cv2.imdecode", return_value=mock_image_array_ref):
+            patch("numpy.fromfile", return_value=reference.tobytes()), \
+            patch("cv2.imdecode", return_value=reference):
 
         mock_img = MagicMock()
         mock_open.return_value.__enter__.return_value = mock_img
-        service = HistogramNormalizationService(mock_path)
+        return HistogramNormalizationService("app/tests/data/rgb/input/DJI_0084.JPG")
+
+
+def _skewed_image(seed, shape, scale):
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.gamma(2.0, scale, shape), 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matchHistograms(seed):
+    reference = _skewed_image(seed, (90, 110, 3), 30.0)
+    src = _skewed_image(seed + 10, (120, 160, 3), 12.0)
+    service = _service_with_reference(reference)
+
+    result = service.match_histograms(src)
+    expected = exposure.match_histograms(src, reference, channel_axis=-1)
+
+    assert result.dtype == np.uint8
+    assert result.shape == src.shape
+    # The lookup table rounds skimage's interpolated values; skimage returns them as
+    # floats or, in newer releases, truncated to the input dtype
+    assert np.abs(result.astype(np.float64) - expected).max() <= 1.0
+
+
+def test_reference_cdf_computed_once():
+    service = _service_with_reference(_skewed_image(3, (50, 60, 3), 30.0))
+
+    with patch.object(HistogramNormalizationService, "_cumulative_distribution") as cdf:
+        service.match_histograms(_skewed_image(4, (40, 40, 3), 12.0))
+        service.match_histograms(_skewed_image(5, (40, 40, 3), 12.0))
+
+    assert cdf.call_count == 0
+    assert len(service.reference_cdfs) == 3
+
+
+def test_matchHistograms_grayscale():
+    reference = _skewed_image(6, (50, 60), 30.0)
+    src = _skewed_image(7, (40, 70), 12.0)
+    service = _service_with_reference(reference)
+
+    result = service.match_histograms(src)
+
+    assert result.shape == src.shape
+    assert np.abs(result.astype(np.float64) - exposure.match_histograms(src, reference)).max() <= 0.5 + 1e-9
+
+
+def test_matchHistograms_non_uint8_uses_skimage():
+    service = _service_with_reference(_skewed_image(8, (50, 60, 3), 30.0))
+    src = (_skewed_image(9, (40, 40, 3), 12.0).astype(np.uint16) * 256)
+
+    with patch("skimage.exposure.match_histograms", return_value=src) as mock_match_histograms:
+        result = service.match_histograms(src)
+
+    mock_match_histograms.assert_called_once_with(src, service.hist_ref_img, channel_axis=-1)
+    assert np.array_equal(result, src)
+
+
+def test_matchHistograms_channel_mismatch():
+    service = _service_with_reference(_skewed_image(10, (50, 60, 3), 30.0))
 
-    with patch("skimage.exposure.match_histograms", return_value=mock_image_array_src) as mock_match_histograms:
-        result = service.match_histograms(mock_image_array_src)
-        mock_match_histograms.assert_called_once_with(mock_image_array_src, mock_image_array_ref, channel_axis=-1)
-        assert np.array_equal(result, mock_image_array_src)
+    with pytest.raises(ValueError):
+        service.match_histograms(_skewed_image(11, (40, 40, 4), 12.0))
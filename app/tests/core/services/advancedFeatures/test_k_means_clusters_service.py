@@ -29,3 +29,94 @@ def test_generateClusters(mock_source_image):
 
         assert result.shape == mock_source_image.shape
         assert result.dtype == np.uint8
+
+
+SCENE_COLORS = np.array([[40, 90, 60], [120, 140, 150], [30, 40, 200], [200, 200, 210], [90, 60, 30]], dtype=np.float32)
+
+
+def _flight_frame(seed, colors=SCENE_COLORS, shape=(240, 320)):
+    """A frame of a flight: blocks of the scene colors in a random layout, with sensor noise."""
+    rng = np.random.default_rng(seed)
+    layout = rng.integers(0, len(colors), (shape[0] // 16, shape[1] // 16))
+    img = colors[np.kron(layout, np.ones((16, 16), dtype=np.int64))]
+    return (img + rng.normal(0, 4, img.shape)).clip(0, 255).astype(np.uint8)
+
+
+def _fitted_service(seeds, clusters=5):
+    cv2.setRNGSeed(0)
+    service = KMeansClustersService(clusters)
+    service.fit_palette([_flight_frame(seed) for seed in seeds])
+    return service
+
+
+def test_palette_is_stable_across_flight_subsets():
+    first = _fitted_service(range(0, 4)).palette
+    second = _fitted_service(range(4, 8)).palette
+
+    distances = np.linalg.norm(first[:, None, :] - second[None, :, :], axis=2)
+    # Every center has a counterpart in the other fit, and every scene color is found
+    assert distances.min(axis=1).max() < 3
+    assert distances.min(axis=0).max() < 3
+    assert np.linalg.norm(first[:, None, :] - SCENE_COLORS[None, :, :], axis=2).min(axis=0).max() < 3
+
+
+def test_lut_quantization_error_is_small():
+    service = _fitted_service(range(4))
+    img = _flight_frame(10)
+
+    quantized = service.quantize(img).reshape(-1, 3).astype(np.float32)
+    pixels = img.reshape(-1, 3).astype(np.float32)
+    exact = np.uint8(service.palette)[service._nearest_centers(pixels, service.palette)].astype(np.float32)
+
+    assert quantized.shape == pixels.shape
+    # The table is indexed at 6 bits per channel; only pixels near a cell boundary can differ
+    assert np.mean(np.all(quantized == exact, axis=1)) > 0.99
+    lut_error = np.linalg.norm(pixels - quantized, axis=1).mean()
+    exact_error = np.linalg.norm(pixels - exact, axis=1).mean()
+    assert lut_error - exact_error < 0.5
+
+
+def test_quantized_image_only_has_palette_colors():
+    service = _fitted_service(range(4))
+
+    result = service.generate_clusters(_flight_frame(11))
+
+    colors = {tuple(color) for color in result.reshape(-1, 3)}
+    assert colors <= {tuple(color) for color in np.uint8(service.palette)}
+
+
+def test_drifted_frame_is_clustered_on_its_own():
+    service = _fitted_service(range(4))
+    drifted = _flight_frame(12, colors=SCENE_COLORS[:, ::-1] * 0.5 + 100)
+
+    assert service.palette_drift(_flight_frame(13)) <= service.drift_threshold
+    assert service.palette_drift(drifted) > service.drift_threshold
+    with patch("cv2.kmeans", wraps=cv2.kmeans) as kmeans:
+        service.generate_clusters(_flight_frame(13))
+        assert kmeans.call_count == 0
+        result = service.generate_clusters(drifted)
+        assert kmeans.call_count == 1
+    assert result.shape == drifted.shape
+
+
+def test_palette_can_be_passed_to_another_service():
+    service = _fitted_service(range(4))
+    img = _flight_frame(14)
+
+    copy = KMeansClustersService(5, service.get_palette())
+
+    assert copy.palette_error == pytest.approx(service.palette_error)
+    np.testing.assert_array_equal(copy.quantize(img), service.quantize(img))
+    assert KMeansClustersService(5).get_palette() is None
+
+
+def test_stratified_sample_covers_every_cell():
+    img = np.zeros((160, 160, 3), dtype=np.uint8)
+    img[..., 0] = (np.arange(160) // 10)[:, None]
+    img[..., 1] = (np.arange(160) // 10)[None, :]
+
+    sample = KMeansClustersService.stratified_sample(img)
+
+    cells = {(int(b), int(g)) for b, g, _ in sample}
+    assert len(cells) == KMeansClustersService.SAMPLE_GRID ** 2
+    assert len(sample) == KMeansClustersService.SAMPLE_GRID ** 2 * KMeansClustersService.SAMPLES_PER_STRATUM
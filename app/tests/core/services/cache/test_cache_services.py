@@ -112,3 +112,26 @@ def test_temperature_cache_service_save():
 
     # Verify temperature was stored
     assert 'temperature' in aoi or service.get_temperature('test_image.jpg', aoi) is not None
+
+
+def test_temperature_cache_service_reads_uncached_aois_from_grid(tmp_path):
+    """Test that an uncached AOI's temperature is measured on the registered temperature grid."""
+    from helpers.TemperatureGrid import TemperatureGrid
+
+    temperatures = np.full((200, 300), 15.0, dtype=np.float32)
+    temperatures[90:110, 140:160] = 36.6
+    grid_path = str(tmp_path / f'image{TemperatureGrid.EXTENSION}')
+    TemperatureGrid.write(grid_path, temperatures)
+
+    service = TemperatureCacheService()
+    cached = {'center': (20, 20), 'radius': 5}
+    service.save_temperature('/data/image.jpg', cached, 21.0)
+    uncached = {'center': (150, 100), 'radius': 8}
+    assert service.get_temperature('/data/image.jpg', uncached) is None
+
+    service.register_grid('/data/image.jpg', grid_path)
+
+    assert service.get_temperature('/data/image.jpg', cached) == 21.0
+    assert service.get_temperature('/data/image.jpg', uncached) == pytest.approx(36.6, abs=0.01)
+    assert service.get_stats() == {'memory_count': 2, 'grid_count': 1}
+    assert service.get_temperature('/data/other.jpg', uncached) is None
@@ -47,3 +47,28 @@ def test_highlight_aois(image_highlight_service, test_image):
 
     assert highlighted.shape == test_image.shape
     assert highlighted.dtype == test_image.dtype
+
+
+def test_sparse_mask_highlight_matches_dense_mask(tmp_path):
+    """Test that highlighting from sparse mask crops matches highlighting from the whole mask."""
+    import cv2
+    from helpers.SparseMask import SparseMask
+
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (300, 400, 3), dtype=np.uint8)
+    mask = np.zeros((300, 400), dtype=np.uint8)
+    cv2.circle(mask, (100, 80), 15, 255, -1)
+    cv2.rectangle(mask, (250, 200), (330, 260), 255, -1)
+    mask[5, 390] = 255
+    sparse_path = str(tmp_path / f'mask{SparseMask.EXTENSION}')
+    png_path = str(tmp_path / 'mask.png')
+    SparseMask.write(sparse_path, mask)
+    cv2.imwrite(png_path, mask)
+
+    expected = ImageHighlightService.apply_mask_highlight(image, png_path, (255, 0, 255))
+    np.testing.assert_array_equal(ImageHighlightService.apply_mask_highlight(image, sparse_path, (255, 0, 255)), expected)
+
+    # A mask stored at another resolution is resized like any other mask
+    half = cv2.resize(image, (200, 150))
+    np.testing.assert_array_equal(ImageHighlightService.apply_mask_highlight(half, sparse_path, (255, 0, 255)),
+                                  ImageHighlightService.apply_mask_highlight(half, png_path, (255, 0, 255)))
@@ -273,3 +273,28 @@ def test_get_thermal_data_with_mask():
             os.unlink(tmp_path)
         if os.path.exists(mask_path):
             os.unlink(mask_path)
+
+
+def test_get_thermal_data_from_temperature_grid(tmp_path):
+    """Test that a sparse mask's temperature grid is opened for point reads in either unit."""
+    from helpers.SparseMask import SparseMask
+    from helpers.TemperatureGrid import TemperatureGrid
+
+    image_path = str(tmp_path / 'image.jpg')
+    cv2.imwrite(image_path, np.zeros((100, 120, 3), dtype=np.uint8))
+    mask = np.zeros((100, 120), dtype=np.uint8)
+    mask[10:20, 10:20] = 255
+    mask_path = str(tmp_path / f'image{SparseMask.EXTENSION}')
+    SparseMask.write(mask_path, mask)
+    rgb_service = ImageService(image_path, mask_path=mask_path)
+    assert rgb_service.get_thermal_data('C') is None
+
+    temperatures = np.full((100, 120), 25.5, dtype=np.float32)
+    TemperatureGrid.write(str(tmp_path / f'image{TemperatureGrid.EXTENSION}'), temperatures)
+    service = ImageService(image_path, mask_path=mask_path)
+
+    thermal_c = service.get_thermal_data('C')
+    thermal_f = service.get_thermal_data('F')
+    assert thermal_c.shape == (100, 120)
+    assert thermal_c[50, 60] == pytest.approx(25.5)
+    assert thermal_f[50][60] == pytest.approx(25.5 * 1.8 + 32.0)
@@ -0,0 +1,207 @@
+"""
+Tests for MetadataIndexService.
+
+Tests indexing, invalidation on file changes, spatial queries and concurrent access.
+"""
+
+import os
+import threading
+
+import piexif
+import pytest
+from PIL import Image
+from unittest.mock import patch
+
+from core.services.image.MetadataIndexService import MetadataIndexService
+from helpers.MetaDataHelper import MetaDataHelper
+
+
+def _make_image(path, latitude, longitude, size=(40, 30)):
+    """Write a small JPEG with DJI EXIF and a GPS position."""
+    exif_dict = {
+        "0th": {piexif.ImageIFD.Make: b"DJI", piexif.ImageIFD.Model: b"M3T"},
+        "Exif": {piexif.ExifIFD.FocalLength: (45, 10), piexif.ExifIFD.DateTimeOriginal: b"2024:05:01 10:20:30"},
+        "Interop": {}, "1st": {}, "thumbnail": None
+    }
+    MetaDataHelper._set_gps_location(exif_dict, latitude, longitude, 150)
+    Image.new('RGB', size).save(str(path), 'JPEG', exif=piexif.dump(exif_dict))
+    return str(path)
+
+
+def _entry(path, latitude, longitude, footprint=None):
+    """Build an index entry for spatial tests."""
+    entry = dict.fromkeys(MetadataIndexService.COLUMNS)
+    signature = MetadataIndexService.signature(path)
+    entry.update(path=MetadataIndexService.key(path), size=signature[0], mtime_ns=signature[1],
+                 latitude=latitude, longitude=longitude, footprint=footprint)
+    return entry
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Fixture providing an index in a temporary database."""
+    index = MetadataIndexService(str(tmp_path / 'index' / 'metadata_index.sqlite'))
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def metadata_batch():
+    """Replace ExifTool batch reads with DJI XMP tags and record the paths read."""
+    reads = []
+
+    def get_metadata_batch(paths, tags=None):
+        reads.extend(paths)
+        return {path: {'EXIF:Make': 'DJI', 'XMP:RelativeAltitude': 80.0, 'XMP:AbsoluteAltitude': 150.0,
+                       'XMP:GimbalPitchDegree': -90.0, 'XMP:GimbalYawDegree': 30.0, 'XMP:FlightYawDegree': 25.0}
+                for path in paths}
+
+    with patch.object(MetaDataHelper, 'get_metadata_batch', side_effect=get_metadata_batch):
+        yield reads
+
+
+def test_update_indexes_each_image_once(tmp_path, index, metadata_batch):
+    paths = [_make_image(tmp_path / f'img{i}.jpg', 40.0 + i * 0.001, -105.0) for i in range(3)]
+
+    assert index.update(paths) == 3
+    assert index.update(paths) == 0
+    assert sorted(metadata_batch) == sorted(paths)
+
+    entry = index.get(paths[1])
+    assert entry['path'] == paths[1]
+    assert entry['latitude'] == pytest.approx(40.001, abs=1e-5)
+    assert entry['longitude'] == pytest.approx(-105.0, abs=1e-5)
+    assert entry['relative_altitude'] == pytest.approx(80.0)
+    assert entry['gimbal_pitch'] == pytest.approx(-90.0)
+    assert entry['camera_yaw'] == pytest.approx(30.0)
+    assert entry['make'] == 'DJI'
+    assert entry['model'] == 'M3T'
+    assert entry['focal_length_mm'] == pytest.approx(4.5)
+    assert entry['capture_time'] == '2024:05:01 10:20:30'
+    assert (entry['image_width'], entry['image_height']) == (40, 30)
+
+
+def test_changed_image_is_reindexed(tmp_path, index, metadata_batch):
+    path = _make_image(tmp_path / 'img.jpg', 40.0, -105.0)
+    other = _make_image(tmp_path / 'other.jpg', 41.0, -105.0)
+    index.update([path, other])
+
+    _make_image(path, 42.0, -106.0, size=(60, 40))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert index.get(path) is None
+    assert index.get(other) is not None
+    assert index.update([path, other]) == 1
+    assert metadata_batch[-1:] == [path]
+    entry = index.get(path)
+    assert entry['latitude'] == pytest.approx(42.0, abs=1e-5)
+    assert (entry['image_width'], entry['image_height']) == (60, 40)
+    assert [result[0] for result in index.images_near(40.0, -105.0, 1000)] == []
+    assert [result[0] for result in index.images_near(42.0, -106.0, 1000)] == [path]
+
+
+def test_unreadable_image_is_not_read_again(tmp_path, index, metadata_batch):
+    path = tmp_path / 'broken.jpg'
+    path.write_bytes(b'not an image')
+
+    assert index.update([str(path)]) == 1
+    assert index.update([str(path)]) == 0
+    entry = index.get(str(path))
+    assert entry['latitude'] is None
+    assert entry['image_width'] is None
+
+
+def test_update_skips_missing_files_and_stops_when_cancelled(tmp_path, index, metadata_batch):
+    path = _make_image(tmp_path / 'img.jpg', 40.0, -105.0)
+
+    assert index.update([str(tmp_path / 'missing.jpg')]) == 0
+    assert index.update([path], cancel_check=lambda: True) == 0
+    assert metadata_batch == []
+    assert index.get(path) is None
+
+
+def test_images_near_returns_closest_first(tmp_path, index):
+    paths = [str(tmp_path / f'img{i}.jpg') for i in range(4)]
+    for path in paths:
+        open(path, 'wb').close()
+    # About 0, 111, 222 and 2224 meters north of the query point
+    index._write_entries([_entry(path, 40.0 + offset, -105.0)
+                          for path, offset in zip(paths, (0.0, 0.001, 0.002, 0.02))])
+
+    results = index.images_near(40.0, -105.0, 300)
+    assert [path for path, _ in results] == [MetadataIndexService.key(path) for path in paths[:3]]
+    assert [distance for _, distance in results] == pytest.approx([0, 111.2, 222.4], abs=0.5)
+
+    filtered = index.images_near(40.0, -105.0, 300, paths=[paths[2], paths[3]])
+    assert [path for path, _ in filtered] == [paths[2]]
+
+
+def test_images_covering_tests_the_footprint(tmp_path, index):
+    square, diamond = str(tmp_path / 'square.jpg'), str(tmp_path / 'diamond.jpg')
+    for path in (square, diamond):
+        open(path, 'wb').close()
+    index._write_entries([
+        _entry(square, 40.0, -105.0, [[39.999, -105.001], [39.999, -104.999], [40.001, -104.999], [40.001, -105.001]]),
+        _entry(diamond, 40.0, -105.0, [[39.999, -105.0], [40.0, -104.999], [40.001, -105.0], [40.0, -105.001]]),
+    ])
+
+    assert sorted(index.images_covering(40.0, -105.0)) == sorted(
+        MetadataIndexService.key(path) for path in (square, diamond))
+    # Inside the bounding box of both footprints, but outside the rotated one
+    assert index.images_covering(40.0009, -104.9991, paths=[square, diamond]) == [square]
+    assert index.images_covering(40.01, -105.0) == []
+
+
+def test_readers_and_writer_share_the_database(tmp_path, index):
+    paths = [str(tmp_path / f'img{i}.jpg') for i in range(200)]
+    for path in paths:
+        open(path, 'wb').close()
+    errors = []
+    done = threading.Event()
+
+    def write():
+        try:
+            for start in range(0, len(paths), 20):
+                index._write_entries([_entry(path, 40.0, -105.0) for path in paths[start:start + 20]])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                # Whole batches are committed at once
+                assert len(index.get_many(paths)) % 20 == 0
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(index.get_many(paths)) == len(paths)
+    other = MetadataIndexService(index.db_path)
+    try:
+        assert len(other.get_many(paths)) == len(paths)
+    finally:
+        other.close()
+
+
+def test_schema_change_rebuilds_the_index(tmp_path, index):
+    path = str(tmp_path / 'img.jpg')
+    open(path, 'wb').close()
+    index._write_entries([_entry(path, 40.0, -105.0)])
+    index.close()
+
+    with patch.object(MetadataIndexService, 'SCHEMA_VERSION', MetadataIndexService.SCHEMA_VERSION + 1):
+        rebuilt = MetadataIndexService(index.db_path)
+    try:
+        assert rebuilt.get(path) is None
+        assert rebuilt.images_near(40.0, -105.0, 10) == []
+    finally:
+        rebuilt.close()
@@ -0,0 +1,121 @@
+import pytest
+import numpy as np
+from core.services.AnalysisManifestService import AnalysisManifestService
+from helpers.AOIPixels import AOIPixels
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    service = AnalysisManifestService(str(tmp_path))
+    yield service
+    service.close()
+
+
+def _sample_aoi():
+    return {
+        'center': (np.int64(12), np.int64(7)),
+        'radius': 5,
+        'area': np.float64(21.5),
+        'contour': [[10, 5], [14, 5], [14, 9]],
+        'detected_pixels': AOIPixels.from_list([[10, 5], [11, 5], [12, 6]]),
+        'confidence': np.float32(87.5),
+        'color_info': {'rgb': (200, 10, 10), 'hex': '#c80a0a', 'hue_degrees': 357}
+    }
+
+
+def test_append_round_trips_aois(manifest):
+    manifest.open(append=False)
+    manifest.append('sub/a.jpg', 'abc', 'settings', 'sub/a.tif', [_sample_aoi()], 3)
+    manifest.close()
+
+    record = manifest.load('settings')['sub/a.jpg']
+    aoi = record['aois'][0]
+    assert record['content_hash'] == 'abc'
+    assert record['mask_path'] == 'sub/a.tif'
+    assert record['base_contour_count'] == 3
+    assert aoi['center'] == (12, 7)
+    assert isinstance(aoi['center'], tuple)
+    assert aoi['area'] == 21.5
+    assert aoi['contour'] == [[10, 5], [14, 5], [14, 9]]
+    assert aoi['detected_pixels'] == AOIPixels.from_list([[10, 5], [11, 5], [12, 6]])
+    assert aoi['confidence'] == 87.5
+    assert aoi['color_info']['rgb'] == (200, 10, 10)
+
+
+def test_append_returns_record_as_loaded(manifest):
+    manifest.open(append=False)
+    returned = manifest.append('a.jpg', 'abc', 'settings', None, [_sample_aoi()])
+    manifest.close()
+    assert returned == manifest.load('settings')['a.jpg']
+
+
+def test_torn_line_is_ignored_and_appending_continues(manifest):
+    manifest.open(append=False)
+    manifest.append('a.jpg', 'h1', 'settings', None, [])
+    manifest.close()
+    with open(manifest.path, 'a', encoding='utf-8') as f:
+        f.write('{"path":"b.jpg","content_ha')
+
+    manifest.open(append=True)
+    manifest.append('c.jpg', 'h3', 'settings', None, [])
+    manifest.close()
+
+    assert list(manifest.load('settings')) == ['a.jpg', 'c.jpg']
+
+
+def test_last_record_wins_and_settings_filter(manifest):
+    manifest.open(append=False)
+    manifest.append('a.jpg', 'old', 'settings', None, [])
+    manifest.append('a.jpg', 'new', 'settings', None, [])
+    manifest.append('b.jpg', 'h2', 'other', None, [])
+    manifest.close()
+
+    records = manifest.load('settings')
+    assert list(records) == ['a.jpg']
+    assert records['a.jpg']['content_hash'] == 'new'
+    assert manifest.load('missing') == {}
+
+
+def test_open_without_append_discards_records(manifest):
+    manifest.open(append=False)
+    manifest.append('a.jpg', 'h1', 'settings', None, [])
+    manifest.open(append=False)
+    manifest.close()
+    assert manifest.read_records() == {}
+
+
+def test_settings_hash_ignores_key_order():
+    first = AnalysisManifestService.settings_hash({'min_area': 10, 'options': {'a': 1, 'b': (1, 2)}})
+    second = AnalysisManifestService.settings_hash({'options': {'b': (1, 2), 'a': 1}, 'min_area': 10})
+    changed = AnalysisManifestService.settings_hash({'min_area': 11, 'options': {'a': 1, 'b': (1, 2)}})
+    assert first == second
+    assert first != changed
+
+
+def test_file_hash_matches_in_memory_hash(tmp_path):
+    data = np.random.default_rng(0).integers(0, 256, 3 * 1024 * 1024 + 17, dtype=np.uint8)
+    path = tmp_path / 'image.bin'
+    data.tofile(path)
+    assert AnalysisManifestService.file_content_hash(str(path)) == AnalysisManifestService.content_hash(data)
+    assert AnalysisManifestService.content_hash(data.tobytes()) == AnalysisManifestService.content_hash(data)
+
+
+def test_append_opens_manifest_on_demand(manifest):
+    manifest.append('a.jpg', 'h1', 'settings', None, [])
+    manifest.close()
+    assert list(manifest.load('settings')) == ['a.jpg']
+
+
+def test_index_summarizes_records_and_reads_them_back(manifest):
+    manifest.open(append=False)
+    manifest.append('a.jpg', 'h1', 'settings', 'a.tif', [_sample_aoi(), _sample_aoi()])
+    manifest.append('b.jpg', 'h2', 'other', None, [])
+    manifest.close()
+
+    index = manifest.index('settings')
+    assert list(index) == ['a.jpg']
+    assert index['a.jpg']['content_hash'] == 'h1'
+    assert index['a.jpg']['mask_path'] == 'a.tif'
+    assert index['a.jpg']['aoi_count'] == 2
+    record = manifest.read_record(index['a.jpg']['offset'])
+    assert record['aois'][0]['center'] == (12, 7)
@@ -8,8 +8,10 @@ import pytest
 import tempfile
 import os
 from unittest.mock import patch, MagicMock
-from PySide6.QtCore import QObject
+from PySide6.QtCore import QObject, Qt
 from core.services.AnalyzeService import AnalyzeService
+from core.services.AnalysisManifestService import AnalysisManifestService
+from core.services.XmlService import XmlService
 
 
 @pytest.fixture
@@ -140,3 +142,470 @@ def test_analyze_service_cancellation(analyze_service):
     assert analyze_service.cancelled is False
     analyze_service.cancelled = True
     assert analyze_service.cancelled is True
+
+
+def test_analyze_service_reuses_warm_pool(analyze_service):
+    """Test that a second run with the same process count reuses the worker pool."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        service = AnalyzeService(
+            id=2,
+            algorithm=analyze_service.algorithm,
+            input=tmpdir,
+            output=tmpdir,
+            identifier_color=(100, 150, 200),
+            min_area=10,
+            num_processes=1,
+            max_aois=100,
+            aoi_radius=5,
+            histogram_reference_path=None,
+            kmeans_clusters=None,
+            options=analyze_service.options,
+            max_area=1000
+        )
+        assert service.pool is analyze_service.pool
+
+
+def test_worker_objects_constructed_once_per_worker():
+    """Test that a worker builds its algorithm and helpers once, not once per image."""
+    import cv2
+    import numpy as np
+    from core.services import AnalyzeService as analyze_module
+    from core.services.advancedFeatures.HistogramNormalizationService import HistogramNormalizationService
+    from core.services.advancedFeatures.KMeansClustersService import KMeansClustersService
+    from algorithms.images.ColorRange.services.ColorRangeService import ColorRangeService
+
+    algorithm = {
+        'name': 'ColorRange',
+        'type': 'RGB',
+        'service': 'ColorRangeService',
+        'combine_overlapping_aois': True
+    }
+    options = {'color_ranges': [{'color_range': [(0, 0, 200), (60, 60, 255)]}]}
+
+    algorithm_cls = MagicMock(side_effect=ColorRangeService)
+    histogram_cls = MagicMock(side_effect=HistogramNormalizationService)
+    kmeans_cls = MagicMock(side_effect=KMeansClustersService)
+
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            patch.object(analyze_module, 'ColorRangeService', algorithm_cls), \
+            patch.object(analyze_module, 'HistogramNormalizationService', histogram_cls), \
+            patch.object(analyze_module, 'KMeansClustersService', kmeans_cls):
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        hist_ref_path = os.path.join(tmpdir, 'reference.png')
+        cv2.imwrite(hist_ref_path, np.random.default_rng(0).integers(0, 256, (40, 60, 3), dtype=np.uint8))
+
+        AnalyzeService._init_worker(algorithm, (255, 0, 0), 5, options, hist_ref_path, 4, False)
+
+        for i in range(50):
+            img = np.full((40, 60, 3), 30, dtype=np.uint8)
+            img[10:20, 10 + i % 30:20 + i % 30] = (20, 20, 240)
+            path = os.path.join(input_dir, f'img_{i:02d}.png')
+            cv2.imwrite(path, img)
+            result = AnalyzeService.process_file(algorithm, (255, 0, 0), 1, 0, 5, options, path, input_dir, output_dir,
+                                                 hist_ref_path, 4, False)
+            assert result is not None
+            assert result.error_message is None
+
+    assert algorithm_cls.call_count == 1
+    assert histogram_cls.call_count == 1
+    assert kmeans_cls.call_count == 1
+
+
+@pytest.mark.parametrize("num_processes, threads", [(2, 4), (4, 2), (16, 1)])
+def test_worker_onnx_sessions_split_cpu_threads_by_pool_size(num_processes, threads):
+    """Test that AI person detector sessions in the workers get their share of the CPU cores."""
+    from core.services import AnalyzeService as analyze_module
+    from algorithms.images.AIPersonDetector.services import AIPersonDetectorService as ai_person_detector_module
+
+    algorithm = {'name': 'AIPersonDetector', 'type': 'RGB', 'service': 'AIPersonDetectorService',
+                 'combine_overlapping_aois': True}
+    options = {'person_detector_confidence': 50, 'cpu_only': True}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with patch.object(AnalyzeService, '_acquire_pool') as acquire_pool:
+            service = AnalyzeService(1, algorithm, tmpdir, tmpdir, (255, 0, 0), 10, num_processes, 100, 5,
+                                     None, None, options, 0)
+    worker_options = acquire_pool.call_args.args[1][3]
+    assert worker_options['num_processes'] == num_processes
+    assert service.options == {'person_detector_confidence': 50, 'cpu_only': True}
+
+    ai_person_detector_module._onnx_sessions.clear()
+    try:
+        with patch.object(ai_person_detector_module.CPUService, 'get_cpu_count', return_value=8), \
+                patch.object(ai_person_detector_module.ort, 'InferenceSession') as inference_session:
+            instance = AnalyzeService._get_worker_algorithm(algorithm, (255, 0, 0), 5, worker_options)
+            instance._get_onnx_session()
+        assert inference_session.call_args.kwargs['sess_options'].intra_op_num_threads == threads
+    finally:
+        ai_person_detector_module._onnx_sessions.clear()
+        analyze_module._worker_cache.clear()
+
+
+def test_first_result_arrives_before_discovery_finishes():
+    """Test that images are analyzed while a slow filesystem is still being listed."""
+    import threading
+    import time
+    import cv2
+    import numpy as np
+
+    algorithm = {
+        'name': 'ColorRange',
+        'type': 'RGB',
+        'service': 'ColorRangeService',
+        'combine_overlapping_aois': True
+    }
+    options = {'color_ranges': [{'color_range': [(0, 0, 200), (60, 60, 255)]}]}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        os.makedirs(os.path.join(input_dir, 'nested'))
+        os.makedirs(output_dir)
+        for i in range(3):
+            img = np.full((40, 60, 3), 30, dtype=np.uint8)
+            img[10:20, 10:20] = (20, 20, 240)
+            cv2.imwrite(os.path.join(input_dir, f'img_{i}.png'), img)
+            cv2.imwrite(os.path.join(input_dir, 'nested', f'img_{i}.png'), img)
+        with open(os.path.join(input_dir, 'notes.txt'), 'w') as f:
+            f.write('not an image')
+
+        events = {}
+
+        def slow_scandir(path):
+            for entry in sorted(os.scandir(path), key=lambda e: e.name):
+                time.sleep(0.3)
+                yield entry
+            # The last listing to finish marks the end of discovery
+            events['discovery_done'] = time.perf_counter()
+
+        service = AnalyzeService(1, algorithm, input_dir, output_dir, (255, 0, 0), 1, 1, 100, 5,
+                                 None, None, options, 0)
+        service._scandir = slow_scandir
+        messages = []
+        service.sig_msg.connect(messages.append, type=Qt.DirectConnection)
+        original_complete = service._process_complete
+        first_result = threading.Event()
+
+        def record_complete(result):
+            events.setdefault('first_result', time.perf_counter())
+            first_result.set()
+            original_complete(result)
+
+        service._process_complete = record_complete
+        service.process_files()
+
+        assert first_result.is_set()
+        assert events['first_result'] < events['discovery_done']
+        assert service._discovered_images == 7
+        assert service._validated_images == 6
+        assert service._completed_images == 6
+        assert any('notes.txt' in m and 'not an image' in m for m in messages)
+        assert any(m.startswith('Discovered 7 files, validated 6 images') for m in messages)
+        assert os.path.exists(os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Data.xml'))
+
+
+def test_validation_errors_skip_the_file_and_queueing_errors_are_reported():
+    """Test that errors on the validation threads are reported instead of lost."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        _write_resume_dataset(input_dir)
+        os.makedirs(output_dir)
+        is_valid_image = AnalyzeService._is_valid_image
+
+        def failing_validation(file):
+            if file.endswith('img_1.png'):
+                raise RuntimeError('header read failed')
+            return is_valid_image(file)
+
+        service = _resume_service(input_dir, output_dir)
+        messages = []
+        service.sig_msg.connect(messages.append, type=Qt.DirectConnection)
+        with patch.object(AnalyzeService, '_is_valid_image', side_effect=failing_validation):
+            service.process_files()
+
+        assert service._discovered_images == 6
+        assert service._validated_images == 5
+        assert service._completed_images == 5
+        assert any('img_1.png' in m and 'header read failed' in m for m in messages)
+
+        failing = _resume_service(input_dir, output_dir)
+        with patch.object(failing.pool, 'apply_async', side_effect=RuntimeError('pool is broken')), \
+                patch.object(failing.logger, 'error') as log_error:
+            failing.process_files()
+
+        assert any('pool is broken' in str(call.args[0]) for call in log_error.call_args_list)
+
+
+def _write_resume_dataset(input_dir):
+    """Write six small images, four of which contain a red target."""
+    import cv2
+    import numpy as np
+
+    os.makedirs(os.path.join(input_dir, 'nested'))
+    for i in range(6):
+        img = np.full((40, 60, 3), 30, dtype=np.uint8)
+        if i % 3 != 2:
+            img[5 + i:15 + i, 10 + 4 * i:20 + 4 * i] = (240, 20, 20)
+        folder = input_dir if i < 3 else os.path.join(input_dir, 'nested')
+        cv2.imwrite(os.path.join(folder, f'img_{i}.png'), img)
+
+
+def _resume_service(input_dir, output_dir, resume=False):
+    algorithm = {
+        'name': 'ColorRange',
+        'type': 'RGB',
+        'service': 'ColorRangeService',
+        'combine_overlapping_aois': True
+    }
+    options = {'color_ranges': [{'color_range': [(0, 0, 200), (60, 60, 255)]}]}
+    return AnalyzeService(1, algorithm, input_dir, output_dir, (255, 0, 0), 1, 1, 100, 5,
+                          None, None, options, 0, resume=resume)
+
+
+def test_resume_after_kill_reprocesses_only_remaining_images():
+    """Test that resuming an interrupted run gives the same results while skipping finished images."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        _write_resume_dataset(input_dir)
+        os.makedirs(output_dir)
+        xml_path = os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Data.xml')
+
+        service = _resume_service(input_dir, output_dir)
+        service.process_files()
+        assert service._validated_images == 6
+        with open(xml_path, 'rb') as f:
+            baseline = f.read()
+        manifest_path = service.manifest.path
+        with open(manifest_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        assert len(lines) == 6
+
+        # Simulate a kill after two images: no XML yet and a half-written third record
+        os.remove(xml_path)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:2])
+            f.write(lines[2][:len(lines[2]) // 2])
+
+        resumed = _resume_service(input_dir, output_dir, resume=True)
+        resumed.process_files()
+
+        assert resumed._resumed_images == 2
+        assert resumed._validated_images == 4
+        assert resumed._completed_images == 4
+        assert resumed.images_with_aois == 4
+        with open(xml_path, 'rb') as f:
+            assert f.read() == baseline
+
+        # Resuming a finished run analyzes nothing
+        again = _resume_service(input_dir, output_dir, resume=True)
+        again.process_files()
+        assert again._resumed_images == 6
+        assert again._validated_images == 0
+        with open(xml_path, 'rb') as f:
+            assert f.read() == baseline
+
+
+def test_resume_reprocesses_changed_images_and_restarts_on_new_settings():
+    """Test that changed files are analyzed again and different settings start a fresh run."""
+    import cv2
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        _write_resume_dataset(input_dir)
+        os.makedirs(output_dir)
+
+        _resume_service(input_dir, output_dir).process_files()
+
+        img = np.full((40, 60, 3), 30, dtype=np.uint8)
+        img[20:30, 30:40] = (240, 20, 20)
+        cv2.imwrite(os.path.join(input_dir, 'img_2.png'), img)
+
+        resumed = _resume_service(input_dir, output_dir, resume=True)
+        resumed.process_files()
+        assert resumed._resumed_images == 5
+        assert resumed._validated_images == 1
+        images = XmlService(os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Data.xml')).get_images()
+        assert any(image['path'].endswith('img_2.png') for image in images)
+
+        changed = _resume_service(input_dir, output_dir, resume=True)
+        changed.min_area = 2
+        changed._settings_hash = AnalysisManifestService.settings_hash(changed._manifest_settings())
+        changed.process_files()
+        assert changed._resumed_images == 0
+        assert changed._validated_images == 6
+
+
+def test_stage_timings_are_summarized_for_every_stage():
+    """Test that a run writes a timing summary covering every processing stage."""
+    import json
+    import cv2
+    import numpy as np
+    from helpers.AnalysisTimings import ImageStageTimings
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        for i in range(2):
+            img = np.full((80, 120, 3), 30, dtype=np.uint8)
+            img[20:40, 20 + 30 * i:40 + 30 * i] = (240, 20, 20)
+            cv2.imwrite(os.path.join(input_dir, f'img_{i}.png'), img)
+
+        algorithm = {'name': 'ColorRange', 'type': 'RGB', 'service': 'ColorRangeService', 'combine_overlapping_aois': True}
+        options = {'color_ranges': [{'color_range': [(0, 0, 200), (60, 60, 255)]}]}
+        # Histogram reference, k-means and downscaling so every optional stage runs
+        service = AnalyzeService(1, algorithm, input_dir, output_dir, (255, 0, 0), 1, 1, 100, 5,
+                                 os.path.join(input_dir, 'img_0.png'), 4, options, 0, 0.5)
+        service.process_files()
+
+        with open(os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Timings.json'), encoding='utf-8') as f:
+            timings = json.load(f)
+        assert timings['images'] == 2
+        assert set(timings['stages']) == set(ImageStageTimings.STAGES)
+        for stage, values in timings['stages'].items():
+            assert values['total_ms'] >= 0
+            assert values['mean_ms'] >= 0
+            assert values['p95_ms'] >= 0
+        assert timings['stages']['decode']['total_ms'] > 0
+        assert timings['stages']['total']['total_ms'] >= timings['stages']['algorithm']['total_ms']
+
+
+def test_shared_kmeans_palette_is_fitted_once_and_used_by_every_image():
+    """Test that the shared palette is fitted from the flight and quantizes every image."""
+    import cv2
+    import numpy as np
+    from core.services import AnalyzeService as analyze_module
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        files = []
+        for i in range(12):
+            img = np.full((80, 120, 3), (40, 90, 60), dtype=np.uint8)
+            img[:, 60:] = (120, 140, 150)
+            img[20:40, 20 + 5 * i:40 + 5 * i] = (20, 20, 240)
+            files.append(os.path.join(input_dir, f'img_{i:02d}.png'))
+            cv2.imwrite(files[-1], img)
+
+        algorithm = {'name': 'ColorRange', 'type': 'RGB', 'service': 'ColorRangeService', 'combine_overlapping_aois': True}
+        options = {'color_ranges': [{'color_range': [(200, 0, 0), (255, 60, 60)]}]}
+        service = AnalyzeService(1, algorithm, input_dir, output_dir, (255, 0, 0), 1, 1, 100, 5, None, 3, options, 0,
+                                 kmeans_shared_palette=True)
+        service._fit_kmeans_palette(files)
+
+        centers, error = service.kmeans_palette
+        assert len(centers) == 3
+        assert error >= 0
+
+        with patch.object(analyze_module.KMeansClustersService, 'quantize',
+                          autospec=True, side_effect=analyze_module.KMeansClustersService.quantize) as quantize:
+            result = AnalyzeService.process_file(algorithm, (255, 0, 0), 1, 0, 5, options, files[0], input_dir,
+                                                 output_dir, None, 3, False, 1.0, service.kmeans_palette)
+        assert result.error_message is None
+        assert len(result.areas_of_interest) == 1
+        assert quantize.call_count == 1
+
+
+def _write_jpeg_with_targets(path, width=1600, height=1200):
+    """Write a JPEG with a few large red squares on a dark background, in BGR order."""
+    import cv2
+    import numpy as np
+
+    img = np.full((height, width, 3), 30, dtype=np.uint8)
+    for x, y in ((200, 150), (900, 500), (1300, 1000)):
+        img[y:y + 60, x:x + 60] = (20, 20, 240)
+    cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return img
+
+
+def test_reduced_decode_picks_largest_covering_reduction():
+    """Test that JPEGs are decoded at the largest power-of-two size covering the processing size."""
+    import cv2
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        jpeg_path = os.path.join(tmpdir, 'img.jpg')
+        png_path = os.path.join(tmpdir, 'img.png')
+        cv2.imwrite(png_path, _write_jpeg_with_targets(jpeg_path))
+        jpeg_bytes = np.fromfile(jpeg_path, dtype=np.uint8)
+
+        img, size = AnalyzeService._decode_reduced(jpeg_bytes, 0.25)
+        assert size == (1600, 1200)
+        assert img.shape == (300, 400, 3)
+        img, size = AnalyzeService._decode_reduced(jpeg_bytes, 0.3)
+        assert img.shape == (600, 800, 3)
+        assert AnalyzeService._decode_reduced(jpeg_bytes, 0.75) is None
+        assert AnalyzeService._decode_reduced(jpeg_bytes, 0.005) is None
+        assert AnalyzeService._decode_reduced(np.fromfile(png_path, dtype=np.uint8), 0.25) is None
+
+
+@pytest.mark.parametrize('resolution', [0.25, 0.5])
+def test_reduced_decode_matches_full_decode_aoi_coordinates(resolution):
+    """Test that AOIs found on a reduced decode match those of a full decode and resize."""
+    algorithm = {'name': 'ColorRange', 'type': 'RGB', 'service': 'ColorRangeService', 'combine_overlapping_aois': True}
+    options = {'color_ranges': [{'color_range': [(200, 0, 0), (255, 60, 60)]}]}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        path = os.path.join(input_dir, 'img.jpg')
+        _write_jpeg_with_targets(path)
+
+        def run():
+            return AnalyzeService.process_file(algorithm, (255, 0, 0), 10, 0, 5, options, path, input_dir, output_dir,
+                                               None, None, False, resolution)
+
+        reduced = run()
+        with patch.object(AnalyzeService, '_decode_reduced', return_value=None):
+            full = run()
+
+    assert reduced.error_message is None
+    assert len(reduced.areas_of_interest) == len(full.areas_of_interest) == 3
+    tolerance = 2 / resolution
+    for ours, theirs in zip(sorted(reduced.areas_of_interest, key=lambda aoi: aoi['center']),
+                            sorted(full.areas_of_interest, key=lambda aoi: aoi['center'])):
+        assert abs(ours['center'][0] - theirs['center'][0]) <= tolerance
+        assert abs(ours['center'][1] - theirs['center'][1]) <= tolerance
+        assert abs(ours['radius'] - theirs['radius']) <= tolerance
+
+
+def test_original_resolution_decoded_only_when_aois_are_found():
+    """Test that a downscaled image's original is decoded for thumbnails only if it has AOIs."""
+    import cv2
+    from core.services import AnalyzeService as analyze_module
+
+    algorithm = {'name': 'ColorRange', 'type': 'RGB', 'service': 'ColorRangeService', 'combine_overlapping_aois': True}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        path = os.path.join(input_dir, 'img.jpg')
+        _write_jpeg_with_targets(path)
+
+        def decode_flags(options):
+            with patch.object(analyze_module.cv2, 'imdecode', wraps=cv2.imdecode) as imdecode:
+                result = AnalyzeService.process_file(algorithm, (255, 0, 0), 10, 0, 5, options, path, input_dir,
+                                                     output_dir, None, None, False, 0.25)
+            assert result.error_message is None
+            return [call.args[1] for call in imdecode.call_args_list]
+
+        # Nothing in range: only the reduced decode
+        flags = decode_flags({'color_ranges': [{'color_range': [(0, 0, 200), (60, 60, 255)]}]})
+        assert flags == [cv2.IMREAD_REDUCED_COLOR_4 | cv2.IMREAD_IGNORE_ORIENTATION]
+
+        # AOIs found: the original is decoded once more for thumbnails
+        flags = decode_flags({'color_ranges': [{'color_range': [(200, 0, 0), (255, 60, 60)]}]})
+        assert flags == [cv2.IMREAD_REDUCED_COLOR_4 | cv2.IMREAD_IGNORE_ORIENTATION, cv2.IMREAD_UNCHANGED]
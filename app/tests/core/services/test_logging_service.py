@@ -24,6 +24,21 @@ def test_logger_service_initialization_windows():
         assert logger_service.logger is not None
 
 
+def test_logger_service_initialization_linux():
+    with patch("platform.system", return_value="Linux"), \
+            patch("sys.platform", "linux"), \
+            patch("os.makedirs") as mock_makedirs, \
+            patch("os.path.exists", return_value=False), \
+            patch("logging.getLogger"), \
+            patch("logging.FileHandler"), \
+            patch("logging.StreamHandler"):
+        logger_service = LoggerService()
+        home_path = os.path.expanduser("~")
+        app_path = home_path + '/.local/share/ADIAT/'
+        mock_makedirs.assert_called_once_with(app_path)
+        assert logger_service.logger is not None
+
+
 def test_warning(logger_service):
     with patch.object(logger_service.logger, 'warning') as mock_warning:
         logger_service.warning("This is a warning message")
@@ -545,6 +545,65 @@ class TestGetImageGps:
 
             assert result is None
 
+    def test_get_gps_from_batch_metadata(self, scanner_service, temp_folder):
+        """Test GPS comes from batch metadata without reading the file again."""
+        image_path = os.path.join(temp_folder, 'test.jpg')
+        metadata = {'Composite:GPSLatitude': 37.77491234, 'Composite:GPSLongitude': -122.4194}
+
+        with patch('core.services.ResultsScannerService.MetaDataHelper') as MockMeta:
+            result = scanner_service._get_image_gps(image_path, metadata)
+
+            assert result == (37.774912, -122.4194)
+            MockMeta.get_exif_data_piexif.assert_not_called()
+
+    def test_get_gps_batch_metadata_without_gps(self, scanner_service, temp_folder):
+        """Test images whose batch metadata has no GPS are not read again."""
+        image_path = os.path.join(temp_folder, 'test.jpg')
+
+        with patch('core.services.ResultsScannerService.MetaDataHelper') as MockMeta:
+            result = scanner_service._get_image_gps(image_path, {'SourceFile': image_path})
+
+            assert result is None
+            MockMeta.get_exif_data_piexif.assert_not_called()
+
+
+class TestResolveGps:
+    """Tests for _resolve_gps method."""
+
+    def test_first_images_of_all_results_are_read_in_one_batch(self, scanner_service):
+        """Test the first image of every result is read with one batch call."""
+        results = [
+            ResultsScanResult(xml_path=f'{name}.xml', folder_name=name, algorithm='Test', image_count=2,
+                              aoi_count=0, missing_images=0, first_image_path=f'{name}_1.jpg',
+                              gps_coordinates=None, available_images=[f'{name}_1.jpg', f'{name}_2.jpg'])
+            for name in ('a', 'b', 'c')
+        ]
+        batch = {
+            'a_1.jpg': {'Composite:GPSLatitude': 1.0, 'Composite:GPSLongitude': 2.0},
+            'b_1.jpg': {'SourceFile': 'b_1.jpg'},
+            'c_1.jpg': {}
+        }
+
+        with patch('core.services.ResultsScannerService.MetaDataHelper') as MockMeta, \
+                patch('core.services.ResultsScannerService.LocationInfo') as MockLocation:
+            MockMeta.get_metadata_batch.return_value = batch
+            MockMeta.get_exif_data_piexif.return_value = {'GPS': 'data'}
+            MockLocation.get_gps.side_effect = lambda **kwargs: (
+                {'latitude': 1.0, 'longitude': 2.0} if kwargs.get('metadata') is batch['a_1.jpg']
+                else {'latitude': 5.0, 'longitude': 6.0} if 'exif_data' in kwargs else {})
+
+            scanner_service._resolve_gps(results)
+
+            MockMeta.get_metadata_batch.assert_called_once_with(['a_1.jpg', 'b_1.jpg', 'c_1.jpg'],
+                                                                MockMeta.GPS_TAGS)
+            assert results[0].gps_coordinates == (1.0, 2.0)
+            # No GPS in b's first image: its second image is read on its own
+            assert results[1].gps_coordinates == (5.0, 6.0)
+            # c's first image was not read by the batch, so it is read on its own
+            assert results[2].gps_coordinates == (5.0, 6.0)
+            MockMeta.get_exif_data_piexif.assert_any_call('b_2.jpg')
+            MockMeta.get_exif_data_piexif.assert_any_call('c_1.jpg')
+
 
 # ============================================================================
 # Integration tests
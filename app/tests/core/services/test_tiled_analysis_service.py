@@ -0,0 +1,195 @@
+import os
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+import tifffile
+from PIL import Image
+
+from algorithms.images.ColorRange.services.ColorRangeService import ColorRangeService
+from core.services import AnalyzeService as analyze_module
+from core.services.AnalyzeService import AnalyzeService
+from core.services.TiledAnalysisService import TiledAnalysisService
+from core.services.XmlService import XmlService
+from helpers.AOIPixels import AOIPixels
+from helpers.SparseMask import SparseMask
+from helpers.TiledImageReader import TiledImageReader
+
+OPTIONS = {'color_ranges': [{'color_range': [(200, 0, 0), (255, 60, 60)]}]}
+TARGET_BGR = (20, 20, 240)
+
+
+def _color_range_service():
+    return ColorRangeService((0, 255, 0), 10, 0, 5, True, OPTIONS)
+
+
+def _synthetic_image(width, height, seed=0):
+    """Noisy background with red discs, some of them straddling 1024-pixel tile seams."""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(40, 140, (height, width, 3), dtype=np.uint8)
+    centers = [(int(x), int(y)) for x, y in zip(rng.integers(30, width - 30, 150), rng.integers(30, height - 30, 150))]
+    centers += [(1024 * i + 3, 1024 * j - 4) for i in range(1, width // 1024) for j in range(1, height // 1024)]
+    for index, center in enumerate(centers):
+        cv2.circle(img, center, 6 + index % 15, TARGET_BGR, -1)
+    return img
+
+
+def _aoi_key(aoi):
+    return (tuple(aoi['center']), aoi['radius'], aoi['area'], AOIPixels.coerce(aoi['detected_pixels']).serialize())
+
+
+@pytest.fixture(scope='module')
+def large_image(tmp_path_factory):
+    """A 40 MP image, stored as an uncompressed TIFF that can be read window by window."""
+    folder = tmp_path_factory.mktemp('tiled')
+    img = _synthetic_image(8000, 5000)
+    path = str(folder / 'input' / 'large.tif')
+    os.makedirs(os.path.dirname(path))
+    tifffile.imwrite(path, img[..., ::-1], photometric='rgb')
+    return str(folder), path, img
+
+
+def test_tiled_aois_match_full_frame(large_image):
+    folder, path, img = large_image
+    input_dir = os.path.join(folder, 'input')
+
+    full = _color_range_service().process_image(img, path, input_dir, os.path.join(folder, 'full'))
+    full_mask = SparseMask.load_mask(os.path.join(folder, 'full', full.output_path))
+    del img
+
+    tiled_service = TiledAnalysisService(_color_range_service(), tile_size=1024, overlap=128)
+    with TiledImageReader(path) as reader:
+        tiled = tiled_service.process(reader, path, input_dir, os.path.join(folder, 'tiled'), generate_cache=False)
+
+    assert tiled.error_message is None
+    assert len(tiled.areas_of_interest) == len(full.areas_of_interest) > 150
+    assert [_aoi_key(aoi) for aoi in tiled.areas_of_interest] == [_aoi_key(aoi) for aoi in full.areas_of_interest]
+    assert tiled.base_contour_count == full.base_contour_count
+    assert tiled.output_path.endswith(SparseMask.EXTENSION)
+    tiled_mask = SparseMask(os.path.join(folder, 'tiled', tiled.output_path))
+    assert tiled_mask.shape == (5000, 8000)
+    np.testing.assert_array_equal(tiled_mask.read_window(), full_mask)
+    # Windows are read from the crops they intersect
+    np.testing.assert_array_equal(tiled_mask.read_window(1000, 900, 300, 250), full_mask[900:1150, 1000:1300])
+
+
+def test_tiled_processing_memory_stays_bounded(large_image):
+    folder, path, _ = large_image
+    image_bytes = 8000 * 5000 * 3
+
+    tiled_service = TiledAnalysisService(_color_range_service(), tile_size=512, overlap=64)
+    tracemalloc.start()
+    try:
+        with TiledImageReader(path) as reader:
+            result = tiled_service.process(reader, path, os.path.join(folder, 'input'), os.path.join(folder, 'bounded'))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert result.areas_of_interest
+    # Full-frame processing holds the decoded image alone (120 MB) plus a full-size mask and labels
+    assert peak < image_bytes / 6, f"peak {peak / 2**20:.1f} MB"
+
+
+def test_aoi_cache_matches_full_frame(tmp_path):
+    img = _synthetic_image(2100, 1500, seed=3)
+    path = str(tmp_path / 'input' / 'medium.png')
+    os.makedirs(os.path.dirname(path))
+    cv2.imwrite(path, img)
+    input_dir = str(tmp_path / 'input')
+
+    full_service = _color_range_service()
+    full = full_service.process_image(img, path, input_dir, str(tmp_path / 'full'))
+    full_service.generate_aoi_cache(img, path, full.areas_of_interest, str(tmp_path / 'full'))
+
+    with TiledImageReader(path) as reader:
+        tiled = TiledAnalysisService(_color_range_service(), tile_size=512, overlap=64).process(
+            reader, path, input_dir, str(tmp_path / 'tiled'))
+
+    assert [aoi['color_info'] for aoi in tiled.areas_of_interest] == [aoi['color_info'] for aoi in full.areas_of_interest]
+    # Thumbnail names hash the AOI center, which can round one pixel differently for merged AOIs
+    assert len(os.listdir(tmp_path / 'tiled' / '.thumbnails')) == len(os.listdir(tmp_path / 'full' / '.thumbnails'))
+
+
+def test_image_without_detections_has_no_mask(tmp_path):
+    path = str(tmp_path / 'empty.png')
+    cv2.imwrite(path, np.full((300, 500, 3), 90, dtype=np.uint8))
+
+    with TiledImageReader(path) as reader:
+        result = TiledAnalysisService(_color_range_service(), tile_size=128, overlap=16).process(
+            reader, path, str(tmp_path), str(tmp_path / 'output'))
+
+    assert result.error_message is None
+    assert result.areas_of_interest is None
+    assert result.output_path is None
+    assert not os.path.exists(tmp_path / 'output' / ('empty' + SparseMask.EXTENSION))
+
+
+def test_tile_size_is_a_multiple_of_16_and_tiles_cover_the_image():
+    service = TiledAnalysisService(_color_range_service(), tile_size=1000, overlap=50)
+    assert service.tile_size == 1008
+
+    tiles = service.tiles(2100, 3000)
+    assert sum(width * height for _, _, width, height in tiles) == 2100 * 3000
+    assert tiles[0] == (0, 0, 1008, 1008)
+    assert tiles[-1] == (2016, 2016, 984, 84)
+
+
+def test_thermal_algorithms_are_rejected():
+    service = _color_range_service()
+    service.is_thermal = True
+    with pytest.raises(ValueError):
+        TiledAnalysisService(service)
+
+
+def test_process_file_uses_tiles_above_threshold(tmp_path, monkeypatch):
+    img = _synthetic_image(1500, 1100, seed=5)
+    input_dir = str(tmp_path / 'input')
+    os.makedirs(input_dir)
+    path = os.path.join(input_dir, 'image.png')
+    cv2.imwrite(path, img)
+    algorithm = {'name': 'ColorRange', 'type': 'RGB', 'service': 'ColorRangeService', 'combine_overlapping_aois': True}
+
+    def run(output):
+        return AnalyzeService.process_file(algorithm, (0, 255, 0), 10, 0, 5, OPTIONS, path, input_dir,
+                                           str(tmp_path / output), None, None, False)
+
+    full = run('full')
+    monkeypatch.setattr(analyze_module, 'TILED_PROCESSING_MIN_PIXELS', 1_000_000)
+    monkeypatch.setattr(TiledAnalysisService, 'DEFAULT_TILE_SIZE', 512)
+    tiled = run('tiled')
+
+    assert [_aoi_key(aoi) for aoi in tiled.areas_of_interest] == [_aoi_key(aoi) for aoi in full.areas_of_interest]
+    assert tiled.content_hash == full.content_hash
+    assert tiled.timings.algorithm_ms > 0
+    assert os.path.exists(tmp_path / 'tiled' / '.thumbnails')
+
+
+def test_process_files_analyzes_images_above_the_pil_pixel_limit(tmp_path, monkeypatch):
+    img = _synthetic_image(1500, 1100, seed=6)
+    input_dir, output_dir = str(tmp_path / 'input'), str(tmp_path / 'output')
+    os.makedirs(input_dir)
+    os.makedirs(output_dir)
+    tifffile.imwrite(os.path.join(input_dir, 'large.tif'), img[..., ::-1], photometric='rgb', tile=(256, 256))
+    algorithm = {'name': 'ColorRange', 'type': 'RGB', 'service': 'ColorRangeService', 'combine_overlapping_aois': True}
+
+    # Shrink the limits so PIL raises DecompressionBombError on this image, here and in the forked workers
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 500_000)
+    monkeypatch.setattr(analyze_module, 'TILED_PROCESSING_MIN_PIXELS', 1_000_000)
+    monkeypatch.setattr(TiledAnalysisService, 'DEFAULT_TILE_SIZE', 512)
+    with pytest.raises(Image.DecompressionBombError):
+        Image.open(os.path.join(input_dir, 'large.tif'))
+    AnalyzeService.shutdown_pool()
+    try:
+        service = AnalyzeService(1, algorithm, input_dir, output_dir, (0, 255, 0), 10, 1, 100, 5,
+                                 None, None, OPTIONS, 0)
+        service.process_files()
+    finally:
+        AnalyzeService.shutdown_pool()
+
+    assert service.get_progress() == {'discovered': 1, 'validated': 1, 'processed': 1, 'skipped': 0}
+    images = XmlService(os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Data.xml')).get_images()
+    assert len(images) == 1
+    assert images[0]['path'].endswith('large.tif')
+    assert len(images[0]['areas_of_interest']) > 0
@@ -1,7 +1,9 @@
 import pytest
 import os
 import xml.etree.ElementTree as ET
+import numpy as np
 from core.services.XmlService import XmlService
+from helpers.AOIPixels import AOIPixels
 
 
 @pytest.fixture
@@ -96,3 +98,43 @@ def test_save_xml_file(tmp_path):
     path = tmp_path / "output.xml"
     service.save_xml_file(path)
     assert os.path.exists(path)
+
+
+def test_detected_pixels_round_trip(tmp_path):
+    mask = np.zeros((300, 300), dtype=np.uint8)
+    mask[20:220, 30:250] = 255
+    mask[100:110, 60:90] = 0
+    pixels = AOIPixels.from_mask(mask)
+    service = XmlService()
+    service.add_image_to_xml({
+        "path": "big_aoi.jpg",
+        "aois": [{"center": (140, 120), "radius": 150, "area": len(pixels), "detected_pixels": pixels}]
+    })
+    path = tmp_path / "output.xml"
+    service.save_xml_file(path)
+
+    loaded = XmlService(path).get_images()[0]["areas_of_interest"][0]["detected_pixels"]
+
+    # AOIs far larger than the old 100-pixel limit are kept exactly
+    assert isinstance(loaded, AOIPixels)
+    assert loaded == pixels
+    np.testing.assert_array_equal(loaded.to_array(), np.argwhere(mask > 0)[:, [1, 0]])
+
+
+def test_legacy_detected_pixels_attribute(tmp_path):
+    xml_content = """
+    <data>
+        <settings output_dir="/output" input_dir="/input"/>
+        <images>
+            <image path="image1.jpg">
+                <areas_of_interest center="(50,50)" radius="10" area="3" detected_pixels="[[50, 50], [51, 50], [50, 51]]"/>
+            </image>
+        </images>
+    </data>
+    """.strip()
+    xml_path = tmp_path / "legacy.xml"
+    xml_path.write_text(xml_content)
+
+    loaded = XmlService(xml_path).get_images()[0]["areas_of_interest"][0]["detected_pixels"]
+
+    assert sorted(loaded) == [(50, 50), (50, 51), (51, 50)]
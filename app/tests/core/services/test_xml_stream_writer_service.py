@@ -0,0 +1,122 @@
+import os
+import tracemalloc
+
+import pytest
+from core.services.XmlService import XmlService
+from core.services.XmlStreamWriterService import XmlStreamWriterService
+from helpers.AOIPixels import AOIPixels
+
+
+def _settings_service():
+    service = XmlService()
+    service.add_settings_to_xml(input_dir='/input', output_dir='/output', identifier_color=(255, 0, 0),
+                                min_area=10, max_area=0, algorithm='ColorRange', thermal=False,
+                                options={'color_ranges': [(1, 2, 3)], 'empty': None})
+    return service
+
+
+def _image(index, input_dir):
+    return {
+        'path': f'img_{index:05d}.tif',
+        'original_path': os.path.join(input_dir, f'img_{index:05d}.jpg'),
+        'aois': [{
+            'center': (index % 4000, index % 3000),
+            'radius': 12,
+            'area': 140.0,
+            'confidence': 87.5,
+            'score_type': 'color_distance',
+            'color_info': {'rgb': (200, 10, 10), 'hex': '#c80a0a', 'hue_degrees': 357},
+            'contour': [[1, 2], [3, 4], [5, 6]],
+            'detected_pixels': AOIPixels.from_list([[index % 50, 3], [index % 50 + 1, 3]])
+        }]
+    }
+
+
+def test_stream_matches_save_xml_file(tmp_path):
+    images = [_image(i, str(tmp_path / 'input')) for i in range(5)]
+    images[2]['original_path'] = str(tmp_path / 'input' / 'café.jpg')
+
+    expected_path = str(tmp_path / 'expected' / 'ADIAT_Data.xml')
+    streamed_path = str(tmp_path / 'streamed' / 'ADIAT_Data.xml')
+    os.makedirs(os.path.dirname(expected_path))
+    os.makedirs(os.path.dirname(streamed_path))
+
+    expected = _settings_service()
+    expected.xml_path = expected_path
+    for img in images:
+        expected.add_image_to_xml(img)
+    expected.save_xml_file(expected_path)
+
+    with XmlStreamWriterService(streamed_path, _settings_service()) as writer:
+        for img in images:
+            writer.add_image(img)
+
+    with open(expected_path, 'rb') as f1, open(streamed_path, 'rb') as f2:
+        assert f1.read() == f2.read()
+    assert writer.image_count == 5
+    assert not os.path.exists(streamed_path + '.tmp')
+
+
+@pytest.mark.parametrize('with_settings', [True, False])
+def test_stream_without_images_matches_save_xml_file(tmp_path, with_settings):
+    expected = _settings_service() if with_settings else XmlService()
+    expected.save_xml_file(str(tmp_path / 'expected.xml'))
+
+    with XmlStreamWriterService(str(tmp_path / 'streamed.xml'), _settings_service() if with_settings else XmlService()):
+        pass
+
+    assert (tmp_path / 'expected.xml').read_bytes() == (tmp_path / 'streamed.xml').read_bytes()
+
+
+def test_streamed_file_is_readable(tmp_path):
+    path = str(tmp_path / 'ADIAT_Data.xml')
+    with XmlStreamWriterService(path, _settings_service()) as writer:
+        for i in range(3):
+            writer.add_image(_image(i, str(tmp_path / 'input')))
+
+    reader = XmlService(path)
+    settings, image_count = reader.get_settings()
+    images = reader.get_images()
+    assert settings['algorithm'] == 'ColorRange'
+    assert image_count == 3
+    assert images[1]['mask_path'] == os.path.join(str(tmp_path), 'img_00001.tif')
+    assert images[1]['areas_of_interest'][0]['detected_pixels'] == [(1, 3), (2, 3)]
+
+
+def test_failed_stream_keeps_previous_file(tmp_path):
+    path = tmp_path / 'ADIAT_Data.xml'
+    path.write_bytes(b'<data />')
+
+    with pytest.raises(RuntimeError):
+        with XmlStreamWriterService(str(path), _settings_service()) as writer:
+            writer.add_image(_image(0, str(tmp_path)))
+            raise RuntimeError('interrupted')
+
+    assert path.read_bytes() == b'<data />'
+    assert not os.path.exists(str(path) + '.tmp')
+
+
+def test_fifty_thousand_images_stay_within_memory_bound(tmp_path):
+    path = str(tmp_path / 'ADIAT_Data.xml')
+    input_dir = str(tmp_path / 'input')
+    service = _settings_service()
+    pixels = AOIPixels.from_list([[x, 3] for x in range(20)])
+
+    tracemalloc.start()
+    try:
+        with XmlStreamWriterService(path, service) as writer:
+            for i in range(50000):
+                aoi = {'center': (i % 4000, i % 3000), 'radius': 12, 'area': 20.0, 'detected_pixels': pixels}
+                writer.add_image({'path': f'img_{i:05d}.tif',
+                                  'original_path': os.path.join(input_dir, f'img_{i:05d}.jpg'),
+                                  'aois': [aoi]})
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert writer.image_count == 50000
+    # Holding the whole tree for this batch in memory takes tens of megabytes
+    assert peak < 2 * 1024 * 1024
+    with open(path, 'rb') as f:
+        f.seek(-16, os.SEEK_END)
+        assert f.read() == b'</images></data>'
@@ -0,0 +1,112 @@
+import json
+import os
+import platform
+import sys
+
+import pytest
+
+from helpers.ExifToolManager import ExifToolManager
+
+# Stand-in for ExifTool's -stay_open mode. It logs every spawn and command, answers
+# -j with a few tags per existing file, -b -RawThermalImage with the file's bytes,
+# reports missing files and files starting with CORRUPT with status 1 and dies on
+# files starting with CRASH.
+FAKE_EXIFTOOL = r'''
+import json
+import os
+import sys
+
+def log(name, line):
+    with open(os.environ[name], 'a') as f:
+        f.write(line + '\n')
+
+log('FAKE_EXIFTOOL_SPAWNS', str(os.getpid()))
+args = []
+for line in sys.stdin:
+    line = line.rstrip('\r\n')
+    if line == 'False' and args[-1:] == ['-stay_open']:
+        break
+    if not line.startswith('-execute'):
+        args.append(line)
+        continue
+    echo = args[args.index('-echo4') + 1]
+    args = args[:args.index('-echo4')]
+    log('FAKE_EXIFTOOL_COMMANDS', json.dumps(args))
+    files = [arg for arg in args if not arg.startswith('-')]
+    tags = [arg[1:] for arg in args if arg.startswith('-') and arg not in ('-j', '-b', '-n', '-G')]
+    status = 0
+    entries = []
+    for file in files:
+        if not os.path.exists(file):
+            sys.stderr.write('Error: File not found - %s\n' % file)
+            status = 1
+            continue
+        with open(file, 'rb') as f:
+            content = f.read()
+        if content.startswith(b'CRASH'):
+            os._exit(3)
+        if content.startswith(b'CORRUPT'):
+            sys.stderr.write('Error: File format error - %s\n' % file)
+            status = 1
+            continue
+        if '-b' in args:
+            sys.stdout.buffer.write(content)
+            continue
+        entry = {'SourceFile': file, 'EXIF:Make': 'DJI', 'EXIF:Model': 'M3T', 'EXIF:ImageWidth': len(content),
+                 'XMP:GimbalYawDegree': 12.5, 'XMP:RelativeAltitude': 80.0,
+                 'Composite:GPSLatitude': 40 + len(content) / 1000, 'Composite:GPSLongitude': -105.0}
+        if tags:
+            entry = {key: value for key, value in entry.items()
+                     if key == 'SourceFile' or any(key == tag or key.endswith(':' + tag) or
+                                                   (tag.endswith(':all') and key.startswith(tag[:-3]))
+                                                   for tag in tags)}
+        entries.append(entry)
+    if '-j' in args and entries:
+        sys.stdout.write(json.dumps(entries) + '\n')
+    sys.stdout.write('{ready%s}\n' % line[len('-execute'):])
+    sys.stdout.flush()
+    sys.stderr.write(echo.replace('${status}', str(status)) + '\n')
+    sys.stderr.flush()
+    args = []
+'''
+
+
+class FakeExifTool:
+    """Paths of the fake ExifTool's logs."""
+
+    def __init__(self, directory):
+        self.spawns_path = directory / 'spawns.log'
+        self.commands_path = directory / 'commands.log'
+
+    @property
+    def spawns(self):
+        """int: Number of times the fake ExifTool was started."""
+        return len(self.spawns_path.read_text().splitlines()) if self.spawns_path.exists() else 0
+
+    @property
+    def commands(self):
+        """list: Arguments of every command it ran, without the -echo4 marker."""
+        if not self.commands_path.exists():
+            return []
+        return [json.loads(line) for line in self.commands_path.read_text().splitlines()]
+
+
+@pytest.fixture
+def fake_exiftool(tmp_path, monkeypatch):
+    """Put a fake exiftool first on PATH and give this process a fresh ExifTool manager."""
+    if platform.system() == 'Windows':
+        pytest.skip("The fake exiftool is a script run through its shebang line")
+    directory = tmp_path / 'fake_exiftool'
+    directory.mkdir()
+    script = directory / 'exiftool'
+    script.write_text(f'#!{sys.executable}\n{FAKE_EXIFTOOL}')
+    script.chmod(0o755)
+    fake = FakeExifTool(directory)
+    monkeypatch.setenv('PATH', f'{directory}{os.pathsep}{os.environ.get("PATH", "")}')
+    monkeypatch.setenv('FAKE_EXIFTOOL_SPAWNS', str(fake.spawns_path))
+    monkeypatch.setenv('FAKE_EXIFTOOL_COMMANDS', str(fake.commands_path))
+
+    ExifToolManager.shutdown_instance()
+    ExifToolManager.instance()
+    yield fake
+    ExifToolManager.shutdown_instance()
@@ -0,0 +1,44 @@
+import pytest
+
+from helpers.AnalysisTimings import ImageStageTimings, StageTimingSummary
+
+
+def test_measure_accumulates_into_stage():
+    timings = ImageStageTimings()
+    with timings.measure('decode'):
+        pass
+    timings.add('decode', 5.0)
+    assert timings.decode_ms >= 5.0
+    assert timings.algorithm_ms == 0.0
+
+
+def test_measure_records_time_when_stage_raises():
+    timings = ImageStageTimings()
+    with pytest.raises(RuntimeError):
+        with timings.measure('algorithm'):
+            raise RuntimeError('failed')
+    assert timings.algorithm_ms > 0.0
+
+
+def test_to_dict_has_every_stage():
+    assert list(ImageStageTimings().to_dict()) == list(ImageStageTimings.STAGES)
+
+
+def test_summary_total_mean_and_p95():
+    summary = StageTimingSummary()
+    for value in range(1, 21):
+        timings = ImageStageTimings()
+        timings.add('algorithm', float(value))
+        summary.add(timings)
+
+    result = summary.summary()
+    assert summary.image_count == 20
+    assert result['algorithm'] == {'total_ms': 210.0, 'mean_ms': 10.5, 'p95_ms': 19.05}
+    assert result['kmeans'] == {'total_ms': 0.0, 'mean_ms': 0.0, 'p95_ms': 0.0}
+
+
+def test_empty_summary():
+    summary = StageTimingSummary()
+    assert summary.image_count == 0
+    assert summary.summary()['total'] == {'total_ms': 0.0, 'mean_ms': 0.0, 'p95_ms': 0.0}
+    assert len(summary.format_lines()) == len(ImageStageTimings.STAGES)
@@ -0,0 +1,118 @@
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+from helpers.AOIPixels import AOIPixels
+
+
+def _random_mask(seed, shape=(120, 160)):
+    rng = np.random.default_rng(seed)
+    return (rng.random(shape) > 0.6).astype(np.uint8) * 255
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_from_mask_matches_argwhere(seed):
+    """Expanded pixels must equal the [x, y] list the algorithms used to store."""
+    mask = _random_mask(seed)
+    pixels = AOIPixels.from_mask(mask)
+
+    expected = np.argwhere(mask > 0)[:, [1, 0]]
+    assert len(pixels) == len(expected)
+    np.testing.assert_array_equal(pixels.to_array(), expected)
+    assert pixels.tolist() == expected.tolist()
+    assert list(pixels) == [tuple(p) for p in expected.tolist()]
+
+
+def test_from_mask_offset_and_bbox():
+    mask = np.zeros((5, 6), dtype=np.uint8)
+    mask[1, 2:5] = 1
+    mask[3, 0] = 1
+    pixels = AOIPixels.from_mask(mask, x_offset=100, y_offset=200)
+
+    assert pixels.tolist() == [[102, 201], [103, 201], [104, 201], [100, 203]]
+    assert pixels.bbox() == (100, 201, 104, 203)
+    crop, x_min, y_min = pixels.to_mask()
+    assert (x_min, y_min) == (100, 201)
+    np.testing.assert_array_equal(crop > 0, mask[1:4, 0:5] > 0)
+
+
+def test_from_list_dedups_and_sorts():
+    pixels = AOIPixels.from_list([(3, 1), (1, 1), (2, 1), (3, 1), (0, 0)])
+
+    assert pixels.tolist() == [[0, 0], [1, 1], [2, 1], [3, 1]]
+    assert len(pixels.runs) == 2
+
+
+def test_empty():
+    pixels = AOIPixels.coerce(None)
+
+    assert len(pixels) == 0
+    assert not pixels
+    assert pixels.to_array().shape == (0, 2)
+    assert pixels.bbox() is None
+    assert AOIPixels.deserialize(pixels.serialize()) == pixels
+
+
+def test_contains():
+    mask = _random_mask(3, (40, 50))
+    pixels = AOIPixels.from_mask(mask)
+
+    for y in range(mask.shape[0]):
+        for x in range(mask.shape[1]):
+            assert ((x, y) in pixels) == bool(mask[y, x])
+
+
+@pytest.mark.parametrize("scale_x,scale_y", [(0.5, 0.5), (2.0, 2.0), (1 / 0.37, 1 / 0.37), (1.6, 1.25)])
+def test_scaled_matches_per_pixel_transform(scale_x, scale_y):
+    mask = _random_mask(4)
+    pixels = AOIPixels.from_mask(mask)
+
+    legacy = {(int(x * scale_x), int(y * scale_y)) for x, y in pixels.tolist()}
+    scaled = pixels.scaled(scale_x, scale_y)
+
+    assert set(scaled) == legacy
+    assert len(scaled) == len(legacy)
+
+
+def test_translated_shifts_every_pixel():
+    pixels = AOIPixels.from_mask(_random_mask(6))
+
+    shifted = pixels.translated(7, -3)
+
+    assert shifted.tolist() == [[x + 7, y - 3] for x, y in pixels.tolist()]
+
+
+def test_to_array_clips_to_shape():
+    pixels = AOIPixels.from_list([(-1, 0), (0, 0), (9, 4), (10, 4), (3, 5)])
+
+    assert pixels.to_array((5, 10)).tolist() == [[0, 0], [9, 4]]
+
+
+def test_serialize_and_pickle_round_trip():
+    pixels = AOIPixels.from_mask(_random_mask(5))
+
+    text = pixels.serialize()
+    assert text.startswith(AOIPixels.SERIAL_PREFIX)
+    assert AOIPixels.deserialize(text) == pixels
+    assert pickle.loads(pickle.dumps(pixels)) == pixels
+
+    with pytest.raises(ValueError):
+        AOIPixels.deserialize("[[1, 2]]")
+
+
+def test_large_aoi_is_compact():
+    """A 1M-pixel blob costs kilobytes instead of the ~100MB a list of [x, y] lists needs."""
+    mask = np.zeros((1200, 1200), dtype=np.uint8)
+    mask[100:1100, 100:1100] = 255
+    pixels = AOIPixels.from_mask(mask)
+
+    assert len(pixels) == 1_000_000
+    assert pixels.nbytes == 1000 * 3 * 4
+    assert len(pickle.dumps(pixels)) < 20_000
+    assert len(pixels.serialize()) < 20_000
+
+    sample = [[x, y] for x, y in pixels.to_array()[:1000].tolist()]
+    per_pixel = sys.getsizeof(sample[0]) + 2 * sys.getsizeof(sample[0][0]) + 8
+    assert pixels.nbytes < len(pixels) * per_pixel / 1000
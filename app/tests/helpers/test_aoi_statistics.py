@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from helpers.AOIPixels import AOIPixels
+from helpers.AOIStatistics import AOIStatistics
+
+
+def _random_labels(seed, shape=(80, 120), count=25):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, count + 1, size=shape)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_label_image_statistics_match_per_label_numpy(seed):
+    labels = _random_labels(seed)
+    values = np.random.default_rng(seed + 10).normal(size=labels.shape).astype(np.float32)
+    stats = AOIStatistics.from_label_image(labels, count=25)
+
+    means = stats.mean(values)
+    minimums = stats.minimum(values)
+    maximums = stats.maximum(values)
+    medians = stats.percentile(values, 50)
+    p90 = stats.percentile(values, 90)
+    for label in range(1, 26):
+        members = values[labels == label]
+        assert stats.counts[label - 1] == len(members)
+        assert means[label - 1] == pytest.approx(np.mean(members), rel=1e-5, abs=1e-6)
+        assert minimums[label - 1] == pytest.approx(np.min(members))
+        assert maximums[label - 1] == pytest.approx(np.max(members))
+        assert medians[label - 1] == pytest.approx(np.percentile(members, 50), rel=1e-5, abs=1e-6)
+        assert p90[label - 1] == pytest.approx(np.percentile(members, 90), rel=1e-5, abs=1e-6)
+
+
+def test_empty_labels_are_nan():
+    labels = np.zeros((10, 10), dtype=np.int32)
+    labels[2:4, 2:4] = 2
+    values = np.ones((10, 10))
+    stats = AOIStatistics.from_label_image(labels, count=3)
+
+    means = stats.mean(values)
+    assert np.isnan(means[0]) and np.isnan(means[2])
+    assert means[1] == 1.0
+    assert np.isnan(stats.percentile(values, 50)[0])
+
+
+def test_from_aois_matches_pixel_loop():
+    """Means from AOI pixels equal the per-pixel loops the algorithms used."""
+    rng = np.random.default_rng(3)
+    values = rng.random((60, 70))
+    image = rng.integers(0, 256, size=(60, 70, 3), dtype=np.uint8)
+    areas_of_interest = [
+        {'detected_pixels': AOIPixels.from_mask(rng.random((20, 20)) > 0.5, 10, 5)},
+        {'detected_pixels': [(0, 0), (69, 59), (70, 10), (-1, 3)]},
+        {'center': (1, 1)},
+        {'detected_pixels': []},
+    ]
+    stats = AOIStatistics.from_aois(areas_of_interest, values.shape)
+
+    means = stats.mean(values)
+    colors = stats.mean(image)
+    for index, aoi in enumerate(areas_of_interest):
+        samples = []
+        pixels = []
+        for x, y in aoi.get('detected_pixels', []):
+            if 0 <= y < values.shape[0] and 0 <= x < values.shape[1]:
+                samples.append(values[y, x])
+                pixels.append(image[y, x])
+        if samples:
+            assert means[index] == pytest.approx(np.mean(samples))
+            np.testing.assert_allclose(colors[index], np.mean(pixels, axis=0))
+        else:
+            assert np.isnan(means[index])
+            assert np.all(np.isnan(colors[index]))
+
+
+def test_from_aois_scale_matches_truncated_lookup():
+    rng = np.random.default_rng(4)
+    values = rng.random((50, 50))
+    pixels = [(x, y) for x in range(10, 40, 3) for y in range(5, 45, 4)]
+    scale = 0.37
+    stats = AOIStatistics.from_aois([{'detected_pixels': pixels}], values.shape, scale)
+
+    expected = np.mean([values[int(y * scale), int(x * scale)] for x, y in pixels])
+    assert stats.mean(values)[0] == pytest.approx(expected)
+
+
+def test_dominant_color():
+    image = np.zeros((20, 20, 3), dtype=np.uint8)
+    labels = np.zeros((20, 20), dtype=np.int32)
+    labels[:, :10] = 1
+    image[:, :10] = (200, 10, 10)
+    image[:3, :10] = (10, 200, 10)
+    image[0, 0] = (201, 12, 14)
+    labels[:, 10:] = 2
+    image[:, 10:] = (5, 5, 250)
+
+    dominant = AOIStatistics.from_label_image(labels).dominant_color(image)
+
+    np.testing.assert_allclose(dominant[0], [(200 * 170 + 201) / 171, (10 * 170 + 12) / 171, (10 * 170 + 14) / 171])
+    np.testing.assert_allclose(dominant[1], [5, 5, 250])
+
+
+def test_shape_mismatch_raises():
+    stats = AOIStatistics.from_label_image(np.ones((5, 5), dtype=np.int32))
+
+    with pytest.raises(ValueError):
+        stats.mean(np.ones((6, 5)))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from helpers.BackgroundStatistics import BackgroundStatistics
+
+
+def _pixels(seed, shape=(60, 90, 3)):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("chunk_pixels", [7, 1000, 1 << 18])
+def test_chunked_statistics_match_numpy(chunk_pixels):
+    pixels = _pixels(0)
+    samples = pixels.reshape(-1, 3).astype(np.float64)
+
+    stats = BackgroundStatistics.from_pixels(pixels, chunk_pixels=chunk_pixels)
+
+    assert stats.count == len(samples)
+    np.testing.assert_allclose(stats.mean, samples.mean(axis=0))
+    np.testing.assert_allclose(stats.covariance, np.cov(samples.T))
+
+
+def test_merge_equals_statistics_of_both_sets():
+    first, second = _pixels(1, (30, 40, 3)), _pixels(2, (50, 40, 3))
+
+    merged = BackgroundStatistics.from_pixels(first).merge(BackgroundStatistics.from_pixels(second))
+    combined = BackgroundStatistics.from_pixels(np.concatenate([first, second]))
+
+    assert merged.count == combined.count
+    np.testing.assert_allclose(merged.mean, combined.mean)
+    np.testing.assert_allclose(merged.covariance, combined.covariance)
+
+
+def test_stride_samples_both_axes():
+    pixels = _pixels(3)
+
+    stats = BackgroundStatistics.from_pixels(pixels, stride=3)
+
+    np.testing.assert_allclose(stats.mean, pixels[::3, ::3].reshape(-1, 3).mean(axis=0))
+    assert stats.count == 20 * 30
+
+
+def test_mahalanobis_matches_inverse_covariance():
+    pixels = _pixels(4)
+    samples = pixels.reshape(-1, 3).astype(np.float64)
+    centered = samples - samples.mean(axis=0)
+    expected = np.einsum('ij,jk,ik->i', centered, np.linalg.inv(np.cov(samples.T)), centered)
+
+    distances = BackgroundStatistics.from_pixels(pixels).mahalanobis(pixels, chunk_pixels=500)
+
+    assert distances.shape == pixels.shape[:2]
+    np.testing.assert_allclose(distances.ravel(), expected, rtol=1e-9)
+
+
+def test_singular_covariance_is_regularized():
+    pixels = np.zeros((10, 10, 3), dtype=np.uint8)
+    pixels[..., 0] = np.arange(10)
+
+    distances = BackgroundStatistics.from_pixels(pixels).mahalanobis(pixels)
+
+    assert np.all(np.isfinite(distances))
+
+
+def test_too_few_pixels_raise():
+    with pytest.raises(ValueError):
+        BackgroundStatistics.from_pixels(np.zeros((1, 1, 3), dtype=np.uint8))
+
+
+def test_matched_filter_scores_targets_one():
+    pixels = _pixels(5)
+    targets = np.array([[200.0, 30.0, 40.0], [10.0, 240.0, 90.0]])
+    stats = BackgroundStatistics.from_pixels(pixels)
+
+    coefficients = stats.matched_filter_coefficients(targets)
+
+    assert coefficients.shape == (3, 2)
+    np.testing.assert_allclose(np.diag((targets - stats.mean) @ coefficients), [1.0, 1.0])
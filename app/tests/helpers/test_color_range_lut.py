@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+import pytest
+
+from helpers.ColorRangeLUT import ColorRangeLUT
+
+
+def _random_ranges(rng, count):
+    """Random inclusive (lower, upper) uint8 bounds, including some empty ranges."""
+    ranges = []
+    for _ in range(count):
+        a, b = rng.integers(0, 256, 3), rng.integers(0, 256, 3)
+        ranges.append((np.minimum(a, b).astype(np.uint8), np.maximum(a, b).astype(np.uint8)))
+    ranges.append((np.array([10, 200, 5], dtype=np.uint8), np.array([20, 100, 50], dtype=np.uint8)))
+    return ranges
+
+
+def _in_range_mask(img, ranges):
+    mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    for lower, upper in ranges:
+        mask = cv2.bitwise_or(mask, cv2.inRange(img, lower, upper))
+    return mask
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_mask_from_ranges_matches_in_range(seed):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, (120, 170, 3), dtype=np.uint8)
+    ranges = _random_ranges(rng, int(rng.integers(1, 11)))
+
+    mask = ColorRangeLUT.from_ranges(ranges).mask(img)
+
+    assert mask.dtype == np.uint8
+    np.testing.assert_array_equal(mask, _in_range_mask(img, ranges))
+
+
+def test_mask_from_out_of_range_bounds_matches_in_range():
+    rng = np.random.default_rng(4)
+    img = rng.integers(0, 256, (120, 170, 3), dtype=np.uint8)
+    ranges = [
+        (np.array([-10, 0, 0]), np.array([40, 255, 255])),
+        (np.array([100, 200, -50]), np.array([300, 400, 20])),
+        (np.array([300, 0, 0]), np.array([400, 255, 255])),
+        (np.array([0, -20, 0]), np.array([255, -5, 255])),
+    ]
+
+    mask = ColorRangeLUT.from_ranges(ranges).mask(img)
+
+    assert mask.any()
+    np.testing.assert_array_equal(mask, _in_range_mask(img, ranges))
+
+
+def test_compiled_mask_function_matches_direct_evaluation():
+    rng = np.random.default_rng(7)
+    img = rng.integers(0, 256, (90, 110, 3), dtype=np.uint8)
+    ranges = _random_ranges(rng, 5)
+
+    def mask_function(bgr):
+        return _in_range_mask(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV), ranges)
+
+    lut = ColorRangeLUT.compile(mask_function)
+
+    np.testing.assert_array_equal(lut.mask(img), mask_function(img))
+    np.testing.assert_array_equal(lut.packed, ColorRangeLUT.compile(lambda bgr: mask_function(bgr) > 0).packed)
+
+
+def test_mask_is_chunked(monkeypatch):
+    rng = np.random.default_rng(8)
+    img = rng.integers(0, 256, (64, 50, 3), dtype=np.uint8)
+    lut = ColorRangeLUT.from_ranges(_random_ranges(rng, 3))
+    expected = lut.mask(img)
+
+    monkeypatch.setattr(ColorRangeLUT, 'CHUNK_PIXELS', 333)
+
+    np.testing.assert_array_equal(lut.mask(img), expected)
+
+
+def test_contains_looks_up_single_colors():
+    lut = ColorRangeLUT.from_ranges([([10, 20, 30], [10, 20, 37])])
+
+    colors = np.array([[10, 20, 30], [10, 20, 37], [10, 20, 38], [11, 20, 30]], dtype=np.uint8)
+
+    assert lut.contains(colors).tolist() == [True, True, False, False]
+
+
+def test_sample_evaluates_only_masked_pixels():
+    img = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+    mask = np.zeros((4, 5), dtype=np.uint8)
+    mask[1, 2] = mask[3, 4] = 255
+    calls = []
+
+    def value_function(colors):
+        calls.append(len(colors))
+        return colors[:, 0, 0].astype(np.float32) / 2
+
+    values = ColorRangeLUT.from_ranges([]).sample(img, mask, value_function)
+
+    assert calls == [2]
+    assert values[1, 2] == img[1, 2, 0] / 2
+    assert values[3, 4] == img[3, 4, 0] / 2
+    assert np.count_nonzero(values) == 2
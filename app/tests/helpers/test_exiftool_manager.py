@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from helpers.ExifToolManager import ExifToolError, ExifToolManager
+from helpers.MetaDataHelper import MetaDataHelper
+
+
+def _images(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f'DJI_{i:04d}.JPG'
+        path.write_bytes(b'\xff\xd8' + b'\x00' * i)
+        paths.append(str(path))
+    return paths
+
+
+def test_metadata_reads_share_one_exiftool_process(tmp_path, fake_exiftool):
+    paths = _images(tmp_path, 200)
+
+    sequential = [MetaDataHelper.get_meta_data_exiftool(path) for path in paths[:100]]
+    with ThreadPoolExecutor(8) as executor:
+        concurrent = list(executor.map(MetaDataHelper.get_meta_data_exiftool, paths[100:]))
+
+    assert fake_exiftool.spawns == 1
+    assert len(fake_exiftool.commands) == 200
+    for path, metadata in zip(paths, sequential + concurrent):
+        assert metadata['SourceFile'] == path
+        assert metadata['EXIF:ImageWidth'] == len(open(path, 'rb').read())
+
+
+def test_commands_go_through_the_shared_process(tmp_path, fake_exiftool):
+    origin, destination = _images(tmp_path, 2)
+
+    assert MetaDataHelper.get_raw_temperature_data(origin) == open(origin, 'rb').read()
+    MetaDataHelper.transfer_all_exiftool(origin, destination)
+    MetaDataHelper.set_tags_exiftool(destination, {'XMP:GimbalYawDegree': 90})
+
+    assert fake_exiftool.spawns == 1
+    assert fake_exiftool.commands[1] == ['-tagsfromfile', origin, destination, '-overwrite_original',
+                                         '--thumbnailimage']
+    assert fake_exiftool.commands[2] == ['-XMP:GimbalYawDegree=90', '-overwrite_original', destination]
+
+
+def test_error_status_fails_only_that_request(tmp_path, fake_exiftool):
+    (path,) = _images(tmp_path, 1)
+
+    with pytest.raises(ExifToolError, match='File not found'):
+        MetaDataHelper.get_meta_data_exiftool(str(tmp_path / 'missing.JPG'))
+    assert MetaDataHelper.get_meta_data_exiftool(path)['SourceFile'] == path
+    assert fake_exiftool.spawns == 1
+
+
+def test_restarts_after_a_crash(tmp_path, fake_exiftool):
+    (path,) = _images(tmp_path, 1)
+    crashing = tmp_path / 'crash.JPG'
+    crashing.write_bytes(b'CRASH')
+    manager = ExifToolManager.instance()
+
+    # The request is retried once on a fresh process, then fails on its own
+    with pytest.raises(ExifToolError, match='crashed'):
+        manager.get_metadata([str(crashing)])
+    assert manager.get_metadata([path])[0]['SourceFile'] == path
+    assert fake_exiftool.spawns == 1 + ExifToolManager.MAX_ATTEMPTS
+
+
+def test_each_process_gets_its_own_manager(fake_exiftool, monkeypatch):
+    manager = ExifToolManager.instance()
+    assert ExifToolManager.instance() is manager
+
+    # As seen from a forked worker
+    monkeypatch.setattr(ExifToolManager, '_instance_pid', -1)
+    worker_manager = ExifToolManager.instance()
+    assert worker_manager is not manager
+    worker_manager.shutdown()
+    manager.shutdown()
+
+
+def test_shutdown_stops_exiftool(tmp_path, fake_exiftool):
+    (path,) = _images(tmp_path, 1)
+    manager = ExifToolManager.instance()
+    manager.get_metadata([path])
+    process = manager._process
+
+    ExifToolManager.shutdown_instance()
+
+    assert process.poll() == 0
+    with pytest.raises(ExifToolError):
+        manager.execute('-ver')
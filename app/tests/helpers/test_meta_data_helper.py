@@ -9,6 +9,7 @@ from unittest.mock import patch, MagicMock, mock_open
 from os import path
 from PIL import Image
 from app.helpers.MetaDataHelper import MetaDataHelper
+from helpers.ExifToolManager import ExifToolManager
 
 
 @pytest.fixture
@@ -60,52 +61,53 @@ def test__transfer_exif_pil(example_image_path, example_destination_path):
 
 
 def test_transfer_exif_exiftool(example_image_path, example_destination_path):
-    with patch('exiftool.ExifTool') as MockExifTool:
-        mock_et = MockExifTool.return_value.__enter__.return_value
+    with patch('app.helpers.MetaDataHelper.MetaDataHelper._exiftool') as mock_exiftool:
+        mock_et = mock_exiftool.return_value
         MetaDataHelper.transfer_exif_exiftool(example_image_path, example_destination_path)
-        mock_et.execute.assert_called_once_with("-tagsfromfile", example_image_path, "-exif", example_destination_path, "-overwrite_original")
+        mock_et.execute.assert_called_once_with("-tagsfromfile", example_image_path, "-exif", example_destination_path, "-overwrite_original", check=False)
 
 
 def test_transfer_xmp_exiftool(example_image_path, example_destination_path):
-    with patch('exiftool.ExifTool') as MockExifTool:
-        mock_et = MockExifTool.return_value.__enter__.return_value
+    with patch('app.helpers.MetaDataHelper.MetaDataHelper._exiftool') as mock_exiftool:
+        mock_et = mock_exiftool.return_value
         MetaDataHelper.transfer_xmp_exiftool(example_image_path, example_destination_path)
-        mock_et.execute.assert_called_once_with("-tagsfromfile", example_image_path, "-xmp", example_destination_path, "-overwrite_original")
+        mock_et.execute.assert_called_once_with("-tagsfromfile", example_image_path, "-xmp", example_destination_path, "-overwrite_original", check=False)
 
 
 def test_transfer_all_exiftool(example_image_path, example_destination_path):
-    with patch('exiftool.ExifTool') as MockExifTool:
-        mock_et = MockExifTool.return_value.__enter__.return_value
+    with patch('app.helpers.MetaDataHelper.MetaDataHelper._exiftool') as mock_exiftool:
+        mock_et = mock_exiftool.return_value
         MetaDataHelper.transfer_all_exiftool(example_image_path, example_destination_path)
-        mock_et.execute.assert_called_once_with("-tagsfromfile", example_image_path, example_destination_path, "-overwrite_original", "--thumbnailimage")
+        mock_et.execute.assert_called_once_with("-tagsfromfile", example_image_path, example_destination_path,
+                                                "-overwrite_original", "--thumbnailimage", check=False)
 
 
 def test_get_raw_temperature_data(example_image_path):
     raw_bytes = b'raw thermal image bytes'
-    with patch('exiftool.ExifTool') as MockExifTool:
-        mock_et = MockExifTool.return_value.__enter__.return_value
+    with patch('app.helpers.MetaDataHelper.MetaDataHelper._exiftool') as mock_exiftool:
+        mock_et = mock_exiftool.return_value
         mock_et.execute.return_value = raw_bytes
         result = MetaDataHelper.get_raw_temperature_data(example_image_path)
-        mock_et.execute.assert_called_once_with("-b", "-RawThermalImage", example_image_path, raw_bytes=True)
+        mock_et.execute.assert_called_once_with("-b", "-RawThermalImage", example_image_path, raw_bytes=True, check=False)
         assert result == raw_bytes
 
 
 def test_get_meta_data_exiftool(example_image_path):
     metadata = {'EXIF:Make': 'Canon', 'EXIF:Model': '5D'}
-    with patch('exiftool.ExifToolHelper') as MockExifToolHelper:
-        mock_et_helper = MockExifToolHelper.return_value.__enter__.return_value
-        mock_et_helper.get_metadata.return_value = [metadata]
+    with patch('app.helpers.MetaDataHelper.MetaDataHelper._exiftool') as mock_exiftool:
+        mock_et = mock_exiftool.return_value
+        mock_et.get_metadata.return_value = [metadata]
         result = MetaDataHelper.get_meta_data_exiftool(example_image_path)
-        mock_et_helper.get_metadata.assert_called_once_with([example_image_path])
+        mock_et.get_metadata.assert_called_once_with([example_image_path])
         assert result == metadata
 
 
 def test_set_tags_exiftool(example_image_path):
     tags = {"EXIF:Make": "Canon", "EXIF:Model": "5D"}
-    with patch('exiftool.ExifToolHelper') as MockExifToolHelper:
-        mock_et_helper = MockExifToolHelper.return_value.__enter__.return_value
+    with patch('app.helpers.MetaDataHelper.MetaDataHelper._exiftool') as mock_exiftool:
+        mock_et = mock_exiftool.return_value
         MetaDataHelper.set_tags_exiftool(example_image_path, tags)
-        mock_et_helper.set_tags.assert_called_once_with([example_image_path], tags=tags, params=["-overwrite_original"])
+        mock_et.set_tags.assert_called_once_with([example_image_path], tags=tags, params=["-overwrite_original"])
 
 
 def test_get_xmp_data(example_image_path):
@@ -174,3 +176,87 @@ def test_get_exif_data_piexif(example_image_path):
         result = MetaDataHelper.get_exif_data_piexif(example_image_path)
         assert result == mock_exif_data
         mock_piexif_load.assert_called_once_with(example_image_path)
+
+
+def _batch_images(directory, count, content=b'\xff\xd8'):
+    paths = []
+    for i in range(count):
+        image_path = directory / f'IMG_{i:04d}.JPG'
+        image_path.write_bytes(content + b'\x00' * i)
+        paths.append(str(image_path))
+    return paths
+
+
+def _batch_files(commands):
+    return [[arg for arg in command if not arg.startswith('-')] for command in commands]
+
+
+@pytest.mark.parametrize('count, batch_size, expected_sizes', [
+    (7, 3, [3, 3, 1]),
+    (6, 3, [3, 3]),
+    (2 * MetaDataHelper.METADATA_BATCH_SIZE + 1, None,
+     [MetaDataHelper.METADATA_BATCH_SIZE, MetaDataHelper.METADATA_BATCH_SIZE, 1]),
+])
+def test_get_metadata_batch_reads_batches_of_files(tmp_path, fake_exiftool, count, batch_size, expected_sizes):
+    paths = _batch_images(tmp_path, count)
+
+    results = MetaDataHelper.get_metadata_batch(paths, MetaDataHelper.GPS_TAGS, batch_size=batch_size)
+
+    assert fake_exiftool.spawns == 1
+    batches = _batch_files(fake_exiftool.commands)
+    assert [len(files) for files in batches] == expected_sizes
+    assert sum(batches, []) == paths
+    assert list(results) == paths
+    for i, image_path in enumerate(paths):
+        assert results[image_path] == {'SourceFile': image_path,
+                                       'Composite:GPSLatitude': pytest.approx(40 + (2 + i) / 1000),
+                                       'Composite:GPSLongitude': -105.0}
+
+
+def test_get_metadata_batch_sends_the_tag_whitelist(tmp_path, fake_exiftool):
+    paths = _batch_images(tmp_path, 2)
+
+    results = MetaDataHelper.get_metadata_batch(paths, ('EXIF:Model', 'XMP:all'))
+
+    assert fake_exiftool.commands == [['-j', '-EXIF:Model', '-XMP:all', *paths]]
+    assert set(results[paths[0]]) == {'SourceFile', 'EXIF:Model', 'XMP:GimbalYawDegree', 'XMP:RelativeAltitude'}
+    xmp_data = MetaDataHelper.xmp_data_from_metadata(results[paths[0]])
+    assert xmp_data['drone-dji:GimbalYawDegree'] == 12.5
+    assert xmp_data['RelativeAltitude'] == 80.0
+
+
+@pytest.mark.parametrize('content', [b'CORRUPT', b'CRASH'])
+def test_get_metadata_batch_isolates_a_bad_file(tmp_path, fake_exiftool, content):
+    paths = _batch_images(tmp_path, 5)
+    bad = tmp_path / 'IMG_BAD.JPG'
+    bad.write_bytes(content)
+    paths.insert(2, str(bad))
+
+    results = MetaDataHelper.get_metadata_batch(paths, MetaDataHelper.GPS_TAGS)
+
+    assert results[str(bad)] == {}
+    for image_path in paths[:2] + paths[3:]:
+        assert results[image_path]['SourceFile'] == image_path
+        assert results[image_path]['Composite:GPSLongitude'] == -105.0
+
+
+def test_get_metadata_batch_falls_back_to_piexif_for_jpegs(tmp_path):
+    exif_dict = {"0th": {piexif.ImageIFD.Make: b"DJI"}, "Exif": {}, "Interop": {}, "1st": {}, "thumbnail": None}
+    MetaDataHelper._set_gps_location(exif_dict, 30.2672, -97.7431, 150)
+    jpeg_path = str(tmp_path / 'gps.jpg')
+    Image.new('RGB', (8, 8)).save(jpeg_path, 'JPEG', exif=piexif.dump(exif_dict))
+    png_path = str(tmp_path / 'plain.png')
+    Image.new('RGB', (8, 8)).save(png_path, 'PNG')
+
+    ExifToolManager.shutdown_instance()
+    try:
+        with patch('app.helpers.MetaDataHelper.MetaDataHelper._get_exif_tool_path',
+                   return_value=str(tmp_path / 'missing' / 'exiftool')):
+            results = MetaDataHelper.get_metadata_batch([jpeg_path, png_path], MetaDataHelper.GPS_TAGS + ('EXIF:Make',))
+    finally:
+        ExifToolManager.shutdown_instance()
+
+    assert results[jpeg_path]['EXIF:Make'] == 'DJI'
+    assert results[jpeg_path]['Composite:GPSLatitude'] == pytest.approx(30.2672, abs=1e-4)
+    assert results[jpeg_path]['Composite:GPSLongitude'] == pytest.approx(-97.7431, abs=1e-4)
+    assert results[png_path] == {}
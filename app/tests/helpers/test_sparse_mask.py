@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+import pytest
+import tifffile
+
+from helpers.SparseMask import SparseMask
+
+
+def _blob_mask(height, width, count, seed):
+    """A 0/255 mask with random discs, rectangles and single noise pixels."""
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for _ in range(count):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        if rng.random() < 0.5:
+            cv2.circle(mask, center, int(rng.integers(1, 40)), 255, -1)
+        else:
+            cv2.rectangle(mask, center, (center[0] + int(rng.integers(1, 90)), center[1] + int(rng.integers(1, 90))), 255, -1)
+    mask[rng.integers(0, height, count), rng.integers(0, width, count)] = 255
+    return mask
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_round_trip_equals_mask(tmp_path, seed):
+    mask = _blob_mask(611, 907, 40, seed)
+    path = str(tmp_path / f'mask{SparseMask.EXTENSION}')
+
+    size = SparseMask.write(path, mask)
+
+    sparse = SparseMask(path)
+    assert sparse.shape == mask.shape
+    assert size == (tmp_path / f'mask{SparseMask.EXTENSION}').stat().st_size
+    np.testing.assert_array_equal(sparse.read_window(), mask)
+    np.testing.assert_array_equal(SparseMask.load_mask(path), mask)
+
+
+def test_crops_are_disjoint_and_cover_every_detected_pixel():
+    mask = _blob_mask(500, 700, 60, 3)
+    coverage = np.zeros(mask.shape, dtype=np.int32)
+    for x, y, bits in SparseMask.find_crops(mask, block=32):
+        assert bits.any(axis=1)[[0, -1]].all() and bits.any(axis=0)[[0, -1]].all()  # Tight boxes
+        coverage[y:y + bits.shape[0], x:x + bits.shape[1]] += bits
+
+    assert coverage.max() == 1
+    np.testing.assert_array_equal(coverage > 0, mask > 0)
+
+
+def test_windows_match_slices_of_the_mask(tmp_path):
+    mask = _blob_mask(400, 600, 30, 4)
+    path = str(tmp_path / f'mask{SparseMask.EXTENSION}')
+    SparseMask.write(path, mask)
+    sparse = SparseMask(path)
+
+    for x, y, width, height in [(0, 0, 600, 400), (37, 55, 200, 190), (590, 390, 10, 10), (300, 0, 1, 400)]:
+        np.testing.assert_array_equal(sparse.read_window(x, y, width, height), mask[y:y + height, x:x + width])
+
+
+def test_auxiliary_bands_round_trip_at_detected_crops(tmp_path):
+    mask = _blob_mask(300, 400, 20, 5)
+    scores = np.random.default_rng(5).random(mask.shape).astype(np.float32)
+    labels = np.arange(mask.size, dtype=np.int32).reshape(mask.shape)
+    path = str(tmp_path / f'mask{SparseMask.EXTENSION}')
+    SparseMask.write(path, mask, bands=[scores, labels])
+    sparse = SparseMask(path)
+
+    assert sparse.band_dtypes == [np.dtype('<f4'), np.dtype('<i4')]
+    detected = mask > 0
+    read_scores = sparse.read_band(0, fill=np.nan)
+    np.testing.assert_array_equal(read_scores[detected], scores[detected])
+    np.testing.assert_array_equal(sparse.read_band(1)[detected], labels[detected])
+    np.testing.assert_array_equal(sparse.read_band(0, 20, 30, 100, 50)[detected[30:80, 20:120]],
+                                  scores[30:80, 20:120][detected[30:80, 20:120]])
+
+
+def test_mask_written_tile_by_tile_round_trips(tmp_path):
+    mask = _blob_mask(611, 907, 40, 6)
+    scores = np.random.default_rng(6).random(mask.shape).astype(np.float32)
+    path = str(tmp_path / f'mask{SparseMask.EXTENSION}')
+
+    def tile_crops(tile=256):
+        for y in range(0, mask.shape[0], tile):
+            for x in range(0, mask.shape[1], tile):
+                for cx, cy, bits in SparseMask.find_crops(mask[y:y + tile, x:x + tile]):
+                    yield x + cx, y + cy, bits, scores[y + cy:y + cy + bits.shape[0], x + cx:x + cx + bits.shape[1]]
+
+    size = SparseMask.write_crops(path, mask.shape, tile_crops(), [scores.dtype])
+
+    sparse = SparseMask(path)
+    assert size == (tmp_path / f'mask{SparseMask.EXTENSION}').stat().st_size
+    assert sparse.shape == mask.shape
+    np.testing.assert_array_equal(sparse.read_window(), mask)
+    np.testing.assert_array_equal(sparse.read_window(200, 150, 120, 250), mask[150:400, 200:320])
+    detected = mask > 0
+    np.testing.assert_array_equal(sparse.read_band(0)[detected], scores[detected])
+
+
+def test_empty_mask(tmp_path):
+    path = str(tmp_path / f'empty{SparseMask.EXTENSION}')
+    SparseMask.write(path, np.zeros((50, 80), dtype=np.uint8))
+
+    sparse = SparseMask(path)
+    assert sparse.crops == []
+    np.testing.assert_array_equal(sparse.read_window(), np.zeros((50, 80), dtype=np.uint8))
+
+
+def test_sparse_file_is_much_smaller_than_deflate_tiff(tmp_path):
+    mask = np.zeros((3648, 5472), dtype=np.uint8)
+    for i in range(25):
+        cv2.circle(mask, (200 + 200 * i, 150 + 130 * i), 12, 255, -1)
+    sparse_size = SparseMask.write(str(tmp_path / f'mask{SparseMask.EXTENSION}'), mask)
+    tifffile.imwrite(str(tmp_path / 'mask.tif'), mask[None], photometric='minisblack', compression='deflate')
+
+    assert sparse_size * 4 < (tmp_path / 'mask.tif').stat().st_size
+
+
+def test_load_mask_reads_legacy_multiband_tiff(tmp_path):
+    mask = _blob_mask(120, 160, 10, 6)
+    temperatures = np.full(mask.shape, 21.5, dtype=np.float32)
+    path = str(tmp_path / 'legacy.tif')
+    tifffile.imwrite(path, np.stack([mask.astype(np.float32), temperatures]), photometric='minisblack',
+                     metadata={'axes': 'CYX'}, compression='deflate')
+
+    np.testing.assert_array_equal(SparseMask.load_mask(path), mask)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / f'other{SparseMask.EXTENSION}'
+    path.write_bytes(b'not a mask')
+
+    with pytest.raises(ValueError):
+        SparseMask(str(path))
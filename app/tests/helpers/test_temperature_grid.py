@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from helpers.TemperatureGrid import TemperatureGrid
+
+
+def _temperatures(height, width, low, high, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(low, high, (height, width)).astype(np.float32)
+
+
+@pytest.mark.parametrize('low, high', [(-20.0, 80.0), (-40.0, 550.0), (-40.0, 1500.0), (1000.0, 1001.0)])
+def test_quantization_error_is_within_half_a_step(tmp_path, low, high):
+    temperatures = _temperatures(150, 210, low, high)
+    path = str(tmp_path / f'grid{TemperatureGrid.EXTENSION}')
+
+    scale, _ = TemperatureGrid.write(path, temperatures)
+
+    grid = TemperatureGrid(path)
+    assert grid.max_error == pytest.approx(scale / 2)
+    # Centi-degrees whenever the range fits in int16 at that step
+    value_range = float(temperatures.max()) - float(temperatures.min())
+    assert scale == pytest.approx(max(TemperatureGrid.DEFAULT_SCALE, value_range / 65534))
+    error = np.abs(grid.window(0, 0, 210, 150).astype(np.float64) - temperatures)
+    # Plus the float32 rounding of the values read
+    assert error.max() <= grid.max_error + max(abs(low), abs(high)) * np.finfo(np.float32).eps
+
+
+def test_reads_match_the_array(tmp_path):
+    temperatures = _temperatures(130, 200, 10.0, 60.0, seed=1)
+    path = str(tmp_path / f'grid{TemperatureGrid.EXTENSION}')
+    TemperatureGrid.write(path, temperatures, tile=32)
+    grid = TemperatureGrid(path)
+    tolerance = grid.max_error + 1e-4
+
+    assert grid.shape == (130, 200)
+    assert len(grid) == 130
+    for x, y in [(0, 0), (199, 129), (31, 32), (100, 64)]:
+        assert grid.point(x, y) == pytest.approx(temperatures[y, x], abs=tolerance)
+        assert grid[y, x] == pytest.approx(temperatures[y, x], abs=tolerance)
+        assert grid[y][x] == pytest.approx(temperatures[y, x], abs=tolerance)
+    assert grid.point(200, 0) is None
+    assert grid.point(-1, 5) is None
+
+    np.testing.assert_allclose(grid[17:90, 45:190], temperatures[17:90, 45:190], atol=tolerance)
+    np.testing.assert_allclose(grid.window(-10, 120, 50, 50), temperatures[120:, :40], atol=tolerance)
+    ys = np.array([0, 5, 129, 64])
+    xs = np.array([199, 3, 0, 33])
+    np.testing.assert_allclose(grid[ys, xs], temperatures[ys, xs], atol=tolerance)
+    np.testing.assert_allclose(np.asarray(grid), temperatures, atol=tolerance)
+    with pytest.raises(IndexError):
+        grid.values([200], [0])
+
+
+def test_fahrenheit_and_missing_values(tmp_path):
+    temperatures = _temperatures(40, 50, 0.0, 40.0, seed=2).astype(np.float64)
+    temperatures[3, 4] = np.nan
+    path = str(tmp_path / f'grid{TemperatureGrid.EXTENSION}')
+    TemperatureGrid.write(path, temperatures)
+
+    celsius = TemperatureGrid(path)
+    fahrenheit = TemperatureGrid(path, 'F')
+    assert celsius.point(4, 3) is None
+    assert np.isnan(celsius[3, 4])
+    assert fahrenheit.point(10, 20) == pytest.approx(celsius.point(10, 20) * 1.8 + 32.0)
+    assert fahrenheit.max_error == pytest.approx(celsius.max_error * 1.8)
+
+
+def test_aoi_mean_uses_detected_pixels_or_circle(tmp_path):
+    temperatures = np.full((100, 120), 20.0, dtype=np.float32)
+    temperatures[40:50, 60:70] = 45.0
+    path = str(tmp_path / f'grid{TemperatureGrid.EXTENSION}')
+    TemperatureGrid.write(path, temperatures)
+    grid = TemperatureGrid(path)
+
+    pixels = [(x, y) for y in range(40, 50) for x in range(60, 70)]
+    assert grid.aoi_mean({'center': (65, 45), 'radius': 20, 'detected_pixels': pixels}) == pytest.approx(45.0, abs=0.01)
+
+    ys, xs = np.mgrid[0:100, 0:120]
+    inside = (xs - 65) ** 2 + (ys - 45) ** 2 <= 8 ** 2
+    expected = temperatures[inside].mean()
+    assert grid.aoi_mean({'center': (65, 45), 'radius': 8}) == pytest.approx(expected, abs=0.01)
+    # Circles are clipped to the grid
+    assert grid.aoi_mean({'center': (0, 0), 'radius': 3}) == pytest.approx(20.0, abs=0.01)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / f'other{TemperatureGrid.EXTENSION}'
+    path.write_bytes(b'not a grid')
+
+    with pytest.raises(ValueError):
+        TemperatureGrid(str(path))
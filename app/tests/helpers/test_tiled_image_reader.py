@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+import pytest
+import tifffile
+
+from helpers.TiledImageReader import TiledImageReader
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (300, 400, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('layout', ['uncompressed', 'tiled', 'stripped'])
+def test_tiff_windows_match_opencv(tmp_path, image, layout):
+    path = str(tmp_path / 'image.tif')
+    kwargs = {'uncompressed': {}, 'tiled': {'tile': (64, 64), 'compression': 'deflate'},
+              'stripped': {'rowsperstrip': 50, 'compression': 'deflate'}}[layout]
+    tifffile.imwrite(path, image, photometric='rgb', **kwargs)
+    expected = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+
+    with TiledImageReader(path) as reader:
+        assert reader.shape == (300, 400, 3)
+        np.testing.assert_array_equal(reader.read(37, 55, 200, 190), expected[55:245, 37:237])
+        # Windows are clipped to the image
+        np.testing.assert_array_equal(reader.read(350, 250, 100, 100), expected[250:, 350:])
+        assert reader.read(0, 0, 64, 64).flags['C_CONTIGUOUS']
+
+
+def test_grayscale_tiled_tiff(tmp_path, image):
+    path = str(tmp_path / 'gray.tif')
+    tifffile.imwrite(path, image[..., 0], tile=(32, 32), compression='deflate')
+
+    with TiledImageReader(path) as reader:
+        np.testing.assert_array_equal(reader.read(5, 7, 100, 90), image[7:97, 5:105, 0])
+
+
+def test_other_formats_are_decoded_with_opencv(tmp_path, image):
+    path = str(tmp_path / 'image.png')
+    cv2.imwrite(path, image)
+
+    with TiledImageReader(path) as reader:
+        np.testing.assert_array_equal(reader.read(10, 20, 30, 40), image[20:60, 10:40])
+
+
+def test_unreadable_image_raises(tmp_path):
+    path = tmp_path / 'broken.jpg'
+    path.write_bytes(b'not an image')
+    with pytest.raises(ValueError):
+        TiledImageReader(str(path))
+
+
+def test_pixel_count_reads_header(tmp_path, image):
+    tifffile.imwrite(str(tmp_path / 'image.tif'), image, photometric='rgb', tile=(64, 64), compression='deflate')
+    cv2.imwrite(str(tmp_path / 'image.jpg'), image)
+
+    assert TiledImageReader.pixel_count(str(tmp_path / 'image.tif')) == 120000
+    assert TiledImageReader.pixel_count(str(tmp_path / 'image.jpg')) == 120000
+    assert TiledImageReader.pixel_count(str(tmp_path / 'missing.jpg')) is None
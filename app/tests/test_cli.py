@@ -0,0 +1,111 @@
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from PySide6.QtCore import QThread
+
+import cli
+from core.services.AnalyzeService import AnalyzeService
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+OPTIONS = {'color_ranges': [{'color_range': [[0, 0, 200], [60, 60, 255]]}]}
+
+
+@pytest.fixture
+def image_folder(testData, tmp_path):
+    """Bundled RGB test images when present, otherwise a small synthetic set."""
+    if os.path.isdir(testData['RGB_Input']) and os.listdir(testData['RGB_Input']):
+        return testData['RGB_Input']
+    input_dir = tmp_path / 'input'
+    os.makedirs(input_dir / 'nested')
+    for i in range(4):
+        img = np.full((60, 80, 3), 30, dtype=np.uint8)
+        img[10 + i:25 + i, 10 + 5 * i:25 + 5 * i] = (240, 20, 20)
+        folder = input_dir if i < 2 else input_dir / 'nested'
+        cv2.imwrite(str(folder / f'img_{i}.png'), img)
+    return str(input_dir)
+
+
+@pytest.fixture
+def options_file(tmp_path):
+    path = tmp_path / 'options.json'
+    path.write_text(json.dumps(OPTIONS))
+    return str(path)
+
+
+def _run_gui_path(qtbot, algorithm, input_dir, output_dir):
+    """Drive AnalyzeService on a QThread the way MainWindow does."""
+    service = AnalyzeService(1, algorithm, input_dir, output_dir, (0, 255, 0), 10, 1, 100, 15,
+                             None, None, json.loads(json.dumps(OPTIONS)), 0, 1.0)
+    thread = QThread()
+    service.moveToThread(thread)
+    thread.started.connect(service.process_files)
+    with qtbot.waitSignal(service.sig_done, timeout=120000):
+        thread.start()
+    thread.quit()
+    thread.wait()
+    with open(os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Data.xml'), 'rb') as f:
+        return f.read()
+
+
+def test_cli_output_matches_gui_path(qtbot, image_folder, options_file, tmp_path):
+    output_dir = str(tmp_path / 'output')
+    os.makedirs(output_dir)
+    gui_xml = _run_gui_path(qtbot, cli.load_algorithm('ColorRange'), image_folder, output_dir)
+    shutil.rmtree(os.path.join(output_dir, 'ADIAT_Results'))
+
+    env = {key: value for key, value in os.environ.items() if key not in ('QT_QPA_PLATFORM', 'DISPLAY', 'WAYLAND_DISPLAY')}
+    # Keep the CLI's application data, e.g. the metadata index, out of the user's home folder
+    env['HOME'] = env['USERPROFILE'] = str(tmp_path / 'home')
+    completed = subprocess.run(
+        [sys.executable, '-m', 'app.cli', 'analyze', image_folder, output_dir,
+         '--algorithm', 'ColorRange', '--options', options_file, '--processes', '1'],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=300)
+
+    assert completed.returncode == 0, completed.stderr
+    events = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert events[0]['event'] == 'start'
+    assert events[-1]['event'] == 'done'
+    assert events[-1]['xml_path'] == os.path.join(output_dir, 'ADIAT_Results', 'ADIAT_Data.xml')
+    assert events[-1]['images_with_aois'] > 0
+    assert any(event['event'] == 'message' and 'progress' in event for event in events)
+    with open(events[-1]['xml_path'], 'rb') as f:
+        assert f.read() == gui_xml
+
+
+def test_unknown_algorithm_is_reported(image_folder, options_file, tmp_path):
+    stream = io.StringIO()
+    code = cli.main(['analyze', image_folder, str(tmp_path / 'out'), '--algorithm', 'Nope', '--options', options_file],
+                    stream=stream)
+    event = json.loads(stream.getvalue())
+    assert code == 2
+    assert event['event'] == 'error'
+    assert 'ColorRange' in event['message']
+
+
+def test_options_must_be_a_json_object(tmp_path):
+    path = tmp_path / 'options.json'
+    path.write_text('[1, 2]')
+    with pytest.raises(ValueError):
+        cli.load_options(str(path))
+
+
+def test_load_algorithm_ignores_case():
+    assert cli.load_algorithm('hsvcolorrange')['service'] == 'HSVColorRangeService'
+
+
+@pytest.mark.parametrize('value', ['1,2', '0,0,256', 'a,b,c'])
+def test_parse_color_rejects_invalid_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.parse_color(value)
+
+
+def test_parse_color():
+    assert cli.parse_color('255,0,10') == (255, 0, 10)
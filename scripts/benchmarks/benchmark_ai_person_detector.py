@@ -0,0 +1,60 @@
+"""
+CPU benchmark for AIPersonDetectorService slice inference.
+
+Runs the CPU model over a synthetic 8000x6000 frame with batch sizes 1, 4 and 8
+and reports slices per second for each.
+
+Usage:
+    python scripts/benchmarks/benchmark_ai_person_detector.py [--repeats N]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from algorithms.images.AIPersonDetector.services.AIPersonDetectorService import AIPersonDetectorService, OVERLAP  # noqa: E402
+from helpers.SlidingWindowSlicer import SlidingWindowSlicer  # noqa: E402
+
+BATCH_SIZES = (1, 4, 8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=1, help="Number of timed passes per batch size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (6000, 8000, 3), dtype=np.uint8)
+
+    service = AIPersonDetectorService((255, 0, 0), 0, 0, 0, True, {'person_detector_confidence': 50, 'cpu_only': True})
+    if not os.path.exists(service.model_path):
+        print(f"Model not found: {service.model_path}")
+        return 1
+
+    session = service._get_onnx_session()
+    input_name = session.get_inputs()[0].name
+    img_pre_processed = service._preprocess_whole_image(frame)
+    slices = SlidingWindowSlicer.get_slices(img_pre_processed.shape, service.slice_size, OVERLAP)
+
+    print(f"Frame 8000x6000, {len(slices)} slices, {service._get_intra_op_threads()} intra-op threads")
+    for batch_size in BATCH_SIZES:
+        service.batch_size = batch_size
+        # Warm-up pass so allocation of the batch shape is not timed
+        service._detect_slices(session, input_name, img_pre_processed, slices[:batch_size])
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            service._detect_slices(session, input_name, img_pre_processed, slices)
+        elapsed = time.perf_counter() - start
+        rate = len(slices) * args.repeats / elapsed
+        print(f"batch_size={batch_size}: {rate:.2f} slices/s ({elapsed:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
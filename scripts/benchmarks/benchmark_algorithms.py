@@ -0,0 +1,244 @@
+"""
+Per-algorithm benchmark on deterministic synthetic frames.
+
+Generates 12 MP, 20 MP and 48 MP frames with a controlled number of planted targets
+and times each algorithm's process_image in isolation. Every (algorithm, frame size,
+target count) case runs in a fresh process so its peak RSS is not inflated by the
+cases before it. Results are printed as a table and written as a JSON report with
+the median, p95 and peak RSS of each case.
+
+Thermal algorithms are fed the synthetic temperature field through a stand-in parser
+instead of a radiometric file. AIPersonDetector is reported as skipped when its model
+file is not present.
+
+Usage:
+    python scripts/benchmarks/benchmark_algorithms.py [--algorithms A B ...] [--sizes 12MP 20MP 48MP]
+        [--targets 10 100] [--repeats N] [--output report.json] [--inline]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+FRAME_SIZES = {
+    '12MP': (4000, 3000),
+    '20MP': (5472, 3648),
+    '48MP': (8000, 6000),
+}
+
+TARGET_BGR = (40, 30, 220)  # Saturated red, well away from the background palette
+TARGET_RGB = TARGET_BGR[::-1]
+BACKGROUND_C = 15.0
+TARGET_C = 36.0
+
+# service module, class name, options, input kind ('rgb', 'thermal' or 'ai')
+ALGORITHMS = {
+    'ColorRange': (
+        'algorithms.images.ColorRange.services.ColorRangeService', 'ColorRangeService',
+        {'color_ranges': [{'color_range': [(180, 0, 0), (255, 80, 80)]}]}, 'rgb'),
+    'HSVColorRange': (
+        'algorithms.images.HSVColorRange.services.HSVColorRangeService', 'HSVColorRangeService',
+        {'hsv_configs': [{'selected_color': TARGET_RGB,
+                          'hsv_ranges': {'h': 0.99, 's': 0.86, 'v': 0.86, 'h_minus': 0.04, 'h_plus': 0.04,
+                                         's_minus': 0.2, 's_plus': 0.14, 'v_minus': 0.2, 'v_plus': 0.14}}]}, 'rgb'),
+    'MatchedFilter': (
+        'algorithms.images.MatchedFilter.services.MatchedFilterService', 'MatchedFilterService',
+        {'color_configs': [{'selected_color': TARGET_RGB, 'match_filter_threshold': 0.3}]}, 'rgb'),
+    'RXAnomaly': (
+        'algorithms.images.RXAnomaly.services.RXAnomalyService', 'RXAnomalyService',
+        {'sensitivity': 7, 'segments': 2}, 'rgb'),
+    'MRMap': (
+        'algorithms.images.MRMap.services.MRMapService', 'MRMapService',
+        {'segments': 2, 'threshold': 30000, 'window': 5, 'colorspace': 'RGB'}, 'rgb'),
+    'ThermalAnomaly': (
+        'algorithms.images.ThermalAnomaly.services.ThermalAnomalyService', 'ThermalAnomalyService',
+        {'threshold': 4.0, 'segments': 2, 'type': 'Above Mean'}, 'thermal'),
+    'AIPersonDetector': (
+        'algorithms.images.AIPersonDetector.services.AIPersonDetectorService', 'AIPersonDetectorService',
+        {'person_detector_confidence': 50, 'cpu_only': True}, 'ai'),
+}
+
+
+def target_layout(width, height, targets, seed):
+    """Deterministic (x, y, radius) for every planted target."""
+    rng = np.random.default_rng(seed)
+    radii = rng.integers(6, 21, targets)
+    xs = rng.integers(30, width - 30, targets)
+    ys = rng.integers(30, height - 30, targets)
+    return list(zip(xs.tolist(), ys.tolist(), radii.tolist()))
+
+
+def smooth_field(width, height, rng, cells=32):
+    """Low-frequency float32 field in [0, 1] (terrain-like shading)."""
+    coarse = rng.random((cells * height // width + 1, cells + 1)).astype(np.float32)
+    return cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC).clip(0, 1)
+
+
+def make_rgb_frame(width, height, targets, seed=0):
+    """BGR frame of green/brown terrain with sensor noise and red disc targets."""
+    rng = np.random.default_rng(seed)
+    shade = smooth_field(width, height, rng)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (30 + 40 * shade).astype(np.uint8)
+    frame[..., 1] = (70 + 90 * shade).astype(np.uint8)
+    frame[..., 2] = (60 + 60 * shade).astype(np.uint8)
+    noise = rng.integers(-6, 7, (height, width, 1), dtype=np.int16)
+    frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    for x, y, radius in target_layout(width, height, targets, seed + 1):
+        cv2.circle(frame, (x, y), radius, TARGET_BGR, -1)
+    return frame
+
+
+def make_thermal_frame(width, height, targets, seed=0):
+    """Temperature field in Celsius with warm disc targets, plus its 8-bit visual rendering."""
+    rng = np.random.default_rng(seed)
+    temperature_c = BACKGROUND_C + 4.0 * smooth_field(width, height, rng)
+    temperature_c += rng.normal(0, 0.2, (height, width)).astype(np.float32)
+    for x, y, radius in target_layout(width, height, targets, seed + 1):
+        cv2.circle(temperature_c, (x, y), radius, TARGET_C, -1)
+    visual = cv2.normalize(temperature_c, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    return temperature_c, cv2.cvtColor(visual, cv2.COLOR_GRAY2BGR)
+
+
+class SyntheticThermalParser:
+    """Stands in for ThermalParserService and returns a prepared temperature field."""
+
+    def __init__(self, temperature_c, visual):
+        self.temperature_c = temperature_c
+        self.visual = visual
+
+    def parse_file(self, full_path):
+        return self.temperature_c, self.visual
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None when it cannot be measured."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(algorithm, size, targets, repeats):
+    """Build one fixture and time process_image on it. Runs in its own process."""
+    import importlib
+
+    module_name, class_name, options, kind = ALGORITHMS[algorithm]
+    width, height = FRAME_SIZES[size]
+    case = {'algorithm': algorithm, 'frame': size, 'width': width, 'height': height,
+            'megapixels': round(width * height / 1e6, 1), 'targets': targets, 'repeats': repeats}
+
+    service_cls = getattr(importlib.import_module(module_name), class_name)
+    service = service_cls((255, 0, 0), 10, 0, 5, True, options)
+    if kind == 'ai' and not os.path.exists(service.model_path):
+        case['skipped'] = f"Model not found: {service.model_path}"
+        return case
+
+    if kind == 'thermal':
+        temperature_c, frame = make_thermal_frame(width, height, targets)
+        service.thermal_parser = SyntheticThermalParser(temperature_c, frame)
+    else:
+        frame = make_rgb_frame(width, height, targets)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = os.path.join(tmpdir, 'input')
+        output_dir = os.path.join(tmpdir, 'output')
+        full_path = os.path.join(input_dir, f'{size}_{targets}.jpg')
+
+        # Warm-up call so lazy initialization (models, LUTs) is not timed
+        result = service.process_image(frame, full_path, input_dir, output_dir)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = service.process_image(frame, full_path, input_dir, output_dir)
+            times.append(time.perf_counter() - start)
+
+    peak = peak_rss_bytes()
+    case.update({
+        'median_s': round(float(np.median(times)), 4),
+        'p95_s': round(float(np.percentile(times, 95)), 4),
+        'min_s': round(min(times), 4),
+        'peak_rss_mb': round(peak / 2**20, 1) if peak is not None else None,
+        'aois_found': len(result.areas_of_interest or []) if result is not None else None,
+        'error': result.error_message if result is not None else 'No result',
+    })
+    return case
+
+
+def run_isolated(algorithm, size, targets, repeats):
+    """Run a case in a fresh spawned process so peak RSS belongs to that case alone."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_case, algorithm, size, targets, repeats).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithms", nargs='+', choices=list(ALGORITHMS), default=list(ALGORITHMS),
+                        help="Algorithms to benchmark (default: all)")
+    parser.add_argument("--sizes", nargs='+', choices=list(FRAME_SIZES), default=list(FRAME_SIZES),
+                        help="Frame sizes (default: all)")
+    parser.add_argument("--targets", nargs='+', type=int, default=[10, 100], help="Planted target counts (default: 10 100)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls per case (default: 5)")
+    parser.add_argument("--output", default="benchmark_report.json", help="JSON report path")
+    parser.add_argument("--inline", action="store_true",
+                        help="Run every case in this process (faster, but peak RSS accumulates)")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'algorithm':<18}{'frame':>6}{'targets':>9}{'aois':>7}{'median s':>10}{'p95 s':>9}{'peak MB':>9}")
+    for algorithm in args.algorithms:
+        for size in args.sizes:
+            for targets in args.targets:
+                runner = run_case if args.inline else run_isolated
+                try:
+                    case = runner(algorithm, size, targets, args.repeats)
+                except Exception as e:
+                    case = {'algorithm': algorithm, 'frame': size, 'targets': targets, 'error': str(e)}
+                results.append(case)
+                if 'median_s' in case:
+                    print(f"{algorithm:<18}{size:>6}{targets:>9}{case['aois_found']!s:>7}{case['median_s']:>10.3f}"
+                          f"{case['p95_s']:>9.3f}{case['peak_rss_mb']!s:>9}")
+                else:
+                    print(f"{algorithm:<18}{size:>6}{targets:>9}  {case.get('skipped') or case.get('error')}")
+
+    report = {
+        'generated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+        },
+        'settings': {'repeats': args.repeats, 'isolated': not args.inline},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark for color range masking with a compiled ColorRangeLUT.
+
+Masks a synthetic 20 MP (5472x3648) frame with 10 color ranges, once with one
+cv2.inRange per range OR-ed together (RGB ranges on the BGR frame, HSV ranges on the
+frame converted to HSV, plus the full-frame HSV distances HSVColorRangeService used to
+compute) and once with a single lookup in the compiled table. Reports the time per
+frame and the one-time compile cost.
+
+Usage:
+    python scripts/benchmarks/benchmark_color_range_lut.py [--repeats N] [--ranges N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from algorithms.images.ColorRange.services.ColorRangeService import ColorRangeService  # noqa: E402
+from algorithms.images.HSVColorRange.services.HSVColorRangeService import HSVColorRangeService  # noqa: E402
+
+FRAME_WIDTH, FRAME_HEIGHT = 5472, 3648
+
+
+def build_services(rng, count):
+    """ColorRange and HSVColorRange services with random ranges."""
+    color_ranges, hsv_configs = [], []
+    for _ in range(count):
+        low = rng.integers(0, 200, 3)
+        color_ranges.append({'color_range': [tuple(int(v) for v in low), tuple(int(v) for v in low + 40)]})
+        hsv_configs.append({
+            'selected_color': tuple(int(v) for v in rng.integers(0, 256, 3)),
+            'hsv_ranges': {'h': float(rng.random()), 's': 0.6, 'v': 0.6, 'h_minus': 0.03, 'h_plus': 0.03,
+                           's_minus': 0.2, 's_plus': 0.2, 'v_minus': 0.2, 'v_plus': 0.2}
+        })
+    rgb = ColorRangeService((255, 0, 0), 10, 0, 5, True, {'color_ranges': color_ranges})
+    hsv = HSVColorRangeService((255, 0, 0), 10, 0, 5, True, {'hsv_configs': hsv_configs})
+    return rgb, hsv
+
+
+def in_range_rgb(service, img):
+    """One cv2.inRange per RGB range."""
+    mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    for config in service.color_ranges:
+        min_rgb, max_rgb = config['color_range']
+        mask = cv2.bitwise_or(mask, cv2.inRange(img, np.array(min_rgb[::-1], dtype=np.uint8),
+                                                np.array(max_rgb[::-1], dtype=np.uint8)))
+    return mask
+
+
+def in_range_hsv(service, img):
+    """Full-frame HSV conversion, one cv2.inRange per HSV range and full-frame distances."""
+    hsv_image = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    for config in service.options['hsv_configs']:
+        mask = cv2.bitwise_or(mask, service._create_mask_from_hsv_ranges(hsv_image, config['hsv_ranges']))
+    return service._calculate_hsv_distances(hsv_image, service.target_color_hsv, mask)
+
+
+def lut_hsv(service, img):
+    """Table lookup and distances of detected pixels only."""
+    lut, _ = service.get_lut()
+    mask = lut.mask(img)
+    return lut.sample(img, mask, lambda colors: service._calculate_hsv_distances(
+        cv2.cvtColor(colors, cv2.COLOR_BGR2HSV), service.target_color_hsv, np.full(colors.shape[:2], 255)))
+
+
+def time_calls(function, repeats):
+    """Median wall time of repeated calls."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5, help="Number of timed calls per variant")
+    parser.add_argument("--ranges", type=int, default=10, help="Number of color ranges")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    rgb, hsv = build_services(rng, args.ranges)
+
+    start = time.perf_counter()
+    rgb.get_lut()
+    rgb_compile = time.perf_counter() - start
+    start = time.perf_counter()
+    hsv.get_lut()
+    hsv_compile = time.perf_counter() - start
+
+    print(f"Frame {FRAME_WIDTH}x{FRAME_HEIGHT}, {args.ranges} ranges, {args.repeats} repeats")
+    for name, compile_time, before, after in [
+        ("ColorRange", rgb_compile, lambda: in_range_rgb(rgb, img), lambda: rgb.get_lut().mask(img)),
+        ("HSVColorRange", hsv_compile, lambda: in_range_hsv(hsv, img), lambda: lut_hsv(hsv, img)),
+    ]:
+        in_range_time = time_calls(before, args.repeats)
+        lut_time = time_calls(after, args.repeats)
+        print(f"{name:<14} inRange {in_range_time:.3f} s, LUT {lut_time:.3f} s "
+              f"(speedup {in_range_time / lut_time:.2f}x, compiled once in {compile_time:.3f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
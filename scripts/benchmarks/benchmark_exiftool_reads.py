@@ -0,0 +1,63 @@
+"""
+Benchmark for metadata reads through ExifTool.
+
+Reads all tags of every image in a folder twice: once starting an ExifTool process
+per image, as MetaDataHelper did through PyExifTool, and once through the shared
+stay-open ExifToolManager. Reports the time per image of each.
+
+Usage:
+    python scripts/benchmarks/benchmark_exiftool_reads.py --folder PATH [--limit N] [--exiftool PATH]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from helpers.ExifToolManager import ExifToolManager  # noqa: E402
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.tif', '.tiff', '.png'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", required=True, help="Folder of drone images")
+    parser.add_argument("--limit", type=int, default=100, help="Number of images to read")
+    parser.add_argument("--exiftool", default="exiftool", help="ExifTool executable")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.folder).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:args.limit]
+    if not paths:
+        print(f"No images found in {args.folder}")
+        return 1
+
+    start = time.perf_counter()
+    for path in paths:
+        result = subprocess.run([args.exiftool, '-j', *ExifToolManager.COMMON_ARGS, path],
+                                capture_output=True, check=True)
+        json.loads(result.stdout)
+    per_call = (time.perf_counter() - start) / len(paths)
+
+    manager = ExifToolManager(args.exiftool)
+    start = time.perf_counter()
+    manager.get_metadata([paths[0]])
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for path in paths:
+        manager.get_metadata([path])
+    stay_open = (time.perf_counter() - start) / len(paths)
+    manager.shutdown()
+
+    print(f"{len(paths)} images")
+    print(f"process per image  {per_call * 1000:8.2f} ms/image")
+    print(f"stay-open process  {stay_open * 1000:8.2f} ms/image (start-up and first read {first * 1000:.2f} ms), "
+          f"{per_call / stay_open:.1f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark for AlgorithmService.apply_hue_expansion.
+
+Expands 500 AOIs of radius 50 on a synthetic 20 MP (5472x3648) frame and reports
+the time per call.
+
+Usage:
+    python scripts/benchmarks/benchmark_hue_expansion.py [--repeats N] [--aois N] [--radius R]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from algorithms.AlgorithmService import AlgorithmService  # noqa: E402
+from helpers.AOIPixels import AOIPixels  # noqa: E402
+
+FRAME_WIDTH, FRAME_HEIGHT = 5472, 3648
+
+
+def build_aois(rng, count, radius):
+    """Random AOIs with a small square of detected pixels at each center."""
+    areas_of_interest = []
+    for _ in range(count):
+        cx = int(rng.integers(radius, FRAME_WIDTH - radius))
+        cy = int(rng.integers(radius, FRAME_HEIGHT - radius))
+        seed = np.zeros((9, 9), dtype=np.uint8)
+        seed[2:7, 2:7] = 1
+        areas_of_interest.append({
+            'center': (cx, cy),
+            'radius': radius,
+            'detected_pixels': AOIPixels.from_mask(seed, cx - 4, cy - 4)
+        })
+    return areas_of_interest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed calls")
+    parser.add_argument("--aois", type=int, default=500, help="Number of AOIs")
+    parser.add_argument("--radius", type=int, default=50, help="AOI radius in pixels")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    mask = np.zeros((FRAME_HEIGHT, FRAME_WIDTH), dtype=np.uint8)
+    areas_of_interest = build_aois(rng, args.aois, args.radius)
+
+    service = AlgorithmService('Benchmark', (255, 0, 0), 0, 0, 0, False, {})
+    times = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        expanded = service.apply_hue_expansion(frame, mask, areas_of_interest, 10)
+        times.append(time.perf_counter() - start)
+
+    print(f"Frame {FRAME_WIDTH}x{FRAME_HEIGHT}, {args.aois} AOIs, radius {args.radius}")
+    print(f"apply_hue_expansion: median {np.median(times):.3f} s, min {min(times):.3f} s "
+          f"({int(np.count_nonzero(expanded))} pixels expanded)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
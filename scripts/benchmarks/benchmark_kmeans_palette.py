@@ -0,0 +1,74 @@
+"""
+Benchmark for k-means color clustering over a flight.
+
+Clusters 100 synthetic frames of one scene (3 MP by default) once with cv2.kmeans on
+every pixel of every frame and once with a palette fitted on 8 frames of the flight
+and applied with the nearest-center lookup table. Reports the total and per-frame
+time and the mean quantization error of both.
+
+Usage:
+    python scripts/benchmarks/benchmark_kmeans_palette.py [--frames N] [--clusters K] [--width W] [--height H]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from core.services.advancedFeatures.KMeansClustersService import KMeansClustersService  # noqa: E402
+
+PALETTE_FRAMES = 8
+
+
+def build_frame(rng, width, height):
+    """Smooth terrain in a few hues with sensor noise, slightly different in every frame."""
+    terrain = cv2.resize(rng.random((height // 64, width // 64, 3)).astype(np.float32), (width, height),
+                         interpolation=cv2.INTER_CUBIC)
+    img = 60 + terrain * np.array([80, 120, 90], dtype=np.float32) + rng.normal(0, 5, (height, width, 3))
+    return img.clip(0, 255).astype(np.uint8)
+
+
+def quantization_error(img, result):
+    """Mean Euclidean distance between original and clustered pixels."""
+    return float(np.linalg.norm(img.reshape(-1, 3).astype(np.float32) - result.reshape(-1, 3), axis=1).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=100, help="Number of frames in the flight")
+    parser.add_argument("--clusters", type=int, default=8, help="Number of color clusters")
+    parser.add_argument("--width", type=int, default=2000, help="Frame width")
+    parser.add_argument("--height", type=int, default=1500, help="Frame height")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [build_frame(rng, args.width, args.height) for _ in range(args.frames)]
+
+    per_image = KMeansClustersService(args.clusters)
+    start = time.perf_counter()
+    per_image_error = np.mean([quantization_error(frame, per_image.generate_clusters(frame)) for frame in frames])
+    per_image_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = KMeansClustersService(args.clusters)
+    shared.fit_palette(frames[::max(1, len(frames) // PALETTE_FRAMES)][:PALETTE_FRAMES])
+    fit_time = time.perf_counter() - start
+    shared_error = np.mean([quantization_error(frame, shared.generate_clusters(frame)) for frame in frames])
+    shared_time = time.perf_counter() - start
+
+    print(f"{args.frames} frames of {args.width}x{args.height}, {args.clusters} clusters")
+    print(f"per-image k-means: {per_image_time:.2f} s ({per_image_time / args.frames * 1000:.1f} ms/frame), "
+          f"mean error {per_image_error:.2f}")
+    print(f"shared palette:    {shared_time:.2f} s ({(shared_time - fit_time) / args.frames * 1000:.1f} ms/frame "
+          f"+ {fit_time:.2f} s fit), mean error {shared_error:.2f}")
+    print(f"speedup {per_image_time / shared_time:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Benchmark for the target scoring of MatchedFilterService.
+
+Scores a synthetic 20 MP (5472x3648) frame against 1, 5, 10 and 20 color targets, once
+the way the service did with one spectral.matched_filter call per target and once with
+the stacked single-pass scoring. Reports the time per image and the cost relative to
+one target, which grows sub-linearly for the stacked scoring because the background
+statistics are computed once.
+
+Usage:
+    python scripts/benchmarks/benchmark_matched_filter.py [--repeats N] [--targets N [N ...]]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import spectral
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from algorithms.images.MatchedFilter.services.MatchedFilterService import MatchedFilterService  # noqa: E402
+
+FRAME_WIDTH, FRAME_HEIGHT = 5472, 3648
+
+
+def build_service(rng, target_count):
+    """Service with random target colors."""
+    colors = [tuple(int(v) for v in rng.integers(0, 256, 3)) for _ in range(target_count)]
+    options = {'color_configs': [{'selected_color': color, 'match_filter_threshold': 0.3} for color in colors]}
+    return MatchedFilterService(colors[0], 10, 0, 5, True, options)
+
+
+def spectral_scores(service, img):
+    """One spectral.matched_filter call per target, OR-ing the masks."""
+    combined_mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    for color_config in service.color_configs:
+        match_color = color_config['selected_color']
+        color_bgr = np.array([match_color[2], match_color[1], match_color[0]], dtype=np.uint8)
+        scores = spectral.matched_filter(img, color_bgr)
+        combined_mask |= np.uint8(scores > color_config['match_filter_threshold'])
+    return combined_mask
+
+
+def time_calls(function, repeats):
+    """Median wall time of repeated calls."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed calls per case")
+    parser.add_argument("--targets", type=int, nargs='+', default=[1, 5, 10, 20], help="Target counts")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    img = rng.normal(110, 20, (FRAME_HEIGHT, FRAME_WIDTH, 3)).clip(0, 255).astype(np.uint8)
+
+    print(f"Frame {FRAME_WIDTH}x{FRAME_HEIGHT}, {args.repeats} repeats")
+    print(f"{'targets':>7}  {'spectral':>10}  {'relative':>8}  {'stacked':>10}  {'relative':>8}  {'speedup':>7}")
+    baseline = None
+    for target_count in args.targets:
+        service = build_service(rng, target_count)
+        per_target = time_calls(lambda: spectral_scores(service, img), args.repeats)
+        stacked = time_calls(lambda: service.compute_match_scores(img), args.repeats)
+        baseline = baseline or (per_target, stacked)
+        print(f"{target_count:>7}  {per_target:>9.3f}s  {per_target / baseline[0]:>7.2f}x  "
+              f"{stacked:>9.3f}s  {stacked / baseline[1]:>7.2f}x  {per_target / stacked:>6.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Benchmark for reading folder-level metadata in batches.
+
+Reads GPS, make, model and XMP tags of every image in a folder twice: one
+MetaDataHelper.get_meta_data_exiftool call per image, as the folder-level services
+did through ImageService, and MetaDataHelper.get_metadata_batch with its tag
+whitelist. Both use the shared stay-open ExifTool, so the difference is the round
+trips and the tags read. Reports the time per image of each.
+
+Usage:
+    python scripts/benchmarks/benchmark_metadata_batch.py --folder PATH [--limit N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from helpers.MetaDataHelper import MetaDataHelper  # noqa: E402
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.tif', '.tiff', '.png'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", required=True, help="Folder of drone images")
+    parser.add_argument("--limit", type=int, default=500, help="Number of images to read")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.folder).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:args.limit]
+    if not paths:
+        print(f"No images found in {args.folder}")
+        return 1
+
+    # Start ExifTool before timing
+    MetaDataHelper.get_meta_data_exiftool(paths[0])
+
+    start = time.perf_counter()
+    for path in paths:
+        MetaDataHelper.get_meta_data_exiftool(path)
+    per_image = (time.perf_counter() - start) / len(paths)
+
+    start = time.perf_counter()
+    metadata = MetaDataHelper.get_metadata_batch(paths, MetaDataHelper.IMAGE_TAGS)
+    batched = (time.perf_counter() - start) / len(paths)
+    with_gps = sum(1 for tags in metadata.values() if 'Composite:GPSLatitude' in tags)
+
+    print(f"{len(paths)} images, {with_gps} with GPS")
+    print(f"one call per image, all tags  {per_image * 1000:8.2f} ms/image")
+    print(f"batches of {MetaDataHelper.METADATA_BATCH_SIZE}, whitelist   {batched * 1000:8.2f} ms/image, "
+          f"{per_image / batched:.1f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
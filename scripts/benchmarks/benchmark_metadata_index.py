@@ -0,0 +1,76 @@
+"""
+Benchmark for the persistent metadata index.
+
+Indexes every image in a folder into a fresh MetadataIndexService database (a cold
+scan: metadata is read in ExifTool batches and parsed once per image), then runs
+the same update again (a warm scan: only file sizes and modification times are
+checked) and looks every image up. Finally times spatial queries around each
+image center. Reports the time per image of each step.
+
+Usage:
+    python scripts/benchmarks/benchmark_metadata_index.py --folder PATH [--limit N] [--radius M]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from core.services.image.MetadataIndexService import MetadataIndexService  # noqa: E402
+from helpers.MetaDataHelper import MetaDataHelper  # noqa: E402
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.tif', '.tiff', '.png'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", required=True, help="Folder of drone images")
+    parser.add_argument("--limit", type=int, default=500, help="Number of images to index")
+    parser.add_argument("--radius", type=float, default=100.0, help="Radius of the spatial queries in meters")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.folder).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:args.limit]
+    if not paths:
+        print(f"No images found in {args.folder}")
+        return 1
+
+    # Start ExifTool before timing
+    try:
+        MetaDataHelper.get_meta_data_exiftool(paths[0])
+    except Exception as e:
+        print(f"ExifTool unavailable ({e}), metadata is read with piexif")
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = MetadataIndexService(os.path.join(directory, MetadataIndexService.FILE_NAME))
+        try:
+            start = time.perf_counter()
+            index.update(paths)
+            cold = (time.perf_counter() - start) / len(paths)
+
+            start = time.perf_counter()
+            index.update(paths)
+            entries = index.get_many(paths)
+            warm = (time.perf_counter() - start) / len(paths)
+
+            centers = [(entry['latitude'], entry['longitude']) for entry in entries.values()
+                       if entry['latitude'] is not None]
+            start = time.perf_counter()
+            neighbors = sum(len(index.images_near(lat, lon, args.radius)) for lat, lon in centers)
+            near = (time.perf_counter() - start) / max(len(centers), 1)
+        finally:
+            index.close()
+
+    print(f"{len(paths)} images, {len(centers)} with GPS")
+    print(f"cold scan (read and index)   {cold * 1000:8.2f} ms/image")
+    print(f"warm scan (stat and lookup)  {warm * 1000:8.2f} ms/image, {cold / warm:.0f}x faster")
+    print(f"images within {args.radius:g} m        {near * 1000:8.2f} ms/query, "
+          f"{neighbors / max(len(centers), 1):.1f} images/query")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
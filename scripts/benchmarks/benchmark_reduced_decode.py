@@ -0,0 +1,101 @@
+"""
+Benchmark for the reduced-resolution JPEG decode of AnalyzeService.process_file.
+
+Encodes a synthetic 20 MP (5472x3648) JPEG and prepares it for processing at 0.25 and
+0.5 resolution the way process_file did before (full decode, a full-resolution copy
+kept for thumbnails, INTER_AREA resize) and with the decoder's power-of-two DCT
+scaling followed by a resize of only the remainder. Every variant runs in a fresh
+process so its peak resident memory can be reported.
+
+Usage:
+    python scripts/benchmarks/benchmark_reduced_decode.py [--repeats N] [--quality Q]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from core.services.AnalyzeService import AnalyzeService  # noqa: E402
+
+FRAME_WIDTH, FRAME_HEIGHT = 5472, 3648
+
+
+def write_frame(path, quality):
+    """Encode smooth terrain with noise, like an aerial photo, as a JPEG."""
+    rng = np.random.default_rng(0)
+    terrain = cv2.resize(rng.random((FRAME_HEIGHT // 64, FRAME_WIDTH // 64, 3)).astype(np.float32),
+                         (FRAME_WIDTH, FRAME_HEIGHT), interpolation=cv2.INTER_CUBIC)
+    img = (40 + terrain * 150 + rng.normal(0, 6, (FRAME_HEIGHT, FRAME_WIDTH, 3))).clip(0, 255).astype(np.uint8)
+    cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+
+def full_decode(file_bytes, resolution):
+    """Decode at full size, keep a copy for thumbnails and resize."""
+    img = cv2.imdecode(file_bytes, cv2.IMREAD_UNCHANGED)
+    original = img.copy()
+    height, width = img.shape[:2]
+    img = cv2.resize(img, (int(width * resolution), int(height * resolution)), interpolation=cv2.INTER_AREA)
+    return img, original
+
+
+def reduced_decode(file_bytes, resolution):
+    """Decode at the largest covering power-of-two reduction and resize the remainder."""
+    img, (width, height) = AnalyzeService._decode_reduced(file_bytes, resolution)
+    size = (int(width * resolution), int(height * resolution))
+    if img.shape[1::-1] != size:
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    return img, None
+
+
+def run_variant(args):
+    """Time a variant in this (fresh) process and return its peak RSS growth in MB."""
+    name, path, resolution, repeats = args
+    function = full_decode if name == 'full' else reduced_decode
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        file_bytes = np.fromfile(path, dtype=np.uint8)
+        img, original = function(file_bytes, resolution)
+        times.append(time.perf_counter() - start)
+        del file_bytes, img, original
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return float(np.median(times)), (peak_kb - baseline_kb) / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5, help="Number of timed decodes per variant")
+    parser.add_argument("--quality", type=int, default=92, help="JPEG quality of the synthetic frame")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'frame.jpg')
+        write_frame(path, args.quality)
+        print(f"Frame {FRAME_WIDTH}x{FRAME_HEIGHT} JPEG ({os.path.getsize(path) / 1e6:.1f} MB), {args.repeats} repeats")
+
+        for resolution in (0.25, 0.5):
+            results = {}
+            for name in ('full', 'reduced'):
+                with context.Pool(1) as pool:
+                    results[name] = pool.apply(run_variant, ((name, path, resolution, args.repeats),))
+            for name, label in (('full', 'full decode + resize'), ('reduced', 'reduced decode')):
+                median, peak_mb = results[name]
+                print(f"resolution {resolution}: {label:<22} median {median:.3f} s, peak RSS +{peak_mb:.0f} MB, "
+                      f"speedup {results['full'][0] / median:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
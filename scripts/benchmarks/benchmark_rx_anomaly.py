@@ -0,0 +1,88 @@
+"""
+Benchmark for the RX anomaly scores of RXAnomalyService.
+
+Scores a synthetic 20 MP (5472x3648) frame the way the service did with spectral.rx
+on every segment, and with the streaming background statistics at full sampling, with
+a subsampling stride, and with statistics shared from the previous frame. Reports the
+time per image and the speedup over spectral.rx.
+
+Usage:
+    python scripts/benchmarks/benchmark_rx_anomaly.py [--repeats N] [--segments N] [--stride N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import spectral
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from algorithms.images.RXAnomaly.services.RXAnomalyService import RXAnomalyService  # noqa: E402
+
+FRAME_WIDTH, FRAME_HEIGHT = 5472, 3648
+
+
+def build_frame(rng):
+    """Noisy terrain in LAB with a few hundred small red discs."""
+    img = rng.normal(110, 12, (FRAME_HEIGHT, FRAME_WIDTH, 3)).clip(0, 255).astype(np.uint8)
+    for _ in range(300):
+        center = (int(rng.integers(0, FRAME_WIDTH)), int(rng.integers(0, FRAME_HEIGHT)))
+        cv2.circle(img, center, int(rng.integers(3, 12)), (30, 40, 230), -1)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+
+
+def time_calls(function, repeats):
+    """Median and minimum wall time of repeated calls."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed calls per variant")
+    parser.add_argument("--segments", type=int, default=4, help="Number of image segments")
+    parser.add_argument("--stride", type=int, default=4, help="Background sampling stride of the strided variant")
+    args = parser.parse_args()
+
+    lab_img = build_frame(np.random.default_rng(0))
+
+    def service(**options):
+        return RXAnomalyService((255, 0, 0), 10, 0, 5, True, {'sensitivity': 7, 'segments': args.segments, **options})
+
+    reference = service()
+    full = service()
+    strided = service(background_stride=args.stride)
+    shared = service(shared_background=True, background_refresh=args.repeats + 1)
+    # The first frame computes the shared statistics; timed frames reuse them
+    shared.compute_rx_values(lab_img, 'flight/0.jpg')
+
+    def spectral_rx():
+        pieces = reference.split_image(lab_img, reference.segments)
+        return reference.glue_image([[spectral.rx(piece) for piece in row] for row in pieces])
+
+    variants = [
+        ("spectral.rx per segment", spectral_rx),
+        ("streaming statistics", lambda: full.compute_rx_values(lab_img, 'flight/1.jpg')),
+        (f"streaming statistics, stride {args.stride}", lambda: strided.compute_rx_values(lab_img, 'flight/1.jpg')),
+        ("shared statistics", lambda: shared.compute_rx_values(lab_img, 'flight/1.jpg')),
+    ]
+
+    print(f"Frame {FRAME_WIDTH}x{FRAME_HEIGHT}, {args.segments} segments, {args.repeats} repeats")
+    baseline = None
+    for name, function in variants:
+        median, minimum = time_calls(function, args.repeats)
+        baseline = baseline or median
+        print(f"{name:<36} median {median:.3f} s, min {minimum:.3f} s, speedup {baseline / median:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Benchmark for sparse detection masks against full-frame deflate TIFF masks.
+
+Builds a 20 MP (5472x3648) detection mask with a number of small AOIs, writes it the
+way AlgorithmService.store_mask did (single-band deflate TIFF) and as a SparseMask,
+and reports file size, write time, the time to load the whole mask and the time of
+ImageHighlightService.apply_mask_highlight on a frame, as the viewer runs it for
+every image load.
+
+Usage:
+    python scripts/benchmarks/benchmark_sparse_mask.py [--aois N] [--repeats N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import tifffile
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from core.services.image.ImageHighlightService import ImageHighlightService  # noqa: E402
+from helpers.SparseMask import SparseMask  # noqa: E402
+
+FRAME_WIDTH, FRAME_HEIGHT = 5472, 3648
+
+
+def build_mask(rng, aois):
+    """Irregular detections of 5 to 40 pixels radius with some scattered noise pixels."""
+    mask = np.zeros((FRAME_HEIGHT, FRAME_WIDTH), dtype=np.uint8)
+    for _ in range(aois):
+        center = (int(rng.integers(0, FRAME_WIDTH)), int(rng.integers(0, FRAME_HEIGHT)))
+        cv2.ellipse(mask, center, (int(rng.integers(5, 40)), int(rng.integers(5, 40))), float(rng.integers(0, 180)),
+                    0, 360, 255, -1)
+    mask[rng.integers(0, FRAME_HEIGHT, aois * 4), rng.integers(0, FRAME_WIDTH, aois * 4)] = 255
+    return mask
+
+
+def time_calls(function, repeats):
+    """Median wall time of repeated calls."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aois", type=int, default=50, help="Number of detections in the mask")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of timed calls per variant")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    mask = build_mask(rng, args.aois)
+    frame = rng.integers(0, 256, (FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tiff_path = os.path.join(tmpdir, 'mask.tif')
+        sparse_path = os.path.join(tmpdir, f'mask{SparseMask.EXTENSION}')
+
+        def write_tiff():
+            tifffile.imwrite(tiff_path, mask[None], photometric='minisblack', metadata={'axes': 'CYX'},
+                             compression='deflate')
+
+        variants = [
+            ("deflate TIFF", tiff_path, write_tiff),
+            ("sparse mask", sparse_path, lambda: SparseMask.write(sparse_path, mask)),
+        ]
+
+        print(f"Mask {FRAME_WIDTH}x{FRAME_HEIGHT}, {args.aois} AOIs, "
+              f"{np.count_nonzero(mask) / mask.size:.4%} detected, {args.repeats} repeats")
+        for name, path, write in variants:
+            write_time = time_calls(write, args.repeats)
+            load_time = time_calls(lambda: SparseMask.load_mask(path), args.repeats)
+            highlight_time = time_calls(lambda: ImageHighlightService.apply_mask_highlight(frame, path), args.repeats)
+            print(f"{name:<13} size {os.path.getsize(path) / 1024:8.1f} KB, write {write_time * 1000:7.1f} ms, "
+                  f"load {load_time * 1000:7.1f} ms, highlight {highlight_time * 1000:7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
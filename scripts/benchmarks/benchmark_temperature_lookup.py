@@ -0,0 +1,88 @@
+"""
+Benchmark for temperature lookups from stored thermal results.
+
+Stores a synthetic temperature matrix the way AlgorithmService.store_mask did (float32
+band in a multi-band deflate TIFF) and as a TemperatureGrid, then answers 1,000 random
+point queries, as the viewer does while the cursor moves. Reports the time to open
+the data, the latency per point lookup, the file size and the largest quantization
+error of the grid.
+
+Usage:
+    python scripts/benchmarks/benchmark_temperature_lookup.py [--width W] [--height H] [--queries N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import tifffile
+
+ROOT = Path(__file__).resolve().parents[2]  # → project root
+sys.path.insert(0, str(ROOT / "app"))
+
+from helpers.TemperatureGrid import TemperatureGrid  # noqa: E402
+
+
+def build_temperatures(rng, width, height):
+    """Smooth ground temperatures with a few warm spots, upscaled like DJI thermal images."""
+    ground = cv2.resize(rng.uniform(5, 30, (height // 32, width // 32)).astype(np.float32), (width, height),
+                        interpolation=cv2.INTER_CUBIC)
+    for _ in range(20):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        cv2.circle(ground, center, int(rng.integers(3, 15)), float(rng.uniform(33, 38)), -1)
+    return ground
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280, help="Temperature matrix width")
+    parser.add_argument("--height", type=int, default=1024, help="Temperature matrix height")
+    parser.add_argument("--queries", type=int, default=1000, help="Number of random point lookups")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    temperatures = build_temperatures(rng, args.width, args.height)
+    xs = rng.integers(0, args.width, args.queries)
+    ys = rng.integers(0, args.height, args.queries)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tiff_path = os.path.join(tmpdir, 'mask.tif')
+        grid_path = os.path.join(tmpdir, f'mask{TemperatureGrid.EXTENSION}')
+        mask = np.zeros(temperatures.shape, dtype=np.float32)
+        tifffile.imwrite(tiff_path, np.stack([mask, temperatures]), photometric='minisblack',
+                         metadata={'axes': 'CYX'}, compression='deflate')
+        TemperatureGrid.write(grid_path, temperatures)
+
+        start = time.perf_counter()
+        data = tifffile.imread(tiff_path)[1]
+        tiff_open = time.perf_counter() - start
+        start = time.perf_counter()
+        for x, y in zip(xs, ys):
+            float(data[y][x])
+        tiff_lookup = (time.perf_counter() - start) / args.queries
+
+        start = time.perf_counter()
+        grid = TemperatureGrid(grid_path)
+        grid_open = time.perf_counter() - start
+        start = time.perf_counter()
+        for x, y in zip(xs, ys):
+            grid.point(int(x), int(y))
+        grid_lookup = (time.perf_counter() - start) / args.queries
+        error = np.abs(np.asarray(grid).astype(np.float64) - temperatures).max()
+
+        print(f"Temperatures {args.width}x{args.height}, {args.queries} random point lookups")
+        print(f"deflate TIFF      size {os.path.getsize(tiff_path) / 1024:8.1f} KB, open {tiff_open * 1000:7.2f} ms, "
+              f"lookup {tiff_lookup * 1e6:6.2f} us, first answer after {(tiff_open + tiff_lookup) * 1000:7.2f} ms")
+        print(f"temperature grid  size {os.path.getsize(grid_path) / 1024:8.1f} KB, open {grid_open * 1000:7.2f} ms, "
+              f"lookup {grid_lookup * 1e6:6.2f} us, first answer after {(grid_open + grid_lookup) * 1000:7.2f} ms")
+        print(f"largest quantization error {error:.4f} C (bound {grid.max_error:.4f} C)")
+        del grid
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())